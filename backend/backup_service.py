@@ -6,9 +6,15 @@ Handles backup and restore operations for MongoDB collections
 import os
 import json
 import gzip
+import asyncio
+import hashlib
+import uuid
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from bson import ObjectId, json_util
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteOne, IndexModel, InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import OperationFailure
 import logging
 from gcs_storage import get_gcs_storage
 
@@ -29,6 +35,10 @@ BACKUP_COLLECTIONS = [
     'share_requests',
     'transactions',
     
+    # Wallet Ledger (statement entries and their backfill markers)
+    'ledger_entries',
+    'ledger_backfills',
+    
     # Account Data
     'ad_accounts',
     'account_groups',
@@ -49,6 +59,47 @@ BACKUP_COLLECTIONS = [
     'restore_history'
 ]
 
+# Backed up for the audit trail but never restored: a restore must not rewrite
+# the history of backups made since, nor its own running restore_history record
+RESTORE_SKIPPED_COLLECTIONS = ('backup_history', 'restore_history')
+
+# Streaming backup format: one gzip stream of NDJSON lines
+#   {"_backup": {...header}}
+#   {"_collection": "<name>"}            followed by one Extended JSON document per line
+#   {"_collection_end": "<name>", "count": n, "sha256": "..."}
+#   {"_manifest": {...}}                 per-collection counts and checksums
+#
+# Each collection section (from its "_collection" line through "_collection_end")
+# is its own gzip member, and the manifest records the member's byte offset in
+# the file ("offset"), so a restore seeks straight to a section instead of
+# decompressing everything before it. The members concatenate into one valid
+# gzip stream, so whole-file readers are unaffected.
+#
+# Delta (incremental) backups use the same envelope, but between the header and
+# the manifest hold one change per line, in capture order:
+#   {"op": "upsert", "coll": "<name>", "ts": {"$date": ...}, "doc": {...}}
+#   {"op": "delete", "coll": "<name>", "ts": {"$date": ...}, "_id": ...}
+BACKUP_FORMAT = "ndjson-v2"
+# ndjson-v1 dropped _id, so deltas (which replay by _id) can only chain onto v2 backups
+STREAMING_FORMATS = ("ndjson-v1", "ndjson-v2")
+BACKUP_DIR = os.environ.get("BACKUP_DIR", "/tmp")
+BACKUP_GCS_FOLDER = "database_backups"
+BACKUP_BATCH_SIZE = int(os.environ.get("BACKUP_BATCH_SIZE", 500))
+# Encoded lines are handed to the gzip writer thread in chunks of about this size
+BACKUP_FLUSH_BYTES = 4 * 1024 * 1024
+RESTORE_BATCH_SIZE = int(os.environ.get("RESTORE_BATCH_SIZE", 500))
+# Collections restored at the same time
+RESTORE_CONCURRENCY = int(os.environ.get("RESTORE_CONCURRENCY", 4))
+RESTORE_MODE_REPLACE = "replace"
+RESTORE_MODE_UPSERT = "upsert"
+RESTORE_MODES = (RESTORE_MODE_REPLACE, RESTORE_MODE_UPSERT)
+# Dates decode as timezone-aware UTC so delta timestamps compare with point-in-time targets
+BACKUP_JSON_OPTIONS = json_util.RELAXED_JSON_OPTIONS.with_options(tz_aware=True, tzinfo=timezone.utc)
+
+# Change capture modes recorded on every backup for the next delta to start from
+CAPTURE_CHANGE_STREAM = "change_stream"
+CAPTURE_TIMESTAMP = "timestamp"
+
 def serialize_mongo_doc(doc):
     """Convert MongoDB document to JSON-serializable format"""
     if doc is None:
@@ -79,97 +130,378 @@ def remove_object_id(doc):
         return doc
     return doc
 
-async def create_backup(db: AsyncIOMotorDatabase, backup_type: str = "manual") -> Dict:
+def encode_backup_line(doc: Dict) -> bytes:
+    """Encode one document (or change record) as an Extended JSON line; _id, dates and other BSON types round-trip"""
+    return (json_util.dumps(doc, json_options=BACKUP_JSON_OPTIONS, ensure_ascii=False) + "\n").encode('utf-8')
+
+def _marker_line(marker: Dict) -> bytes:
+    return encode_backup_line(marker)
+
+_MARKER_PREFIXES = (b'{"_backup"', b'{"_collection', b'{"_manifest"')
+
+class _HashingWriter:
+    """Write-through file wrapper tracking the size and SHA-256 of the compressed output"""
+    
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+    
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.fileobj.write(data)
+    
+    def flush(self):
+        self.fileobj.flush()
+
+class _GzipLineWriter:
+    """Buffered NDJSON writer; compression runs in a worker thread in BACKUP_FLUSH_BYTES chunks"""
+    
+    def __init__(self, local_path: str):
+        self.raw = open(local_path, 'wb')
+        self.hashing = _HashingWriter(self.raw)
+        self.gz = gzip.GzipFile(fileobj=self.hashing, mode='wb')
+        self.buffer = []
+        self.buffered = 0
+        self.written = 0  # Uncompressed bytes accepted so far
+    
+    async def write(self, line: bytes):
+        self.buffer.append(line)
+        self.buffered += len(line)
+        self.written += len(line)
+        if self.buffered >= BACKUP_FLUSH_BYTES:
+            await self.flush()
+    
+    async def flush(self):
+        if self.buffer:
+            await asyncio.to_thread(self.gz.write, b"".join(self.buffer))
+            self.buffer, self.buffered = [], 0
+    
+    async def start_member(self) -> int:
+        """End the current gzip member and start a new one; returns its offset in the file"""
+        await self.flush()
+        await asyncio.to_thread(self.gz.close)
+        offset = self.hashing.size
+        self.gz = gzip.GzipFile(fileobj=self.hashing, mode='wb')
+        return offset
+    
+    async def close(self):
+        try:
+            await self.flush()
+            self.gz.close()
+        finally:
+            self.raw.close()
+
+def _finish_manifest(local_path: str, manifest: Dict, writer: _GzipLineWriter) -> Dict:
+    manifest["file_size"] = writer.hashing.size
+    manifest["file_sha256"] = writer.hashing.sha256.hexdigest()
+    
+    # Sidecar manifest so restore/verification never has to scan the archive
+    with open(manifest_path_for(local_path), 'w') as f:
+        f.write(json_util.dumps(manifest, json_options=BACKUP_JSON_OPTIONS, indent=2, ensure_ascii=False))
+    
+    return manifest
+
+async def write_backup_file(
+    db: AsyncIOMotorDatabase,
+    collections: List[str],
+    local_path: str,
+    header: Dict
+) -> Dict:
     """
-    Create a full database backup
+    Stream collections into a gzip-compressed NDJSON backup file
+    
+    Documents are read from cursors in batches and pushed through an incremental
+    gzip stream, so memory stays flat regardless of collection size.
     
     Args:
         db: MongoDB database instance
-        backup_type: "manual", "incremental", or "scheduled"
+        collections: Collection names to write, in order
+        local_path: Destination file path
+        header: Backup header (backup_id, backup_date, backup_type, ...)
     
     Returns:
-        Dict with backup metadata and file path
+        Dict: Manifest with per-collection counts and checksums
     """
+    manifest = {**header, "format": BACKUP_FORMAT, "collections": {}}
+    writer = _GzipLineWriter(local_path)
+    
     try:
-        timestamp = datetime.now(timezone.utc)
-        backup_id = timestamp.strftime("%Y%m%d_%H%M%S")
+        await writer.write(_marker_line({"_backup": {**header, "format": BACKUP_FORMAT}}))
         
-        backup_data = {
-            "backup_id": backup_id,
-            "backup_date": timestamp.isoformat(),
-            "backup_type": backup_type,
-            "collections": {}
-        }
-        
-        # Backup each collection
-        for collection_name in BACKUP_COLLECTIONS:
+        for collection_name in collections:
+            checksum = hashlib.sha256()
+            count = 0
+            entry = {"offset": await writer.start_member()}
+            await writer.write(_marker_line({"_collection": collection_name}))
+            start = writer.written
+            
             try:
-                collection = db[collection_name]
-                documents = await collection.find().to_list(length=None)
+                cursor = db[collection_name].find({}).batch_size(BACKUP_BATCH_SIZE)
+                async for doc in cursor:
+                    line = encode_backup_line(doc)
+                    checksum.update(line)
+                    count += 1
+                    await writer.write(line)
                 
-                # Serialize documents
-                serialized_docs = [serialize_mongo_doc(doc) for doc in documents]
-                
-                backup_data["collections"][collection_name] = {
-                    "count": len(serialized_docs),
-                    "documents": serialized_docs
-                }
-                
-                logger.info(f"Backed up {len(serialized_docs)} documents from {collection_name}")
+                entry["indexes"] = _index_specs(await db[collection_name].index_information())
+                logger.info(f"Backed up {count} documents from {collection_name}")
                 
             except Exception as e:
                 logger.error(f"Error backing up collection {collection_name}: {e}")
-                backup_data["collections"][collection_name] = {
-                    "error": str(e),
-                    "count": 0,
-                    "documents": []
-                }
+                entry["error"] = str(e)
+            
+            entry.update({"count": count, "sha256": checksum.hexdigest(), "bytes": writer.written - start})
+            manifest["collections"][collection_name] = entry
+            await writer.write(_marker_line({"_collection_end": collection_name, **entry}))
         
-        # Convert to JSON
-        json_data = json.dumps(backup_data, indent=2, ensure_ascii=False)
+        manifest["total_documents"] = sum(c["count"] for c in manifest["collections"].values())
+        await writer.write(_marker_line({"_manifest": manifest}))
+    finally:
+        await writer.close()
+    
+    return _finish_manifest(local_path, manifest, writer)
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def _change_pipeline(collections: List[str]) -> List[Dict]:
+    return [{"$match": {
+        "ns.coll": {"$in": collections},
+        "operationType": {"$in": ["insert", "update", "replace", "delete"]}
+    }}]
+
+def _change_record(change: Dict) -> Optional[Dict]:
+    """Delta record for one change stream event (None for updates of since-deleted documents)"""
+    record = {
+        "op": "delete" if change["operationType"] == "delete" else "upsert",
+        "coll": change["ns"]["coll"],
+        "ts": change["clusterTime"].as_datetime()
+    }
+    if record["op"] == "delete":
+        record["_id"] = change["documentKey"]["_id"]
+        return record
+    
+    # updateLookup returns None when the document was deleted before the lookup;
+    # the delete event that follows covers it
+    if change.get("fullDocument") is None:
+        return None
+    record["doc"] = change["fullDocument"]
+    return record
+
+def _change_time(doc: Dict, default: datetime) -> datetime:
+    """Best-known modification time of a document captured by the timestamp fallback"""
+    updated_at = doc.get("updated_at")
+    if isinstance(updated_at, datetime):
+        return _as_utc(updated_at)
+    if isinstance(doc.get("_id"), ObjectId):
+        return doc["_id"].generation_time
+    return default
+
+def _timestamp_delta_query(since: datetime) -> Dict:
+    """Documents inserted (ObjectId time) or updated (updated_at, as date or ISO string) since a high-water mark"""
+    return {"$or": [
+        {"_id": {"$gt": ObjectId.from_datetime(since)}},
+        {"updated_at": {"$gte": since}},
+        {"updated_at": {"$gte": since.isoformat()}}
+    ]}
+
+async def capture_change_position(db: AsyncIOMotorDatabase) -> Dict:
+    """
+    Record where the next delta backup should start reading changes from
+    
+    Uses a change stream resume token when the server has an oplog (replica set
+    or Atlas). Standalone servers fall back to an updated_at / ObjectId
+    high-water mark, which cannot see deletes.
+    
+    Returns:
+        Dict: capture mode, resume token (if any) and high-water mark
+    """
+    high_water = datetime.now(timezone.utc).isoformat()
+    try:
+        async with db.watch(_change_pipeline(BACKUP_COLLECTIONS)) as stream:
+            await stream.try_next()
+            return {
+                "capture": CAPTURE_CHANGE_STREAM,
+                "change_stream_token": stream.resume_token,
+                "high_water": high_water
+            }
+    except OperationFailure as e:
+        logger.warning(f"⚠️ Change streams unavailable, delta backups will use timestamps: {e}")
+        return {"capture": CAPTURE_TIMESTAMP, "high_water": high_water}
+
+async def write_delta_file(
+    db: AsyncIOMotorDatabase,
+    collections: List[str],
+    local_path: str,
+    header: Dict,
+    position: Dict
+) -> Tuple[Dict, Dict]:
+    """
+    Stream changes made since a recorded position into a delta backup file
+    
+    Args:
+        db: MongoDB database instance
+        collections: Collection names to capture
+        local_path: Destination file path
+        header: Backup header (backup_id, base_backup_id, parent_backup_id, ...)
+        position: Position recorded by the parent backup (see capture_change_position)
+    
+    Returns:
+        Tuple[Dict, Dict]: (manifest, position for the next delta)
+    """
+    started = datetime.now(timezone.utc)
+    capture = position.get("capture", CAPTURE_TIMESTAMP)
+    header = {**header, "capture": capture, "deletes_captured": capture == CAPTURE_CHANGE_STREAM}
+    manifest = {**header, "format": BACKUP_FORMAT, "collections": {}}
+    checksums = {}
+    writer = _GzipLineWriter(local_path)
+    
+    async def write_record(record: Dict):
+        entry = manifest["collections"].setdefault(record["coll"], {"upserts": 0, "deletes": 0})
+        entry["upserts" if record["op"] == "upsert" else "deletes"] += 1
+        line = encode_backup_line(record)
+        checksums.setdefault(record["coll"], hashlib.sha256()).update(line)
+        await writer.write(line)
+    
+    try:
+        await writer.write(_marker_line({"_backup": {**header, "format": BACKUP_FORMAT}}))
         
-        # Compress with gzip
-        compressed_data = gzip.compress(json_data.encode('utf-8'))
+        if capture == CAPTURE_CHANGE_STREAM:
+            token = position["change_stream_token"]
+            async with db.watch(
+                _change_pipeline(collections),
+                full_document="updateLookup",
+                start_after=token,
+                batch_size=BACKUP_BATCH_SIZE
+            ) as stream:
+                while True:
+                    change = await stream.try_next()
+                    if change is None:
+                        # Caught up: the post-batch token covers everything read so far
+                        token = stream.resume_token
+                        break
+                    if change["clusterTime"].as_datetime() > started:
+                        # Leave changes made while this delta runs to the next one
+                        break
+                    record = _change_record(change)
+                    if record:
+                        await write_record(record)
+                    token = change["_id"]
+            next_position = {
+                "capture": CAPTURE_CHANGE_STREAM,
+                "change_stream_token": token,
+                "high_water": started.isoformat()
+            }
+        else:
+            since = datetime.fromisoformat(position["high_water"])
+            for collection_name in collections:
+                cursor = db[collection_name].find(_timestamp_delta_query(since)).batch_size(BACKUP_BATCH_SIZE)
+                async for doc in cursor:
+                    await write_record({
+                        "op": "upsert",
+                        "coll": collection_name,
+                        "ts": _change_time(doc, started),
+                        "doc": doc
+                    })
+            next_position = {"capture": CAPTURE_TIMESTAMP, "high_water": started.isoformat()}
         
-        # Create filename
-        filename = f"backup_{backup_type}_{backup_id}.json.gz"
-        local_path = f"/tmp/{filename}"
+        for collection_name, entry in manifest["collections"].items():
+            entry["count"] = entry["upserts"] + entry["deletes"]
+            entry["sha256"] = checksums[collection_name].hexdigest()
+        manifest["total_documents"] = sum(c["count"] for c in manifest["collections"].values())
+        await writer.write(_marker_line({"_manifest": manifest}))
+    finally:
+        await writer.close()
+    
+    return _finish_manifest(local_path, manifest, writer), next_position
+
+def manifest_path_for(local_path: str) -> str:
+    """Path of the sidecar manifest written next to a backup file"""
+    return f"{local_path}.manifest.json"
+
+def read_backup_manifest(local_path: str) -> Optional[Dict]:
+    """Load the sidecar manifest of a backup file, if present"""
+    try:
+        with open(manifest_path_for(local_path)) as f:
+            return json_util.loads(f.read(), json_options=BACKUP_JSON_OPTIONS)
+    except (OSError, ValueError):
+        return None
+
+async def upload_backup_file(local_path: str, filename: str) -> Optional[str]:
+    """Upload a backup file and its manifest to GCS with a resumable upload (off the event loop)"""
+    gcs_path = f"{BACKUP_GCS_FOLDER}/{filename}"
+    try:
+        gcs_storage = get_gcs_storage()
+        gcs_url = await asyncio.to_thread(
+            gcs_storage.upload_file_resumable, local_path, gcs_path, 'application/gzip'
+        )
+        manifest_path = manifest_path_for(local_path)
+        if os.path.exists(manifest_path):
+            await asyncio.to_thread(
+                gcs_storage.upload_file_resumable, manifest_path, f"{gcs_path}.manifest.json", 'application/json'
+            )
+        logger.info(f"Backup uploaded to GCS: {gcs_url}")
+        return gcs_url
+    except Exception as e:
+        logger.error(f"Failed to upload backup to GCS: {e}")
+        return None
+
+async def create_backup(db: AsyncIOMotorDatabase, backup_type: str = "manual") -> Dict:
+    """
+    Create a full database backup
+    
+    Args:
+        db: MongoDB database instance
+        backup_type: "manual", "incremental", or "scheduled"
+    
+    Returns:
+        Dict with backup metadata and file path
+    """
+    try:
+        timestamp = datetime.now(timezone.utc)
+        backup_id = timestamp.strftime("%Y%m%d_%H%M%S")
         
-        # Save locally (temporary)
-        with open(local_path, 'wb') as f:
-            f.write(compressed_data)
+        filename = f"backup_{backup_type}_{backup_id}.ndjson.gz"
+        local_path = os.path.join(BACKUP_DIR, filename)
         
-        # Upload to GCS
-        gcs_folder = "database_backups"
-        gcs_path = f"{gcs_folder}/{filename}"
+        # Taken before the dump: changes made while it runs are replayed by the next delta
+        position = await capture_change_position(db)
         
-        try:
-            gcs_storage = get_gcs_storage()
-            with open(local_path, 'rb') as f:
-                gcs_url = gcs_storage.upload_file(f, gcs_path, content_type='application/gzip')
-            logger.info(f"Backup uploaded to GCS: {gcs_url}")
-        except Exception as e:
-            logger.error(f"Failed to upload backup to GCS: {e}")
-            gcs_url = None
+        manifest = await write_backup_file(
+            db,
+            BACKUP_COLLECTIONS,
+            local_path,
+            header={
+                "backup_id": backup_id,
+                "backup_date": timestamp.isoformat(),
+                "backup_type": backup_type
+            }
+        )
+        
+        gcs_url = await upload_backup_file(local_path, filename)
         
         # Save backup metadata to database
         backup_metadata = {
             "backup_id": backup_id,
             "backup_date": timestamp.isoformat(),
             "backup_type": backup_type,
+            "format": BACKUP_FORMAT,
             "filename": filename,
             "gcs_url": gcs_url,
             "local_path": local_path,
-            "file_size": len(compressed_data),
-            "collections_count": len(backup_data["collections"]),
-            "total_documents": sum(
-                coll.get("count", 0) 
-                for coll in backup_data["collections"].values()
-            ),
+            "file_size": manifest["file_size"],
+            "file_sha256": manifest["file_sha256"],
+            "collections_count": len(manifest["collections"]),
+            "total_documents": manifest["total_documents"],
+            "manifest": manifest["collections"],
+            **position,
             "status": "completed"
         }
         
         await db.backup_history.insert_one(backup_metadata)
+        backup_metadata.pop('_id', None)
         
         return {
             "success": True,
@@ -204,105 +536,556 @@ async def get_backup_history(db: AsyncIOMotorDatabase, limit: int = 20) -> List[
         logger.error(f"Error getting backup history: {e}")
         return []
 
-async def restore_backup(db: AsyncIOMotorDatabase, backup_file_path: str, selected_collections: Optional[List[str]] = None) -> Dict:
+def _read_lines(reader, max_lines: int) -> List[bytes]:
+    """Read up to max_lines lines from a (gzip) file object"""
+    lines = []
+    for _ in range(max_lines):
+        line = reader.readline()
+        if not line:
+            break
+        lines.append(line)
+    return lines
+
+def _read_backup_header(backup_file_path: str) -> Optional[Dict]:
+    """Header of a streaming backup (None for legacy single-document backups)"""
+    with gzip.open(backup_file_path, 'rb') as f:
+        first_line = f.readline()
+    try:
+        return json.loads(first_line).get("_backup")
+    except ValueError:
+        return None
+
+def _scan_backup_manifest(backup_file_path: str) -> Dict:
+    """Rebuild a manifest from the section markers when the sidecar file is missing"""
+    manifest = {"collections": {}}
+    with gzip.open(backup_file_path, 'rb') as reader:
+        for line in reader:
+            if line.startswith(b'{"_collection_end"'):
+                entry = json_util.loads(line, json_options=BACKUP_JSON_OPTIONS)
+                manifest["collections"][entry.pop("_collection_end")] = entry
+            elif line.startswith(b'{"_backup"'):
+                manifest.update(json.loads(line)["_backup"])
+    return manifest
+
+class _MemberReader(gzip.GzipFile):
+    """gzip reader starting at a member offset of a backup file; closing it closes the file"""
+    
+    def __init__(self, path: str, offset: int):
+        self.raw = open(path, 'rb')
+        self.raw.seek(offset)
+        super().__init__(fileobj=self.raw, mode='rb')
+    
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.raw.close()
+
+def _open_section(backup_file_path: str, collection_name: str, offset: Optional[int] = None):
     """
-    Restore database from backup file
+    gzip reader positioned at the first document of a collection section (None if absent)
     
-    Args:
-        db: MongoDB database instance
-        backup_file_path: Path to backup file
-        selected_collections: List of collections to restore (None = all)
+    With the section's member offset from the manifest the reader starts there;
+    backups written before sections had their own members are scanned from the start.
+    """
+    marker = _marker_line({"_collection": collection_name})
+    if offset is not None:
+        reader = _MemberReader(backup_file_path, offset)
+        try:
+            if reader.readline() == marker:
+                return reader
+        except (OSError, EOFError):
+            pass
+        reader.close()
+        logger.warning(f"⚠️ Section offset of {collection_name} is invalid, scanning the backup")
     
-    Returns:
-        Dict with restore results
+    reader = gzip.open(backup_file_path, 'rb')
+    for line in reader:
+        if line == marker:
+            return reader
+    reader.close()
+    return None
+
+def _read_section_batch(reader, batch_size: int) -> Tuple[List[Dict], bool]:
+    """Decode up to batch_size documents; the flag is set at the end of the section"""
+    docs = []
+    for line in _read_lines(reader, batch_size):
+        if line.startswith(b'{"_collection_end"'):
+            return docs, True
+        docs.append(json_util.loads(line, json_options=BACKUP_JSON_OPTIONS))
+    return docs, len(docs) < batch_size
+
+async def _section_batches(backup_file_path: str, collection_name: str, batch_size: int, offset: Optional[int] = None):
+    """Documents of one collection section, in batches; each section gets its own reader so collections restore in parallel"""
+    reader = await asyncio.to_thread(_open_section, backup_file_path, collection_name, offset)
+    if reader is None:
+        return
+    try:
+        while True:
+            docs, done = await asyncio.to_thread(_read_section_batch, reader, batch_size)
+            if docs:
+                yield docs
+            if done:
+                break
+    finally:
+        reader.close()
+
+async def _list_batches(documents: List[Dict], batch_size: int):
+    for i in range(0, len(documents), batch_size):
+        yield documents[i:i + batch_size]
+
+def _index_specs(index_information: Dict) -> List[Dict]:
+    """JSON-safe index definitions from index_information(), without the default _id index"""
+    specs = []
+    for name, info in index_information.items():
+        if name == "_id_":
+            continue
+        spec = {key: value for key, value in info.items() if key not in ("v", "ns", "key")}
+        spec["name"] = name
+        spec["key"] = [[field, direction] for field, direction in info["key"]]
+        specs.append(spec)
+    return specs
+
+def _index_models(specs: List[Dict]) -> List[IndexModel]:
+    return [
+        IndexModel([tuple(key) for key in spec["key"]], **{k: v for k, v in spec.items() if k != "key"})
+        for spec in specs
+    ]
+
+def _upsert_operation(doc: Dict, mode: str):
     """
+    Write operation restoring one document without wiping the collection
+    
+    Upsert mode matches on the business id; the backed-up _id is only used when
+    the document is inserted, so existing documents keep theirs. Documents
+    without an id (and every document in replace mode) are matched on _id.
+    """
+    if mode == RESTORE_MODE_UPSERT and "id" in doc:
+        fields = {key: value for key, value in doc.items() if key != "_id"}
+        update = {"$set": fields}
+        if "_id" in doc:
+            update["$setOnInsert"] = {"_id": doc["_id"]}
+        return UpdateOne({"id": doc["id"]}, update, upsert=True)
+    if "_id" in doc:
+        return ReplaceOne({"_id": doc["_id"]}, doc, upsert=True)
+    return InsertOne(doc)
+
+class _RestoreProgress:
+    """Per-collection progress kept on the restore_history record while a restore runs"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase, restore_id: str):
+        self.db = db
+        self.restore_id = restore_id
+    
+    async def update(self, collection_name: str, **fields):
+        await self.db.restore_history.update_one(
+            {"restore_id": self.restore_id},
+            {"$set": {f"progress.{collection_name}.{key}": value for key, value in fields.items()}}
+        )
+
+async def _restore_collection(
+    db: AsyncIOMotorDatabase,
+    collection_name: str,
+    batches,
+    mode: str,
+    backup_indexes: Optional[List[Dict]],
+    progress: _RestoreProgress
+) -> Dict:
+    """
+    Load one collection from an async iterator of document batches
+    
+    Replace mode clears the collection and drops its secondary indexes, loads
+    with ordered bulk_write batches, then rebuilds the indexes (those it had plus
+    those recorded in the backup). Upsert mode keeps existing data and indexes.
+    """
+    collection = db[collection_name]
+    result = {"status": "success", "mode": mode}
+    restored = 0
+    indexes = {}
+    dropped_indexes = False
+    
     try:
-        # Read and decompress backup file
-        with gzip.open(backup_file_path, 'rb') as f:
-            json_data = f.read().decode('utf-8')
+        existing = _index_specs(await collection.index_information())
+        indexes = {spec["name"]: spec for spec in (backup_indexes or []) + existing}
         
-        backup_data = json.loads(json_data)
+        if mode == RESTORE_MODE_REPLACE:
+            delete_result = await collection.delete_many({})
+            result["deleted"] = delete_result.deleted_count
+            if existing:
+                await collection.drop_indexes()
+                dropped_indexes = True
+        elif not any(spec["key"][0][0] == "id" for spec in existing):
+            # Upserts match on id
+            await collection.create_index([("id", 1)])
         
-        collections_to_restore = selected_collections or list(backup_data["collections"].keys())
+        await progress.update(collection_name, status="running")
         
-        restore_results = {
-            "backup_id": backup_data.get("backup_id"),
-            "backup_date": backup_data.get("backup_date"),
-            "collections": {}
-        }
+        async for docs in batches:
+            if mode == RESTORE_MODE_REPLACE:
+                operations = [InsertOne(doc) for doc in docs]
+            else:
+                operations = [_upsert_operation(doc, mode) for doc in docs]
+            await collection.bulk_write(operations, ordered=True)
+            restored += len(docs)
+            await progress.update(collection_name, restored=restored)
         
-        for collection_name in collections_to_restore:
-            try:
-                if collection_name not in backup_data["collections"]:
-                    restore_results["collections"][collection_name] = {
-                        "status": "skipped",
-                        "reason": "not found in backup"
-                    }
+        result["inserted" if mode == RESTORE_MODE_REPLACE else "upserted"] = restored
+        logger.info(f"Restored {restored} documents to {collection_name} ({mode})")
+        
+    except Exception as e:
+        logger.error(f"Error restoring collection {collection_name}: {e}")
+        result = {"status": "error", "mode": mode, "error": str(e), "restored": restored}
+    
+    if mode == RESTORE_MODE_REPLACE and indexes:
+        try:
+            await collection.create_indexes(_index_models(list(indexes.values())))
+            result["indexes_rebuilt"] = len(indexes)
+        except Exception as e:
+            logger.error(f"Error rebuilding indexes of {collection_name}: {e}")
+            result["index_error"] = str(e)
+            if dropped_indexes:
+                result["status"] = "error"
+    
+    await progress.update(collection_name, status=result["status"], restored=restored)
+    return result
+
+async def _restore_collections(
+    db: AsyncIOMotorDatabase,
+    sources: Dict[str, Tuple],
+    mode: str,
+    progress: _RestoreProgress
+) -> Dict[str, Dict]:
+    """Restore collections concurrently, at most RESTORE_CONCURRENCY at a time"""
+    semaphore = asyncio.Semaphore(RESTORE_CONCURRENCY)
+    
+    async def restore_one(collection_name: str, batches, backup_indexes):
+        async with semaphore:
+            return await _restore_collection(db, collection_name, batches, mode, backup_indexes, progress)
+    
+    names = list(sources.keys())
+    results = await asyncio.gather(*(restore_one(name, *sources[name]) for name in names))
+    return dict(zip(names, results))
+
+async def _restore_streaming_backup(
+    db: AsyncIOMotorDatabase,
+    backup_file_path: str,
+    manifest: Dict,
+    selected_collections: Optional[List[str]],
+    mode: str,
+    batch_size: int,
+    progress: _RestoreProgress
+) -> Dict:
+    """Restore an NDJSON backup; every collection section is streamed by its own reader"""
+    restore_results = {
+        "backup_id": manifest.get("backup_id"),
+        "backup_date": manifest.get("backup_date"),
+        "collections": {}
+    }
+    sources = {}
+    
+    for collection_name in selected_collections or list(manifest["collections"].keys()):
+        entry = manifest["collections"].get(collection_name)
+        if collection_name in RESTORE_SKIPPED_COLLECTIONS:
+            restore_results["collections"][collection_name] = {"status": "skipped", "reason": "audit history is not restored"}
+        elif entry is None:
+            restore_results["collections"][collection_name] = {"status": "skipped", "reason": "not found in backup"}
+        elif entry.get("error"):
+            restore_results["collections"][collection_name] = {"status": "skipped", "reason": f"backup error: {entry['error']}"}
+        elif not entry.get("count"):
+            restore_results["collections"][collection_name] = {"status": "skipped", "reason": "no documents"}
+        else:
+            sources[collection_name] = (
+                _section_batches(backup_file_path, collection_name, batch_size, entry.get("offset")),
+                entry.get("indexes")
+            )
+    
+    restore_results["collections"].update(await _restore_collections(db, sources, mode, progress))
+    return restore_results
+
+def _restore_legacy_collections(backup_file_path: str) -> Dict:
+    """Load a pre-streaming (single JSON document) backup"""
+    with gzip.open(backup_file_path, 'rb') as f:
+        return json.loads(f.read().decode('utf-8'))
+
+async def _restore_legacy_backup(
+    db: AsyncIOMotorDatabase,
+    backup_file_path: str,
+    selected_collections: Optional[List[str]],
+    mode: str,
+    batch_size: int,
+    progress: _RestoreProgress
+) -> Dict:
+    """Restore a pre-streaming .json.gz backup (whole file held in memory)"""
+    backup_data = await asyncio.to_thread(_restore_legacy_collections, backup_file_path)
+    
+    restore_results = {
+        "backup_id": backup_data.get("backup_id"),
+        "backup_date": backup_data.get("backup_date"),
+        "collections": {}
+    }
+    sources = {}
+    
+    for collection_name in selected_collections or list(backup_data["collections"].keys()):
+        if collection_name in RESTORE_SKIPPED_COLLECTIONS:
+            restore_results["collections"][collection_name] = {"status": "skipped", "reason": "audit history is not restored"}
+            continue
+        if collection_name not in backup_data["collections"]:
+            restore_results["collections"][collection_name] = {"status": "skipped", "reason": "not found in backup"}
+            continue
+        
+        documents = backup_data["collections"][collection_name].get("documents", [])
+        if not documents:
+            restore_results["collections"][collection_name] = {"status": "skipped", "reason": "no documents"}
+            continue
+        
+        sources[collection_name] = (_list_batches(documents, batch_size), None)
+    
+    restore_results["collections"].update(await _restore_collections(db, sources, mode, progress))
+    return restore_results
+
+async def _apply_delta_file(
+    db: AsyncIOMotorDatabase,
+    delta_file_path: str,
+    selected_collections: Optional[List[str]],
+    until: Optional[datetime],
+    mode: str = RESTORE_MODE_REPLACE,
+    batch_size: int = RESTORE_BATCH_SIZE
+) -> Dict:
+    """
+    Replay one delta backup on top of the restored data
+    
+    Changes are applied in capture order with ordered bulk writes (upserts, and
+    deletes by _id); changes made after `until` are skipped.
+    
+    Returns:
+        Dict: backup_id and per-collection upsert/delete counts
+    """
+    selected = set(selected_collections) if selected_collections else None
+    result = {"collections": {}}
+    
+    with gzip.open(delta_file_path, 'rb') as reader:
+        while True:
+            lines = await asyncio.to_thread(_read_lines, reader, batch_size)
+            if not lines:
+                break
+            
+            # Group this batch per collection; order only matters within a collection
+            operations = {}
+            for line in lines:
+                if line.startswith(_MARKER_PREFIXES):
+                    marker = json.loads(line)
+                    if "_backup" in marker:
+                        result["backup_id"] = marker["_backup"].get("backup_id")
                     continue
                 
-                collection_data = backup_data["collections"][collection_name]
-                documents = collection_data.get("documents", [])
-                
-                if not documents:
-                    restore_results["collections"][collection_name] = {
-                        "status": "skipped",
-                        "reason": "no documents"
-                    }
+                record = json_util.loads(line, json_options=BACKUP_JSON_OPTIONS)
+                collection_name = record["coll"]
+                if selected is not None and collection_name not in selected:
+                    continue
+                if collection_name in RESTORE_SKIPPED_COLLECTIONS:
+                    continue
+                if until and record["ts"] > until:
                     continue
                 
-                # Clear existing collection
-                collection = db[collection_name]
-                delete_result = await collection.delete_many({})
-                
-                # Insert backup documents
-                if documents:
-                    await collection.insert_many(documents)
-                
-                restore_results["collections"][collection_name] = {
-                    "status": "success",
-                    "deleted": delete_result.deleted_count,
-                    "inserted": len(documents)
-                }
-                
-                logger.info(f"Restored {len(documents)} documents to {collection_name}")
-                
-            except Exception as e:
-                logger.error(f"Error restoring collection {collection_name}: {e}")
-                restore_results["collections"][collection_name] = {
-                    "status": "error",
-                    "error": str(e)
-                }
+                counts = result["collections"].setdefault(collection_name, {"upserts": 0, "deletes": 0})
+                if record["op"] == "delete":
+                    operation = DeleteOne({"_id": record["_id"]})
+                    counts["deletes"] += 1
+                else:
+                    operation = _upsert_operation(record["doc"], mode)
+                    counts["upserts"] += 1
+                operations.setdefault(collection_name, []).append(operation)
+            
+            for collection_name, batch in operations.items():
+                await db[collection_name].bulk_write(batch, ordered=True)
+    
+    logger.info(f"Applied delta backup {result.get('backup_id')}: {result['collections']}")
+    return result
+
+async def restore_backup(
+    db: AsyncIOMotorDatabase,
+    backup_file_path: str,
+    selected_collections: Optional[List[str]] = None,
+    delta_file_paths: Optional[List[str]] = None,
+    until: Optional[datetime] = None,
+    mode: str = RESTORE_MODE_REPLACE,
+    batch_size: int = RESTORE_BATCH_SIZE
+) -> Dict:
+    """
+    Restore database from backup file
+    
+    Collections are streamed from the archive and restored concurrently in
+    ordered bulk_write batches. Progress is kept on the restore_history record
+    (restore_id) while the restore runs. backup_history and restore_history are
+    never restored (RESTORE_SKIPPED_COLLECTIONS).
+    
+    Args:
+        db: MongoDB database instance
+        backup_file_path: Path to the (full) backup file
+        selected_collections: List of collections to restore (None = all)
+        delta_file_paths: Delta backups chained to this backup, oldest first (see resolve_backup_chain)
+        until: Point in time to restore to; later changes in the deltas are skipped
+        mode: "replace" (clear each collection, then load) or "upsert" (merge by id, nothing is deleted)
+        batch_size: Documents per bulk_write batch
+    
+    Returns:
+        Dict with restore results
+    """
+    if mode not in RESTORE_MODES:
+        return {"success": False, "error": f"Invalid restore mode: {mode}"}
+    
+    until = _as_utc(until) if until else None
+    restore_id = str(uuid.uuid4())
+    progress = _RestoreProgress(db, restore_id)
+    
+    try:
+        header = await asyncio.to_thread(_read_backup_header, backup_file_path)
+        manifest = None
+        if header is not None:
+            manifest = read_backup_manifest(backup_file_path) or await asyncio.to_thread(
+                _scan_backup_manifest, backup_file_path
+            )
         
-        # Save restore metadata
-        restore_metadata = {
+        await db.restore_history.insert_one({
+            "restore_id": restore_id,
             "restore_date": datetime.now(timezone.utc).isoformat(),
-            "backup_id": backup_data.get("backup_id"),
-            "backup_date": backup_data.get("backup_date"),
-            "collections_restored": collections_to_restore,
-            "results": restore_results
-        }
+            "status": "running",
+            "mode": mode,
+            "backup_id": (header or {}).get("backup_id"),
+            "backup_date": (header or {}).get("backup_date"),
+            "point_in_time": until.isoformat() if until else None,
+            "progress": {
+                name: {"status": "pending", "restored": 0, "total": entry.get("count")}
+                for name, entry in (manifest or {}).get("collections", {}).items()
+                if (not selected_collections or name in selected_collections)
+                and name not in RESTORE_SKIPPED_COLLECTIONS
+            }
+        })
         
-        await db.restore_history.insert_one(restore_metadata)
+        if manifest is not None:
+            restore_results = await _restore_streaming_backup(
+                db, backup_file_path, manifest, selected_collections, mode, batch_size, progress
+            )
+        else:
+            restore_results = await _restore_legacy_backup(
+                db, backup_file_path, selected_collections, mode, batch_size, progress
+            )
+        collections_to_restore = list(restore_results["collections"].keys())
+        
+        if delta_file_paths:
+            restore_results["deltas"] = []
+            for delta_file_path in delta_file_paths:
+                delta_result = await _apply_delta_file(
+                    db, delta_file_path, selected_collections, until, mode, batch_size
+                )
+                restore_results["deltas"].append(delta_result)
+                for collection_name in delta_result["collections"]:
+                    if collection_name not in collections_to_restore:
+                        collections_to_restore.append(collection_name)
+        
+        # Save restore metadata
+        await db.restore_history.update_one(
+            {"restore_id": restore_id},
+            {"$set": {
+                "status": "completed",
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+                "backup_id": restore_results.get("backup_id"),
+                "backup_date": restore_results.get("backup_date"),
+                "collections_restored": collections_to_restore,
+                "results": restore_results
+            }}
+        )
         
         return {
             "success": True,
+            "restore_id": restore_id,
             "results": restore_results
         }
         
     except Exception as e:
         logger.error(f"Error restoring backup: {e}")
+        await db.restore_history.update_one(
+            {"restore_id": restore_id},
+            {"$set": {"status": "failed", "error": str(e)}}
+        )
         return {
             "success": False,
+            "restore_id": restore_id,
             "error": str(e)
         }
 
-async def create_incremental_backup(db: AsyncIOMotorDatabase, changed_collections: List[str]) -> Dict:
+async def resolve_backup_chain(
+    db: AsyncIOMotorDatabase,
+    backup_id: str,
+    until: Optional[datetime] = None
+) -> List[Dict]:
     """
-    Create incremental backup for specific collections
+    Backups to replay for a restore: the base full backup followed by its deltas
+    
+    For a delta backup_id the chain ends at that delta. For a full backup the chain
+    ends at the first delta taken at or after `until` (no deltas without `until`).
     
     Args:
         db: MongoDB database instance
-        changed_collections: List of collection names that changed
+        backup_id: Full or delta backup to restore
+        until: Optional point in time (timezone-aware)
+    
+    Returns:
+        List[Dict]: backup_history records, base first (empty if backup_id is unknown)
+    
+    Raises:
+        ValueError: When a delta of the chain is missing
+    """
+    backup = await db.backup_history.find_one({"backup_id": backup_id}, {"_id": 0})
+    if not backup:
+        return []
+    until = _as_utc(until) if until else None
+    
+    if backup.get("backup_type") == "incremental" and backup.get("base_backup_id"):
+        base = await db.backup_history.find_one({"backup_id": backup["base_backup_id"]}, {"_id": 0})
+        if not base:
+            raise ValueError(f"Base backup {backup['base_backup_id']} not found")
+        last_date = backup["backup_date"]
+    elif until is None:
+        return [backup]
+    else:
+        base = backup
+        last_date = None
+    
+    if until and base["backup_date"] > until.isoformat():
+        raise ValueError(f"Point in time is before backup {base['backup_id']}")
+    
+    chain = [base]
+    deltas = db.backup_history.find(
+        {"base_backup_id": base["backup_id"], "backup_type": "incremental"},
+        {"_id": 0}
+    ).sort("backup_date", 1)
+    
+    async for delta in deltas:
+        if last_date and delta["backup_date"] > last_date:
+            break
+        if delta.get("parent_backup_id") != chain[-1]["backup_id"]:
+            raise ValueError(f"Backup chain broken before delta {delta['backup_id']}")
+        chain.append(delta)
+        if until and delta["backup_date"] >= until.isoformat():
+            break
+    
+    return chain
+
+async def create_incremental_backup(db: AsyncIOMotorDatabase, changed_collections: Optional[List[str]] = None) -> Dict:
+    """
+    Create a delta backup of the changes since the previous backup
+    
+    Only documents inserted, updated or deleted since the last full or delta
+    backup are written. The delta is chained to its base full backup
+    (base_backup_id) and to the backup it continues from (parent_backup_id).
+    Without a usable base (none yet, or change history expired) a full backup is
+    taken instead.
+    
+    Args:
+        db: MongoDB database instance
+        changed_collections: Collections known to have changed (recorded for audit;
+            every backed-up collection is captured so no change is skipped)
     
     Returns:
         Dict with backup metadata
@@ -330,68 +1113,86 @@ async def create_incremental_backup(db: AsyncIOMotorDatabase, changed_collection
                     "message": "Backup throttled (< 5 minutes since last backup)"
                 }
         
-        backup_data = {
-            "backup_id": backup_id,
-            "backup_date": timestamp.isoformat(),
-            "backup_type": "incremental",
-            "changed_collections": changed_collections,
-            "collections": {}
-        }
-        
-        # Backup only changed collections
-        for collection_name in changed_collections:
-            if collection_name not in BACKUP_COLLECTIONS:
-                continue
-                
-            try:
-                collection = db[collection_name]
-                documents = await collection.find().to_list(length=None)
-                serialized_docs = [serialize_mongo_doc(doc) for doc in documents]
-                
-                backup_data["collections"][collection_name] = {
-                    "count": len(serialized_docs),
-                    "documents": serialized_docs
-                }
-                
-            except Exception as e:
-                logger.error(f"Error in incremental backup for {collection_name}: {e}")
+        # The newest backup carrying a change position is the parent of this delta
+        parent = await db.backup_history.find_one(
+            {"format": BACKUP_FORMAT, "status": "completed", "high_water": {"$exists": True}},
+            sort=[("backup_date", -1)]
+        )
         
-        # Save to GCS
-        json_data = json.dumps(backup_data, indent=2, ensure_ascii=False)
-        compressed_data = gzip.compress(json_data.encode('utf-8'))
+        if not parent:
+            logger.info("No base backup for delta, creating a full backup")
+            result = await create_backup(db, backup_type="scheduled")
+            return {**result, "throttled": False, "rebased": True}
         
-        filename = f"backup_incremental_{backup_id}.json.gz"
-        local_path = f"/tmp/{filename}"
+        if parent["backup_id"] == backup_id:
+            # Backup ids have one-second resolution
+            return {
+                "success": True,
+                "throttled": True,
+                "message": "Backup throttled (previous backup was taken this second)"
+            }
         
-        with open(local_path, 'wb') as f:
-            f.write(compressed_data)
+        base_backup_id = parent.get("base_backup_id") or parent["backup_id"]
+        filename = f"backup_incremental_{backup_id}.ndjson.gz"
+        local_path = os.path.join(BACKUP_DIR, filename)
         
-        gcs_path = f"database_backups/{filename}"
         try:
-            gcs_storage = get_gcs_storage()
-            with open(local_path, 'rb') as f:
-                gcs_url = gcs_storage.upload_file(f, gcs_path, content_type='application/gzip')
-        except Exception as e:
-            logger.error(f"Failed to upload incremental backup to GCS: {e}")
-            gcs_url = None
+            manifest, position = await write_delta_file(
+                db,
+                BACKUP_COLLECTIONS,
+                local_path,
+                header={
+                    "backup_id": backup_id,
+                    "backup_date": timestamp.isoformat(),
+                    "backup_type": "incremental",
+                    "base_backup_id": base_backup_id,
+                    "parent_backup_id": parent["backup_id"],
+                    "since": parent["high_water"]
+                },
+                position=parent
+            )
+        except OperationFailure as e:
+            # Resume token fell off the oplog (ChangeStreamHistoryLost): start a new chain
+            logger.warning(f"⚠️ Cannot continue backup chain from {parent['backup_id']}, creating a full backup: {e}")
+            for path in (local_path, manifest_path_for(local_path)):
+                if os.path.exists(path):
+                    os.remove(path)
+            result = await create_backup(db, backup_type="scheduled")
+            return {**result, "throttled": False, "rebased": True}
+        
+        gcs_url = await upload_backup_file(local_path, filename)
         
         # Save metadata
         backup_metadata = {
             "backup_id": backup_id,
             "backup_date": timestamp.isoformat(),
             "backup_type": "incremental",
+            "format": BACKUP_FORMAT,
             "filename": filename,
             "gcs_url": gcs_url,
+            "local_path": local_path,
+            "base_backup_id": base_backup_id,
+            "parent_backup_id": parent["backup_id"],
             "changed_collections": changed_collections,
-            "file_size": len(compressed_data),
+            "deletes_captured": manifest["deletes_captured"],
+            "file_size": manifest["file_size"],
+            "file_sha256": manifest["file_sha256"],
+            "collections_count": len(manifest["collections"]),
+            "total_documents": manifest["total_documents"],
+            "manifest": manifest["collections"],
+            **position,
             "status": "completed"
         }
         
         await db.backup_history.insert_one(backup_metadata)
         
+        logger.info(f"✅ Delta backup {backup_id}: {manifest['total_documents']} changes since {parent['backup_id']}")
+        
         return {
             "success": True,
             "backup_id": backup_id,
+            "base_backup_id": base_backup_id,
+            "total_changes": manifest["total_documents"],
             "throttled": False
         }
         
@@ -428,8 +1229,16 @@ async def cleanup_old_backups(db: AsyncIOMotorDatabase, keep_daily: int = 7, kee
                 if len(incremental_backups) < 50:  # Keep last 50 incremental
                     incremental_backups.append(backup)
         
-        # Delete old backups
-        backups_to_keep_ids = [b["backup_id"] for b in daily_backups + weekly_backups + incremental_backups]
+        # Delete old backups. A delta restores only on top of its base and every delta
+        # before it (parent_backup_id), so chains are kept whole: the recent deltas pick
+        # the chains, and each kept chain keeps its base and all of its deltas
+        kept_chains = {b["base_backup_id"] for b in incremental_backups if b.get("base_backup_id")}
+        chain_deltas = [
+            b for b in all_backups
+            if b.get("backup_type") == "incremental" and b.get("base_backup_id") in kept_chains
+        ]
+        backups_to_keep_ids = {b["backup_id"] for b in daily_backups + weekly_backups + incremental_backups + chain_deltas}
+        backups_to_keep_ids |= kept_chains
         
         for backup in all_backups:
             if backup["backup_id"] not in backups_to_keep_ids:
@@ -0,0 +1,104 @@
+"""
+Batch Loader Module
+Request-scoped, DataLoader-style document loaders that resolve foreign ids
+with one `$in` query per collection instead of one find_one per row
+"""
+from typing import Any, Dict, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Payment proofs may carry base64 file content; list endpoints never need it
+PROOF_LIST_PROJECTION = {"file_data": 0}
+
+
+class BatchLoader:
+    """Memoizing loader for documents of one collection keyed by a single field"""
+
+    def __init__(
+        self,
+        collection,
+        key_field: str = "id",
+        projection: Optional[dict] = None,
+        base_query: Optional[dict] = None
+    ):
+        """
+        Args:
+            collection: Motor collection to read from
+            key_field: Document field the keys refer to (e.g. "id", "tracking_id")
+            projection: Optional projection applied to every batch query
+            base_query: Optional extra conditions every loaded document must match
+        """
+        self.collection = collection
+        self.key_field = key_field
+        self.projection = projection
+        self.base_query = base_query or {}
+        self.round_trips = 0
+        self._cache: Dict[Any, Optional[dict]] = {}
+
+    async def load_many(self, keys: Iterable[Any]) -> Dict[Any, Optional[dict]]:
+        """
+        Resolve keys in one query, skipping keys that are already memoized
+
+        Returns:
+            dict: key -> document (None when no document matches)
+        """
+        keys = [key for key in keys if key is not None]
+        missing = list(dict.fromkeys(key for key in keys if key not in self._cache))
+
+        if missing:
+            self.round_trips += 1
+            query = {**self.base_query, self.key_field: {"$in": missing}}
+            cursor = self.collection.find(query, self.projection)
+            async for doc in cursor:
+                # Keep the first match per key, mirroring find_one semantics
+                self._cache.setdefault(doc.get(self.key_field), doc)
+            for key in missing:
+                self._cache.setdefault(key, None)
+
+        return {key: self._cache[key] for key in keys}
+
+    async def load(self, key: Any) -> Optional[dict]:
+        """Resolve a single key (batched with nothing, but memoized)"""
+        if key is None:
+            return None
+        await self.load_many([key])
+        return self._cache[key]
+
+    def get(self, key: Any) -> Optional[dict]:
+        """Return an already loaded document without touching the database"""
+        return self._cache.get(key)
+
+
+class RequestLoaders:
+    """Set of loaders shared by everything that runs within one API request"""
+
+    def __init__(self, db):
+        self.users = BatchLoader(db.users)
+        self.admin_users = BatchLoader(db.admin_users)
+        self.ad_accounts = BatchLoader(db.ad_accounts)
+        self.payment_proofs = BatchLoader(db.payment_proofs, projection=PROOF_LIST_PROJECTION)
+        self.proofs_by_tracking_id = BatchLoader(
+            db.payment_proofs, key_field="tracking_id", projection=PROOF_LIST_PROJECTION
+        )
+        self.pending_proofs_by_tracking_id = BatchLoader(
+            db.payment_proofs,
+            key_field="tracking_id",
+            projection=PROOF_LIST_PROJECTION,
+            base_query={"pending_edit": True}
+        )
+
+    @property
+    def round_trips(self) -> int:
+        """Total number of batch queries issued by all loaders"""
+        return sum(
+            loader.round_trips
+            for loader in (
+                self.users,
+                self.admin_users,
+                self.ad_accounts,
+                self.payment_proofs,
+                self.proofs_by_tracking_id,
+                self.pending_proofs_by_tracking_id,
+            )
+        )
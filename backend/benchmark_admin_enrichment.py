@@ -0,0 +1,154 @@
+"""
+Admin Enrichment Benchmark
+Counts Mongo round trips of the admin list endpoints with per-row find_one
+lookups (previous behaviour) versus request-scoped batch loaders
+
+Usage:
+    MONGO_URL=mongodb://localhost:27017 python benchmark_admin_enrichment.py --rows 1000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from pymongo import monitoring
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the benchmark database"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in ("find", "aggregate", "getMore"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+counter = CommandCounter()
+monitoring.register(counter)
+
+# server.py reads its connection settings at import time
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = os.environ.get("BENCH_DB_NAME", "rimuru_enrichment_bench")
+
+import server  # noqa: E402
+from batch_loader import RequestLoaders  # noqa: E402
+from fastapi import Response  # noqa: E402
+from pagination import QueuePageParams  # noqa: E402
+
+
+async def seed(db, rows: int):
+    """Seed users, admins, ad accounts, proofs and top-up requests"""
+    for name in ("users", "admin_users", "ad_accounts", "payment_proofs", "topup_requests",
+                 "wallet_topup_requests", "ad_account_requests", "wallet_transfers"):
+        await db[name].delete_many({})
+
+    now = datetime.now(timezone.utc)
+    users = [{"id": str(uuid.uuid4()), "username": f"user{i}", "email": f"user{i}@example.com",
+              "name": f"User {i}"} for i in range(max(rows // 10, 1))]
+    admins = [{"id": str(uuid.uuid4()), "username": f"admin{i}", "name": f"Admin {i}"} for i in range(5)]
+    await db.users.insert_many(users)
+    await db.admin_users.insert_many(admins)
+
+    accounts, proofs, topups, wallet_topups, account_requests = [], [], [], [], []
+    for i in range(rows):
+        user = users[i % len(users)]
+        admin = admins[i % len(admins)]
+        created_at = (now - timedelta(minutes=i)).isoformat()
+        account_id = str(uuid.uuid4())
+        proof_id = str(uuid.uuid4())
+        request_id = str(uuid.uuid4())
+        accounts.append({"id": account_id, "user_id": user["id"], "account_id": f"act_{i}",
+                         "account_name": f"Account {i}", "platform": "facebook",
+                         "fee_updated_by": admin["id"], "created_at": created_at})
+        proofs.append({"id": proof_id, "file_name": f"proof_{i}.jpg", "file_path": f"proofs/{i}.jpg",
+                       "uploaded_at": created_at, "file_data": "A" * 1024})
+        proofs.append({"id": str(uuid.uuid4()), "tracking_id": f"proof_tracking_{request_id}_{account_id}_spend_limit",
+                       "pending_edit": False})
+        topups.append({"id": request_id, "user_id": user["id"], "payment_proof_id": proof_id,
+                       "verified_by": admin["id"], "status": "verified", "currency": "IDR",
+                       "total_amount": 100000, "created_at": created_at, "verified_at": created_at,
+                       "accounts": [{"account_id": account_id, "amount": 100000,
+                                     "spend_limit_proof_url": f"/files/{i}.jpg"}]})
+        wallet_topups.append({"id": str(uuid.uuid4()), "user_id": user["id"], "payment_proof_id": proof_id,
+                              "verified_by": admin["id"], "wallet_type": "main", "currency": "IDR",
+                              "amount": 50000, "payment_method": "bank_transfer", "status": "verified",
+                              "created_at": created_at})
+        account_requests.append({"id": str(uuid.uuid4()), "user_id": user["id"], "verified_by": admin["id"],
+                                 "platform": "facebook", "status": "approved", "created_at": created_at})
+
+    await db.ad_accounts.insert_many(accounts)
+    await db.payment_proofs.insert_many(proofs)
+    await db.topup_requests.insert_many(topups)
+    await db.wallet_topup_requests.insert_many(wallet_topups)
+    await db.ad_account_requests.insert_many(account_requests)
+
+
+async def per_row_lookups(db):
+    """Replays the previous per-row find_one access pattern of /admin/payments"""
+    requests = await db.topup_requests.find({}).sort("created_at", -1).to_list(1000)
+    for req in requests:
+        await db.users.find_one({"id": req["user_id"]})
+        if req.get("payment_proof_id"):
+            await db.payment_proofs.find_one({"id": req["payment_proof_id"]})
+        if req.get("verified_by"):
+            await db.admin_users.find_one({"id": req["verified_by"]})
+        for acc in req.get("accounts", []):
+            await db.ad_accounts.find_one({"id": acc["account_id"]})
+            if acc.get("spend_limit_proof_url"):
+                await db.payment_proofs.find_one(
+                    {"tracking_id": f"proof_tracking_{req['id']}_{acc['account_id']}_spend_limit"}
+                )
+            await db.ad_accounts.find_one({"id": acc["account_id"]})
+
+
+async def measure(label: str, coro_factory):
+    counter.count = 0
+    started = time.perf_counter()
+    result = await coro_factory()
+    elapsed = (time.perf_counter() - started) * 1000
+    rows = len(result) if isinstance(result, list) else "-"
+    print(f"{label:<45} rows={rows!s:<6} round_trips={counter.count:<6} time={elapsed:8.1f} ms")
+
+
+async def main(rows: int):
+    db = server.db
+    print(f"Seeding {rows} rows into {os.environ['DB_NAME']}...")
+    await seed(db, rows)
+
+    # Endpoint functions are called directly, bypassing auth dependencies
+    def queue_args():
+        return {"response": Response(), "status": None, "page": QueuePageParams(),
+                "current_admin": None, "loaders": RequestLoaders(db)}
+
+    print()
+    await measure("/admin/payments (per-row find_one)", lambda: per_row_lookups(db))
+    await measure("/admin/payments (batch loaders)",
+                  lambda: server.get_payment_requests(**queue_args()))
+    await measure("/admin/topup-requests (batch loaders)",
+                  lambda: server.get_account_topup_requests(**queue_args()))
+    await measure("/admin/wallet-topup-requests (batch loaders)",
+                  lambda: server.get_wallet_topup_requests(**queue_args()))
+    await measure("/admin/requests (batch loaders)",
+                  lambda: server.get_all_requests(None, None, None, RequestLoaders(db)))
+    await measure("/admin/accounts (batch loaders)",
+                  lambda: server.get_all_ad_accounts(None, None, None, None, RequestLoaders(db)))
+
+    await server.client.drop_database(os.environ["DB_NAME"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Number of requests to seed per collection")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
@@ -0,0 +1,125 @@
+"""
+Email Rendering Benchmark
+Render time per email and memory footprint of the Jinja2 templates versus the
+previous f-string send_* functions
+
+Usage:
+    git show <commit-before-templates>:backend/email_service.py > /tmp/legacy_email_service.py
+    python benchmark_email_rendering.py --iterations 200 --legacy /tmp/legacy_email_service.py
+"""
+
+import argparse
+import gc
+import importlib.util
+import inspect
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Sample values by parameter name; anything else gets a short string
+SAMPLE_ARGS = {
+    "admin_emails": ["admin1@example.com", "admin2@example.com"],
+    "amount": 1500000.0,
+    "currency": "IDR",
+    "platform": "facebook",
+    "wallet_type": "main",
+    "target_count": 3,
+    "is_super_admin": True,
+    "balance_transferred": True,
+    "notification_type": "success",
+    "action_type": "wallet_topup",
+}
+
+
+def load_module(name: str, path: Path):
+    """Import a module from a file path under the given name, tracking allocated memory"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    if hasattr(module, "email_renderer"):
+        module.email_renderer.precompile()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return module, retained
+
+
+def capture_sends(module, sink: list):
+    """Replace the transport so send_* functions return the rendered content instead of sending"""
+    def capture(*args, **kwargs):
+        sink.append(args)
+        return True
+    module.EmailService.send_email = staticmethod(capture)
+    if hasattr(module.EmailService, "send_bulk_email"):
+        module.EmailService.send_bulk_email = staticmethod(capture)
+
+
+def email_functions(module):
+    """Module-level send_*_email functions with sample arguments"""
+    functions = {}
+    for name, func in inspect.getmembers(module, inspect.isfunction):
+        if not (name.startswith("send_") and name.endswith("_email")) or func.__module__ != module.__name__:
+            continue
+        kwargs = {}
+        for param in inspect.signature(func).parameters.values():
+            kwargs[param.name] = SAMPLE_ARGS.get(param.name, f"sample {param.name}")
+        functions[name] = (func, kwargs)
+    return functions
+
+
+def measure(module, iterations: int):
+    """Return (mean microseconds per email, peak bytes while rendering) over all send_* functions"""
+    sink = []
+    capture_sends(module, sink)
+    functions = email_functions(module)
+
+    # Warm-up pass (also compiles templates lazily when precompile was skipped)
+    for func, kwargs in functions.values():
+        func(**kwargs)
+
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for func, kwargs in functions.values():
+            func(**kwargs)
+            sink.clear()
+    elapsed = time.perf_counter() - started
+    per_email_us = elapsed / (iterations * len(functions)) * 1_000_000
+
+    tracemalloc.start()
+    for func, kwargs in functions.values():
+        func(**kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    sink.clear()
+
+    return len(functions), per_email_us, peak
+
+
+def main(iterations: int, legacy: str):
+    sys.path.insert(0, str(Path(__file__).parent))
+    rows = []
+
+    if legacy:
+        module, retained = load_module("legacy_email_service", Path(legacy))
+        rows.append(("f-string (legacy)", retained, *measure(module, iterations)))
+
+    module, retained = load_module("email_service", Path(__file__).parent / "email_service.py")
+    rows.append(("jinja2 templates", retained, *measure(module, iterations)))
+
+    print(f"{'renderer':<20} {'emails':>6} {'µs/email':>10} {'peak render KB':>15} {'module KB':>10}")
+    for label, retained, count, per_email_us, peak in rows:
+        print(f"{label:<20} {count:>6} {per_email_us:>10.1f} {peak / 1024:>15.1f} {retained / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="Render passes over every email")
+    parser.add_argument("--legacy", default=None, help="Path to the previous f-string email_service.py")
+    args = parser.parse_args()
+    main(args.iterations, args.legacy)
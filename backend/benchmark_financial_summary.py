@@ -0,0 +1,148 @@
+"""
+Financial Summary Benchmark
+Latency of /admin/financial-reports/summary over a seeded dataset: the previous
+per-currency pipelines over the request collections versus one $facet over the
+daily rollups, cold and from the report cache
+
+Usage:
+    MONGO_URL=mongodb://localhost:27017 python benchmark_financial_summary.py --topups 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from financial_rollup import ROLLUP_COLLECTION, financial_summary, rebuild_rollups, report_cache
+
+SEED_BATCH_SIZE = 10000
+PAYMENT_METHODS = {"IDR": ["bank_bca", "bank_mandiri", "bank_bri", None], "USD": ["usdt_trc20", "crypto_bep20", None]}
+
+
+def _created_at(now: datetime, days: int) -> str:
+    return (now - timedelta(seconds=random.randint(0, days * 86400))).isoformat()
+
+
+async def seed(db, topups: int, days: int):
+    """Seed account top-ups plus a tenth as many wallet top-ups, transfers and withdrawals"""
+    for name in ("topup_requests", "wallet_topup_requests", "wallet_transfers", "withdraw_requests", ROLLUP_COLLECTION):
+        await db[name].delete_many({})
+
+    now = datetime.now(timezone.utc)
+    others = max(topups // 10, 1)
+
+    def topup():
+        currency = random.choice(["IDR", "USD"])
+        total = random.randint(100, 10000) * (1000 if currency == "IDR" else 1)
+        return {"id": str(uuid.uuid4()), "currency": currency, "payment_method": random.choice(PAYMENT_METHODS[currency]),
+                "status": random.choice(["verified", "verified", "completed", "pending", "rejected"]),
+                "total_amount": total, "total_fee": round(total * 0.05, 2), "created_at": _created_at(now, days)}
+
+    def wallet_topup():
+        currency = random.choice(["IDR", "USD"])
+        return {"id": str(uuid.uuid4()), "currency": currency, "payment_method": random.choice(PAYMENT_METHODS[currency]),
+                "status": random.choice(["verified", "pending", "rejected"]),
+                "amount": random.randint(100, 10000), "total_fee": 0, "created_at": _created_at(now, days)}
+
+    def transfer():
+        return {"id": str(uuid.uuid4()), "currency": random.choice(["IDR", "USD"]),
+                "status": random.choice(["completed", "approved", "pending"]),
+                "amount": random.randint(100, 10000), "fee": random.randint(0, 500), "created_at": _created_at(now, days)}
+
+    def withdraw():
+        return {"id": str(uuid.uuid4()), "currency": random.choice(["IDR", "USD"]),
+                "status": random.choice(["pending", "approved", "completed", "rejected"]),
+                "requested_amount": random.randint(100, 10000), "created_at": _created_at(now, days)}
+
+    for collection, factory, count in (("topup_requests", topup, topups), ("wallet_topup_requests", wallet_topup, others),
+                                       ("wallet_transfers", transfer, others), ("withdraw_requests", withdraw, others)):
+        for offset in range(0, count, SEED_BATCH_SIZE):
+            await db[collection].insert_many([factory() for _ in range(min(SEED_BATCH_SIZE, count - offset))], ordered=False)
+        await db[collection].create_index([("created_at", 1)])
+        print(f"  {collection}: {count} documents")
+
+
+async def legacy_summary(db, date_filter: dict):
+    """The previous summary: separate pipelines per collection and currency over the requests"""
+    topup_filter = {**date_filter, "status": {"$in": ["verified", "approved", "completed"]}}
+    methods = {
+        "IDR": [{"payment_method": {"$regex": "^bank_", "$options": "i"}}],
+        "USD": [{"payment_method": {"$regex": "usdt|crypto", "$options": "i"}}],
+    }
+    for currency in ("IDR", "USD"):
+        await db.topup_requests.aggregate([
+            {"$match": {**topup_filter, "currency": currency, "$or": methods[currency] + [
+                {"payment_method": {"$in": [None, ""]}}, {"payment_method": {"$exists": False}}]}},
+            {"$project": {"total_fee": 1, "pure_amount": {"$subtract": ["$total_amount", "$total_fee"]}}},
+            {"$group": {"_id": None, "total_fee": {"$sum": "$total_fee"}, "pure_amount": {"$sum": "$pure_amount"}, "count": {"$sum": 1}}}
+        ]).to_list(1)
+    for currency in ("IDR", "USD"):
+        await db.wallet_transfers.aggregate([
+            {"$match": {**date_filter, "status": {"$in": ["completed", "approved"]}, "currency": currency}},
+            {"$group": {"_id": None, "total_fee": {"$sum": "$fee"}, "count": {"$sum": 1}}}
+        ]).to_list(1)
+    for currency in ("IDR", "USD"):
+        await db.wallet_topup_requests.aggregate([
+            {"$match": {**topup_filter, "currency": currency}},
+            {"$group": {"_id": None, "total_amount": {"$sum": "$amount"}, "count": {"$sum": 1}}}
+        ]).to_list(1)
+    await db.withdraw_requests.aggregate([
+        {"$match": date_filter},
+        {"$group": {"_id": {"currency": "$currency", "status": "$status"}, "total_amount": {"$sum": "$requested_amount"}, "count": {"$sum": 1}}}
+    ]).to_list(length=None)
+
+
+async def measure(label: str, coro_factory, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<45} median={statistics.median(timings):9.1f} ms  max={max(timings):9.1f} ms")
+
+
+async def main(args):
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db_name = os.environ.get("BENCH_DB_NAME", "rimuru_financial_bench")
+    db = client[db_name]
+
+    print(f"Seeding {args.topups} top-ups over {args.days} days into {db_name}...")
+    await seed(db, args.topups, args.days)
+
+    started = time.perf_counter()
+    rows = await rebuild_rollups(db)
+    print(f"Rollup backfill: {rows} rows in {time.perf_counter() - started:.1f} s\n")
+
+    month_start = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    periods = {
+        "all": ({}, None),
+        "month": ({"created_at": {"$gte": month_start.isoformat()}}, month_start.date()),
+    }
+    for period, (date_filter, start_day) in periods.items():
+        print(f"period={period}")
+        await measure("  request pipelines (previous)", lambda: legacy_summary(db, date_filter), args.repeat)
+        await measure("  $facet over rollups", lambda: financial_summary(db, start_day), args.repeat)
+
+        async def cached():
+            return await report_cache.get_or_compute(("bench", period), lambda: financial_summary(db, start_day))
+        report_cache.invalidate()
+        await measure("  $facet over rollups, report cache", cached, args.repeat)
+
+    if not args.keep:
+        await client.drop_database(db_name)
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topups", type=int, default=1000000, help="Account top-ups to seed")
+    parser.add_argument("--days", type=int, default=3 * 365, help="Spread created_at over this many days")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark database afterwards")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,70 @@
+"""
+LLM Gateway Benchmark
+Event loop responsiveness and provider calls with the gateway versus the
+previous blocking litellm.completion call, using FakeProvider (no network)
+
+Usage:
+    python benchmark_llm_gateway.py --requests 20 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+
+async def probe(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Largest delay of a periodic timer while the requests run"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(label: str, request, count: int):
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(request(i) for i in range(count)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    worst = await prober
+    print(f"{label:<34} {elapsed:>8.2f}s {worst * 1000:>12.0f}ms")
+
+
+async def main(count: int, latency: float):
+    sys.path.insert(0, str(Path(__file__).parent))
+    from llm_gateway import FakeProvider, LLMGateway
+
+    print(f"{'mode':<34} {'wall':>9} {'max loop lag':>13}")
+
+    async def blocking(i):
+        # What litellm.completion did inside the async handlers
+        time.sleep(latency)
+
+    await run("blocking call in handler", blocking, count)
+
+    provider = FakeProvider(latency=latency)
+    gateway = LLMGateway(provider)
+    await run("gateway, distinct prompts", lambda i: gateway.complete_json(f"prompt {i}"), count)
+    print(f"  provider calls: {provider.calls}")
+
+    provider.calls = 0
+    await run("gateway, identical prompts", lambda i: gateway.complete_json("same prompt"), count)
+    print(f"  provider calls: {provider.calls} (coalesced)")
+
+    provider.calls = 0
+    await gateway.complete_json("seo prompt", cache=True)
+    await run("gateway, cached helper", lambda i: gateway.complete_json("seo prompt", cache=True), count)
+    print(f"  provider calls: {provider.calls} (1 warm-up, then cache hits)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="Concurrent requests per mode")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated LLM latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency))
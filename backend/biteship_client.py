@@ -2,32 +2,194 @@
 BitShip Multi-Courier Shipping Integration Client
 Handles all communication with BitShip API for shipping rate calculation,
 order creation, and tracking.
+
+One long-lived pooled httpx client is shared by every call. Idempotent calls
+(rates, couriers, tracking) are retried with jittered exponential backoff on
+timeouts, 429 and 5xx; order creation is only retried when the connection
+could not be made. After BITESHIP_BREAKER_FAILURES consecutive failures the
+circuit opens and calls fail fast for BITESHIP_BREAKER_RESET_SECONDS, then a
+single trial call decides whether it closes again.
+
+Results are cached in process memory: the courier list for hours, rates per
+(origin, destination, weight bucket, couriers) for minutes and tracking per
+waybill for a short time. Identical calls in flight share one request.
+
+For local runs and tests, point BITESHIP_BASE_URL at biteship_mock.py.
 """
 
 import httpx
+import asyncio
+import copy
 import logging
+import math
 import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import random
+import time
+from typing import List, Dict, Any, Awaitable, Callable, Optional
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
+BITESHIP_TIMEOUT_SECONDS = float(os.getenv("BITESHIP_TIMEOUT_SECONDS", 30))
+BITESHIP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("BITESHIP_CONNECT_TIMEOUT_SECONDS", 5))
+BITESHIP_POOL_SIZE = int(os.getenv("BITESHIP_POOL_SIZE", 20))
+BITESHIP_MAX_ATTEMPTS = int(os.getenv("BITESHIP_MAX_ATTEMPTS", 3))
+BITESHIP_RETRY_BASE_SECONDS = float(os.getenv("BITESHIP_RETRY_BASE_SECONDS", 0.5))
+BITESHIP_RETRY_MAX_SECONDS = float(os.getenv("BITESHIP_RETRY_MAX_SECONDS", 5))
+# Consecutive failures that open the circuit, and how long it stays open
+BITESHIP_BREAKER_FAILURES = int(os.getenv("BITESHIP_BREAKER_FAILURES", 5))
+BITESHIP_BREAKER_RESET_SECONDS = float(os.getenv("BITESHIP_BREAKER_RESET_SECONDS", 30))
+
+BITESHIP_COURIERS_TTL_SECONDS = int(os.getenv("BITESHIP_COURIERS_TTL_SECONDS", 6 * 3600))
+BITESHIP_RATES_TTL_SECONDS = int(os.getenv("BITESHIP_RATES_TTL_SECONDS", 10 * 60))
+BITESHIP_TRACKING_TTL_SECONDS = int(os.getenv("BITESHIP_TRACKING_TTL_SECONDS", 60))
+BITESHIP_CACHE_SIZE = int(os.getenv("BITESHIP_CACHE_SIZE", 2048))
+# Rates are quoted for the parcel's weight rounded up to this step
+BITESHIP_WEIGHT_BUCKET_GRAMS = int(os.getenv("BITESHIP_WEIGHT_BUCKET_GRAMS", 1000))
+# Volumetric divisor used by the couriers (cm³ per kg)
+VOLUMETRIC_DIVISOR = 6000
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+class BiteshipUnavailable(Exception):
+    """The circuit is open: BitShip failed repeatedly and is not being called"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial"""
+
+    def __init__(self, failures: int = BITESHIP_BREAKER_FAILURES, reset_seconds: float = BITESHIP_BREAKER_RESET_SECONDS):
+        self.threshold = failures
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half-open" and self.trial_running):
+            raise BiteshipUnavailable("Layanan pengiriman sedang tidak tersedia, coba lagi dalam beberapa saat")
+        if state == "half-open":
+            self.trial_running = True
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("✅ BitShip circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_running = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.error(f"❌ BitShip circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+
+def weight_bucket(weight: int, length: int = 0, width: int = 0, height: int = 0) -> int:
+    """Chargeable weight (actual or volumetric, in grams) rounded up to BITESHIP_WEIGHT_BUCKET_GRAMS"""
+    volumetric = length * width * height * 1000 / VOLUMETRIC_DIVISOR
+    chargeable = max(weight, volumetric, 1)
+    return int(math.ceil(chargeable / BITESHIP_WEIGHT_BUCKET_GRAMS) * BITESHIP_WEIGHT_BUCKET_GRAMS)
+
+
+def normalize_couriers(couriers: str) -> str:
+    return ",".join(sorted({code.strip().lower() for code in couriers.split(",") if code.strip()}))
+
 
 class BiteshipClient:
     """Client for interacting with BitShip API"""
-    
+
     def __init__(self):
         self.base_url = os.getenv("BITESHIP_BASE_URL", "https://api.biteship.com")
         self.api_key = os.getenv("BITESHIP_API_KEY")
-        
+
         if not self.api_key:
             raise ValueError("BITESHIP_API_KEY environment variable is required")
-        
+
         self.headers = {
             "Authorization": self.api_key,
             "Content-Type": "application/json"
         }
-    
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=httpx.Timeout(BITESHIP_TIMEOUT_SECONDS, connect=BITESHIP_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=BITESHIP_POOL_SIZE, max_keepalive_connections=BITESHIP_POOL_SIZE),
+        )
+        self.breaker = CircuitBreaker()
+        self.couriers_cache = TTLCache(maxsize=1, ttl=BITESHIP_COURIERS_TTL_SECONDS)
+        self.rates_cache = TTLCache(maxsize=BITESHIP_CACHE_SIZE, ttl=BITESHIP_RATES_TTL_SECONDS)
+        self.tracking_cache = TTLCache(maxsize=BITESHIP_CACHE_SIZE, ttl=BITESHIP_TRACKING_TTL_SECONDS)
+        self.inflight: Dict[tuple, asyncio.Future] = {}
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _request(self, method: str, path: str, idempotent: bool = True, **kwargs) -> Dict[str, Any]:
+        """
+        Send one API call through the circuit breaker, retrying transient failures
+
+        Raises:
+            BiteshipUnavailable: The circuit is open
+            httpx.HTTPStatusError: Non-retryable status, or retries exhausted
+            httpx.TransportError: Network failure after the retries
+        """
+        delay = BITESHIP_RETRY_BASE_SECONDS
+        for attempt in range(1, BITESHIP_MAX_ATTEMPTS + 1):
+            self.breaker.before_call()
+            try:
+                response = await self.client.request(method, path, **kwargs)
+                if response.status_code in RETRYABLE_STATUS:
+                    response.raise_for_status()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                self.breaker.record_failure()
+                # A non-idempotent call is only safe to repeat if it never reached the server
+                retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not retryable or attempt == BITESHIP_MAX_ATTEMPTS:
+                    raise
+                # Full jitter: spread retries of concurrent callers apart
+                sleep = random.uniform(0, min(delay, BITESHIP_RETRY_MAX_SECONDS))
+                logger.warning(f"⚠️ BitShip {method} {path} attempt {attempt}/{BITESHIP_MAX_ATTEMPTS} failed ({str(e).splitlines()[0] or type(e).__name__}), retrying in {sleep:.2f}s")
+                await asyncio.sleep(sleep)
+                delay *= 2
+                continue
+
+            # 4xx answers mean BitShip is up; they count as success for the breaker
+            self.breaker.record_success()
+            response.raise_for_status()
+            return response.json()
+
+    async def _cached(self, cache: TTLCache, key: tuple, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Cached result for key; concurrent misses share one fetch"""
+        if key in cache:
+            return copy.deepcopy(cache[key])
+        inflight_key = (id(cache), key)
+        task = self.inflight.get(inflight_key)
+        if task is None:
+            async def run():
+                try:
+                    result = await fetch()
+                finally:
+                    self.inflight.pop(inflight_key, None)
+                cache[key] = result
+                return result
+            task = asyncio.ensure_future(run())
+            self.inflight[inflight_key] = task
+        # Shielded so one cancelled caller does not cancel the others
+        return copy.deepcopy(await asyncio.shield(task))
+
     async def get_rates(
         self,
         origin_postal_code: int,
@@ -37,42 +199,55 @@ class BiteshipClient:
     ) -> Dict[str, Any]:
         """
         Calculate shipping rates from multiple couriers.
-        
+
+        Rates are cached per (origin, destination, weight bucket, couriers).
+        For a single item the quote is requested for the bucket weight, so a
+        cached answer is exact for every parcel in the bucket.
+
         Args:
             origin_postal_code: Origin postal code
             destination_postal_code: Destination postal code
             couriers: Comma-separated courier codes (e.g., "jne,jnt,sicepat")
             items: List of items with name, value, weight, length, width, height
-            
+
         Returns:
             Dict containing success status and pricing options from couriers
         """
+        couriers = normalize_couriers(couriers)
+        bucket = sum(
+            weight_bucket(item.get("weight", 0), item.get("length", 0), item.get("width", 0), item.get("height", 0))
+            * item.get("quantity", 1)
+            for item in items
+        )
+        if len(items) == 1:
+            items = [{**items[0], "weight": bucket // items[0].get("quantity", 1)}]
         payload = {
             "origin_postal_code": origin_postal_code,
             "destination_postal_code": destination_postal_code,
             "couriers": couriers,
             "items": items
         }
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/rates/couriers",
-                    json=payload,
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                result = response.json()
+
+        async def fetch():
+            try:
+                result = await self._request("POST", "/v1/rates/couriers", json=payload)
                 logger.info(f"✅ Retrieved shipping rates for {couriers}")
                 return result
-        except httpx.HTTPStatusError as e:
-            logger.error(f"❌ BitShip API error: {e.response.status_code} - {e.response.text}")
-            raise Exception(f"Failed to get shipping rates: {e.response.text}")
-        except Exception as e:
-            logger.error(f"❌ Error fetching rates: {str(e)}")
-            raise
-    
+            except httpx.HTTPStatusError as e:
+                logger.error(f"❌ BitShip API error: {e.response.status_code} - {e.response.text}")
+                raise Exception(f"Failed to get shipping rates: {e.response.text}")
+            except BiteshipUnavailable:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error fetching rates: {str(e)}")
+                raise
+
+        key = (origin_postal_code, destination_postal_code, bucket, couriers)
+        if len(items) > 1:
+            # Multi-item parcels are keyed by their exact contents
+            key += (repr(items),)
+        return await self._cached(self.rates_cache, key, fetch)
+
     async def create_order(
         self,
         shipper_contact_name: str,
@@ -101,7 +276,7 @@ class BiteshipClient:
         """
         Create a new shipping order with BitShip.
         Automatically generates AWB (airway bill) number.
-        
+
         Returns:
             Dict containing order details including waybill_id
         """
@@ -128,85 +303,95 @@ class BiteshipClient:
             "order_note": order_note,
             "items": items
         }
-        
+
         if reference_id:
             payload["reference_id"] = reference_id
-        
+
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/orders",
-                    json=payload,
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                result = response.json()
-                logger.info(f"✅ Created BitShip order: {result.get('id')}")
-                return result
+            result = await self._request("POST", "/v1/orders", idempotent=False, json=payload)
+            logger.info(f"✅ Created BitShip order: {result.get('id')}")
+            return result
         except httpx.HTTPStatusError as e:
             error_text = e.response.text
             logger.error(f"❌ BitShip order creation error: {e.response.status_code} - {error_text}")
-            
+
             # Check for specific BitShip API key activation error
             if "40002002" in error_text or "Key has not been activated" in error_text:
                 raise Exception("BitShip API Key belum diaktivasi untuk membuat order. Silakan hubungi BitShip support atau aktifkan fitur order creation di dashboard BitShip.")
             else:
                 raise Exception(f"Failed to create shipping order: {error_text}")
+        except BiteshipUnavailable:
+            raise
         except Exception as e:
             logger.error(f"❌ Error creating order: {str(e)}")
             raise
-    
+
     async def track_order(self, waybill_id: str, courier_code: str) -> Dict[str, Any]:
         """
         Track a shipment using waybill ID and courier code.
-        
+
+        Results are cached per waybill for BITESHIP_TRACKING_TTL_SECONDS.
+
         Args:
             waybill_id: The waybill/AWB number
             courier_code: Courier company code (e.g., 'jne', 'jnt')
-            
+
         Returns:
             Dict containing tracking information
         """
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v1/trackings/{waybill_id}/couriers/{courier_code}",
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                result = response.json()
+        async def fetch():
+            try:
+                result = await self._request("GET", f"/v1/trackings/{waybill_id}/couriers/{courier_code}")
                 logger.info(f"✅ Retrieved tracking for {waybill_id}")
                 return result
+            except httpx.HTTPStatusError as e:
+                logger.error(f"❌ BitShip tracking error: {e.response.status_code} - {e.response.text}")
+                raise Exception(f"Failed to get tracking info: {e.response.text}")
+            except BiteshipUnavailable:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error tracking order: {str(e)}")
+                raise
+
+        return await self._cached(self.tracking_cache, (waybill_id, courier_code.lower()), fetch)
+
+    async def get_order(self, biteship_order_id: str) -> Dict[str, Any]:
+        """
+        Retrieve a shipping order (status, waybill and courier history).
+
+        Not cached: used by the shipment reconciler, which wants the current state.
+
+        Args:
+            biteship_order_id: Order ID returned by create_order
+
+        Returns:
+            Dict containing the order
+        """
+        try:
+            return await self._request("GET", f"/v1/orders/{biteship_order_id}")
         except httpx.HTTPStatusError as e:
-            logger.error(f"❌ BitShip tracking error: {e.response.status_code} - {e.response.text}")
-            raise Exception(f"Failed to get tracking info: {e.response.text}")
-        except Exception as e:
-            logger.error(f"❌ Error tracking order: {str(e)}")
-            raise
-    
+            logger.error(f"❌ BitShip order retrieval error: {e.response.status_code} - {e.response.text}")
+            raise Exception(f"Failed to get shipping order: {e.response.text}")
+
     async def get_couriers(self) -> Dict[str, Any]:
         """
         Retrieve list of all available courier services.
-        
+
+        The list is cached for BITESHIP_COURIERS_TTL_SECONDS.
+
         Returns:
             Dict containing list of available couriers
         """
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v1/couriers",
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                result = response.json()
+        async def fetch():
+            try:
+                result = await self._request("GET", "/v1/couriers")
                 logger.info("✅ Retrieved available couriers")
                 return result
-        except Exception as e:
-            logger.error(f"❌ Error retrieving couriers: {str(e)}")
-            raise
+            except Exception as e:
+                logger.error(f"❌ Error retrieving couriers: {str(e)}")
+                raise
+
+        return await self._cached(self.couriers_cache, ("couriers",), fetch)
 
 
 # Singleton instance
@@ -218,3 +403,11 @@ def get_biteship_client() -> BiteshipClient:
     if _biteship_client is None:
         _biteship_client = BiteshipClient()
     return _biteship_client
+
+
+async def close_biteship_client():
+    """Close the pooled connections of the singleton, if it was created"""
+    global _biteship_client
+    if _biteship_client is not None:
+        await _biteship_client.aclose()
+        _biteship_client = None
@@ -0,0 +1,172 @@
+"""
+Local BitShip Mock
+Minimal HTTP server answering the BitShip endpoints used by biteship_client
+(couriers, rates, orders, order reads, trackings) with generated data, for exercising the
+shipping flows without the real API. --fail-rate answers that share of
+requests with 503 and --latency delays every answer, to test retries, the
+circuit breaker and the caches; every request is logged so upstream calls can
+be counted.
+
+Usage:
+    python biteship_mock.py --port 8098 --fail-rate 0.2 --latency 0.3
+    BITESHIP_BASE_URL=http://localhost:8098 BITESHIP_API_KEY=test uvicorn server:app
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import re
+import uuid
+from datetime import datetime, timezone
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+COURIERS = {
+    "jne": ("JNE", [("reg", "Reguler", 9000), ("yes", "Yakin Esok Sampai", 18000)]),
+    "jnt": ("J&T", [("ez", "EZ", 9500)]),
+    "sicepat": ("SiCepat", [("reg", "Reguler", 8500), ("best", "Besok Sampai Tujuan", 15000)]),
+    "anteraja": ("AnterAja", [("reg", "Regular", 8800)]),
+}
+
+ORDER_PATH = re.compile(r"^/v1/orders/(?P<order_id>[^/]+)$")
+TRACKING_PATH = re.compile(r"^/v1/trackings/(?P<waybill>[^/]+)/couriers/(?P<courier>[^/]+)$")
+
+
+class BiteshipMock:
+    """Generates BitShip-shaped responses; prices scale with weight and distance"""
+
+    def __init__(self, fail_rate: float = 0.0, latency: float = 0.0):
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.requests = 0
+
+    def couriers(self) -> dict:
+        return {"success": True, "couriers": [
+            {"courier_name": name, "courier_code": code, "courier_service_name": service_name,
+             "courier_service_code": service_code, "service_type": "standard"}
+            for code, (name, services) in COURIERS.items()
+            for service_code, service_name, _ in services
+        ]}
+
+    def rates(self, body: dict) -> dict:
+        grams = sum(item.get("weight", 0) * item.get("quantity", 1) for item in body.get("items", []))
+        kilos = max(1, math.ceil(grams / 1000))
+        distance = abs(int(body.get("origin_postal_code", 0)) - int(body.get("destination_postal_code", 0))) // 1000
+        pricing = []
+        for code in str(body.get("couriers", "")).split(","):
+            name, services = COURIERS.get(code.strip(), (None, []))
+            for service_code, service_name, per_kilo in services:
+                pricing.append({
+                    "courier_name": name, "courier_code": code.strip(),
+                    "courier_service_name": service_name, "courier_service_code": service_code,
+                    "price": per_kilo * kilos + distance * 100,
+                    "duration": "1 - 2 days" if service_code in ("yes", "best") else "2 - 4 days",
+                })
+        return {"success": True, "object": "courier_pricing", "pricing": pricing}
+
+    def order(self, body: dict) -> dict:
+        waybill = f"MOCK{random.randint(10**9, 10**10 - 1)}"
+        return {
+            "success": True, "object": "order", "id": uuid.uuid4().hex[:24], "status": "confirmed",
+            "reference_id": body.get("reference_id"),
+            "courier": {"company": body.get("courier_company"), "type": body.get("courier_type"),
+                        "waybill_id": waybill, "tracking_id": uuid.uuid4().hex[:24],
+                        "link": f"https://track.example.com/{waybill}"},
+            "waybill_id": waybill,
+        }
+
+    def order_status(self, order_id: str) -> dict:
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            "success": True, "object": "order", "id": order_id, "status": "dropping_off",
+            "courier": {"waybill_id": f"MOCK{order_id[:10]}", "history": [
+                {"note": "Order dikonfirmasi", "status": "confirmed", "updated_at": now},
+                {"note": "Paket dalam perjalanan", "status": "dropping_off", "updated_at": now},
+            ]},
+        }
+
+    def tracking(self, waybill: str, courier: str) -> dict:
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            "success": True, "object": "tracking", "waybill_id": waybill, "status": "dropping_off",
+            "courier": {"company": courier},
+            "history": [
+                {"note": "Paket diterima kurir", "status": "picked", "updated_at": now},
+                {"note": "Paket dalam perjalanan", "status": "dropping_off", "updated_at": now},
+            ],
+        }
+
+    def route(self, method: str, path: str, body: dict):
+        if method == "GET" and path == "/v1/couriers":
+            return "200 OK", self.couriers()
+        if method == "POST" and path == "/v1/rates/couriers":
+            return "200 OK", self.rates(body)
+        if method == "POST" and path == "/v1/orders":
+            return "200 OK", self.order(body)
+        match = ORDER_PATH.match(path)
+        if method == "GET" and match:
+            return "200 OK", self.order_status(match["order_id"])
+        match = TRACKING_PATH.match(path)
+        if method == "GET" and match:
+            return "200 OK", self.tracking(match["waybill"], match["courier"])
+        return "404 Not Found", {"success": False, "error": "Not found"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = (await reader.readline()).decode(errors="replace")
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode(errors="replace")
+                    if line in ("\r\n", "\n", ""):
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                raw = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                self.requests += 1
+
+                method, path = request_line.split()[:2]
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if random.random() < self.fail_rate:
+                    status, body = "503 Service Unavailable", {"success": False, "error": "Mock outage"}
+                else:
+                    status, body = self.route(method, path.split("?", 1)[0], json.loads(raw) if raw else {})
+                logger.info(f"🚚 #{self.requests} {method} {path} -> {status}")
+
+                payload = json.dumps(body).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def main(host: str, port: int, mock: BiteshipMock):
+    server = await asyncio.start_server(mock.handle, host, port)
+    logger.info(f"BitShip mock listening on {host}:{port} (fail rate {mock.fail_rate}, latency {mock.latency}s)")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before every answer")
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, BiteshipMock(args.fail_rate, args.latency)))
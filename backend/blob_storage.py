@@ -0,0 +1,180 @@
+"""
+Blob Storage Module
+Content-addressed storage for uploaded binaries (payment proofs). Blobs are
+keyed by the SHA-256 of their content, so identical uploads are stored once and
+documents reference them by digest. Blobs live in the object storage (GCS
+bucket or local root directory) selected by object_storage.get_object_storage().
+"""
+import os
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+import logging
+
+from object_storage import OBJECT_STORAGE_DIR, get_object_storage, run_storage_io
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = "blobs/sha256"
+
+
+def blob_digest(data: bytes) -> str:
+    """Hex SHA-256 of the content, used as the blob address"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_key(digest: str) -> str:
+    """Object key of a blob (fanned out by the first two byte pairs of the digest)"""
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+class BlobNotFound(FileNotFoundError):
+    """Raised when no blob is stored under a digest"""
+
+
+class BlobStore:
+    """Interface of a content-addressed blob backend"""
+
+    backend = "base"
+
+    def put(self, data: bytes, content_type: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Store content under its SHA-256 digest
+
+        Args:
+            data: File content
+            content_type: MIME type recorded with the blob (where supported)
+
+        Returns:
+            tuple: (digest, created) - created is False when the blob already existed
+        """
+        raise NotImplementedError
+
+    def get(self, digest: str) -> bytes:
+        """Return the content of a blob (raises BlobNotFound)"""
+        raise NotImplementedError
+
+    def exists(self, digest: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, digest: str) -> bool:
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a root directory"""
+
+    backend = "local"
+
+    def __init__(self, root: str = OBJECT_STORAGE_DIR):
+        self.root = Path(root)
+
+    def path(self, digest: str) -> Path:
+        return self.root / blob_key(digest)
+
+    def put(self, data: bytes, content_type: Optional[str] = None) -> Tuple[str, bool]:
+        digest = blob_digest(data)
+        path = self.path(digest)
+        if path.exists():
+            return digest, False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        logger.info(f"Stored blob {digest[:12]} locally ({len(data)} bytes)")
+        return digest, True
+
+    def get(self, digest: str) -> bytes:
+        try:
+            return self.path(digest).read_bytes()
+        except FileNotFoundError:
+            raise BlobNotFound(f"Blob not found: {digest}")
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def delete(self, digest: str) -> bool:
+        try:
+            self.path(digest).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+
+class GCSBlobStore(BlobStore):
+    """Blobs as objects in the configured GCS bucket"""
+
+    backend = "gcs"
+
+    def __init__(self, gcs_storage=None):
+        if gcs_storage is None:
+            from gcs_storage import get_gcs_storage
+            gcs_storage = get_gcs_storage()
+        self.gcs = gcs_storage
+
+    def put(self, data: bytes, content_type: Optional[str] = None) -> Tuple[str, bool]:
+        from google.api_core.exceptions import PreconditionFailed
+
+        digest = blob_digest(data)
+        blob = self.gcs.bucket.blob(blob_key(digest))
+        try:
+            # Create-only: a concurrent or earlier upload of the same content wins
+            blob.upload_from_string(data, content_type=content_type, if_generation_match=0)
+        except PreconditionFailed:
+            return digest, False
+
+        logger.info(f"Stored blob {digest[:12]} in GCS ({len(data)} bytes)")
+        return digest, True
+
+    def get(self, digest: str) -> bytes:
+        try:
+            return self.gcs.download_file(blob_key(digest))
+        except FileNotFoundError:
+            raise BlobNotFound(f"Blob not found: {digest}")
+
+    def exists(self, digest: str) -> bool:
+        return self.gcs.file_exists(blob_key(digest))
+
+    def delete(self, digest: str) -> bool:
+        return self.gcs.delete_file(blob_key(digest))
+
+
+# Global instance
+_blob_store_instance = None
+
+def get_blob_store() -> BlobStore:
+    """
+    Get or create the global blob store
+
+    Follows the object storage backend, so blobs are stored where /files serves
+    them from: its GCS client, or its local root directory.
+    """
+    global _blob_store_instance
+    if _blob_store_instance is None:
+        storage = get_object_storage()
+        if storage.backend == "gcs":
+            _blob_store_instance = GCSBlobStore(storage.gcs)
+        else:
+            _blob_store_instance = LocalBlobStore(storage.root)
+        logger.info(f"Blob storage backend: {_blob_store_instance.backend}")
+    return _blob_store_instance
+
+
+async def put_blob(data: bytes, content_type: Optional[str] = None) -> Tuple[str, bool]:
+    """Store content on the storage thread pool; returns (digest, created)"""
+    return await run_storage_io(get_blob_store().put, data, content_type)
+
+
+async def get_blob(digest: str) -> bytes:
+    """Read a blob on the storage thread pool (raises BlobNotFound)"""
+    return await run_storage_io(get_blob_store().get, digest)
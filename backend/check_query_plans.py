@@ -0,0 +1,162 @@
+"""
+Query Plan Check
+Runs explain() for the hot queries of server.py against a scratch database
+whose indexes come from the registry (db_indexes.py), and fails when any
+winning plan contains a COLLSCAN.
+
+Usage:
+    MONGO_URL=mongodb://localhost:27017 python check_query_plans.py
+
+Exit status is 1 when a query is not served by an index. When you add a query
+on a new field, add it to HOT_QUERIES and its index to db_indexes.INDEXES.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from db_indexes import INDEXES, reconcile_indexes
+
+ID = "00000000-0000-0000-0000-000000000000"
+
+# (collection, filter, sort, where in server.py)
+HOT_QUERIES = [
+    ("users", {"id": ID}, None, "user lookups"),
+    ("users", {"username": "client"}, None, "login / auth principal"),
+    ("users", {"email": "client@example.com"}, None, "registration / profile email checks"),
+    ("users", {}, [("created_at", -1)], "admin client list"),
+    ("admin_users", {"id": ID}, None, "admin lookups"),
+    ("admin_users", {"username": "admin"}, None, "admin login / auth principal"),
+    ("ad_accounts", {"id": ID}, None, "account lookups"),
+    ("ad_accounts", {"user_id": ID}, [("created_at", -1)], "client account list"),
+    ("ad_accounts", {"id": ID, "user_id": ID}, None, "owned account checks"),
+    ("ad_accounts", {"account_id": "act_1"}, None, "account id lookups"),
+    ("ad_account_requests", {"id": ID}, None, "account request lookups"),
+    ("ad_account_requests", {"user_id": ID}, None, "client account requests"),
+    ("account_groups", {"id": ID}, None, "group lookups"),
+    ("account_groups", {"user_id": ID}, None, "client groups"),
+    ("transactions", {"user_id": ID, "type": "topup", "status": "completed"}, None, "client transactions"),
+    ("transactions", {"user_id": ID}, [("created_at", -1)], "transaction history"),
+    ("transactions", {"reference_id": ID, "type": "withdraw_request"}, None, "transaction sync by reference"),
+    ("transactions", {"account_id": ID}, None, "account transactions"),
+    ("topup_requests", {"id": ID}, None, "top-up lookups"),
+    ("topup_requests", {"user_id": ID}, [("created_at", -1)], "client top-up history"),
+    ("topup_requests", {"status": "pending"}, [("created_at", -1)], "admin top-up queue"),
+    ("topup_requests", {"accounts.account_id": {"$in": [ID]}, "status": "verified"}, None, "last top-up per account"),
+    ("topup_requests", {"user_id": ID, "$or": [{"account_id": ID}, {"accounts.account_id": ID}],
+                        "status": {"$in": ["verified", "completed", "approved"]}}, [("verified_at", -1)], "account detail history"),
+    ("wallet_topup_requests", {"id": ID}, None, "wallet top-up lookups"),
+    ("wallet_topup_requests", {"user_id": ID}, [("created_at", -1)], "client wallet top-ups"),
+    ("wallet_topup_requests", {"status": "pending"}, [("created_at", -1)], "admin wallet top-up queue"),
+    ("wallet_transfers", {"id": ID}, None, "wallet transfer lookups"),
+    ("wallet_transfers", {"user_id": ID, "status": "pending"}, None, "pending wallet amounts"),
+    ("wallet_transfers", {"target_account_id": {"$in": [ID]}, "status": {"$in": ["completed", "approved"]}}, None, "last transfer per account"),
+    ("wallet_transfers", {"status": "pending"}, [("created_at", -1)], "admin wallet transfer queue"),
+    ("withdraw_requests", {"id": ID}, None, "withdraw lookups"),
+    ("withdraw_requests", {"user_id": ID}, [("created_at", -1)], "client withdrawals"),
+    ("withdraw_requests", {"user_id": ID, "account_id": ID, "status": {"$in": ["pending", "approved", "processing"]}}, None, "pending withdrawal check"),
+    ("withdraw_requests", {"account_id": ID, "status": "pending"}, None, "withdrawals per account"),
+    ("withdraw_requests", {"status": "pending"}, [("created_at", -1)], "admin withdraw queue"),
+    ("transfer_requests", {"id": ID}, None, "transfer request lookups"),
+    ("share_requests", {"id": ID}, None, "share request lookups"),
+    ("wallet_deduction_requests", {"status": "pending"}, None, "deduction queue"),
+    ("admin_actions", {"status": "pending"}, [("created_at", -1)], "admin action queue"),
+    ("payment_proofs", {"id": ID}, None, "proof lookups"),
+    ("payment_proofs", {"topup_id": ID}, None, "proof by top-up"),
+    ("payment_proofs", {"tracking_id": f"proof_tracking_{ID}"}, None, "account proof tracking"),
+    ("payment_proofs", {"pending_edit": True}, None, "pending proof edits"),
+    ("payment_proofs", {"id": ID, "pending_edit": True}, None, "proof edit approval"),
+    ("wallet_payment_proofs", {"topup_id": ID}, None, "wallet proof by top-up"),
+    ("notifications", {}, [("created_at", -1)], "admin notifications"),
+    ("notifications", {"is_read": False}, [("created_at", -1)], "admin unread notifications"),
+    ("notifications", {"reference_id": ID}, None, "notification by reference"),
+    ("client_notifications", {"user_id": ID}, [("created_at", -1)], "client notifications"),
+    ("client_notifications", {"user_id": ID, "is_read": False}, [("created_at", -1)], "client unread notifications"),
+    ("client_notifications", {"id": ID, "user_id": ID}, None, "mark notification read"),
+    ("landing_pages", {"id": ID}, None, "landing page lookups"),
+    ("landing_pages", {"slug": "promo", "status": "published"}, None, "public landing page"),
+    ("landing_pages", {"user_id": ID}, None, "merchant landing pages"),
+    ("orders", {"id": ID}, None, "order lookups"),
+    ("orders", {"order_number": "ORD-1"}, None, "public order tracking"),
+    ("orders", {"merchant_id": ID}, [("created_at", -1)], "merchant orders"),
+    ("orders", {"merchant_id": ID, "order_status": "pending"}, [("created_at", -1)], "merchant orders by status"),
+    ("orders", {"landing_page_id": ID}, None, "orders per landing page"),
+    ("orders", {"biteship_order_id": ID}, None, "shipment webhook"),
+    ("orders", {"shipping_active": True, "shipping_checked_at": {"$lt": "2024-01-01"}}, [("shipping_checked_at", 1)],
+     "shipment reconciler"),
+    ("saved_ad_copies", {"user_id": ID}, None, "saved ad copies"),
+    ("saved_ad_copies", {"ad_copy_id": ID, "user_id": ID}, None, "saved ad copy lookups"),
+    ("currency_exchanges", {"user_id": ID}, [("created_at", -1)], "exchange history"),
+    ("admin_settings", {"setting_key": "maintenance_mode"}, None, "settings"),
+    ("backup_history", {"backup_id": ID}, None, "backup lookups"),
+    ("financial_daily_rollups", {"day": {"$gte": "2024-01-01"}}, None, "financial reports"),
+    ("ledger_entries", {"user_id": ID, "field": "main_wallet_idr"}, [("created_at", -1), ("id", -1)], "wallet statement"),
+    ("ledger_entries", {"user_id": ID, "field": "main_wallet_idr", "created_at": {"$lt": "2024-01-01"}},
+     [("created_at", -1), ("id", -1)], "wallet statement next page"),
+    ("ledger_entries", {"user_id": ID, "field": "main_wallet_idr"}, [("created_at", 1), ("id", 1)], "oldest entry (statement backfill)"),
+    ("ledger_backfills", {"user_id": ID, "field": "main_wallet_idr"}, None, "statement backfill marker"),
+    ("admin_actions", {"status": {"$in": ["approved", "rejected"]}}, [("processed_at", -1), ("id", -1)], "actions history export"),
+    ("admin_actions_history", {"status": {"$in": ["approved", "rejected"]}}, [("processed_at", -1), ("id", -1)],
+     "actions history export (archive)"),
+    ("data_migrations", {"name": "timestamps_to_dates"}, None, "startup migration marker"),
+    ("exchange_rate_snapshots", {"base": "USD"}, [("fetched_at", -1)], "last known good exchange rates"),
+    ("export_jobs", {"id": ID}, None, "export job lookups"),
+    ("export_jobs", {"dedupe_key": "key", "active": True}, None, "export job deduplication"),
+    ("export_jobs", {"owner_id": ID}, [("created_at", -1)], "export job list"),
+    ("export_jobs", {"status": "completed", "expires_at": {"$lte": "2024-01-01"}}, None, "expired export artifacts"),
+    ("export_jobs", {"status": "running", "lease_until": {"$lt": "2024-01-01"}}, None, "abandoned export jobs"),
+]
+
+
+def plan_stages(plan: dict):
+    """Every stage name of a (nested) query plan"""
+    yield plan.get("stage")
+    for child in ("inputStage", "outerStage", "innerStage", "queryPlan"):
+        if child in plan:
+            yield from plan_stages(plan[child])
+    for stage in plan.get("inputStages", []):
+        yield from plan_stages(stage)
+
+
+async def explain(db, collection: str, query: dict, sort) -> dict:
+    command = {"find": collection, "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+    result = await db.command("explain", command, verbosity="queryPlanner")
+    return result["queryPlanner"]["winningPlan"]
+
+
+async def main(keep: bool) -> int:
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db_name = os.environ.get("PLAN_CHECK_DB_NAME", f"rimuru_plan_check_{uuid.uuid4().hex[:8]}")
+    db = client[db_name]
+    failures = 0
+    try:
+        # One document per collection so every collection exists
+        for collection in {query[0] for query in HOT_QUERIES} | set(INDEXES):
+            await db[collection].insert_one({"id": str(uuid.uuid4())})
+        await reconcile_indexes(db)
+
+        for collection, query, sort, where in HOT_QUERIES:
+            stages = set(plan_stages(await explain(db, collection, query, sort)))
+            status = "COLLSCAN" if "COLLSCAN" in stages else "ok"
+            if status != "ok":
+                failures += 1
+            print(f"{status:<9} {collection:<24} {where:<38} {query} sort={sort}")
+    finally:
+        if not keep:
+            await client.drop_database(db_name)
+        client.close()
+
+    print(f"\n{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} hot queries use an index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database afterwards")
+    sys.exit(asyncio.run(main(parser.parse_args().keep)))
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Index Registry
+Every MongoDB index the API relies on, declared in one place and reconciled
+against the database on startup (missing indexes are created) or by hand.
+Indexes found in the database but not declared here are reported, and with
+--drop-unregistered removed.
+
+Add an index here together with the query that needs it, and add that query
+to check_query_plans.py so a missing index fails the plan check.
+
+Usage:
+    python db_indexes.py [--dry-run] [--drop-unregistered]
+"""
+import argparse
+import asyncio
+import os
+from pathlib import Path
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _index(*keys, **options) -> IndexModel:
+    """IndexModel from ("field", direction) pairs or bare field names (ascending)"""
+    return IndexModel([key if isinstance(key, tuple) else (key, ASCENDING) for key in keys], **options)
+
+
+RECENT = ("created_at", DESCENDING)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        _index("id"),
+        _index("username"),
+        _index("email"),
+        _index(RECENT),
+    ],
+    "admin_users": [
+        _index("id"),
+        _index("username"),
+    ],
+    "ad_accounts": [
+        _index("id"),
+        _index("user_id", RECENT),
+        _index("account_id"),
+    ],
+    "ad_account_requests": [
+        _index("id"),
+        _index("user_id"),
+        _index("status", RECENT),
+    ],
+    "account_groups": [
+        _index("id"),
+        _index("user_id"),
+    ],
+    "transactions": [
+        _index("id"),
+        _index("user_id", "type", "status"),
+        _index("user_id", RECENT),
+        _index("reference_id", "type"),
+        _index("account_id"),
+    ],
+    "topup_requests": [
+        _index("id"),
+        _index("user_id", RECENT),
+        _index("status", RECENT),
+        _index("account_id"),
+        _index("accounts.account_id"),
+    ],
+    "wallet_topup_requests": [
+        _index("id"),
+        _index("user_id", RECENT),
+        _index("status", RECENT),
+    ],
+    "wallet_transfers": [
+        _index("id"),
+        _index("user_id", RECENT),
+        _index("status", RECENT),
+        _index("target_account_id", "status"),
+    ],
+    "withdraw_requests": [
+        _index("id"),
+        _index("user_id", RECENT),
+        _index("status", RECENT),
+        _index("account_id", "status"),
+    ],
+    "transfer_requests": [
+        _index("id"),
+        _index("user_id"),
+    ],
+    "share_requests": [
+        _index("id"),
+        _index("user_id"),
+    ],
+    "wallet_deduction_requests": [
+        _index("id"),
+        _index("status"),
+    ],
+    "admin_actions": [
+        _index("id"),
+        _index("status", RECENT),
+        # Actions history export: processed actions newest first
+        _index("status", ("processed_at", DESCENDING), ("id", DESCENDING)),
+    ],
+    "admin_actions_history": [
+        _index("status", ("processed_at", DESCENDING), ("id", DESCENDING)),
+    ],
+    "payment_proofs": [
+        _index("id"),
+        _index("topup_id"),
+        _index("tracking_id"),
+        _index("pending_edit"),
+    ],
+    "wallet_payment_proofs": [
+        _index("topup_id"),
+    ],
+    "notifications": [
+        _index("id"),
+        _index(RECENT),
+        _index("is_read", RECENT),
+        _index("reference_id"),
+    ],
+    "client_notifications": [
+        _index("id"),
+        _index("user_id", RECENT),
+        _index("user_id", "is_read", RECENT),
+    ],
+    "landing_pages": [
+        _index("id"),
+        _index("slug", "status"),
+        _index("user_id"),
+    ],
+    "orders": [
+        _index("id"),
+        _index("order_number"),
+        _index("merchant_id", RECENT),
+        _index("merchant_id", "order_status", RECENT),
+        _index("landing_page_id"),
+        _index("biteship_order_id"),
+        # Shipment reconciler: in-transit shipments by last contact with BitShip
+        _index("shipping_checked_at", partialFilterExpression={"shipping_active": True}),
+    ],
+    "saved_ad_copies": [
+        _index("user_id", "ad_copy_id"),
+    ],
+    "currency_exchanges": [
+        _index("user_id", RECENT),
+    ],
+    "admin_settings": [
+        _index("setting_key"),
+    ],
+    "backup_history": [
+        _index("backup_id"),
+    ],
+    "financial_daily_rollups": [
+        _index("day", "source"),
+    ],
+    "email_outbox": [
+        _index("status", "next_attempt_at"),
+        _index("id", unique=True),
+    ],
+    "ledger_entries": [
+        _index("id", unique=True),
+        # Wallet statement pages: (created_at, id) keyset per wallet
+        _index("user_id", "field", RECENT, ("id", DESCENDING)),
+        _index("collection", "account_id", RECENT),
+        _index("reference_id"),
+    ],
+    "ledger_backfills": [
+        _index("user_id", "field", unique=True),
+    ],
+    "data_migrations": [
+        _index("name", unique=True),
+    ],
+    "exchange_rate_snapshots": [
+        _index("id", unique=True),
+        _index("base", ("fetched_at", DESCENDING)),
+    ],
+    "export_jobs": [
+        _index("id", unique=True),
+        # One active (queued, running or not yet expired) job per identical export
+        _index("dedupe_key", unique=True, partialFilterExpression={"active": True}),
+        _index("owner_id", RECENT),
+        _index("status", "expires_at"),
+        _index("status", "lease_until"),
+    ],
+}
+
+
+def _key(spec) -> tuple:
+    # Indexes created from the shell may carry 1.0 instead of 1
+    return tuple((field, int(direction) if isinstance(direction, float) else direction) for field, direction in spec)
+
+
+async def reconcile_indexes(db, drop_unregistered: bool = False, dry_run: bool = False) -> Dict[str, dict]:
+    """
+    Bring the database's indexes in line with INDEXES
+
+    Args:
+        db: Database
+        drop_unregistered: Drop indexes that are not in the registry
+        dry_run: Report only
+
+    Returns:
+        dict: Per collection, the index names created, failed, unregistered and dropped
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = {_key(info["key"]): name for name, info in (await collection.index_information()).items()}
+        registered = {_key(model.document["key"].items()) for model in models}
+        result = {"created": [], "failed": [], "unregistered": [], "dropped": []}
+
+        for model in models:
+            if _key(model.document["key"].items()) in existing:
+                continue
+            name = model.document["name"]
+            if dry_run:
+                result["created"].append(name)
+                continue
+            try:
+                await collection.create_indexes([model])
+                result["created"].append(name)
+            except OperationFailure as e:
+                # e.g. a unique index over duplicate data; the rest still gets created
+                result["failed"].append(name)
+                logger.error(f"❌ Could not create index {collection_name}.{name}: {e}")
+
+        for key, name in existing.items():
+            if name == "_id_" or key in registered:
+                continue
+            result["unregistered"].append(name)
+            if drop_unregistered and not dry_run:
+                await collection.drop_index(name)
+                result["dropped"].append(name)
+
+        if any(result.values()):
+            report[collection_name] = result
+
+    created = sum(len(r["created"]) for r in report.values())
+    unregistered = [f"{c}.{n}" for c, r in report.items() for n in r["unregistered"]]
+    logger.info(f"✅ Index registry reconciled{' (dry run)' if dry_run else ''}: {created} created")
+    if unregistered:
+        logger.warning(f"⚠️ Indexes not in the registry: {', '.join(unregistered)}")
+    return report
+
+
+async def main(drop_unregistered: bool, dry_run: bool):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.environ.get("DB_NAME", "test_database")]
+    try:
+        report = await reconcile_indexes(db, drop_unregistered=drop_unregistered, dry_run=dry_run)
+        for collection_name, result in report.items():
+            for action, names in result.items():
+                for name in names:
+                    print(f"{action:<13} {collection_name}.{name}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv(Path(__file__).parent / ".env")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing anything")
+    parser.add_argument("--drop-unregistered", action="store_true", help="Drop indexes that are not in the registry")
+    args = parser.parse_args()
+    asyncio.run(main(args.drop_unregistered, args.dry_run))
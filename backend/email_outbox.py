@@ -0,0 +1,348 @@
+"""
+Email Outbox Module
+Persisted outbound email queue drained by a background worker over pooled,
+authenticated SMTP connections, so API handlers never wait on the mail server
+"""
+import os
+import uuid
+import queue
+import random
+import asyncio
+import smtplib
+import threading
+from datetime import datetime, timezone, timedelta
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from typing import List, Optional, Union
+from pymongo import ReturnDocument
+import logging
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_COLLECTION = "email_outbox"
+
+# Delivery tuning
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 2))
+SMTP_TIMEOUT_SECONDS = int(os.getenv("SMTP_TIMEOUT_SECONDS", 30))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 6))
+EMAIL_RETRY_BASE_SECONDS = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", 30))
+EMAIL_RETRY_MAX_SECONDS = int(os.getenv("EMAIL_RETRY_MAX_SECONDS", 3600))
+# A claimed message whose worker died is picked up again after this lease
+EMAIL_CLAIM_LEASE_SECONDS = int(os.getenv("EMAIL_CLAIM_LEASE_SECONDS", 300))
+# Idle poll interval; new messages wake the worker immediately
+EMAIL_POLL_SECONDS = int(os.getenv("EMAIL_POLL_SECONDS", 15))
+
+
+def build_message(
+    sender: str,
+    recipients: List[str],
+    subject: str,
+    html_content: str,
+    text_content: Optional[str] = None
+) -> MIMEMultipart:
+    """Build a multipart/alternative message with optional plain text fallback"""
+    message = MIMEMultipart("alternative")
+    message["From"] = sender
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = subject
+
+    if text_content:
+        message.attach(MIMEText(text_content, "plain"))
+    message.attach(MIMEText(html_content, "html"))
+    return message
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of authenticated SMTP connections that are reused between sends"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        use_starttls: bool = True,
+        size: int = SMTP_POOL_SIZE,
+        timeout: int = SMTP_TIMEOUT_SECONDS
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_starttls = use_starttls
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_starttls:
+            connection.starttls()
+        if self.user:
+            connection.login(self.user, self.password)
+        logger.info(f"📮 Opened SMTP connection to {self.host}:{self.port}")
+        return connection
+
+    @staticmethod
+    def _close(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def _acquire(self) -> smtplib.SMTP:
+        """Return an idle live connection, or open a new one"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            try:
+                if connection.noop()[0] == 250:
+                    return connection
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            self._close(connection)
+
+    def send(self, message: MIMEMultipart, sender: str, recipients: List[str]):
+        """
+        Send one message to all recipients in a single SMTP transaction (blocking)
+
+        Raises:
+            smtplib.SMTPException / OSError when delivery fails
+        """
+        with self._slots:
+            connection = self._acquire()
+            try:
+                try:
+                    refused = connection.send_message(message, from_addr=sender, to_addrs=recipients)
+                except smtplib.SMTPServerDisconnected:
+                    # Server dropped an idle connection between the liveness check and the send
+                    self._close(connection)
+                    connection = self._connect()
+                    refused = connection.send_message(message, from_addr=sender, to_addrs=recipients)
+            except (smtplib.SMTPException, OSError):
+                self._close(connection)
+                raise
+            self._idle.put(connection)
+
+        if refused:
+            logger.warning(f"⚠️ SMTP refused recipients: {list(refused.keys())}")
+
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(connection)
+
+
+class EmailOutbox:
+    """Mongo-backed outbound queue plus the worker that drains it"""
+
+    def __init__(self, pool: SMTPConnectionPool, sender: str):
+        self.pool = pool
+        self.sender = sender
+        self.db = None
+        self._wake = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._pending_writes = set()
+        self._stopping = False
+
+    def configure(self, db):
+        """Attach the database; until then messages are delivered synchronously"""
+        self.db = db
+
+    @property
+    def collection(self):
+        return self.db[OUTBOX_COLLECTION]
+
+    def deliver_now(
+        self,
+        recipients: List[str],
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> bool:
+        """Blocking delivery, used by scripts running without an event loop or database"""
+        try:
+            message = build_message(self.sender, recipients, subject, html_content, text_content)
+            self.pool.send(message, self.sender, recipients)
+            logger.info(f"[SUCCESS] Email sent successfully to {', '.join(recipients)}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to send email to {', '.join(recipients)}: {e}")
+            return False
+
+    def enqueue(
+        self,
+        recipients: Union[str, List[str]],
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> bool:
+        """
+        Queue one message for all recipients without blocking the caller
+
+        Callable from synchronous code running inside the event loop (the
+        send_* helpers): the outbox insert is scheduled on the running loop.
+
+        Returns:
+            bool: True if the message was accepted (queued or delivered)
+        """
+        if isinstance(recipients, str):
+            recipients = [recipients]
+        recipients = [email for email in dict.fromkeys(recipients) if email]
+        if not recipients:
+            return False
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if self.db is None or loop is None:
+            return self.deliver_now(recipients, subject, html_content, text_content)
+
+        now = datetime.now(timezone.utc)
+        doc = {
+            "id": str(uuid.uuid4()),
+            "recipients": recipients,
+            "subject": subject,
+            "html_content": html_content,
+            "text_content": text_content,
+            "status": "pending",
+            "attempts": 0,
+            "last_error": None,
+            "created_at": now,
+            "next_attempt_at": now,
+            "claimed_until": None,
+            "sent_at": None
+        }
+        task = loop.create_task(self._persist(doc))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+        return True
+
+    async def _persist(self, doc: dict):
+        try:
+            await self.collection.insert_one(doc)
+            logger.info(f"📧 Queued email '{doc['subject']}' for {len(doc['recipients'])} recipient(s)")
+            self._wake.set()
+        except Exception as e:
+            logger.error(f"❌ Failed to queue email, delivering inline in a worker thread: {e}")
+            await asyncio.to_thread(
+                self.deliver_now, doc["recipients"], doc["subject"], doc["html_content"], doc["text_content"]
+            )
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("status", 1), ("next_attempt_at", 1)])
+        await self.collection.create_index([("id", 1)], unique=True)
+
+    async def start(self, concurrency: int = SMTP_POOL_SIZE):
+        """Start background delivery workers (call from the app startup hook)"""
+        if self.db is None:
+            raise RuntimeError("EmailOutbox.configure(db) must be called before start()")
+        await self.ensure_indexes()
+        self._stopping = False
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(max(concurrency, 1))]
+        logger.info(f"✅ Email outbox started with {len(self._workers)} worker(s)")
+
+    async def stop(self):
+        """Flush pending queue writes, stop workers and close SMTP connections"""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        self._stopping = True
+        self._wake.set()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await asyncio.to_thread(self.pool.close_all)
+        logger.info("✅ Email outbox stopped")
+
+    async def _claim_next(self) -> Optional[dict]:
+        """Atomically lease the oldest due message"""
+        now = datetime.now(timezone.utc)
+        return await self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    {"status": "sending", "claimed_until": {"$lte": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "status": "sending",
+                    "claimed_until": now + timedelta(seconds=EMAIL_CLAIM_LEASE_SECONDS)
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Exponential backoff with jitter for the given attempt count"""
+        delay = min(EMAIL_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)), EMAIL_RETRY_MAX_SECONDS)
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _deliver(self, doc: dict):
+        message = build_message(
+            self.sender, doc["recipients"], doc["subject"], doc["html_content"], doc.get("text_content")
+        )
+        try:
+            await asyncio.to_thread(self.pool.send, message, self.sender, doc["recipients"])
+        except Exception as e:
+            attempts = doc.get("attempts", 1)
+            if attempts >= EMAIL_MAX_ATTEMPTS:
+                update = {"status": "failed", "last_error": str(e), "claimed_until": None}
+                logger.error(f"❌ Giving up on email {doc['id']} after {attempts} attempts: {e}")
+            else:
+                next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=self.retry_delay(attempts))
+                update = {
+                    "status": "pending",
+                    "last_error": str(e),
+                    "claimed_until": None,
+                    "next_attempt_at": next_attempt_at
+                }
+                logger.warning(f"⚠️ Email {doc['id']} attempt {attempts} failed, retrying at {next_attempt_at}: {e}")
+            await self.collection.update_one({"id": doc["id"]}, {"$set": update})
+            return
+
+        await self.collection.update_one(
+            {"id": doc["id"]},
+            {"$set": {
+                "status": "sent",
+                "sent_at": datetime.now(timezone.utc),
+                "claimed_until": None,
+                "last_error": None
+            }}
+        )
+        logger.info(f"[SUCCESS] Email '{doc['subject']}' sent to {len(doc['recipients'])} recipient(s)")
+
+    async def _worker(self, worker_id: int):
+        while not self._stopping:
+            try:
+                doc = await self._claim_next()
+                if doc is not None:
+                    await self._deliver(doc)
+                    continue
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=EMAIL_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Email outbox worker {worker_id} error: {e}")
+                await asyncio.sleep(EMAIL_POLL_SECONDS)
@@ -0,0 +1,108 @@
+"""
+Email Renderer Module
+Jinja2 rendering for transactional emails. Templates live in templates/email,
+share the layouts/ and partials/ markup, and are compiled once and cached for
+the life of the process. The plain text alternative comes from a text template
+generated from each HTML template at compile time, unless a hand-written
+<name>.txt template exists.
+"""
+import re
+from html import unescape
+from pathlib import Path
+from typing import Optional, Tuple
+from jinja2 import ChoiceLoader, Environment, FileSystemLoader, FunctionLoader, StrictUndefined, select_autoescape
+import logging
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TEMPLATE_DIR = Path(__file__).parent / "templates" / "email"
+
+# Name suffix of the plain text templates generated from each HTML template
+DERIVED_TEXT_SUFFIX = ".auto.txt"
+
+
+_SKIP_RE = re.compile(r"<(head|style|script|title)\b.*?</\1\s*>|<!--.*?-->", re.S | re.I)
+_LINK_RE = re.compile(r"<a\b[^>]*?href=[\"']((?:https?:|mailto:|\{\{)[^\"']*)[\"'][^>]*>(.*?)</a\s*>", re.S | re.I)
+_BREAK_RE = re.compile(r"<br\s*/?>", re.I)
+_ITEM_RE = re.compile(r"<li\b[^>]*>", re.I)
+_CELL_RE = re.compile(r"<t[dh]\b[^>]*>", re.I)
+_BLOCK_RE = re.compile(r"</?(?:p|div|h[1-6]|tr|table|ul|ol)\b[^>]*>", re.I)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_TEMPLATE_REF_RE = re.compile(r'(\{%-?\s*(?:extends|include)\s+"[^"]+)\.html"')
+
+
+def html_to_text(html: str) -> str:
+    """Convert rendered email HTML into a plain text alternative (block structure and link targets kept)"""
+    text = _SKIP_RE.sub("", html)
+    text = " ".join(text.split())
+    text = _LINK_RE.sub(lambda m: f"{m.group(2)} ({m.group(1)})", text)
+    text = _BREAK_RE.sub("\n", text)
+    text = _ITEM_RE.sub("\n- ", text)
+    text = _CELL_RE.sub(" ", text)
+    text = _BLOCK_RE.sub("\n\n", text)
+    text = unescape(_TAG_RE.sub("", text))
+    return _tidy_text(text)
+
+
+def _tidy_text(text: str) -> str:
+    lines = [_SPACE_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip() + "\n"
+
+
+class EmailRenderer:
+    """Compiled, cached Jinja2 environment for the email templates"""
+
+    def __init__(self, template_dir: Path = EMAIL_TEMPLATE_DIR, globals: Optional[dict] = None):
+        self.files = FileSystemLoader(str(template_dir))
+        self.env = Environment(
+            loader=ChoiceLoader([self.files, FunctionLoader(self._derived_text_source)]),
+            autoescape=select_autoescape(["html"]),
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            # Templates ship with the code; never stat() them again once compiled
+            auto_reload=False,
+            cache_size=-1
+        )
+        self.env.globals.update(globals or {})
+        # Resolved once so a missing hand-written text part never hits the filesystem
+        self.text_templates = {name for name in self.files.list_templates() if name.endswith(".txt")}
+
+    def _derived_text_source(self, name: str) -> Optional[str]:
+        """Plain text template source generated from the matching HTML template"""
+        if not name.endswith(DERIVED_TEXT_SUFFIX):
+            return None
+        html_name = name[:-len(DERIVED_TEXT_SUFFIX)] + ".html"
+        source, _, _ = self.files.get_source(self.env, html_name)
+        source = _TEMPLATE_REF_RE.sub(lambda m: f'{m.group(1)}{DERIVED_TEXT_SUFFIX}"', source)
+        return html_to_text(source)
+
+    def precompile(self) -> int:
+        """Compile every template and its derived text part into the cache"""
+        names = self.files.list_templates()
+        for name in names:
+            self.env.get_template(name)
+            if name.endswith(".html"):
+                self.env.get_template(name[:-len(".html")] + DERIVED_TEXT_SUFFIX)
+        logger.info(f"✅ Compiled {len(names)} email templates")
+        return len(names)
+
+    def render(self, name: str, **context) -> Tuple[str, str]:
+        """
+        Render an email template
+
+        Args:
+            name: Template name without extension (e.g. "client_topup_approved")
+            **context: Template variables
+
+        Returns:
+            tuple: (html_content, text_content)
+        """
+        html_content = self.env.get_template(f"{name}.html").render(**context)
+        if f"{name}.txt" in self.text_templates:
+            text_content = self.env.get_template(f"{name}.txt").render(**context)
+        else:
+            text_content = _tidy_text(self.env.get_template(f"{name}{DERIVED_TEXT_SUFFIX}").render(**context))
+        return html_content, text_content
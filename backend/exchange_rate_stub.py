@@ -0,0 +1,85 @@
+"""
+Local Exchange Rate Stub
+Minimal HTTP server answering ExchangeRate-API v4 requests
+(GET /v4/latest/<BASE>) with a fixed table, for exercising the exchange rate
+service without the real API. --fail answers 500 to test the last known good
+fallback; every request is logged so refreshes can be counted.
+
+Usage:
+    python exchange_rate_stub.py --port 8099 --idr-per-usd 16250
+    EXCHANGE_RATE_API_URL=http://localhost:8099/v4/latest uvicorn server:app
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class RateStub:
+    """Serves one USD based table, converted to the requested base"""
+
+    def __init__(self, usd_rates: dict, fail: bool = False):
+        self.usd_rates = {"USD": 1.0, **usd_rates}
+        self.fail = fail
+        self.requests = 0
+
+    def table(self, base: str) -> dict:
+        base_rate = self.usd_rates[base]
+        return {
+            "base": base,
+            "date": time.strftime("%Y-%m-%d", time.gmtime()),
+            "time_last_updated": int(time.time()),
+            "rates": {currency: rate / base_rate for currency, rate in self.usd_rates.items()},
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode(errors="replace")
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            self.requests += 1
+            parts = request_line.split()
+            path = parts[1] if len(parts) > 1 else "/"
+            base = path.rstrip("/").rsplit("/", 1)[-1].upper()
+
+            if self.fail:
+                status, body = "500 Internal Server Error", {"result": "error"}
+            elif path.startswith("/v4/latest/") and base in self.usd_rates:
+                status, body = "200 OK", self.table(base)
+            else:
+                status, body = "404 Not Found", {"result": "error", "error-type": "unsupported-code"}
+            logger.info(f"💱 #{self.requests} {request_line.strip()} -> {status}")
+
+            payload = json.dumps(body).encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def main(host: str, port: int, stub: RateStub):
+    server = await asyncio.start_server(stub.handle, host, port)
+    logger.info(f"Exchange rate stub listening on {host}:{port} (1 USD = {stub.usd_rates['IDR']} IDR)")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--idr-per-usd", type=float, default=16000.0)
+    parser.add_argument("--fail", action="store_true", help="Answer every request with HTTP 500")
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, RateStub({"IDR": args.idr_per_usd, "EUR": 0.92, "SGD": 1.35}, args.fail)))
@@ -0,0 +1,191 @@
+"""
+Exchange Rate Module
+One rate table (every currency against EXCHANGE_RATE_BASE) is fetched per
+refresh interval by a scheduler job and kept in process memory, so lookups are
+a dict read with no network on the request path. Each fetched table is stored
+as a snapshot in MongoDB; on startup the latest one is loaded as the last
+known good table. If a refresh fails the current table stays in use and the
+job retries every EXCHANGE_RATE_CHECK_SECONDS.
+
+Every quote carries the id and fetch time of the snapshot it came from, so an
+exchange can record exactly which rates it used.
+
+For local runs and tests, point EXCHANGE_RATE_API_URL at exchange_rate_stub.py.
+"""
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOTS_COLLECTION = "exchange_rate_snapshots"
+
+# ExchangeRate-API v4 compatible endpoint; the base currency is appended
+EXCHANGE_RATE_API_URL = os.getenv("EXCHANGE_RATE_API_URL", "https://api.exchangerate-api.com/v4/latest").rstrip("/")
+EXCHANGE_RATE_BASE = os.getenv("EXCHANGE_RATE_BASE", "USD")
+EXCHANGE_RATE_REFRESH_MINUTES = int(os.getenv("EXCHANGE_RATE_REFRESH_MINUTES", 30))
+# How often the refresh job checks whether the table is due (and retries after a failure)
+EXCHANGE_RATE_CHECK_SECONDS = int(os.getenv("EXCHANGE_RATE_CHECK_SECONDS", 60))
+EXCHANGE_RATE_TIMEOUT_SECONDS = float(os.getenv("EXCHANGE_RATE_TIMEOUT_SECONDS", 10))
+# Older tables are still quoted, but flagged stale and refused for exchanges
+EXCHANGE_RATE_MAX_AGE_HOURS = int(os.getenv("EXCHANGE_RATE_MAX_AGE_HOURS", 24))
+# Currencies a table must contain to be accepted
+REQUIRED_CURRENCIES = ("IDR", "USD")
+
+
+class RateUnavailable(Exception):
+    """No rate table has been loaded or fetched yet, or it lacks the currency"""
+
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    """One fetched rate table"""
+    id: str
+    base: str
+    rates: Dict[str, float]
+    fetched_at: datetime
+    # Provider's own update time, when it reports one
+    source_updated_at: Optional[datetime] = None
+
+    def to_mongo(self) -> dict:
+        return {
+            "id": self.id,
+            "base": self.base,
+            "rates": self.rates,
+            "fetched_at": self.fetched_at,
+            "source_updated_at": self.source_updated_at,
+        }
+
+    @classmethod
+    def from_mongo(cls, doc: dict) -> "RateSnapshot":
+        return cls(doc["id"], doc["base"], doc["rates"], doc["fetched_at"], doc.get("source_updated_at"))
+
+
+@dataclass(frozen=True)
+class RateQuote:
+    """A rate and the snapshot it was derived from"""
+    from_currency: str
+    to_currency: str
+    rate: float
+    snapshot_id: Optional[str]
+    as_of: datetime
+    stale: bool = False
+
+
+def parse_table(data: dict, base: str) -> RateSnapshot:
+    """
+    Validate a provider response into a snapshot
+
+    Raises:
+        ValueError: Wrong base, or missing / non-positive required rates
+    """
+    if data.get("base", base) != base:
+        raise ValueError(f"Rate table base is {data.get('base')}, expected {base}")
+    rates = {currency: float(rate) for currency, rate in (data.get("rates") or {}).items()}
+    rates[base] = 1.0
+    for currency in REQUIRED_CURRENCIES:
+        if rates.get(currency, 0) <= 0:
+            raise ValueError(f"Rate table has no usable {currency} rate")
+
+    updated = data.get("time_last_updated")
+    source_updated_at = datetime.fromtimestamp(updated, timezone.utc) if isinstance(updated, (int, float)) else None
+    return RateSnapshot(str(uuid.uuid4()), base, rates, datetime.now(timezone.utc), source_updated_at)
+
+
+class ExchangeRateService:
+    """In-memory rate table refreshed in the background, persisted as snapshots"""
+
+    def __init__(self, api_url: str = EXCHANGE_RATE_API_URL, base: str = EXCHANGE_RATE_BASE):
+        self.api_url = api_url
+        self.base = base
+        self.db = None
+        self.snapshot: Optional[RateSnapshot] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def configure(self, db):
+        self.db = db
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=EXCHANGE_RATE_TIMEOUT_SECONDS)
+        return self._client
+
+    async def start(self):
+        """Load the last known good table, fetching a new one if it is missing or due"""
+        doc = await self.db[SNAPSHOTS_COLLECTION].find_one({"base": self.base}, {"_id": 0}, sort=[("fetched_at", -1)])
+        if doc:
+            self.snapshot = RateSnapshot.from_mongo(doc)
+            logger.info(f"💱 Exchange rates loaded from snapshot of {self.snapshot.fetched_at.isoformat()}")
+        await self.refresh_if_due()
+
+    async def refresh_if_due(self):
+        """Scheduler job: refresh when there is no table or it is older than the refresh interval"""
+        if self.snapshot is None or self.age() >= timedelta(minutes=EXCHANGE_RATE_REFRESH_MINUTES):
+            await self.refresh()
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def refresh(self) -> bool:
+        """
+        Fetch and install a new rate table
+
+        Returns:
+            bool: True when the table was replaced; on failure the current one stays
+        """
+        try:
+            response = await self.client.get(f"{self.api_url}/{self.base}")
+            response.raise_for_status()
+            snapshot = parse_table(response.json(), self.base)
+        except (httpx.HTTPError, ValueError) as e:
+            age = f"{self.age()} old" if self.snapshot else "none loaded"
+            logger.error(f"❌ Exchange rate refresh failed, keeping current table ({age}): {e}")
+            return False
+
+        if self.db is not None:
+            await self.db[SNAPSHOTS_COLLECTION].insert_one(snapshot.to_mongo())
+        self.snapshot = snapshot
+        logger.info(f"💱 Exchange rates refreshed: 1 {self.base} = {snapshot.rates.get('IDR')} IDR")
+        return True
+
+    def age(self) -> timedelta:
+        return datetime.now(timezone.utc) - self.snapshot.fetched_at
+
+    def quote(self, from_currency: str, to_currency: str) -> RateQuote:
+        """
+        Rate from the in-memory table (no I/O)
+
+        Args:
+            from_currency: Currency code, e.g. "IDR"
+            to_currency: Currency code, e.g. "USD"
+
+        Returns:
+            RateQuote: Rate with the snapshot id and fetch time
+
+        Raises:
+            RateUnavailable: No table yet, or a currency is not in it
+        """
+        from_currency, to_currency = from_currency.upper(), to_currency.upper()
+        snapshot = self.snapshot
+        if snapshot is None:
+            raise RateUnavailable("Exchange rates are not available yet")
+        if from_currency == to_currency:
+            return RateQuote(from_currency, to_currency, 1.0, snapshot.id, snapshot.fetched_at)
+
+        try:
+            rate = snapshot.rates[to_currency] / snapshot.rates[from_currency]
+        except KeyError as e:
+            raise RateUnavailable(f"No exchange rate for {e.args[0]}")
+        stale = self.age() > timedelta(hours=EXCHANGE_RATE_MAX_AGE_HOURS)
+        return RateQuote(from_currency, to_currency, rate, snapshot.id, snapshot.fetched_at, stale)
+
+
+# Global instance
+exchange_rates = ExchangeRateService()
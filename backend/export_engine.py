@@ -0,0 +1,281 @@
+"""
+Export Engine
+Writes tabular exports (XLSX, CSV, PDF) from async row sources, usually a
+Mongo cursor, without a row cap. Rows are pulled in batches on the event loop
+and handed to the file writer in a worker thread, so the loop stays free
+while openpyxl / reportlab work.
+
+XLSX uses openpyxl's write-only mode (rows go straight to a temporary file)
+and CSV is written as it comes, so memory stays flat however many rows there
+are. PDF tables are split every PDF_TABLE_ROWS rows, so layout cost grows
+linearly instead of with one giant Table; the formatted cell text of a PDF is
+held until the document is built. The finished file is spooled (memory, then
+disk past SPOOL_MAX_BYTES) and streamed to the client in chunks.
+"""
+import asyncio
+import csv
+import io
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, List, Optional
+from fastapi.responses import StreamingResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_ROWS = 500
+
+PDF_TABLE_ROWS = 250
+
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "pdf": "application/pdf",
+}
+
+
+@dataclass
+class ExportSpec:
+    """Layout of a single-table export"""
+    title: str
+    filename: str  # without extension
+    headers: List[str]
+    # Excel column widths in characters; PDF columns keep the same proportions
+    widths: List[float]
+    # Lines between the title and the table (period, generated at, ...)
+    info: List[str] = field(default_factory=list)
+    sheet_name: str = "Export"
+    # Formats a row for the PDF (default: str() of every cell)
+    pdf_row: Optional[Callable[[list], list]] = None
+
+
+class XlsxWriter:
+    """Write-only openpyxl workbook; rows are not kept in memory"""
+
+    def __init__(self, spec: ExportSpec, file):
+        import openpyxl
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Font, PatternFill
+        from openpyxl.utils import get_column_letter
+
+        self.file = file
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(spec.sheet_name[:31])
+        for index, width in enumerate(spec.widths, 1):
+            self.sheet.column_dimensions[get_column_letter(index)].width = width
+
+        def cell(value, **style):
+            c = WriteOnlyCell(self.sheet, value=value)
+            for name, item in style.items():
+                setattr(c, name, item)
+            return c
+
+        self.sheet.append([cell(spec.title, font=Font(bold=True, size=14))])
+        for line in spec.info:
+            self.sheet.append([line])
+        self.sheet.append([])
+        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        self.sheet.append([
+            cell(header, fill=header_fill, font=Font(bold=True, color="FFFFFF"), alignment=Alignment(horizontal="center"))
+            for header in spec.headers
+        ])
+
+    def write_rows(self, rows: List[list]):
+        for row in rows:
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.file)
+
+
+class CsvWriter:
+    """UTF-8 CSV (with BOM so Excel detects the encoding)"""
+
+    def __init__(self, spec: ExportSpec, file):
+        self.text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        self.writer = csv.writer(self.text)
+        self.writer.writerow([spec.title])
+        for line in spec.info:
+            self.writer.writerow([line])
+        self.writer.writerow([])
+        self.writer.writerow(spec.headers)
+
+    def write_rows(self, rows: List[list]):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.text.flush()
+        # Leave the spooled file open for streaming
+        self.text.detach()
+
+
+class PdfWriter:
+    """Platypus document with the table split every PDF_TABLE_ROWS rows"""
+
+    def __init__(self, spec: ExportSpec, file):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+        self.spec = spec
+        self.doc = SimpleDocTemplate(file, pagesize=A4)
+        styles = getSampleStyleSheet()
+        self.story = [Paragraph(spec.title, styles["Title"]), Spacer(1, 0.2 * inch)]
+        for line in spec.info:
+            self.story.append(Paragraph(line, styles["Normal"]))
+        self.story.append(Spacer(1, 0.3 * inch))
+
+        total = sum(spec.widths) or 1
+        self.col_widths = [self.doc.width * width / total for width in spec.widths]
+        self.pending: List[list] = []
+        self.tables = 0
+
+    def _flush(self):
+        from reportlab.lib import colors
+        from reportlab.platypus import Table, TableStyle
+
+        table = Table([self.spec.headers] + self.pending, colWidths=self.col_widths, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ]))
+        self.story.append(table)
+        self.pending = []
+        self.tables += 1
+
+    def write_rows(self, rows: List[list]):
+        format_row = self.spec.pdf_row or (lambda row: ["" if value is None else str(value) for value in row])
+        for row in rows:
+            self.pending.append(format_row(row))
+            if len(self.pending) >= PDF_TABLE_ROWS:
+                self._flush()
+
+    def close(self):
+        if self.pending or not self.tables:
+            self._flush()
+        self.doc.build(self.story)
+
+
+WRITERS = {"xlsx": XlsxWriter, "csv": CsvWriter, "pdf": PdfWriter}
+
+
+async def iterate(rows: Iterable[Any]) -> AsyncIterable[Any]:
+    """Async row source over rows already in memory"""
+    for row in rows:
+        yield row
+
+
+async def merge_sorted(sources: List[AsyncIterable[Any]], key: Callable[[Any], Any],
+                       reverse: bool = False) -> AsyncIterable[Any]:
+    """Merge async row sources that are each already sorted by key"""
+    iterators = [aiter(source) for source in sources]
+    heads = {}
+    for index, iterator in enumerate(iterators):
+        try:
+            heads[index] = await anext(iterator)
+        except StopAsyncIteration:
+            pass
+    pick_fn = max if reverse else min
+    while heads:
+        pick = pick_fn(heads, key=lambda index: key(heads[index]))
+        yield heads[pick]
+        try:
+            heads[pick] = await anext(iterators[pick])
+        except StopAsyncIteration:
+            del heads[pick]
+
+
+async def write_export(
+    spec: ExportSpec,
+    rows: AsyncIterable[list],
+    fmt: str,
+    file,
+    progress: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> int:
+    """
+    Write an export into a binary file
+
+    Args:
+        spec: Title, headers and column widths
+        rows: Async source of rows (lists of cell values, in header order)
+        fmt: xlsx, csv or pdf
+        file: Binary file object to write to
+        progress: Awaited with the number of rows written after every batch
+
+    Returns:
+        int: Rows written
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    writer = await asyncio.to_thread(WRITERS[fmt], spec, file)
+    count = 0
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= EXPORT_BATCH_ROWS:
+            await asyncio.to_thread(writer.write_rows, batch)
+            count += len(batch)
+            batch = []
+            if progress:
+                await progress(count)
+    if batch:
+        await asyncio.to_thread(writer.write_rows, batch)
+        count += len(batch)
+    await asyncio.to_thread(writer.close)
+    if progress:
+        await progress(count)
+    return count
+
+
+async def stream_file(file, chunk_size: int = STREAM_CHUNK_BYTES):
+    """Yield a file's content from the start in chunks, closing it afterwards"""
+    try:
+        await asyncio.to_thread(file.seek, 0)
+        while True:
+            chunk = await asyncio.to_thread(file.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file.close()
+
+
+async def export_response(spec: ExportSpec, rows: AsyncIterable[list], fmt: str,
+                          headers: Optional[dict] = None) -> StreamingResponse:
+    """
+    Build an export and stream it as a file download
+
+    Args:
+        spec: Title, headers and column widths
+        rows: Async source of rows
+        fmt: xlsx, csv or pdf
+        headers: Extra response headers
+
+    Returns:
+        StreamingResponse: The file with a Content-Disposition attachment header
+    """
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        count = await write_export(spec, rows, fmt, file)
+    except BaseException:
+        file.close()
+        raise
+    logger.info(f"📤 Export {spec.filename}.{fmt}: {count} rows")
+    return StreamingResponse(
+        stream_file(file),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename={spec.filename}.{fmt}", **(headers or {})},
+    )
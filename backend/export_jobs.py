@@ -0,0 +1,328 @@
+"""
+Export Jobs Module
+Large exports run as background jobs instead of inside the HTTP request.
+Submitting returns a job id; the job runs on the APScheduler event loop
+(bounded by EXPORT_JOB_CONCURRENCY), writes the file through export_engine and
+uploads it to object storage under exports/<job id>/. Progress (rows written)
+is stored on the job and pushed to the owner's notification stream as
+"export_job" events; clients poll or listen, then download the artifact.
+
+A submit identical to an active job (same kind, format, parameters and owner)
+returns that job instead of starting another one; finished artifacts are
+reused until they expire after EXPORT_ARTIFACT_TTL_MINUTES. Expired artifacts
+are deleted by a periodic sweep, which also re-queues jobs whose worker died.
+"""
+import os
+import json
+import uuid
+import asyncio
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import logging
+
+from export_engine import MEDIA_TYPES, write_export
+from notification_hub import ADMIN_AUDIENCE, client_audience, notification_hub
+from object_storage import get_object_storage
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = "export_jobs"
+
+# Jobs running at the same time in this process
+EXPORT_JOB_CONCURRENCY = int(os.getenv("EXPORT_JOB_CONCURRENCY", 2))
+# How long a finished artifact is kept and handed out again for identical requests
+EXPORT_ARTIFACT_TTL_MINUTES = int(os.getenv("EXPORT_ARTIFACT_TTL_MINUTES", 60))
+# A running job whose lease was not renewed for this long is re-queued; the
+# worker renews it every EXPORT_JOB_HEARTBEAT_SECONDS while the job runs
+EXPORT_JOB_LEASE_SECONDS = int(os.getenv("EXPORT_JOB_LEASE_SECONDS", 600))
+EXPORT_JOB_HEARTBEAT_SECONDS = max(1, int(os.getenv("EXPORT_JOB_HEARTBEAT_SECONDS", EXPORT_JOB_LEASE_SECONDS // 4)))
+# Finished, failed and expired job records are deleted after this many days
+EXPORT_JOB_RETENTION_DAYS = int(os.getenv("EXPORT_JOB_RETENTION_DAYS", 7))
+# Minimum interval between progress writes / events of one job
+EXPORT_PROGRESS_INTERVAL_SECONDS = float(os.getenv("EXPORT_PROGRESS_INTERVAL_SECONDS", 1))
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+EXPIRED = "expired"
+
+OWNER_USER = "user"
+OWNER_ADMIN = "admin"
+
+# Fields returned to clients
+JOB_PROJECTION = {
+    "_id": 0, "id": 1, "kind": 1, "format": 1, "params": 1, "status": 1, "progress": 1,
+    "file_name": 1, "size": 1, "error": 1, "created_at": 1, "started_at": 1, "finished_at": 1, "expires_at": 1,
+}
+
+Progress = Callable[[int], Awaitable[None]]
+# Writes the export into the file; returns the file name (with extension)
+Producer = Callable[[dict, str, str, object, Progress], Awaitable[str]]
+
+
+@dataclass
+class ExportKind:
+    """A kind of export that can run as a job"""
+    name: str
+    producer: Producer
+    formats: Tuple[str, ...]
+    # Accepted parameter names; anything else is dropped before deduplication
+    params: Tuple[str, ...] = ()
+    # OWNER_USER: private to the client; OWNER_ADMIN: shared by all admins
+    owner_kind: str = OWNER_USER
+
+
+def table_producer(build: Callable) -> Producer:
+    """
+    Producer for single-table exports
+
+    Args:
+        build: build(params, owner_id, fmt) -> (ExportSpec, async rows), as
+            used by export_engine.export_response
+    """
+    async def produce(params: dict, owner_id: str, fmt: str, file, progress: Progress) -> str:
+        spec, rows = build(params, owner_id, fmt)
+        await write_export(spec, rows, fmt, file, progress)
+        return f"{spec.filename}.{fmt}"
+    return produce
+
+
+def dedupe_key(kind: str, fmt: str, owner_id: str, params: dict) -> str:
+    raw = json.dumps([kind, fmt, owner_id, params], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def artifact_path(job: dict) -> str:
+    return f"exports/{job['id']}/{job['file_name']}"
+
+
+def job_view(job: dict) -> dict:
+    """Client-facing fields of a job"""
+    return {key: job.get(key) for key in JOB_PROJECTION if key != "_id"}
+
+
+class ExportJobs:
+    """Export job queue on MongoDB, executed through the shared APScheduler"""
+
+    def __init__(self, concurrency: int = EXPORT_JOB_CONCURRENCY):
+        self.db = None
+        self.scheduler = None
+        self.kinds: Dict[str, ExportKind] = {}
+        self.concurrency = concurrency
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def configure(self, db, scheduler):
+        self.db = db
+        self.scheduler = scheduler
+
+    @property
+    def collection(self):
+        return self.db[JOBS_COLLECTION]
+
+    def register(self, name: str, producer: Producer, formats: Tuple[str, ...] = ("xlsx", "pdf"),
+                 params: Tuple[str, ...] = (), owner_kind: str = OWNER_USER):
+        self.kinds[name] = ExportKind(name, producer, formats, params, owner_kind)
+
+    def audience(self, job: dict) -> str:
+        return ADMIN_AUDIENCE if job["owner_kind"] == OWNER_ADMIN else client_audience(job["owner_id"])
+
+    def _publish(self, job: dict):
+        notification_hub.publish(self.audience(job), "export_job", job_view(job))
+
+    def _schedule(self, job_id: str):
+        self.scheduler.add_job(
+            self.run, args=[job_id], id=f"export_job_{job_id}",
+            name="Export job", replace_existing=True, misfire_grace_time=None,
+        )
+
+    async def submit(self, kind: str, fmt: str, params: dict, owner_id: str) -> Tuple[dict, bool]:
+        """
+        Queue an export, or return the identical job that is already active
+
+        Args:
+            kind: Registered export kind
+            fmt: File format (one of the kind's formats)
+            params: Export parameters; unknown and empty ones are dropped, the
+                rest is part of the dedupe key
+            owner_id: Client id (user kinds) or admin id (admin kinds)
+
+        Returns:
+            tuple: (job, deduplicated)
+
+        Raises:
+            ValueError: Unknown kind or unsupported format
+        """
+        export_kind = self.kinds.get(kind)
+        if export_kind is None:
+            raise ValueError(f"Unknown export: {kind}")
+        if fmt not in export_kind.formats:
+            raise ValueError(f"Unsupported format for {kind}: {fmt}")
+
+        params = {name: params[name] for name in export_kind.params if params.get(name) not in (None, "")}
+        # Admin exports are shared by every admin
+        owner = ADMIN_AUDIENCE if export_kind.owner_kind == OWNER_ADMIN else owner_id
+        key = dedupe_key(kind, fmt, owner, params)
+        now = datetime.now(timezone.utc)
+
+        for _ in range(2):
+            existing = await self.collection.find_one({"dedupe_key": key, "active": True}, {"_id": 0})
+            if existing and existing["status"] == COMPLETED and existing["expires_at"] <= now:
+                await self._expire(existing)
+                existing = None
+            if existing:
+                return existing, True
+
+            job = {
+                "id": str(uuid.uuid4()),
+                "kind": kind,
+                "format": fmt,
+                "params": params,
+                "owner_kind": export_kind.owner_kind,
+                "owner_id": owner,
+                "requested_by": owner_id,
+                "dedupe_key": key,
+                "active": True,
+                "status": QUEUED,
+                "progress": 0,
+                "created_at": now,
+            }
+            try:
+                await self.collection.insert_one(job)
+            except DuplicateKeyError:
+                # An identical job was submitted concurrently
+                continue
+            job.pop("_id", None)
+            self._schedule(job["id"])
+            logger.info(f"📤 Export job {job['id'][:8]} queued: {kind}.{fmt}")
+            return job, False
+
+        existing = await self.collection.find_one({"dedupe_key": key, "active": True}, {"_id": 0})
+        return existing, True
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    async def run(self, job_id: str):
+        """Claim and execute one queued job"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        async with self._slots:
+            now = datetime.now(timezone.utc)
+            job = await self.collection.find_one_and_update(
+                {"id": job_id, "status": QUEUED},
+                {"$set": {"status": RUNNING, "started_at": now,
+                          "lease_until": now + timedelta(seconds=EXPORT_JOB_LEASE_SECONDS)}},
+                projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+            )
+            if job is None:
+                return
+            self._publish(job)
+
+            last_report = 0.0
+
+            async def progress(rows: int):
+                nonlocal last_report
+                job["progress"] = rows
+                loop_time = asyncio.get_running_loop().time()
+                if loop_time - last_report < EXPORT_PROGRESS_INTERVAL_SECONDS:
+                    return
+                last_report = loop_time
+                await self.collection.update_one({"id": job_id}, {"$set": {"progress": rows}})
+                self._publish(job)
+
+            # Slow steps (PDF build, upload, producers without progress) report nothing,
+            # so the lease is renewed independently for as long as the job runs
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            fd, tmp_path = tempfile.mkstemp(prefix="export-")
+            try:
+                export_kind = self.kinds[job["kind"]]
+                with os.fdopen(fd, "w+b") as file:
+                    file_name = await export_kind.producer(job["params"], job["requested_by"], job["format"], file, progress)
+                job["file_name"] = file_name
+                path = artifact_path(job)
+                await get_object_storage().upload_file(tmp_path, path, content_type=MEDIA_TYPES.get(file_name.rsplit(".", 1)[-1]))
+
+                finished = datetime.now(timezone.utc)
+                update = {
+                    "status": COMPLETED,
+                    "progress": job["progress"],
+                    "file_name": file_name,
+                    "artifact_path": path,
+                    "size": os.path.getsize(tmp_path),
+                    "finished_at": finished,
+                    "expires_at": finished + timedelta(minutes=EXPORT_ARTIFACT_TTL_MINUTES),
+                }
+                await self.collection.update_one({"id": job_id}, {"$set": update, "$unset": {"lease_until": ""}})
+                job.update(update)
+                logger.info(f"✅ Export job {job_id[:8]} finished: {file_name} ({update['size']} bytes)")
+            except Exception as e:
+                logger.error(f"❌ Export job {job_id[:8]} ({job['kind']}) failed: {e}")
+                update = {"status": FAILED, "error": str(e), "finished_at": datetime.now(timezone.utc)}
+                await self.collection.update_one({"id": job_id}, {"$set": update, "$unset": {"active": "", "lease_until": ""}})
+                job.update(update)
+            finally:
+                heartbeat.cancel()
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self._publish(job)
+
+    async def _heartbeat(self, job_id: str):
+        """Keep renewing a running job's lease until cancelled"""
+        while True:
+            await asyncio.sleep(EXPORT_JOB_HEARTBEAT_SECONDS)
+            try:
+                await self.collection.update_one({"id": job_id, "status": RUNNING}, {"$set": {
+                    "lease_until": datetime.now(timezone.utc) + timedelta(seconds=EXPORT_JOB_LEASE_SECONDS),
+                }})
+            except Exception as e:
+                logger.warning(f"⚠️ Export job {job_id[:8]} lease renewal failed: {e}")
+
+    async def _expire(self, job: dict):
+        """Delete a finished job's artifact and release its dedupe key"""
+        if job.get("artifact_path"):
+            try:
+                await get_object_storage().delete(job["artifact_path"])
+            except Exception as e:
+                logger.warning(f"⚠️ Could not delete export artifact {job['artifact_path']}: {e}")
+        await self.collection.update_one({"id": job["id"]}, {"$set": {"status": EXPIRED}, "$unset": {"active": ""}})
+
+    async def sweep(self):
+        """Expire old artifacts, re-queue abandoned jobs and purge old job records"""
+        now = datetime.now(timezone.utc)
+        expired = 0
+        async for job in self.collection.find({"status": COMPLETED, "expires_at": {"$lte": now}}, {"_id": 0}):
+            await self._expire(job)
+            expired += 1
+
+        # Running jobs whose worker stopped reporting (e.g. the process restarted)
+        requeued = 0
+        async for job in self.collection.find({"status": RUNNING, "lease_until": {"$lt": now}}, {"_id": 0, "id": 1}):
+            result = await self.collection.update_one(
+                {"id": job["id"], "status": RUNNING, "lease_until": {"$lt": now}},
+                {"$set": {"status": QUEUED}, "$unset": {"lease_until": ""}}
+            )
+            if result.modified_count:
+                self._schedule(job["id"])
+                requeued += 1
+
+        purged = await self.collection.delete_many({
+            "status": {"$in": [FAILED, EXPIRED]},
+            "created_at": {"$lt": now - timedelta(days=EXPORT_JOB_RETENTION_DAYS)},
+        })
+        if expired or requeued or purged.deleted_count:
+            logger.info(f"🧹 Export jobs: {expired} artifacts expired, {requeued} re-queued, {purged.deleted_count} purged")
+
+    async def resume(self):
+        """Schedule jobs left queued by a previous process"""
+        async for job in self.collection.find({"status": QUEUED}, {"_id": 0, "id": 1}):
+            self._schedule(job["id"])
+
+
+# Global instance
+export_jobs = ExportJobs()
@@ -0,0 +1,343 @@
+"""
+File Serving Module
+Streams stored files (GCS objects, content-addressed blobs and local uploads)
+into HTTP responses. Supports ETag / If-None-Match revalidation, single byte
+ranges and a Cache-Control policy chosen by the file's access class. GCS
+objects can instead be handed out as short-lived signed URL redirects, which
+keeps the API process out of the data path.
+"""
+import os
+import mimetypes
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+from fastapi import HTTPException, Request
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+import logging
+
+from blob_storage import LocalBlobStore, blob_key, get_blob_store
+from object_storage import run_storage_io
+
+logger = logging.getLogger(__name__)
+
+# Bytes fetched per read; every GCS chunk is one ranged GET
+FILE_CHUNK_SIZE = int(os.environ.get("FILE_CHUNK_SIZE", str(1024 * 1024)))
+# Redirect GCS reads to signed URLs instead of proxying the bytes
+SIGNED_URL_REDIRECT = os.environ.get("FILE_SIGNED_URL_REDIRECT", "false").lower() == "true"
+SIGNED_URL_TTL_MINUTES = int(os.environ.get("FILE_SIGNED_URL_TTL_MINUTES", "5"))
+
+# Access classes
+ACL_PUBLIC = "public"  # anyone
+ACL_USER = "user"      # the authenticated owner (or an admin)
+ACL_ADMIN = "admin"    # admin only (payment proofs, verification documents)
+
+CACHE_CONTROL = {
+    ACL_PUBLIC: "public, max-age=86400",
+    ACL_USER: "private, max-age=3600",
+    # Sensitive files are re-authorised on every view; the ETag keeps that a 304
+    ACL_ADMIN: "private, no-cache",
+}
+IMMUTABLE_CACHE_CONTROL = {
+    ACL_PUBLIC: "public, max-age=31536000, immutable",
+    ACL_USER: "private, max-age=31536000, immutable",
+    ACL_ADMIN: "private, no-cache",
+}
+
+# blobs/ holds the content-addressed payment proofs (blob_storage.py)
+ADMIN_PREFIXES = ("payment_proofs/", "wallet_payment_proofs/", "verification_files/", "exports/", "blobs/")
+
+
+def acl_for_path(file_path: str) -> str:
+    """Access class of a /files/ object by its folder"""
+    if file_path.startswith(ADMIN_PREFIXES):
+        return ACL_ADMIN
+    return ACL_USER
+
+
+def guess_content_type(file_name: str) -> str:
+    return mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+
+
+class StoredFile:
+    """Metadata and ranged reads of one stored file"""
+
+    def __init__(
+        self,
+        name: str,
+        size: int,
+        etag: str,
+        content_type: Optional[str] = None,
+        last_modified: Optional[datetime] = None,
+        immutable: bool = False
+    ):
+        self.name = name
+        self.size = size
+        self.etag = etag
+        self.content_type = content_type or guess_content_type(name)
+        self.last_modified = last_modified
+        self.immutable = immutable
+
+    def read(self, start: int, end: int) -> bytes:
+        """Return bytes start..end (inclusive)"""
+        raise NotImplementedError
+
+    def signed_url(self, file_name: str, expiration_minutes: int) -> Optional[str]:
+        """Short-lived direct download URL, or None when the backend has none"""
+        return None
+
+
+class LocalFile(StoredFile):
+    """File on the local filesystem"""
+
+    def __init__(self, path: Path, content_type: Optional[str] = None, etag: Optional[str] = None, immutable: bool = False):
+        stat = path.stat()
+        super().__init__(
+            name=path.name,
+            size=stat.st_size,
+            etag=etag or f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            content_type=content_type,
+            last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            immutable=immutable
+        )
+        self.path = path
+
+    def read(self, start: int, end: int) -> bytes:
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+
+class GCSFile(StoredFile):
+    """GCS object pinned to the generation its metadata was read from"""
+
+    def __init__(self, blob, content_type: Optional[str] = None, etag: Optional[str] = None, immutable: bool = False):
+        super().__init__(
+            name=blob.name.rsplit("/", 1)[-1],
+            size=blob.size or 0,
+            etag=etag or f'"{blob.generation}"',
+            content_type=blob.content_type or content_type,
+            last_modified=blob.updated,
+            immutable=immutable
+        )
+        self.blob = blob
+
+    def read(self, start: int, end: int) -> bytes:
+        # Ranged reads cannot be checked against the whole-object hash
+        return self.blob.download_as_bytes(start=start, end=end, if_generation_match=self.blob.generation, checksum=None)
+
+    def signed_url(self, file_name: str, expiration_minutes: int) -> Optional[str]:
+        return self.blob.generate_signed_url(
+            version="v4",
+            expiration=timedelta(minutes=expiration_minutes),
+            method="GET",
+            generation=self.blob.generation,
+            response_type=self.content_type,
+            response_disposition=f'inline; filename="{file_name}"'
+        )
+
+
+def get_file_bucket(bucket_name: Optional[str] = None):
+    """Bucket handle on the shared GCSStorage client"""
+    from gcs_storage import get_gcs_storage
+    gcs = get_gcs_storage()
+    if not bucket_name or bucket_name == gcs.bucket_name:
+        return gcs.bucket
+    return gcs.client.bucket(bucket_name)
+
+
+async def open_gcs_file(gcs_path: str, bucket_name: Optional[str] = None, content_type: Optional[str] = None) -> Optional[GCSFile]:
+    """
+    Fetch the metadata of a GCS object (one request, no content)
+
+    Returns:
+        GCSFile, or None when the object does not exist
+    """
+    def _get():
+        return get_file_bucket(bucket_name).get_blob(gcs_path)
+
+    blob = await run_storage_io(_get)
+    if blob is None:
+        return None
+    return GCSFile(blob, content_type=content_type)
+
+
+async def open_blob_file(digest: str, content_type: Optional[str] = None) -> Optional[StoredFile]:
+    """Stored file of a content-addressed blob; the digest is its ETag"""
+    store = get_blob_store()
+    etag = f'"{digest}"'
+    if isinstance(store, LocalBlobStore):
+        path = store.path(digest)
+        if not path.exists():
+            return None
+        return LocalFile(path, content_type=content_type, etag=etag, immutable=True)
+
+    blob = await run_storage_io(store.gcs.bucket.get_blob, blob_key(digest))
+    if blob is None:
+        return None
+    return GCSFile(blob, content_type=content_type, etag=etag, immutable=True)
+
+
+def open_local_file(paths: Iterable, content_type: Optional[str] = None) -> Optional[LocalFile]:
+    """First existing path of the candidates as a stored file"""
+    for path in paths:
+        if path and Path(path).is_file():
+            return LocalFile(Path(path), content_type=content_type)
+    return None
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" range against the file size
+
+    Returns:
+        tuple: (start, end) inclusive, or None to serve the whole file
+               (no header, or a multi-range request)
+
+    Raises:
+        ValueError: when the range cannot be satisfied
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+
+    first, _, last = spec.partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                raise ValueError(range_header)
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        raise ValueError(f"Invalid range: {range_header}")
+
+    end = min(end, size - 1)
+    if start >= size or start > end:
+        raise ValueError(f"Unsatisfiable range: {range_header}")
+    return start, end
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match / If-Range comparison (weak comparison, "*" matches)"""
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+async def _iter_file(stored: StoredFile, start: int, end: int, chunk_size: int) -> AsyncIterator[bytes]:
+    position = start
+    while position <= end:
+        chunk_end = min(position + chunk_size - 1, end)
+        chunk = await run_storage_io(stored.read, position, chunk_end)
+        if not chunk:
+            break
+        yield chunk
+        position += len(chunk)
+
+
+async def serve_file(
+    request: Request,
+    stored: StoredFile,
+    acl: str,
+    file_name: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    redirect: Optional[bool] = None,
+    chunk_size: int = FILE_CHUNK_SIZE
+) -> Response:
+    """
+    Stream a stored file as the response to a GET request
+
+    Args:
+        request: Incoming request (Range / If-None-Match / If-Range headers)
+        stored: File to serve
+        acl: Access class (ACL_PUBLIC, ACL_USER or ACL_ADMIN); picks Cache-Control
+        file_name: Name for Content-Disposition (defaults to the stored name)
+        headers: Extra response headers (e.g. CORS, or an attachment Content-Disposition)
+        redirect: Redirect to a signed URL when the backend supports it
+                  (defaults to FILE_SIGNED_URL_REDIRECT)
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Response: 200/206 stream, 304, 307 redirect or 416
+    """
+    file_name = file_name or stored.name
+    cache_control = (IMMUTABLE_CACHE_CONTROL if stored.immutable else CACHE_CONTROL)[acl]
+    response_headers = {
+        "Content-Disposition": f'inline; filename="{file_name}"',
+        **(headers or {}),
+        "ETag": stored.etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if stored.last_modified:
+        response_headers["Last-Modified"] = format_datetime(stored.last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if etag_matches(request.headers.get("if-none-match"), stored.etag):
+        return Response(status_code=304, headers=response_headers)
+
+    if SIGNED_URL_REDIRECT if redirect is None else redirect:
+        url = await run_storage_io(stored.signed_url, file_name, SIGNED_URL_TTL_MINUTES)
+        if url:
+            # The URL expires; never let a cache keep the redirect
+            return RedirectResponse(url, status_code=307, headers={**(headers or {}), "Cache-Control": "private, no-store"})
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if not if_range or etag_matches(if_range, stored.etag):
+        try:
+            byte_range = parse_range(request.headers.get("range"), stored.size)
+        except ValueError:
+            return Response(status_code=416, headers={**response_headers, "Content-Range": f"bytes */{stored.size}"})
+
+    status_code = 200
+    start, end = 0, stored.size - 1
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        response_headers["Content-Range"] = f"bytes {start}-{end}/{stored.size}"
+    response_headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        _iter_file(stored, start, end, chunk_size),
+        status_code=status_code,
+        media_type=stored.content_type,
+        headers=response_headers
+    )
+
+
+async def serve_gcs_path(
+    request: Request,
+    gcs_path: str,
+    acl: str,
+    file_name: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    fallback_paths: Iterable = (),
+    bucket_name: Optional[str] = None,
+    content_type: Optional[str] = None
+) -> Response:
+    """
+    Serve a GCS object, falling back to legacy copies on the local filesystem
+
+    Raises:
+        HTTPException: 404 when neither GCS nor the fallback paths have the file
+    """
+    stored = None
+    try:
+        stored = await open_gcs_file(gcs_path, bucket_name, content_type)
+    except Exception as e:
+        logger.warning(f"⚠️ GCS lookup failed for {gcs_path}: {e}")
+
+    if stored is None:
+        stored = open_local_file(fallback_paths, content_type)
+        if stored is None:
+            logger.error(f"❌ File not found in GCS or filesystem: {gcs_path}")
+            raise HTTPException(status_code=404, detail="File not found")
+        logger.info(f"✅ Serving {gcs_path} from filesystem: {stored.path}")
+
+    return await serve_file(request, stored, acl, file_name=file_name, headers=headers)
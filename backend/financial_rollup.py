@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+"""
+Financial Daily Rollups
+Pre-aggregated totals behind the financial reports. One document per
+(day in Asia/Jakarta, source, currency, payment class, status) holds the summed
+fee, amount and request count, so summary, growth and export read O(days)
+rollup rows instead of every request.
+
+Rows are kept up to date incrementally ($inc) whenever a request is created,
+deleted or changes status; rebuild_rollups() recomputes everything from the
+source collections (run at startup when the collection is empty, or by hand).
+Computed reports are kept in report_cache for a few minutes and dropped as soon
+as a rollup row changes.
+
+Sources and the statuses they keep:
+    account_topup    topup_requests          verified, approved, completed
+    wallet_topup     wallet_topup_requests   verified, approved, completed
+    wallet_transfer  wallet_transfers        completed, approved
+    withdraw         withdraw_requests       every status
+
+Usage:
+    python financial_rollup.py [--source withdraw] [--dry-run]
+"""
+import argparse
+import asyncio
+import copy
+import os
+import re
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+from cachetools import TTLCache
+from pymongo import ReplaceOne, UpdateOne
+from mongo_dates import as_datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLLECTION = "financial_daily_rollups"
+REPORT_TIMEZONE = "Asia/Jakarta"
+REPORT_TZ = ZoneInfo(REPORT_TIMEZONE)
+
+ACCOUNT_TOPUP = "account_topup"
+WALLET_TOPUP = "wallet_topup"
+WALLET_TRANSFER = "wallet_transfer"
+WITHDRAW = "withdraw"
+
+TOPUP_STATUSES = ["verified", "approved", "completed"]
+WALLET_TRANSFER_STATUSES = ["completed", "approved"]
+WITHDRAW_GROWTH_STATUSES = ["approved", "completed"]
+
+# Payment classes of payment_method
+PAYMENT_BANK = "bank"                # bank_bca, bank_mandiri, ...
+PAYMENT_CRYPTO = "crypto"            # usdt_trc20, crypto, ...
+PAYMENT_UNSPECIFIED = "unspecified"  # missing / null / ""
+PAYMENT_OTHER = "other"
+
+# Ad account top-ups counted as revenue per currency (empty method = legacy request)
+TOPUP_PAYMENT_CLASSES = {
+    "IDR": {PAYMENT_BANK, PAYMENT_UNSPECIFIED},
+    "USD": {PAYMENT_CRYPTO, PAYMENT_UNSPECIFIED},
+}
+
+# Seconds a computed summary / growth report is reused (any rollup change clears it)
+FINANCIAL_CACHE_TTL_SECONDS = int(os.getenv("FINANCIAL_CACHE_TTL_SECONDS", 300))
+FINANCIAL_CACHE_SIZE = 256
+
+_BANK_RE = re.compile("^bank_", re.IGNORECASE)
+_CRYPTO_RE = re.compile("usdt|crypto", re.IGNORECASE)
+
+
+def _number(value) -> float:
+    return value if isinstance(value, (int, float)) else 0
+
+
+class RollupSource:
+    """How one request collection maps onto rollup rows"""
+
+    def __init__(
+        self,
+        name: str,
+        collection: str,
+        statuses: Optional[List[str]],
+        fee_field: Optional[str],
+        amount_field: str,
+        net_of_fee: bool = False
+    ):
+        self.name = name
+        self.collection = collection
+        self.statuses = statuses  # None: every status
+        self.fee_field = fee_field
+        self.amount_field = amount_field
+        # Amount is stored with the fee included; the rollup keeps the pure amount
+        self.net_of_fee = net_of_fee
+
+    def tracks(self, status: Optional[str]) -> bool:
+        return status is not None and (self.statuses is None or status in self.statuses)
+
+    def fee(self, doc: dict) -> float:
+        return _number(doc.get(self.fee_field)) if self.fee_field else 0
+
+    def amount(self, doc: dict) -> float:
+        amount = _number(doc.get(self.amount_field))
+        return amount - self.fee(doc) if self.net_of_fee else amount
+
+    def fee_expr(self):
+        return {"$ifNull": [f"${self.fee_field}", 0]} if self.fee_field else 0
+
+    def amount_expr(self):
+        amount = {"$ifNull": [f"${self.amount_field}", 0]}
+        return {"$subtract": [amount, self.fee_expr()]} if self.net_of_fee else amount
+
+
+SOURCES: Dict[str, RollupSource] = {
+    ACCOUNT_TOPUP: RollupSource(ACCOUNT_TOPUP, "topup_requests", TOPUP_STATUSES, "total_fee", "total_amount", net_of_fee=True),
+    WALLET_TOPUP: RollupSource(WALLET_TOPUP, "wallet_topup_requests", TOPUP_STATUSES, "total_fee", "amount"),
+    WALLET_TRANSFER: RollupSource(WALLET_TRANSFER, "wallet_transfers", WALLET_TRANSFER_STATUSES, "fee", "amount"),
+    WITHDRAW: RollupSource(WITHDRAW, "withdraw_requests", None, None, "requested_amount"),
+}
+
+
+def classify_payment_method(payment_method: Optional[str]) -> str:
+    """Payment class of a payment_method value"""
+    if not payment_method:
+        return PAYMENT_UNSPECIFIED
+    if _BANK_RE.search(payment_method):
+        return PAYMENT_BANK
+    if _CRYPTO_RE.search(payment_method):
+        return PAYMENT_CRYPTO
+    return PAYMENT_OTHER
+
+
+def report_day(value) -> Optional[str]:
+    """Asia/Jakarta calendar day (YYYY-MM-DD) of a created_at value"""
+    value = as_datetime(value)
+    if value is None:
+        return None
+    return value.astimezone(REPORT_TZ).date().isoformat()
+
+
+def report_today() -> date:
+    return datetime.now(REPORT_TZ).date()
+
+
+def rollup_id(day: str, source: str, currency: str, payment_class: str, status: str) -> str:
+    return f"{day}|{source}|{currency}|{payment_class}|{status}"
+
+
+def _rollup_update(key: dict, fee: float, amount: float, count: int) -> UpdateOne:
+    return UpdateOne(
+        {"_id": rollup_id(**key)},
+        {
+            "$setOnInsert": key,
+            "$inc": {"fee": fee, "amount": amount, "count": count},
+            "$currentDate": {"updated_at": True}
+        },
+        upsert=True
+    )
+
+
+async def record_status_change(db, source: str, doc: dict, old_status: Optional[str], new_status: Optional[str]):
+    """
+    Move a request between rollup rows after its status changed
+
+    Args:
+        db: Database
+        source: Rollup source name (ACCOUNT_TOPUP, WALLET_TOPUP, ...)
+        doc: The request (created_at, currency, payment_method and amounts)
+        old_status: Status before the change (None for a new request)
+        new_status: Status after the change (None for a deleted request)
+    """
+    spec = SOURCES[source]
+    if old_status == new_status:
+        return
+    day = report_day(doc.get("created_at"))
+    if day is None:
+        logger.warning(f"⚠️ Rollup skipped {source} {doc.get('id')}: unreadable created_at")
+        return
+
+    base = {
+        "day": day,
+        "source": source,
+        "currency": doc.get("currency") or "IDR",
+        "payment_class": classify_payment_method(doc.get("payment_method")),
+    }
+    fee, amount = spec.fee(doc), spec.amount(doc)
+    operations = []
+    if spec.tracks(old_status):
+        operations.append(_rollup_update({**base, "status": old_status}, -fee, -amount, -1))
+    if spec.tracks(new_status):
+        operations.append(_rollup_update({**base, "status": new_status}, fee, amount, 1))
+    if not operations:
+        return
+
+    try:
+        await db[ROLLUP_COLLECTION].bulk_write(operations, ordered=False)
+    except Exception as e:
+        # Reports drift until the next rebuild; never fail the request over it
+        logger.error(f"❌ Failed to update financial rollup for {source} {doc.get('id')}: {e}")
+    report_cache.invalidate()
+
+
+async def record_created(db, source: str, doc: dict):
+    await record_status_change(db, source, doc, None, doc.get("status"))
+
+
+async def record_deleted(db, source: str, query: dict):
+    """Take the requests matching query out of the rollups (call before deleting them)"""
+    spec = SOURCES[source]
+    match = dict(query)
+    if spec.statuses is not None:
+        match["status"] = {"$in": spec.statuses}
+    projection = {"_id": 0, "id": 1, "created_at": 1, "currency": 1, "payment_method": 1, "status": 1,
+                  "total_fee": 1, "total_amount": 1, "fee": 1, "amount": 1, "requested_amount": 1}
+    async for doc in db[spec.collection].find(match, projection):
+        await record_status_change(db, source, doc, doc.get("status"), None)
+
+
+def _rebuild_pipeline(spec: RollupSource) -> list:
+    match = {} if spec.statuses is None else {"status": {"$in": spec.statuses}}
+    # A no-op for BSON dates; still reads ISO strings not yet migrated by mongo_dates.py
+    created = {"$convert": {"input": "$created_at", "to": "date", "onError": None, "onNull": None}}
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": created, "timezone": REPORT_TIMEZONE}},
+                "currency": {"$ifNull": ["$currency", "IDR"]},
+                "payment_method": "$payment_method",
+                "status": "$status",
+            },
+            "fee": {"$sum": spec.fee_expr()},
+            "amount": {"$sum": spec.amount_expr()},
+            "count": {"$sum": 1}
+        }}
+    ]
+
+
+async def rebuild_rollups(db, sources: Optional[Iterable[str]] = None, dry_run: bool = False) -> int:
+    """
+    Recompute rollup rows from the request collections
+
+    Args:
+        db: Database
+        sources: Source names to rebuild (default: all)
+        dry_run: Compute and log without writing
+
+    Returns:
+        int: Number of rollup rows
+    """
+    total = 0
+    for name in sources or SOURCES:
+        spec = SOURCES[name]
+        rows: Dict[str, dict] = {}
+        skipped = 0
+        async for group in db[spec.collection].aggregate(_rebuild_pipeline(spec), allowDiskUse=True):
+            key = group["_id"]
+            if key["day"] is None:
+                skipped += group["count"]
+                continue
+            row_key = {
+                "day": key["day"],
+                "source": name,
+                "currency": key["currency"],
+                "payment_class": classify_payment_method(key.get("payment_method")),
+                "status": key["status"],
+            }
+            row = rows.setdefault(rollup_id(**row_key), {**row_key, "fee": 0, "amount": 0, "count": 0})
+            row["fee"] += group["fee"]
+            row["amount"] += group["amount"]
+            row["count"] += group["count"]
+
+        if skipped:
+            logger.warning(f"⚠️ {skipped} {spec.collection} documents without a readable created_at left out of the rollups")
+        total += len(rows)
+        if dry_run:
+            logger.info(f"📊 {name}: {len(rows)} rollup rows (dry run)")
+            continue
+
+        now = datetime.now(timezone.utc)
+        collection = db[ROLLUP_COLLECTION]
+        if rows:
+            await collection.bulk_write(
+                [ReplaceOne({"_id": row_id}, {**row, "updated_at": now}, upsert=True) for row_id, row in rows.items()],
+                ordered=False
+            )
+        await collection.delete_many({"source": name, "_id": {"$nin": list(rows)}})
+        logger.info(f"✅ Rebuilt {len(rows)} {name} rollup rows")
+    if not dry_run:
+        report_cache.invalidate()
+    return total
+
+
+async def ensure_rollups(db):
+    """Backfill an empty rollup collection (its index is in db_indexes.py)"""
+    collection = db[ROLLUP_COLLECTION]
+    if await collection.estimated_document_count() == 0:
+        logger.info("🔄 Financial rollups empty, backfilling...")
+        await rebuild_rollups(db)
+
+
+def _day_match(start_day: Optional[date], end_day: Optional[date]) -> dict:
+    day_range = {}
+    if start_day:
+        day_range["$gte"] = start_day.isoformat()
+    if end_day:
+        day_range["$lte"] = end_day.isoformat()
+    return {"day": day_range} if day_range else {}
+
+
+async def load_rollups(db, start_day: Optional[date] = None, end_day: Optional[date] = None, sources: Optional[Iterable[str]] = None) -> List[dict]:
+    """Rollup rows for an inclusive day range (open ends allowed)"""
+    query = _day_match(start_day, end_day)
+    if sources:
+        query["source"] = {"$in": list(sources)}
+    return await db[ROLLUP_COLLECTION].find(query, {"_id": 0, "updated_at": 0}).to_list(length=None)
+
+
+def _summary_pipeline(start_day: Optional[date], end_day: Optional[date]) -> list:
+    topup_classes = [
+        {"currency": currency, "payment_class": {"$in": sorted(classes)}}
+        for currency, classes in TOPUP_PAYMENT_CLASSES.items()
+    ]
+    return [
+        {"$match": _day_match(start_day, end_day)},
+        {"$facet": {
+            ACCOUNT_TOPUP: [
+                {"$match": {"source": ACCOUNT_TOPUP, "status": {"$in": TOPUP_STATUSES}, "$or": topup_classes}},
+                {"$group": {"_id": "$currency", "fee": {"$sum": "$fee"}, "amount": {"$sum": "$amount"}}}
+            ],
+            WALLET_TRANSFER: [
+                {"$match": {"source": WALLET_TRANSFER, "status": {"$in": WALLET_TRANSFER_STATUSES}}},
+                {"$group": {"_id": "$currency", "fee": {"$sum": "$fee"}}}
+            ],
+            WALLET_TOPUP: [
+                {"$match": {"source": WALLET_TOPUP, "status": {"$in": TOPUP_STATUSES}}},
+                {"$group": {"_id": "$currency", "amount": {"$sum": "$amount"}}}
+            ],
+            WITHDRAW: [
+                {"$match": {"source": WITHDRAW}},
+                {"$group": {
+                    "_id": {"currency": "$currency", "status": "$status"},
+                    "amount": {"$sum": "$amount"},
+                    "count": {"$sum": "$count"}
+                }}
+            ],
+        }}
+    ]
+
+
+async def financial_summary(db, start_day: Optional[date] = None, end_day: Optional[date] = None) -> dict:
+    """
+    Revenue, top-up volume and withdrawals for an inclusive day range
+
+    One $facet aggregation over the rollups; every section is grouped in Mongo.
+
+    Returns:
+        dict: revenue, topup_volume and withdraw_summary sections of the
+              financial summary
+    """
+    result = await db[ROLLUP_COLLECTION].aggregate(_summary_pipeline(start_day, end_day)).to_list(1)
+    facets = result[0] if result else {}
+
+    def by_currency(source: str, field: str) -> Dict[str, float]:
+        totals = defaultdict(int)
+        for item in facets.get(source, []):
+            totals[item["_id"]] += item[field]
+        return totals
+
+    topup_fee = by_currency(ACCOUNT_TOPUP, "fee")
+    topup_amount = by_currency(ACCOUNT_TOPUP, "amount")
+    transfer_fee = by_currency(WALLET_TRANSFER, "fee")
+    wallet_topup_amount = by_currency(WALLET_TOPUP, "amount")
+
+    withdraw_summary = {"IDR": {}, "USD": {}}
+    for item in facets.get(WITHDRAW, []):
+        currency, status = item["_id"]["currency"], item["_id"]["status"]
+        withdraw_summary.setdefault(currency, {})[status] = {"amount": item["amount"], "count": item["count"]}
+
+    return {
+        "revenue": {
+            "total_revenue_idr": topup_fee["IDR"] + transfer_fee["IDR"],
+            "total_revenue_usd": topup_fee["USD"] + transfer_fee["USD"],
+            "breakdown_idr": {
+                "ad_account_topup_fee": topup_fee["IDR"],
+                "wallet_transfer_fee": transfer_fee["IDR"]
+            },
+            "breakdown_usd": {
+                "ad_account_topup_fee": topup_fee["USD"],
+                "wallet_transfer_fee": transfer_fee["USD"]
+            }
+        },
+        "topup_volume": {
+            "total_topup_idr": wallet_topup_amount["IDR"] + topup_amount["IDR"],
+            "total_topup_usd": wallet_topup_amount["USD"] + topup_amount["USD"],
+            "breakdown_idr": {
+                "wallet_topup": wallet_topup_amount["IDR"],
+                "ad_account_topup": topup_amount["IDR"]
+            },
+            "breakdown_usd": {
+                "wallet_topup": wallet_topup_amount["USD"],
+                "ad_account_topup": topup_amount["USD"]
+            }
+        },
+        "withdraw_summary": withdraw_summary,
+    }
+
+
+def growth_period(day: str, period: str) -> str:
+    """Chart bucket of a day: YYYY-MM-DD (day), YYYY-Www (week, Sunday first) or YYYY-MM (month)"""
+    if period == "day":
+        return day
+    if period == "week":
+        return date.fromisoformat(day).strftime("%Y-W%U")
+    return day[:7]
+
+
+def growth_from_rollups(rows: Iterable[dict], period: str) -> dict:
+    """
+    Per-period top-up, revenue and withdrawal series of a set of rollup rows
+
+    Top-up amount and count come from ad account and wallet top-ups; revenue
+    is every fee (ad account top-up, wallet top-up and wallet transfer).
+    """
+    combined: Dict[tuple, dict] = {}
+    withdraws: Dict[tuple, dict] = {}
+
+    for row in rows:
+        source, status = row["source"], row["status"]
+        key = (growth_period(row["day"], period), row["currency"])
+        if source in (ACCOUNT_TOPUP, WALLET_TOPUP) and status in TOPUP_STATUSES:
+            entry = combined.setdefault(key, {"topup_amount": 0, "revenue": 0, "count": 0})
+            entry["topup_amount"] += row["amount"]
+            entry["revenue"] += row["fee"]
+            entry["count"] += row["count"]
+        elif source == WALLET_TRANSFER and status in WALLET_TRANSFER_STATUSES:
+            entry = combined.setdefault(key, {"topup_amount": 0, "revenue": 0, "count": 0})
+            entry["revenue"] += row["fee"]
+        elif source == WITHDRAW and status in WITHDRAW_GROWTH_STATUSES:
+            entry = withdraws.setdefault(key, {"amount": 0, "count": 0})
+            entry["amount"] += row["amount"]
+            entry["count"] += row["count"]
+
+    growth_data = {
+        "topup": {"IDR": [], "USD": []},
+        "withdraw": {"IDR": [], "USD": []},
+        "revenue": {"IDR": [], "USD": []}
+    }
+    for (bucket, currency), data in sorted(combined.items()):
+        growth_data["topup"].setdefault(currency, []).append({
+            "period": bucket,
+            "amount": data["topup_amount"],
+            "count": data["count"]
+        })
+        growth_data["revenue"].setdefault(currency, []).append({
+            "period": bucket,
+            "amount": data["revenue"]
+        })
+    for (bucket, currency), data in sorted(withdraws.items()):
+        growth_data["withdraw"].setdefault(currency, []).append({
+            "period": bucket,
+            "amount": data["amount"],
+            "count": data["count"]
+        })
+    return growth_data
+
+
+class ReportCache:
+    """
+    TTL cache of computed financial reports, shared by the summary, growth and
+    export endpoints. Concurrent misses for the same key share one computation.
+    """
+
+    def __init__(self, ttl: int = FINANCIAL_CACHE_TTL_SECONDS, maxsize: int = FINANCIAL_CACHE_SIZE):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.inflight: Dict[tuple, asyncio.Future] = {}
+        # Bumped on invalidation so a computation that raced a change is not stored
+        self.generation = 0
+
+    def invalidate(self):
+        self.generation += 1
+        self.entries.clear()
+        self.inflight.clear()
+
+    async def get_or_compute(self, key: tuple, compute: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        Cached report for key, computing it on a miss
+
+        Args:
+            key: Cache key (report name plus its parameters)
+            compute: Coroutine function producing the report
+
+        Returns:
+            dict: A copy of the report (callers may modify it)
+        """
+        report = self.entries.get(key)
+        if report is None:
+            task = self.inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._compute(key, compute, self.generation))
+                self.inflight[key] = task
+            # Shielded so one cancelled caller does not cancel the others
+            report = await asyncio.shield(task)
+        return copy.deepcopy(report)
+
+    async def _compute(self, key: tuple, compute, generation: int) -> dict:
+        try:
+            report = await compute()
+        finally:
+            if self.inflight.get(key) is asyncio.current_task():
+                del self.inflight[key]
+        if generation == self.generation:
+            self.entries[key] = report
+        return report
+
+
+# Global instance
+report_cache = ReportCache()
+
+
+async def main(sources: Optional[List[str]], dry_run: bool):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.environ.get("DB_NAME", "test_database")]
+    try:
+        rows = await rebuild_rollups(db, sources, dry_run=dry_run)
+        logger.info(f"🎉 Financial rollup rebuild{' (dry run)' if dry_run else ''}: {rows} rows")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv(Path(__file__).parent / ".env")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", action="append", choices=list(SOURCES), help="Rebuild only this source (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Compute rows without writing them")
+    args = parser.parse_args()
+    asyncio.run(main(args.source, args.dry_run))
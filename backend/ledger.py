@@ -0,0 +1,282 @@
+"""
+Ledger Module
+Every balance change (wallets on users, ad account balances, product stock)
+goes through post(): each posting is one atomic conditional update on the
+balance document, and each applied posting appends a row to ledger_entries
+with the balance before and after.
+
+Debits with a guard only apply while the balance covers them, so concurrent
+requests cannot overdraw a wallet or lose each other's updates, and nothing
+has to read the balance first. Multi-posting operations (e.g. wallet -> ad
+account) run in a multi-document transaction on a replica set; on a standalone
+server already-applied postings are reverted when a later one fails.
+
+Money postings are rounded to MONEY_PLACES on the server (an $add/$round update
+instead of a plain $inc) so balances do not drift by float error; stock uses
+plain $inc.
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, List, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+import logging
+
+logger = logging.getLogger(__name__)
+
+LEDGER_COLLECTION = "ledger_entries"
+
+MONEY_PLACES = 2
+
+WALLET_TYPES = ("main", "withdrawal")
+
+
+class LedgerError(Exception):
+    """A posting could not be applied; nothing of the operation was kept"""
+
+    def __init__(self, posting: "Posting", message: str):
+        super().__init__(message)
+        self.posting = posting
+
+
+class InsufficientBalance(LedgerError):
+    """A guarded debit is larger than the balance"""
+
+    def __init__(self, posting: "Posting", available: float):
+        super().__init__(posting, f"Insufficient balance on {posting.collection}.{posting.field}: "
+                                  f"needed {-posting.amount}, available {available}")
+        self.available = available
+
+
+class AccountNotFound(LedgerError):
+    """The balance document of a posting does not exist"""
+
+    def __init__(self, posting: "Posting"):
+        super().__init__(posting, f"{posting.collection} {posting.account_id} not found")
+
+
+@dataclass
+class Posting:
+    """One balance change: a signed delta, or an absolute value (set_to)"""
+    collection: str
+    account_id: str
+    field: str
+    amount: float = 0
+    currency: Optional[str] = None
+    # Refuse the posting when it would take the balance below zero
+    guard: bool = False
+    # Set the balance instead of adding to it (e.g. drain to 0); the delta is recorded
+    set_to: Optional[float] = None
+    places: Optional[int] = MONEY_PLACES
+    # Extra conditions on the balance document (e.g. ownership)
+    match: Dict[str, Any] = field(default_factory=dict)
+    # Fields written together with the balance
+    extra_set: Dict[str, Any] = field(default_factory=dict)
+    # Skip (no entry) instead of failing when the balance document does not exist
+    missing_ok: bool = False
+
+    def __post_init__(self):
+        if self.places is not None:
+            self.amount = round_amount(self.amount, self.places)
+
+
+def round_amount(value: float, places: int = MONEY_PLACES) -> float:
+    return float(Decimal(str(value or 0)).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP))
+
+
+def wallet_field(wallet_type: str, currency: str) -> str:
+    """users field of a wallet, e.g. main_wallet_idr"""
+    return f"{wallet_type}_wallet_{currency.lower()}"
+
+
+def wallet(user_id: str, field_name: str, amount: float, currency: Optional[str] = None,
+           guard: Optional[bool] = None, **options) -> Posting:
+    """Posting on a user wallet field; debits are guarded unless guard=False"""
+    if currency is None:
+        currency = field_name.rsplit("_", 1)[-1].upper()
+    return Posting("users", user_id, field_name, amount, currency,
+                   guard=amount < 0 if guard is None else guard, **options)
+
+
+def ad_account(account_id: str, amount: float = 0, currency: Optional[str] = None, **options) -> Posting:
+    """Posting on an ad account balance (mirrors the platform, so not guarded by default)"""
+    return Posting("ad_accounts", account_id, "balance", amount, currency, **options)
+
+
+def stock(page_id: str, quantity: int = 0, **options) -> Posting:
+    """Posting on a landing page product's stock; removals are guarded"""
+    options.setdefault("guard", quantity < 0)
+    return Posting("landing_pages", page_id, "product_details.stock_quantity", quantity, None, places=None, **options)
+
+
+def _value(doc: Optional[dict], path: str) -> float:
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return 0
+        doc = doc.get(part)
+    return doc or 0
+
+
+def _update(posting: Posting):
+    if posting.set_to is not None:
+        return {"$set": {posting.field: posting.set_to, **posting.extra_set}}
+    if posting.places is None:
+        update = {"$inc": {posting.field: posting.amount}}
+        if posting.extra_set:
+            update["$set"] = posting.extra_set
+        return update
+    balance = {"$round": [{"$add": [{"$ifNull": [f"${posting.field}", 0]}, posting.amount]}, posting.places]}
+    extra = {key: {"$literal": value} for key, value in posting.extra_set.items()}
+    return [{"$set": {posting.field: balance, **extra}}]
+
+
+async def _apply_one(db, posting: Posting, session=None) -> Optional[Dict[str, float]]:
+    query = {"id": posting.account_id, **posting.match}
+    if posting.guard and posting.set_to is None and posting.amount < 0:
+        query[posting.field] = {"$gte": -posting.amount}
+
+    before_set = posting.set_to is not None
+    doc = await db[posting.collection].find_one_and_update(
+        query, _update(posting), projection={"_id": 0, posting.field: 1},
+        return_document=ReturnDocument.BEFORE if before_set else ReturnDocument.AFTER,
+        session=session,
+    )
+    if doc is None:
+        current = await db[posting.collection].find_one(
+            {"id": posting.account_id, **posting.match}, {"_id": 0, posting.field: 1}, session=session
+        )
+        if current is None:
+            if posting.missing_ok:
+                logger.warning(f"⚠️ Ledger posting skipped, {posting.collection} {posting.account_id} not found")
+                return None
+            raise AccountNotFound(posting)
+        raise InsufficientBalance(posting, _value(current, posting.field))
+
+    if before_set:
+        before = _value(doc, posting.field)
+        return {"amount": posting.set_to - before, "balance_before": before, "balance_after": posting.set_to}
+    after = _value(doc, posting.field)
+    before = after - posting.amount
+    if posting.places is not None:
+        before = round_amount(before, posting.places)
+    return {"amount": posting.amount, "balance_before": before, "balance_after": after}
+
+
+async def _revert(db, applied: List[tuple]):
+    for posting, result in reversed(applied):
+        undo = Posting(posting.collection, posting.account_id, posting.field, -result["amount"],
+                       places=posting.places, match=posting.match)
+        try:
+            await db[posting.collection].update_one({"id": posting.account_id}, _update(undo))
+        except PyMongoError as e:
+            logger.critical(f"❌ Ledger revert failed for {posting.collection} {posting.account_id} "
+                            f"{posting.field} {-result['amount']}: {e}")
+
+
+_transactions_supported: Optional[bool] = None
+
+
+async def supports_transactions(db) -> bool:
+    """Multi-document transactions need a replica set or a sharded cluster"""
+    global _transactions_supported
+    if _transactions_supported is None:
+        try:
+            hello = await db.client.admin.command("hello")
+            _transactions_supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+        except PyMongoError:
+            _transactions_supported = False
+        if not _transactions_supported:
+            logger.warning("⚠️ MongoDB has no transactions (standalone); multi-posting ledger operations revert on failure instead")
+    return _transactions_supported
+
+
+async def post(
+    db,
+    postings: List[Posting],
+    entry_type: str,
+    user_id: Optional[str] = None,
+    reference_id: Optional[str] = None,
+    description: Optional[str] = None,
+    metadata: Optional[dict] = None,
+) -> List[dict]:
+    """
+    Apply balance postings atomically and append them to the ledger
+
+    Args:
+        db: Database
+        postings: Balance changes, applied in order
+        entry_type: Operation type (e.g. "wallet_transfer", "exchange")
+        user_id: Client the operation belongs to
+        reference_id: Request / order / action the operation settles
+        description: Human readable description
+        metadata: Extra details stored on every entry
+
+    Returns:
+        list: Ledger entries (one per posting) with balance_before / balance_after
+
+    Raises:
+        InsufficientBalance: A guarded debit was larger than the balance
+        AccountNotFound: A balance document does not exist
+    """
+    postings = [p for p in postings if p.set_to is not None or p.amount]
+    if not postings:
+        return []
+
+    operation_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+
+    def entry(posting: Posting, result: Dict[str, float]) -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "operation_id": operation_id,
+            "type": entry_type,
+            "user_id": user_id or (posting.account_id if posting.collection == "users" else None),
+            "reference_id": reference_id,
+            "collection": posting.collection,
+            "account_id": posting.account_id,
+            "field": posting.field,
+            "currency": posting.currency,
+            "description": description,
+            "metadata": metadata or {},
+            "created_at": now,
+            **result,
+        }
+
+    if len(postings) > 1 and await supports_transactions(db):
+        async def run(session):
+            entries = []
+            for posting in postings:
+                result = await _apply_one(db, posting, session)
+                if result is not None and result["amount"]:
+                    entries.append(entry(posting, result))
+            if entries:
+                await db[LEDGER_COLLECTION].insert_many(entries, session=session)
+            return entries
+
+        async with await db.client.start_session() as session:
+            entries = await session.with_transaction(run)
+    else:
+        applied = []
+        try:
+            for posting in postings:
+                result = await _apply_one(db, posting)
+                if result is not None and result["amount"]:
+                    applied.append((posting, result))
+        except LedgerError:
+            await _revert(db, applied)
+            raise
+        entries = [entry(p, result) for p, result in applied]
+        try:
+            if entries:
+                await db[LEDGER_COLLECTION].insert_many(entries)
+        except PyMongoError as e:
+            # The balances moved; losing the audit rows must not fail the request
+            logger.critical(f"❌ Ledger entries for operation {operation_id} ({entry_type}) not written: {e}")
+
+    for e in entries:
+        e.pop("_id", None)
+    logger.info(f"📒 Ledger {entry_type}: " + ", ".join(
+        f"{e['collection']}.{e['field']}[{e['account_id'][:8]}] {e['amount']:+}" for e in entries))
+    return entries
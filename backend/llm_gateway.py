@@ -0,0 +1,468 @@
+"""
+LLM Gateway Module
+Shared async entry point for LLM calls (landing page copy, AI helpers, ad
+copy). Calls are awaited on the event loop (litellm.acompletion), limited per
+provider by a semaphore, and retried on timeouts and 502/503/504.
+
+Identical prompts (model, temperature and messages) that are in flight at the
+same time share one provider call. Callers can also opt into a TTL cache of
+results for deterministic helpers (SEO, benefits), keyed by a hash of the same
+fields. complete_json() extracts JSON from replies that wrap it in markdown
+fences or prose.
+
+stream() yields the reply as it is generated (not cached or coalesced);
+JSONSectionParser turns such a stream of a JSON object into its top-level
+members as each one completes. Closing the stream early closes the upstream
+response, so an abandoned generation stops costing tokens.
+
+LLM_PROVIDER=fake swaps in FakeProvider, which answers without network access.
+"""
+import os
+import copy
+import json
+import asyncio
+import hashlib
+import inspect
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from cachetools import TTLCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "litellm")
+LLM_DEFAULT_MODEL = os.getenv("LLM_DEFAULT_MODEL", "openai/gpt-4o")
+# Concurrent calls per provider (the model prefix, e.g. "openai"); LLM_CONCURRENCY_OPENAI overrides
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", 2))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", 1))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 24 * 3600))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", 1024))
+
+RETRYABLE_STATUS = (502, 503, 504)
+
+
+class LLMError(Exception):
+    """An LLM call failed; status_code is the suggested HTTP status"""
+    status_code = 500
+
+
+class LLMNotConfigured(LLMError):
+    """No API key for the provider"""
+
+
+class LLMTimeout(LLMError):
+    status_code = 504
+
+
+class LLMBudgetExceeded(LLMError):
+    """The API key has no balance left"""
+    status_code = 402
+
+
+class LLMResponseError(LLMError, ValueError):
+    """The reply does not contain the expected JSON"""
+
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the JSON value in an LLM reply
+
+    Accepts bare JSON, JSON in ```json / ``` fences and JSON surrounded by
+    prose: the first position where an object or array parses wins.
+
+    Raises:
+        LLMResponseError: No JSON value in the text
+    """
+    text = (text or "").strip()
+    candidates = []
+    if "```" in text:
+        # Fenced blocks first: ```json\n...\n```
+        parts = text.split("```")
+        for block in parts[1::2]:
+            block = block.strip()
+            if block[:4].lower() == "json":
+                block = block[4:]
+            candidates.append(block.strip())
+    candidates.append(text)
+
+    decoder = json.JSONDecoder()
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+        for index, char in enumerate(candidate):
+            if char in "{[":
+                try:
+                    return decoder.raw_decode(candidate, index)[0]
+                except ValueError:
+                    continue
+    raise LLMResponseError(f"No JSON in LLM response: {text[:200]!r}")
+
+
+class JSONSectionParser:
+    """
+    Incremental parser for a streamed JSON object
+
+    feed() takes the next piece of text and returns the (key, value) pairs of
+    the top-level members completed by it. Text before the opening brace
+    (e.g. a ```json fence) is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+        self.done = False
+        self.member_start = None
+        self.members: Dict[str, Any] = {}
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        self.buffer += text
+        completed = []
+        while self.position < len(self.buffer) and not self.done:
+            char = self.buffer[self.position]
+            index = self.position
+            self.position += 1
+
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                    self.depth = 1
+                    self.member_start = index + 1
+                continue
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    completed += self._member(self.buffer[self.member_start:index])
+                    self.done = True
+            elif char == "," and self.depth == 1:
+                completed += self._member(self.buffer[self.member_start:index])
+                self.member_start = index + 1
+        return completed
+
+    def _member(self, text: str) -> List[Tuple[str, Any]]:
+        if not text.strip():
+            return []
+        try:
+            (key, value), = json.loads("{" + text + "}").items()
+        except ValueError as e:
+            raise LLMResponseError(f"Invalid JSON member in LLM stream: {text[:200]!r}") from e
+        self.members[key] = value
+        return [(key, value)]
+
+    def document(self) -> dict:
+        """The complete object; raises when the stream ended before its closing brace"""
+        if not self.done:
+            raise LLMResponseError("LLM stream ended before the JSON object was complete")
+        return self.members
+
+
+def provider_of(model: str) -> str:
+    return model.split("/", 1)[0] if "/" in model else "openai"
+
+
+def cache_key(model: str, temperature: Optional[float], messages: List[dict]) -> str:
+    raw = json.dumps([model, temperature, messages], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LiteLLMProvider:
+    """OpenAI-compatible models through the Emergent integration proxy"""
+
+    def __init__(self, api_key: Optional[str] = None, api_base: Optional[str] = None):
+        self.api_key = api_key or os.environ.get("EMERGENT_LLM_KEY")
+        proxy = api_base or os.getenv("INTEGRATION_PROXY_URL", "https://integrations.emergentagent.com")
+        self.api_base = proxy.rstrip("/") + "/llm"
+
+    async def complete(self, messages: List[dict], model: str, temperature: Optional[float], timeout: float) -> str:
+        import litellm
+
+        if not self.api_key:
+            raise LLMNotConfigured("AI service not configured")
+        options = {} if temperature is None else {"temperature": temperature}
+        response = await litellm.acompletion(
+            model=model,
+            messages=messages,
+            api_key=self.api_key,
+            api_base=self.api_base,
+            custom_llm_provider="openai",
+            timeout=timeout,
+            **options
+        )
+        return response.choices[0].message.content or ""
+
+    async def stream(self, messages: List[dict], model: str, temperature: Optional[float], timeout: float) -> AsyncIterator[str]:
+        import litellm
+
+        if not self.api_key:
+            raise LLMNotConfigured("AI service not configured")
+        options = {} if temperature is None else {"temperature": temperature}
+        response = await litellm.acompletion(
+            model=model,
+            messages=messages,
+            api_key=self.api_key,
+            api_base=self.api_base,
+            custom_llm_provider="openai",
+            timeout=timeout,
+            stream=True,
+            **options
+        )
+        try:
+            async for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        finally:
+            await _close_upstream(response)
+
+
+async def _close_upstream(response):
+    """Close a provider stream (and its HTTP response) that may not have been read to the end"""
+    upstream = getattr(response, "completion_stream", response)
+    close = getattr(upstream, "aclose", None) or getattr(upstream, "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.warning(f"⚠️ Could not close LLM stream: {e}")
+
+
+class FakeProvider:
+    """
+    Offline provider for tests and local runs
+
+    The responder receives (messages, model) and returns the reply text; by
+    default a fenced JSON object describing the request. Calls are counted;
+    streams are cut into chunk_size pieces.
+    """
+
+    def __init__(self, responder: Optional[Callable[[List[dict], str], str]] = None, latency: float = 0.0,
+                 chunk_size: int = 8):
+        self.responder = responder or self.default_reply
+        # Total time per reply; a stream spreads it over its chunks
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    @staticmethod
+    def default_reply(messages: List[dict], model: str) -> str:
+        digest = cache_key(model, None, messages)[:12]
+        return f"```json\n{json.dumps({'fake': True, 'model': model, 'prompt': digest})}\n```"
+
+    async def complete(self, messages: List[dict], model: str, temperature: Optional[float], timeout: float) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.responder(messages, model)
+
+    async def stream(self, messages: List[dict], model: str, temperature: Optional[float], timeout: float) -> AsyncIterator[str]:
+        self.calls += 1
+        reply = self.responder(messages, model)
+        pieces = [reply[i:i + self.chunk_size] for i in range(0, len(reply), self.chunk_size)]
+        for piece in pieces:
+            if self.latency:
+                await asyncio.sleep(self.latency / len(pieces))
+            yield piece
+
+
+def _status_of(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status
+    message = str(error)
+    return next((code for code in RETRYABLE_STATUS if str(code) in message), None)
+
+
+def _translate(error: Exception) -> Tuple[LLMError, bool]:
+    """Gateway error for a provider exception, and whether the call may be retried"""
+    if isinstance(error, LLMError):
+        return error, False
+    if isinstance(error, asyncio.TimeoutError):
+        return LLMTimeout("AI sedang lambat, coba lagi dalam beberapa saat"), True
+    message = str(error)
+    if "budget" in message.lower() or "insufficient" in message.lower():
+        return LLMBudgetExceeded(message), False
+    retryable = _status_of(error) in RETRYABLE_STATUS or "timeout" in type(error).__name__.lower()
+    return LLMError(f"AI generation error: {message}"), retryable
+
+
+class LLMGateway:
+    """Concurrency-limited, coalescing and optionally caching LLM client"""
+
+    def __init__(self, provider=None, cache_ttl: int = LLM_CACHE_TTL_SECONDS, cache_size: int = LLM_CACHE_SIZE):
+        if provider is None:
+            provider = FakeProvider() if LLM_PROVIDER == "fake" else LiteLLMProvider()
+        self.provider = provider
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.inflight: Dict[tuple, asyncio.Future] = {}
+        self.slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _slots(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self.slots:
+            limit = int(os.getenv(f"LLM_CONCURRENCY_{provider.upper()}", LLM_MAX_CONCURRENCY))
+            self.slots[provider] = asyncio.Semaphore(limit)
+        return self.slots[provider]
+
+    async def _call_provider(self, messages: List[dict], model: str, temperature: Optional[float], timeout: float) -> str:
+        delay = LLM_RETRY_BASE_SECONDS
+        for attempt in range(1, LLM_MAX_ATTEMPTS + 1):
+            try:
+                async with self._slots(provider_of(model)):
+                    return await asyncio.wait_for(self.provider.complete(messages, model, temperature, timeout), timeout)
+            except Exception as e:
+                error, retryable = _translate(e)
+            if not retryable or attempt == LLM_MAX_ATTEMPTS:
+                logger.error(f"❌ LLM {model} failed after {attempt} attempt(s): {error}")
+                raise error
+            logger.warning(f"⚠️ LLM {model} attempt {attempt}/{LLM_MAX_ATTEMPTS} failed ({error}), retrying in {delay}s")
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    async def _run(self, key: tuple, compute: Callable[[], Awaitable[Any]], cache: bool) -> Any:
+        if cache and key in self.cache:
+            return copy.deepcopy(self.cache[key])
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, compute, cache))
+            self.inflight[key] = task
+        # Shielded so one cancelled caller does not cancel the others
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def _compute(self, key: tuple, compute, cache: bool) -> Any:
+        try:
+            result = await compute()
+        finally:
+            if self.inflight.get(key) is asyncio.current_task():
+                del self.inflight[key]
+        if cache:
+            self.cache[key] = result
+        return result
+
+    @staticmethod
+    def _messages(prompt: Optional[str], system: Optional[str], messages: Optional[List[dict]]) -> List[dict]:
+        messages = list(messages or [])
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        if prompt is not None:
+            messages.append({"role": "user", "content": prompt})
+        return messages
+
+    async def complete(
+        self,
+        prompt: Optional[str] = None,
+        system: Optional[str] = None,
+        messages: Optional[List[dict]] = None,
+        model: str = LLM_DEFAULT_MODEL,
+        temperature: Optional[float] = 0.7,
+        cache: bool = False,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+    ) -> str:
+        """
+        Reply text for a prompt
+
+        Args:
+            prompt: User message (appended after messages)
+            system: System message (prepended)
+            messages: Earlier chat messages
+            model: "provider/model", e.g. "openai/gpt-4o"
+            temperature: Sampling temperature; None leaves the model default
+            cache: Serve identical requests from the result cache
+            timeout: Seconds per attempt
+
+        Returns:
+            str: Reply text
+
+        Raises:
+            LLMError: Not configured, timed out, out of budget or provider error
+        """
+        messages = self._messages(prompt, system, messages)
+        key = ("text", cache_key(model, temperature, messages))
+        return await self._run(key, lambda: self._call_provider(messages, model, temperature, timeout), cache)
+
+    async def complete_json(
+        self,
+        prompt: Optional[str] = None,
+        system: Optional[str] = None,
+        messages: Optional[List[dict]] = None,
+        model: str = LLM_DEFAULT_MODEL,
+        temperature: Optional[float] = 0.7,
+        cache: bool = False,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+    ) -> Any:
+        """
+        JSON value of the reply (see complete() for the arguments)
+
+        Only replies that parse are cached.
+
+        Raises:
+            LLMResponseError: The reply has no JSON
+            LLMError: As complete()
+        """
+        messages = self._messages(prompt, system, messages)
+        key = ("json", cache_key(model, temperature, messages))
+
+        async def compute():
+            return extract_json(await self._call_provider(messages, model, temperature, timeout))
+
+        return await self._run(key, compute, cache)
+
+    async def stream(
+        self,
+        prompt: Optional[str] = None,
+        system: Optional[str] = None,
+        messages: Optional[List[dict]] = None,
+        model: str = LLM_DEFAULT_MODEL,
+        temperature: Optional[float] = 0.7,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+    ) -> AsyncIterator[str]:
+        """
+        Reply text as it is generated (see complete() for the arguments)
+
+        Holds a provider slot until the stream is exhausted or closed; closing
+        it early (e.g. the client went away) closes the upstream response.
+        timeout applies to the wait for each piece.
+
+        Raises:
+            LLMError: As complete(); nothing is retried once text was yielded
+        """
+        messages = self._messages(prompt, system, messages)
+        async with self._slots(provider_of(model)):
+            upstream = self.provider.stream(messages, model, temperature, timeout)
+            try:
+                while True:
+                    try:
+                        piece = await asyncio.wait_for(anext(upstream), timeout)
+                    except StopAsyncIteration:
+                        break
+                    except Exception as e:
+                        error, _ = _translate(e)
+                        logger.error(f"❌ LLM {model} stream failed: {error}")
+                        raise error from e
+                    yield piece
+            finally:
+                await upstream.aclose()
+
+
+# Global instance
+llm_gateway = LLMGateway()
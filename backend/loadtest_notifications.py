@@ -0,0 +1,136 @@
+"""
+Notification Load Test
+MongoDB operations per second caused by N open dashboards, either polling the
+notification endpoints (the previous client behaviour) or holding a
+notification stream open (the current behaviour)
+
+Usage:
+    # before: previous build, dashboards polling list + unread-count
+    python loadtest_notifications.py --mode poll --dashboards 500 --duration 300 --token <admin JWT>
+    # after: current build, dashboards on the SSE stream
+    python loadtest_notifications.py --mode push --dashboards 500 --duration 300 --token <admin JWT>
+
+Run against an otherwise idle server: QPS is read from the server-wide
+serverStatus opcounters, so any other traffic is included.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+OPCOUNTERS = ("query", "getmore", "command", "insert", "update", "delete")
+
+
+async def opcounters(mongo) -> dict:
+    status = await mongo.admin.command("serverStatus")
+    return {name: status["opcounters"].get(name, 0) for name in OPCOUNTERS}
+
+
+class Stats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.events = 0
+        self.streams_open = 0
+
+
+async def polling_dashboard(http: httpx.AsyncClient, prefix: str, interval: float, stop: asyncio.Event, stats: Stats):
+    """The previous hook: list + unread count on every tick"""
+    await asyncio.sleep(random.uniform(0, interval))
+    while not stop.is_set():
+        for path in (f"{prefix}/notifications?limit=50", f"{prefix}/notifications/unread-count"):
+            try:
+                response = await http.get(path)
+                response.raise_for_status()
+                stats.requests += 1
+            except httpx.HTTPError:
+                stats.errors += 1
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def streaming_dashboard(http: httpx.AsyncClient, prefix: str, token: str, stop: asyncio.Event, stats: Stats):
+    """The current hook: one initial fetch, then the event stream"""
+    async def consume():
+        await asyncio.sleep(random.uniform(0, 5))
+        (await http.get(f"{prefix}/notifications?limit=50")).raise_for_status()
+        stats.requests += 1
+        async with http.stream("GET", f"{prefix}/notifications/stream", params={"token": token}, timeout=None) as response:
+            response.raise_for_status()
+            stats.requests += 1
+            stats.streams_open += 1
+            try:
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        stats.events += 1
+            finally:
+                stats.streams_open -= 1
+
+    reader = asyncio.create_task(consume())
+    stopper = asyncio.create_task(stop.wait())
+    await asyncio.wait({reader, stopper}, return_when=asyncio.FIRST_COMPLETED)
+    for task in (reader, stopper):
+        task.cancel()
+    if reader.done() and not reader.cancelled() and reader.exception():
+        stats.errors += 1
+
+
+async def run(args):
+    mongo = AsyncIOMotorClient(args.mongo_url)
+    prefix = f"/api/{args.user_type}"
+    stats = Stats()
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=args.dashboards + 10, max_keepalive_connections=args.dashboards + 10)
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        headers={"Authorization": f"Bearer {args.token}"},
+        limits=limits,
+        timeout=30
+    ) as http:
+        if args.mode == "poll":
+            tasks = [asyncio.create_task(polling_dashboard(http, prefix, args.interval, stop, stats)) for _ in range(args.dashboards)]
+        else:
+            tasks = [asyncio.create_task(streaming_dashboard(http, prefix, args.token, stop, stats)) for _ in range(args.dashboards)]
+
+        # Measure the steady state, not the connection ramp-up
+        await asyncio.sleep(args.warmup)
+        before, started = await opcounters(mongo), time.perf_counter()
+        await asyncio.sleep(args.duration)
+        after, elapsed = await opcounters(mongo), time.perf_counter() - started
+        open_streams = stats.streams_open
+
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    mongo.close()
+
+    print(f"mode={args.mode} dashboards={args.dashboards} window={elapsed:.0f}s "
+          f"http_requests={stats.requests} errors={stats.errors} events={stats.events} open_streams={open_streams}")
+    total = 0
+    for name in OPCOUNTERS:
+        delta = after[name] - before[name]
+        total += delta
+        print(f"  {name:<8} {delta:>8} ops {delta / elapsed:>8.2f}/s")
+    print(f"  {'total':<8} {total:>8} ops {total / elapsed:>8.2f}/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["poll", "push"], required=True)
+    parser.add_argument("--dashboards", type=int, default=500, help="Simulated open dashboards")
+    parser.add_argument("--duration", type=int, default=300, help="Measurement window in seconds")
+    parser.add_argument("--warmup", type=int, default=30, help="Seconds to wait before measuring")
+    parser.add_argument("--interval", type=float, default=60, help="Poll interval of the polling client in seconds")
+    parser.add_argument("--user-type", choices=["admin", "client"], default="admin")
+    parser.add_argument("--token", required=True, help="JWT of the admin or client the dashboards log in as")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    asyncio.run(run(parser.parse_args()))
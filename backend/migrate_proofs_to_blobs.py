@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Payment Proof Blob Migration
+Moves payment proof binaries out of payment_proofs documents into
+content-addressed blob storage and strips file_data from the documents.
+
+Sources, in order: base64 file_data, the legacy filesystem path, and (with
+--include-gcs) the per-upload GCS object. Each document ends up with
+storage_type "blob" and a sha256 reference; identical files are stored once.
+
+Usage:
+    python migrate_proofs_to_blobs.py [--dry-run] [--include-gcs]
+
+MongoDB does not return the freed space to the OS by itself; run
+`compact` on payment_proofs afterwards to shrink the collection on disk.
+"""
+import argparse
+import asyncio
+import base64
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+from blob_storage import get_blob_store
+from object_storage import run_storage_io
+
+logger = logging.getLogger(__name__)
+
+# Documents are large until migrated; keep cursor batches small
+MIGRATION_BATCH_SIZE = 20
+
+
+def _read_legacy_file(proof: Dict) -> Optional[bytes]:
+    for key in ("file_path", "original_file_path"):
+        file_path = proof.get(key)
+        if not file_path:
+            continue
+        path = Path(file_path)
+        if not path.is_absolute():
+            path = Path("/app") / file_path
+        if path.exists():
+            return path.read_bytes()
+    return None
+
+
+def _read_proof_content(proof: Dict, include_gcs: bool) -> Tuple[Optional[bytes], Optional[str]]:
+    """Return (content, source) for a proof document, or (None, None) when no copy is left"""
+    if proof.get("file_data"):
+        return base64.b64decode(proof["file_data"]), "database"
+
+    content = _read_legacy_file(proof)
+    if content is not None:
+        return content, "filesystem"
+
+    if include_gcs and proof.get("gcs_path"):
+        from gcs_storage import get_gcs_storage
+        try:
+            return get_gcs_storage().download_file(proof["gcs_path"]), "gcs"
+        except FileNotFoundError:
+            return None, None
+
+    return None, None
+
+
+async def migrate_payment_proofs_to_blobs(db, include_gcs: bool = False, dry_run: bool = False) -> Dict:
+    """
+    Move payment proof content into blob storage
+
+    Args:
+        db: MongoDB database instance
+        include_gcs: Also re-home proofs stored as individual GCS objects
+        dry_run: Only count what would be migrated
+
+    Returns:
+        Dict: migrated / stripped / missing / failed counts
+    """
+    sources = [
+        {"file_data": {"$exists": True}},
+        {"storage_type": {"$exists": False}},
+        {"storage_type": "local"},
+        {"storage_type": "database"}
+    ]
+    if include_gcs:
+        sources.append({"storage_type": "gcs", "gcs_path": {"$nin": [None, ""]}})
+
+    stats = {"migrated": 0, "stripped": 0, "missing": 0, "failed": 0, "bytes": 0}
+    store = get_blob_store()
+    # Tracking documents only point at account proof URLs; they hold no content
+    query = {"$or": sources, "tracking_id": {"$exists": False}}
+    cursor = db.payment_proofs.find(query).batch_size(MIGRATION_BATCH_SIZE)
+
+    async for proof in cursor:
+        proof_id = proof.get("id")
+        try:
+            # Already in blob storage: only the leftover base64 copy has to go
+            if proof.get("sha256") and proof.get("storage_type") == "blob":
+                if not dry_run:
+                    await db.payment_proofs.update_one({"_id": proof["_id"]}, {"$unset": {"file_data": ""}})
+                stats["stripped"] += 1
+                continue
+
+            content, source = await run_storage_io(_read_proof_content, proof, include_gcs)
+            if content is None:
+                logger.warning(f"⚠️ No content left for proof {proof_id}, skipped")
+                stats["missing"] += 1
+                continue
+
+            stats["bytes"] += len(content)
+            if dry_run:
+                stats["migrated"] += 1
+                continue
+
+            digest, _ = await run_storage_io(store.put, content, proof.get("mime_type"))
+            await db.payment_proofs.update_one(
+                {"_id": proof["_id"]},
+                {
+                    "$set": {
+                        "sha256": digest,
+                        "storage_type": "blob",
+                        "file_size": len(content),
+                        "blob_migrated_from": source
+                    },
+                    "$unset": {"file_data": ""}
+                }
+            )
+            stats["migrated"] += 1
+            logger.info(f"✅ Migrated proof {proof_id} from {source} to blob {digest[:12]}")
+
+        except Exception as e:
+            logger.error(f"❌ Failed to migrate proof {proof_id}: {e}")
+            stats["failed"] += 1
+
+    logger.info(
+        f"🎉 Proof blob migration{' (dry run)' if dry_run else ''}: {stats['migrated']} migrated, "
+        f"{stats['stripped']} stripped, {stats['missing']} missing, {stats['failed']} failed, "
+        f"{stats['bytes'] / 1024 / 1024:.1f} MB"
+    )
+    return stats
+
+
+async def main(include_gcs: bool, dry_run: bool):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.environ.get("DB_NAME", "test_database")]
+    try:
+        await migrate_payment_proofs_to_blobs(db, include_gcs=include_gcs, dry_run=dry_run)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv(Path(__file__).parent / ".env")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Count documents without changing anything")
+    parser.add_argument("--include-gcs", action="store_true", help="Also move per-upload GCS objects into blob storage")
+    args = parser.parse_args()
+    asyncio.run(main(args.include_gcs, args.dry_run))
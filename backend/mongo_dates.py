@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Mongo Dates
+Timestamps are stored as BSON dates (UTC). Older documents carry some of them
+as ISO strings ("...Z", "...+00:00", "...+00:00Z" or naive); the migration below
+rewrites those in place, in batches, so date range queries can use a single
+typed bound and the indexes on created_at / processed_at.
+
+Writers go through to_mongo() (prepare_for_mongo in server.py). Readers get
+timezone-aware UTC datetimes from the Motor client (tz_aware=True); code that
+computes with a timestamp still wraps it in as_datetime(), which also accepts
+the legacy strings until the migration has run everywhere.
+
+The server runs the migration on startup until it has completed once
+(ensure_timestamps_migrated); the script below re-runs it by hand.
+
+Usage:
+    python mongo_dates.py [--dry-run] [--collection topup_requests] [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import os
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from pymongo import UpdateOne
+import logging
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_BATCH_SIZE = 1000
+# Completed one-off migrations, by name
+MIGRATIONS_COLLECTION = "data_migrations"
+TIMESTAMP_MIGRATION = "timestamps_to_dates"
+
+TIMESTAMP_FIELDS = (
+    "created_at", "updated_at", "processed_at", "verified_at", "claimed_at",
+    "approved_at", "rejected_at", "uploaded_at", "proof_uploaded_at",
+    "edit_requested_at", "last_edited_at",
+)
+
+# Collections written through prepare_for_mongo / the request endpoints.
+# Landing pages, orders and ad copies keep their string timestamps (their
+# response models declare them as str).
+TIMESTAMP_COLLECTIONS = (
+    "users", "admin_users", "ad_accounts", "ad_account_requests", "groups", "account_groups",
+    "transactions", "topup_requests", "wallet_topup_requests", "wallet_transfers",
+    "withdraw_requests", "transfer_requests", "share_requests", "wallet_deduction_requests",
+    "admin_actions", "admin_actions_history", "payment_proofs", "wallet_payment_proofs",
+    "notifications", "client_notifications", "currency_exchanges", "wallet_statements",
+)
+
+# Sorts before every real timestamp (e.g. for documents missing one)
+MIN_DATETIME = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def as_datetime(value: Any) -> Optional[datetime]:
+    """
+    Timezone-aware UTC datetime of a stored timestamp
+
+    Args:
+        value: BSON date (datetime), legacy ISO string or None
+
+    Returns:
+        datetime: UTC datetime, or None when missing or unparseable
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        # "+00:00Z" was written by an older prepare_for_mongo
+        if text.endswith("Z"):
+            text = text[:-1]
+            if not (len(text) > 6 and text[-6] in "+-" and text[-3] == ":"):
+                text += "+00:00"
+        try:
+            value = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def to_mongo(data: Any) -> Any:
+    """
+    Normalize a document before writing it: every datetime (nested ones
+    included) becomes a timezone-aware UTC datetime, stored as a BSON date
+
+    Args:
+        data: Document, list or value (modified in place where mutable)
+
+    Returns:
+        The same document
+    """
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, datetime):
+                data[key] = as_datetime(value)
+            elif isinstance(value, (dict, list)):
+                to_mongo(value)
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            if isinstance(value, datetime):
+                data[index] = as_datetime(value)
+            elif isinstance(value, (dict, list)):
+                to_mongo(value)
+    return data
+
+
+async def migrate_collection(db, name: str, fields: Iterable[str] = TIMESTAMP_FIELDS,
+                             batch_size: int = MIGRATION_BATCH_SIZE, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Rewrite string timestamps of one collection as BSON dates
+
+    Args:
+        db: Database
+        name: Collection name
+        fields: Timestamp fields to convert
+        batch_size: Documents per bulk write
+        dry_run: Count only
+
+    Returns:
+        dict: Documents scanned and updated, values left unparseable
+    """
+    fields = list(fields)
+    collection = db[name]
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {field: 1 for field in fields}
+    stats = {"scanned": 0, "updated": 0, "unparseable": 0}
+
+    batch = []
+    async for doc in collection.find(query, projection).batch_size(batch_size):
+        stats["scanned"] += 1
+        converted = {}
+        for field in fields:
+            value = doc.get(field)
+            if not isinstance(value, str):
+                continue
+            parsed = as_datetime(value) if value else None
+            if parsed is None:
+                stats["unparseable"] += 1
+                logger.warning(f"⚠️ {name} {doc['_id']}: cannot parse {field}={value!r}, left as is")
+                continue
+            converted[field] = parsed
+        if not converted:
+            continue
+        stats["updated"] += 1
+        if not dry_run:
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": converted}))
+        if len(batch) >= batch_size:
+            await collection.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+
+    return stats
+
+
+async def migrate_timestamps(db, collections: Optional[Iterable[str]] = None,
+                             batch_size: int = MIGRATION_BATCH_SIZE, dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+    """
+    Rewrite string timestamps as BSON dates in every timestamp collection
+
+    Safe to re-run: documents already migrated do not match the scan.
+
+    Args:
+        db: Database
+        collections: Limit to these collections (default TIMESTAMP_COLLECTIONS)
+        batch_size: Documents per bulk write
+        dry_run: Count only
+
+    Returns:
+        dict: Per collection stats from migrate_collection
+    """
+    report = {}
+    for name in collections or TIMESTAMP_COLLECTIONS:
+        stats = await migrate_collection(db, name, batch_size=batch_size, dry_run=dry_run)
+        if stats["scanned"]:
+            report[name] = stats
+            logger.info(f"✅ {name}: {stats['updated']}/{stats['scanned']} documents "
+                        f"{'to migrate' if dry_run else 'migrated'}, {stats['unparseable']} unparseable values")
+    return report
+
+
+async def ensure_timestamps_migrated(db):
+    """
+    Run the migration once per database, recorded in MIGRATIONS_COLLECTION
+
+    Called on startup: date-filtered queries only use typed bounds, so string
+    timestamps would otherwise drop out of them until the script is run by hand.
+    Writers only store BSON dates, so once done the scan is not repeated.
+    """
+    if await db[MIGRATIONS_COLLECTION].find_one({"name": TIMESTAMP_MIGRATION}):
+        return
+    logger.info("🔄 Migrating string timestamps to BSON dates...")
+    report = await migrate_timestamps(db)
+    await db[MIGRATIONS_COLLECTION].update_one(
+        {"name": TIMESTAMP_MIGRATION},
+        {"$set": {
+            "completed_at": datetime.now(timezone.utc),
+            "updated": sum(stats["updated"] for stats in report.values()),
+            "unparseable": sum(stats["unparseable"] for stats in report.values()),
+        }},
+        upsert=True
+    )
+    logger.info("✅ Timestamp migration completed")
+
+
+async def main(collections, batch_size: int, dry_run: bool):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), tz_aware=True)
+    db = client[os.environ.get("DB_NAME", "test_database")]
+    try:
+        report = await migrate_timestamps(db, collections, batch_size=batch_size, dry_run=dry_run)
+        if not report:
+            print("No string timestamps left")
+        for name, stats in report.items():
+            print(f"{name:<28} scanned={stats['scanned']} updated={stats['updated']} unparseable={stats['unparseable']}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv(Path(__file__).parent / ".env")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", action="append", choices=TIMESTAMP_COLLECTIONS,
+                        help="Only migrate this collection (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE, help="Documents per bulk write")
+    parser.add_argument("--dry-run", action="store_true", help="Count documents without updating them")
+    args = parser.parse_args()
+    asyncio.run(main(args.collection, args.batch_size, args.dry_run))
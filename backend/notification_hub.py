@@ -0,0 +1,167 @@
+"""
+Notification Hub Module
+Pushes new notifications and unread counts to connected dashboards over
+Server-Sent Events, and keeps per-audience unread counters up to date
+incrementally (notification_counters) so nobody counts documents per request.
+
+Fan-out is in-process: with several API workers each worker pushes what it
+created itself, and the dashboards' slow fallback poll picks up the rest.
+"""
+import os
+import json
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Iterable, Set
+from pymongo import ReturnDocument, ReplaceOne
+import logging
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_COLLECTION = "notification_counters"
+
+# Admin notifications are shared by all admins; client ones are per user
+ADMIN_AUDIENCE = "admin"
+
+# Comment line sent on idle streams so proxies keep the connection open
+NOTIFICATION_HEARTBEAT_SECONDS = int(os.getenv("NOTIFICATION_HEARTBEAT_SECONDS", 25))
+# Events buffered per connection; a subscriber that falls further behind is dropped
+NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", 100))
+# Reconnect delay suggested to EventSource clients
+NOTIFICATION_RETRY_MS = int(os.getenv("NOTIFICATION_RETRY_MS", 5000))
+
+
+def client_audience(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def format_sse(event: str, data) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class Subscription:
+    """One connected dashboard"""
+
+    def __init__(self, audience: str, queue_size: int):
+        self.audience = audience
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+
+class NotificationHub:
+    """In-process pub/sub of notification events plus the unread counters"""
+
+    def __init__(self, queue_size: int = NOTIFICATION_QUEUE_SIZE):
+        self.db = None
+        self.queue_size = queue_size
+        self.subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def configure(self, db):
+        self.db = db
+
+    @property
+    def counters(self):
+        return self.db[COUNTERS_COLLECTION]
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(subs) for subs in self.subscribers.values())
+
+    # Unread counters
+
+    async def unread_count(self, audience: str) -> int:
+        doc = await self.counters.find_one({"_id": audience})
+        return max(0, doc.get("unread", 0)) if doc else 0
+
+    async def adjust_unread(self, audience: str, amount: int, notify: bool = True) -> int:
+        """Add amount (may be negative) to an audience's counter; notify pushes the new value"""
+        doc = await self.counters.find_one_and_update(
+            {"_id": audience},
+            {"$inc": {"unread": amount}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        unread = max(0, doc.get("unread", 0))
+        if notify:
+            self.publish(audience, "unread", {"count": unread})
+        return unread
+
+    async def rebuild_counters(self) -> int:
+        """
+        Recount every audience's unread notifications from scratch
+
+        Returns:
+            int: Number of counters written
+        """
+        counts = {ADMIN_AUDIENCE: await self.db.notifications.count_documents({"is_read": False})}
+
+        pipeline = [
+            {"$match": {"is_read": False}},
+            {"$group": {"_id": "$user_id", "unread": {"$sum": 1}}}
+        ]
+        async for row in self.db.client_notifications.aggregate(pipeline):
+            if row["_id"]:
+                counts[client_audience(row["_id"])] = row["unread"]
+
+        await self.counters.bulk_write(
+            [ReplaceOne({"_id": audience}, {"unread": unread}, upsert=True) for audience, unread in counts.items()],
+            ordered=False
+        )
+        await self.counters.delete_many({"_id": {"$nin": list(counts)}})
+        logger.info(f"✅ Rebuilt {len(counts)} notification counters")
+        return len(counts)
+
+    async def delete_counters(self, audiences: Iterable[str]):
+        await self.counters.delete_many({"_id": {"$in": list(audiences)}})
+
+    # Fan-out
+
+    def subscribe(self, audience: str) -> Subscription:
+        subscription = Subscription(audience, self.queue_size)
+        self.subscribers[audience].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subs = self.subscribers.get(subscription.audience)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del self.subscribers[subscription.audience]
+
+    def publish(self, audience: str, event: str, data: dict):
+        """Queue an event for every dashboard of the audience (never blocks)"""
+        for subscription in list(self.subscribers.get(audience, ())):
+            try:
+                subscription.queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # Too slow to keep up: close it, the client reconnects and refetches
+                subscription.dropped = True
+                self.unsubscribe(subscription)
+                logger.warning(f"⚠️ Dropped slow notification stream for {audience}")
+
+    async def stream(self, request, audience: str) -> AsyncIterator[str]:
+        """
+        Server-Sent Events body for one dashboard
+
+        Starts with the current unread count, then relays "notification" and
+        "unread" events until the client disconnects.
+        """
+        subscription = self.subscribe(audience)
+        try:
+            yield f"retry: {NOTIFICATION_RETRY_MS}\n\n"
+            yield format_sse("unread", {"count": await self.unread_count(audience)})
+            while not subscription.dropped:
+                try:
+                    event, data = await asyncio.wait_for(subscription.queue.get(), timeout=NOTIFICATION_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event, data)
+        finally:
+            self.unsubscribe(subscription)
+
+
+# Global instance
+notification_hub = NotificationHub()
@@ -0,0 +1,230 @@
+"""
+Object Storage Module
+Process-wide async facade over GCSStorage. Blocking google-cloud-storage calls
+run on a bounded thread pool sized to match the pooled HTTP connections, so a
+large upload never stalls the event loop and connections are reused between
+requests. LocalObjectStorage offers the same interface on the filesystem for
+local development and tests.
+"""
+import os
+import io
+import asyncio
+import functools
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Threads doing blocking storage I/O (also the GCS HTTP connection pool size)
+STORAGE_IO_THREADS = int(os.getenv("STORAGE_IO_THREADS", 8))
+OBJECT_STORAGE_DIR = os.getenv("OBJECT_STORAGE_DIR", "/app/uploads")
+
+
+class ObjectStorage:
+    """Async object storage interface; subclasses implement the blocking primitives"""
+
+    backend = "base"
+
+    def __init__(self, max_workers: int = STORAGE_IO_THREADS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage-io")
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking call on the storage thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def upload(
+        self,
+        data: bytes,
+        path: str,
+        content_type: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> str:
+        """
+        Store bytes under a path
+
+        Args:
+            data: File content
+            path: Object path (e.g. "balance_proofs/abc.jpg")
+            content_type: MIME type of file
+            metadata: Optional metadata dict
+
+        Returns:
+            str: Object path
+        """
+        return await self.run(self._upload, data, path, content_type, metadata)
+
+    async def upload_file(
+        self,
+        local_path: str,
+        path: str,
+        content_type: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> str:
+        """Store a local file under a path without reading it into memory"""
+        return await self.run(self._upload_file, local_path, path, content_type, metadata)
+
+    async def download(self, path: str) -> bytes:
+        """Return the content of an object (raises FileNotFoundError)"""
+        return await self.run(self._download, path)
+
+    async def exists(self, path: str) -> bool:
+        return await self.run(self._exists, path)
+
+    async def delete(self, path: str) -> bool:
+        return await self.run(self._delete, path)
+
+    async def signed_url(self, path: str, expiration_minutes: int = 60) -> Optional[str]:
+        """Short-lived direct download URL, or None when the backend has none"""
+        return await self.run(self._signed_url, path, expiration_minutes)
+
+    def public_url(self, path: str) -> str:
+        raise NotImplementedError
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    def _upload(self, data: bytes, path: str, content_type: Optional[str], metadata: Optional[dict]) -> str:
+        raise NotImplementedError
+
+    def _upload_file(self, local_path: str, path: str, content_type: Optional[str], metadata: Optional[dict]) -> str:
+        raise NotImplementedError
+
+    def _download(self, path: str) -> bytes:
+        raise NotImplementedError
+
+    def _exists(self, path: str) -> bool:
+        raise NotImplementedError
+
+    def _delete(self, path: str) -> bool:
+        raise NotImplementedError
+
+    def _signed_url(self, path: str, expiration_minutes: int) -> Optional[str]:
+        return None
+
+
+class GCSObjectStorage(ObjectStorage):
+    """Objects in the configured GCS bucket, through the shared GCSStorage client"""
+
+    backend = "gcs"
+
+    def __init__(self, gcs_storage=None, max_workers: int = STORAGE_IO_THREADS):
+        super().__init__(max_workers)
+        if gcs_storage is None:
+            from gcs_storage import get_gcs_storage
+            gcs_storage = get_gcs_storage()
+        self.gcs = gcs_storage
+
+    @property
+    def bucket_name(self) -> str:
+        return self.gcs.bucket_name
+
+    def public_url(self, path: str) -> str:
+        return f"https://storage.googleapis.com/{self.gcs.bucket_name}/{path}"
+
+    def _upload(self, data, path, content_type, metadata):
+        return self.gcs.upload_file(io.BytesIO(data), path, content_type=content_type, metadata=metadata)
+
+    def _upload_file(self, local_path, path, content_type, metadata):
+        return self.gcs.upload_file_resumable(local_path, path, content_type=content_type, metadata=metadata)
+
+    def _download(self, path):
+        return self.gcs.download_file(path)
+
+    def _exists(self, path):
+        return self.gcs.file_exists(path)
+
+    def _delete(self, path):
+        return self.gcs.delete_file(path)
+
+    def _signed_url(self, path, expiration_minutes):
+        return self.gcs.get_signed_url(path, expiration_minutes)
+
+
+class LocalObjectStorage(ObjectStorage):
+    """Objects as files under a root directory (served by the /uploads static mount)"""
+
+    backend = "local"
+
+    def __init__(self, root: str = OBJECT_STORAGE_DIR, max_workers: int = STORAGE_IO_THREADS):
+        super().__init__(max_workers)
+        self.root = Path(root)
+        self.bucket_name = "local"
+
+    def path(self, path: str) -> Path:
+        resolved = (self.root / path).resolve()
+        if not resolved.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Path escapes storage root: {path}")
+        return resolved
+
+    def public_url(self, path: str) -> str:
+        return f"/uploads/{path}"
+
+    def _write(self, path: str, write):
+        target = self.path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def _upload(self, data, path, content_type, metadata):
+        return self._write(path, lambda f: f.write(data))
+
+    def _upload_file(self, local_path, path, content_type, metadata):
+        def copy(f):
+            with open(local_path, "rb") as source:
+                shutil.copyfileobj(source, f)
+        return self._write(path, copy)
+
+    def _download(self, path):
+        try:
+            return self.path(path).read_bytes()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {path}")
+
+    def _exists(self, path):
+        return self.path(path).is_file()
+
+    def _delete(self, path):
+        try:
+            self.path(path).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+
+# Global instance
+_object_storage_instance = None
+
+def get_object_storage() -> ObjectStorage:
+    """
+    Get or create the process-wide object storage
+
+    OBJECT_STORAGE_BACKEND selects "gcs" or "local"; by default GCS is used when
+    a bucket is configured.
+    """
+    global _object_storage_instance
+    if _object_storage_instance is None:
+        backend = os.environ.get("OBJECT_STORAGE_BACKEND")
+        if backend is None:
+            backend = "gcs" if os.environ.get("GCS_BUCKET_NAME") else "local"
+        _object_storage_instance = GCSObjectStorage() if backend == "gcs" else LocalObjectStorage()
+        logger.info(f"Object storage backend: {_object_storage_instance.backend} ({STORAGE_IO_THREADS} I/O threads)")
+    return _object_storage_instance
+
+
+async def run_storage_io(func, *args, **kwargs):
+    """Run a blocking storage call on the shared storage thread pool"""
+    return await get_object_storage().run(func, *args, **kwargs)
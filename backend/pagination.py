@@ -0,0 +1,191 @@
+"""
+Admin Queue Pagination Module
+Keyset pagination on (created_at, id) with opaque cursors and the shared
+server-side filters used by the admin queue endpoints
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException, Query, Response
+
+# Matches the previous hard to_list(1000) cap so existing clients see the same first page
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 1000
+
+PAGE_SORT = [("created_at", -1), ("id", -1)]
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+PAGE_HEADERS = [NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER]
+
+JAKARTA_TZ = ZoneInfo("Asia/Jakarta")
+
+
+@dataclass
+class QueuePageParams:
+    """Pagination and filter parameters shared by the admin queue endpoints"""
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+    include_total: bool = False
+    currency: Optional[str] = None
+    user_id: Optional[str] = None
+    start_date: Optional[str] = None  # YYYY-MM-DD (Asia/Jakarta) or ISO timestamp
+    end_date: Optional[str] = None  # YYYY-MM-DD (Asia/Jakarta) or ISO timestamp
+
+
+def queue_page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    currency: Optional[str] = None,
+    user_id: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> QueuePageParams:
+    """FastAPI dependency collecting queue pagination/filter query parameters"""
+    return QueuePageParams(
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        currency=currency,
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+def encode_cursor(doc: dict) -> str:
+    """Build an opaque cursor pointing just past the given document"""
+    created_at = doc.get("created_at")
+    if isinstance(created_at, datetime):
+        payload = {"t": "date", "c": created_at.isoformat()}
+    elif created_at is None:
+        payload = {"t": "null", "c": None}
+    else:
+        payload = {"t": "str", "c": created_at}
+    payload["id"] = doc.get("id")
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["t"] == "date":
+            payload["c"] = datetime.fromisoformat(payload["c"])
+        elif payload["t"] not in ("str", "null"):
+            raise ValueError(f"Unknown cursor type: {payload['t']}")
+        return payload
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def keyset_condition(cursor: str) -> dict:
+    """
+    Match documents sorting after the cursor under PAGE_SORT
+
+    created_at is a BSON date, but documents not yet migrated by mongo_dates.py
+    may still hold an ISO string, and range operators only compare values of
+    the same BSON type. Descending BSON order is date > string > null, so later
+    types are appended explicitly.
+    """
+    payload = decode_cursor(cursor)
+    created_at, last_id, kind = payload["c"], payload["id"], payload["t"]
+
+    conditions = [{"created_at": created_at, "id": {"$lt": last_id}}]
+    if kind != "null":
+        conditions.append({"created_at": {"$lt": created_at}})
+        conditions.append({"created_at": None})
+    if kind == "date":
+        conditions.append({"created_at": {"$type": "string"}})
+    return {"$or": conditions}
+
+
+def _parse_bound(value: str, field: str, end_of_day: bool) -> datetime:
+    """Parse a YYYY-MM-DD day (Asia/Jakarta) or an exact ISO timestamp into UTC"""
+    try:
+        day = datetime.fromisoformat(value.replace(' ', '+').replace('Z', '+00:00'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {field} format. Use YYYY-MM-DD or ISO 8601")
+    if 'T' in value:
+        # Exact instant sent by the admin date range picker
+        if day.tzinfo is None:
+            day = day.replace(tzinfo=timezone.utc)
+        return day.astimezone(timezone.utc)
+    if end_of_day:
+        day = day.replace(hour=23, minute=59, second=59, microsecond=999999)
+    else:
+        day = day.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day.replace(tzinfo=JAKARTA_TZ).astimezone(timezone.utc)
+
+
+def apply_queue_filters(query: dict, params: QueuePageParams, user_field: str = "user_id") -> dict:
+    """Add the shared currency/user/date-range filters to an endpoint's base query"""
+    query = dict(query)
+    if params.currency:
+        query["currency"] = params.currency.upper()
+    if params.user_id:
+        query[user_field] = params.user_id
+
+    date_filter = {}
+    if params.start_date:
+        date_filter["$gte"] = _parse_bound(params.start_date, "start_date", end_of_day=False)
+    if params.end_date:
+        date_filter["$lte"] = _parse_bound(params.end_date, "end_date", end_of_day=True)
+    if date_filter:
+        # created_at is a BSON date (mongo_dates.py), so one typed range uses the index
+        query["created_at"] = date_filter
+    return query
+
+
+async def fetch_queue_page(
+    collection,
+    query: dict,
+    params: QueuePageParams,
+    response: Optional[Response] = None,
+    pipeline_tail: Optional[List[dict]] = None,
+) -> List[dict]:
+    """
+    Fetch one keyset page of a queue collection, newest first
+
+    Args:
+        collection: Motor collection holding the queue
+        query: Filter query (already including apply_queue_filters)
+        params: Page parameters
+        response: When given, receives X-Next-Cursor / X-Total-Count headers
+        pipeline_tail: Optional aggregation stages (e.g. $lookup) run on the page only
+
+    Returns:
+        list: At most params.limit documents
+    """
+    page_query = dict(query)
+    if params.cursor:
+        page_query = {"$and": [query, keyset_condition(params.cursor)]}
+
+    if pipeline_tail is not None:
+        pipeline = [
+            {"$match": page_query},
+            {"$sort": dict(PAGE_SORT)},
+            {"$limit": params.limit + 1},
+            *pipeline_tail,
+        ]
+        docs = await collection.aggregate(pipeline).to_list(length=None)
+    else:
+        docs = await collection.find(page_query).sort(PAGE_SORT).limit(params.limit + 1).to_list(length=None)
+
+    has_more = len(docs) > params.limit
+    docs = docs[:params.limit]
+
+    if response is not None:
+        if has_more and docs:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(docs[-1])
+        if params.include_total:
+            response.headers[TOTAL_COUNT_HEADER] = str(await collection.count_documents(query))
+
+    return docs
@@ -0,0 +1,104 @@
+"""
+Principal Cache Module
+Short-lived, size-bounded cache of authenticated users and admins, so the auth
+dependencies do not read users / admin_users on every request.
+
+Entries are keyed by (kind, JWT subject, token version). A token whose version
+no longer matches the account's token_version is rejected, which is how a
+password reset signs out existing sessions. Profile, status and password
+changes invalidate the account's entries in this process; other API workers
+pick the change up within PRINCIPAL_CACHE_TTL_SECONDS.
+
+Wallet balances are deliberately not part of the principal: they change all
+the time and must be read from users where they are needed.
+"""
+import os
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from cachetools import TTLCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+
+KIND_USER = "user"
+KIND_ADMIN = "admin"
+
+WALLET_FIELDS = (
+    "wallet_balance_idr", "wallet_balance_usd",
+    "main_wallet_idr", "main_wallet_usd",
+    "withdrawal_wallet_idr", "withdrawal_wallet_usd",
+)
+
+# Projection of the cached account documents
+PRINCIPAL_PROJECTION = {"_id": 0, **{field: 0 for field in WALLET_FIELDS}}
+
+PrincipalKey = Tuple[str, str, int]
+
+
+class PrincipalCache:
+    """TTL cache of account documents by (kind, subject, token version)"""
+
+    def __init__(self, ttl: int = PRINCIPAL_CACHE_TTL_SECONDS, maxsize: int = PRINCIPAL_CACHE_SIZE):
+        self.entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.inflight: Dict[PrincipalKey, asyncio.Future] = {}
+        # Bumped on invalidation so a load that raced a change is not stored
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: PrincipalKey, load: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        """
+        Cached account document for key, loading it on a miss
+
+        Args:
+            key: (kind, subject, token version)
+            load: Coroutine function reading the account (None when missing)
+
+        Returns:
+            dict: Account document (shared, do not modify), or None
+        """
+        account = self.entries.get(key)
+        if account is not None:
+            self.hits += 1
+            return account
+
+        self.misses += 1
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, load, self.generation))
+            self.inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: PrincipalKey, load, generation: int) -> Optional[dict]:
+        try:
+            account = await load()
+        finally:
+            if self.inflight.get(key) is asyncio.current_task():
+                del self.inflight[key]
+        # Missing accounts are not cached, so a new sign-up works immediately
+        if account is not None and generation == self.generation:
+            self.entries[key] = account
+        return account
+
+    def invalidate(self, kind: str, account_id: Optional[str] = None, subject: Optional[str] = None):
+        """Drop the cached entries of one account (by id or JWT subject)"""
+        self.generation += 1
+        for key, account in list(self.entries.items()):
+            if key[0] != kind:
+                continue
+            if (account_id and account.get("id") == account_id) or (subject and key[1] == subject):
+                self.entries.pop(key, None)
+        self.inflight.clear()
+        logger.debug(f"Principal cache invalidated: {kind} id={account_id} subject={subject}")
+
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+        self.inflight.clear()
+
+
+# Global instance
+principal_cache = PrincipalCache()
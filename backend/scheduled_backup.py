@@ -1,15 +1,17 @@
 """
 Scheduled Backup Script
 Run this as a cron job for daily automated backups
+(--incremental for delta backups of the changes since the previous backup)
 """
 
+import argparse
 import asyncio
 import os
 import sys
 from pathlib import Path
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
-from backup_service import create_backup, cleanup_old_backups
+from backup_service import create_backup, create_incremental_backup, cleanup_old_backups
 import logging
 
 # Setup logging
@@ -19,8 +21,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-async def run_scheduled_backup():
-    """Run scheduled backup and cleanup"""
+async def run_scheduled_backup(incremental: bool = False):
+    """Run scheduled backup (full, or a delta since the previous backup) and cleanup"""
     try:
         logger.info("Starting scheduled backup...")
         
@@ -32,9 +34,16 @@ async def run_scheduled_backup():
         db = client[db_name]
         
         # Create backup
-        result = await create_backup(db, backup_type="scheduled")
+        if incremental:
+            result = await create_incremental_backup(db)
+        else:
+            result = await create_backup(db, backup_type="scheduled")
         
-        if result.get("success"):
+        if result.get("throttled"):
+            logger.info(f"⏭️ {result.get('message')}")
+        elif result.get("success") and "filename" not in result:
+            logger.info(f"✅ Delta backup created: {result['backup_id']} ({result['total_changes']} changes)")
+        elif result.get("success"):
             logger.info(f"✅ Scheduled backup created: {result['backup_id']}")
             logger.info(f"   Filename: {result['filename']}")
             logger.info(f"   GCS URL: {result.get('gcs_url')}")
@@ -62,8 +71,12 @@ if __name__ == "__main__":
     ROOT_DIR = Path(__file__).parent
     load_dotenv(ROOT_DIR / '.env')
     
+    parser = argparse.ArgumentParser(description="Run a scheduled database backup")
+    parser.add_argument("--incremental", action="store_true", help="Back up only the changes since the previous backup")
+    args = parser.parse_args()
+    
     # Run backup
-    success = asyncio.run(run_scheduled_backup())
+    success = asyncio.run(run_scheduled_backup(incremental=args.incremental))
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
@@ -1,5 +1,6 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Header
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Header, Query, Request
 from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
@@ -15,7 +16,6 @@ from motor.motor_asyncio import AsyncIOMotorClient
 import logging
 import traceback
 from pydantic import BaseModel, Field
-import httpx
 import asyncio
 from typing import List, Optional, Dict, Any
 import uuid
@@ -24,7 +24,7 @@ from zoneinfo import ZoneInfo
 from decimal import Decimal, ROUND_HALF_UP
 import jwt
 import hashlib
-from io import BytesIO
+from io import BytesIO, StringIO
 import io
 import base64
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -35,15 +35,48 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.colors import Color, black, blue, grey
 from reportlab.lib.units import inch, cm
 from reportlab.lib import colors
-from gcs_storage import get_gcs_storage
+from object_storage import get_object_storage
+from blob_storage import put_blob
+from file_serving import (
+    ACL_ADMIN, ACL_USER, acl_for_path, guess_content_type, open_blob_file, open_gcs_file, open_local_file,
+    serve_file, serve_gcs_path,
+)
+from migrate_proofs_to_blobs import migrate_payment_proofs_to_blobs
+from notification_hub import ADMIN_AUDIENCE, client_audience, format_sse, notification_hub
+from db_indexes import reconcile_indexes
+import ledger
+import wallet_statement
+from exchange_rates import EXCHANGE_RATE_CHECK_SECONDS, RateUnavailable, exchange_rates
+from shipment_sync import BITESHIP_WEBHOOK_HEADER, SHIPMENT_RECONCILE_INTERVAL_MINUTES, shipment_sync, tracking_view, webhook_authorized
+from export_engine import ExportSpec, export_response, iterate, merge_sorted
+from export_jobs import (
+    COMPLETED as EXPORT_COMPLETED, EXPIRED as EXPORT_EXPIRED, JOB_PROJECTION as EXPORT_JOB_PROJECTION,
+    OWNER_ADMIN as EXPORT_OWNER_ADMIN, export_jobs, job_view, table_producer,
+)
+from llm_gateway import JSONSectionParser, LLMBudgetExceeded, LLMError, LLMNotConfigured, LLMResponseError, llm_gateway
+from mongo_dates import MIN_DATETIME, as_datetime, ensure_timestamps_migrated, migrate_timestamps, to_mongo
+from principal_cache import KIND_ADMIN, KIND_USER, PRINCIPAL_PROJECTION, WALLET_FIELDS, principal_cache
+from financial_rollup import (
+    ACCOUNT_TOPUP, WALLET_TOPUP, WALLET_TRANSFER, WITHDRAW, WITHDRAW_GROWTH_STATUSES,
+    ensure_rollups, financial_summary, growth_from_rollups, load_rollups, rebuild_rollups, record_created,
+    record_deleted, record_status_change, report_cache, report_today
+)
+from batch_loader import RequestLoaders
+from pagination import QueuePageParams, queue_page_params, apply_queue_filters, fetch_queue_page, PAGE_HEADERS, MAX_PAGE_SIZE
 from backup_service import (
     create_backup,
     get_backup_history,
     restore_backup,
     create_incremental_backup,
-    cleanup_old_backups
+    cleanup_old_backups,
+    manifest_path_for,
+    resolve_backup_chain,
+    RESTORE_MODE_REPLACE,
+    RESTORE_MODES
 )
 from email_service import (
+    email_outbox,
+    email_renderer,
     send_welcome_client_email, 
     send_welcome_admin_email, 
     send_notification_email,
@@ -78,31 +111,23 @@ async def upload_to_gcs(file: UploadFile, folder: str = "uploads") -> dict:
     Returns dict with gcs_path, gcs_bucket, file_size, mime_type
     """
     try:
-        from google.cloud import storage
-        import os
+        storage = get_object_storage()
         
         # Read file content
         content = await file.read()
         
-        # Initialize GCS client
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/app/backend/gcs-service-account.json"
-        storage_client = storage.Client()
-        bucket_name = os.getenv("GCS_BUCKET_NAME", "rimuru-file-uploads")
-        bucket = storage_client.bucket(bucket_name)
-        
         # Generate unique filename for GCS
         file_extension = Path(file.filename).suffix
         gcs_filename = f"{folder}/{str(uuid.uuid4())[:12]}{file_extension}"
         
-        # Upload to GCS
-        blob = bucket.blob(gcs_filename)
-        blob.upload_from_string(content, content_type=file.content_type)
+        # Upload on the storage thread pool (shared client, pooled connections)
+        await storage.upload(content, gcs_filename, content_type=file.content_type)
         
         logger.info(f"✅ Uploaded to GCS: {gcs_filename}, size={len(content)}")
         
         return {
             "gcs_path": gcs_filename,
-            "gcs_bucket": bucket_name,
+            "gcs_bucket": storage.bucket_name,
             "storage_type": "gcs",
             "file_size": len(content),
             "mime_type": file.content_type,
@@ -112,36 +137,26 @@ async def upload_to_gcs(file: UploadFile, folder: str = "uploads") -> dict:
         logger.error(f"❌ GCS upload failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to upload to cloud storage: {str(e)}")
 
-async def download_from_gcs(gcs_path: str) -> tuple:
+async def store_payment_proof_blob(content: bytes, content_type: Optional[str]) -> str:
     """
-    Download file from Google Cloud Storage
-    Returns tuple of (file_content, mime_type)
+    Store payment proof content in content-addressed blob storage
+    Returns the SHA-256 digest referenced by payment_proofs.sha256
     """
     try:
-        from google.cloud import storage
-        import os
-        
-        # Initialize GCS client
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/app/backend/gcs-service-account.json"
-        storage_client = storage.Client()
-        bucket_name = os.getenv("GCS_BUCKET_NAME", "rimuru-file-uploads")
-        bucket = storage_client.bucket(bucket_name)
-        
-        # Download from GCS
-        blob = bucket.blob(gcs_path)
-        
-        if not blob.exists():
-            raise HTTPException(status_code=404, detail="File not found in cloud storage")
-        
-        content = blob.download_as_bytes()
-        mime_type = blob.content_type or "application/octet-stream"
-        
-        logger.info(f"✅ Downloaded from GCS: {gcs_path}, size={len(content)} bytes")
-        
-        return content, mime_type
+        digest, created = await put_blob(content, content_type)
+        logger.info(f"✅ Stored proof blob {digest[:12]} ({'new' if created else 'deduplicated'}), size={len(content)}")
+        return digest
     except Exception as e:
-        logger.error(f"❌ GCS download failed for {gcs_path}: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to download from cloud storage: {str(e)}")
+        logger.error(f"❌ Blob upload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to upload to cloud storage: {str(e)}")
+
+async def serve_proof_blob(request: Request, proof: dict, headers: dict, acl: str = ACL_ADMIN) -> Response:
+    """Stream the content of a payment proof kept in blob storage"""
+    stored = await open_blob_file(proof["sha256"], proof.get("mime_type"))
+    if stored is None:
+        logger.error(f"❌ Proof blob missing: proof_id={proof.get('id')}, sha256={proof['sha256']}")
+        raise HTTPException(status_code=404, detail="Payment proof file not found")
+    return await serve_file(request, stored, acl, file_name=proof.get("file_name"), headers=headers)
 
 # Notification translations
 NOTIFICATION_TRANSLATIONS = {
@@ -217,9 +232,9 @@ NOTIFICATION_TRANSLATIONS = {
     }
 }
 
-# MongoDB connection
+# MongoDB connection (BSON dates are read back as timezone-aware UTC datetimes)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # Security
@@ -240,6 +255,7 @@ app.add_middleware(
     allow_origins=origins,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=PAGE_HEADERS,
 )
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -294,10 +310,10 @@ async def create_notification(title: str, message: str, notification_type: str,
         "type": notification_type,
         "reference_id": reference_id,
         "is_read": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     try:
-        await db.notifications.insert_one(notification)
+        await insert_admin_notification(notification)
         logger.info(f"Notification created: {title}")
     except Exception as e:
         # Catch duplicate key error (code 11000) from unique index
@@ -307,6 +323,37 @@ async def create_notification(title: str, message: str, notification_type: str,
             # Re-raise other errors
             raise
         
+async def push_notification(audience: str, response_model, notification: dict):
+    """Bump the audience's unread counter and push the notification to its open streams"""
+    try:
+        unread = await notification_hub.adjust_unread(audience, 1, notify=False)
+    except Exception as e:
+        logger.error(f"❌ Unread counter update failed for {audience}: {e}")
+        return
+    
+    parsed = parse_from_mongo(dict(notification))
+    if isinstance(parsed.get("created_at"), str):
+        parsed["created_at"] = as_datetime(parsed["created_at"])
+    try:
+        payload = jsonable_encoder(response_model(**parsed))
+    except Exception as e:
+        logger.warning(f"⚠️ Notification {notification.get('id')} not pushed: {e}")
+        notification_hub.publish(audience, "unread", {"count": unread})
+        return
+    notification_hub.publish(audience, "notification", {"notification": payload, "unread_count": unread})
+
+async def insert_admin_notification(notification: dict):
+    """Insert an admin notification, keeping the shared unread counter and admin streams current"""
+    await db.notifications.insert_one(notification)
+    if notification.get("is_read") is False:
+        await push_notification(ADMIN_AUDIENCE, NotificationResponse, notification)
+
+async def insert_client_notification(notification: dict):
+    """Insert a client notification, keeping the user's unread counter and streams current"""
+    await db.client_notifications.insert_one(notification)
+    if notification.get("is_read") is False:
+        await push_notification(client_audience(notification["user_id"]), ClientNotificationResponse, notification)
+
 async def create_localized_notification(title_key: str, message_key: str, notification_type: str, 
                                        lang: str = 'id', reference_id: str = None, **kwargs):
     """Create localized admin notification with idempotency check"""
@@ -353,23 +400,32 @@ async def startup_event():
             await db.admin_users.insert_one(prepare_for_mongo(default_admin))
             logger.info("Default admin user created: username=admin, password=admin123")
         
-        # Create database indexes for optimized queries
-        logger.info("Creating database indexes...")
+        # Create any missing index from the registry (db_indexes.py)
         try:
-            # Index for ad_account_requests lookups by user_id
-            await db.ad_account_requests.create_index([("user_id", 1)])
-            # Index for transactions lookups by user_id, type, and status
-            await db.transactions.create_index([("user_id", 1), ("type", 1), ("status", 1)])
-            # Index for admin_users lookups by id
-            await db.admin_users.create_index([("id", 1)])
-            # Index for users by created_at for sorting
-            await db.users.create_index([("created_at", -1)])
-            logger.info("Database indexes created successfully")
+            await reconcile_indexes(db)
         except Exception as idx_error:
             logger.warning(f"Index creation warning: {idx_error}")
         
         logger.info("Database initialization completed")
         
+        # Compile email templates once, then start the outbound email worker (send_* helpers only enqueue)
+        email_renderer.precompile()
+        email_outbox.configure(db)
+        await email_outbox.start()
+        
+        # Seed the incremental unread counters used by the notification streams
+        notification_hub.configure(db)
+        await notification_hub.rebuild_counters()
+        
+        # Convert legacy string timestamps before anything filters by date (once per database)
+        try:
+            await ensure_timestamps_migrated(db)
+        except Exception as e:
+            logger.error(f"❌ Timestamp migration error (re-run mongo_dates.py): {e}")
+        
+        # Backfill the financial report rollups on first start
+        await ensure_rollups(db)
+        
         # Auto-migrate payment proofs on startup
         logger.info("🔄 Running auto-migration for payment proofs...")
         await auto_migrate_payment_proofs()
@@ -394,6 +450,39 @@ async def startup_event():
             replace_existing=True
         )
         
+        # Exchange rates: last known good table from MongoDB, refreshed in the background
+        exchange_rates.configure(db)
+        await exchange_rates.start()
+        scheduler.add_job(
+            exchange_rates.refresh_if_due,
+            IntervalTrigger(seconds=EXCHANGE_RATE_CHECK_SECONDS),
+            id='exchange_rates_refresh',
+            name='Refresh exchange rate table',
+            replace_existing=True
+        )
+        
+        # Background exports run on the scheduler's loop; the sweep expires old artifacts
+        export_jobs.configure(db, scheduler)
+        scheduler.add_job(
+            export_jobs.sweep,
+            IntervalTrigger(minutes=5),
+            id='export_jobs_sweep',
+            name='Expire export artifacts and re-queue abandoned export jobs',
+            replace_existing=True
+        )
+        await export_jobs.resume()
+        
+        # Shipment status arrives by webhook; the reconciler reads quiet shipments from BitShip
+        shipment_sync.configure(db)
+        await shipment_sync.backfill()
+        scheduler.add_job(
+            shipment_sync.reconcile,
+            IntervalTrigger(minutes=SHIPMENT_RECONCILE_INTERVAL_MINUTES),
+            id='shipment_reconcile',
+            name='Reconcile shipment status with BitShip',
+            replace_existing=True
+        )
+        
         scheduler.start()
         logger.info("✅ Scheduler started successfully - auto-cancel will run every 1 hour")
         
@@ -403,109 +492,42 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Shutdown scheduler on application shutdown"""
-    try:
+    """Shutdown scheduler and background workers on application shutdown"""
+    # Each step on its own, so one failure does not leave the others running
+    async def stop_scheduler():
         scheduler.shutdown()
         logger.info("✅ Scheduler shutdown successfully")
-    except Exception as e:
-        logger.error(f"Shutdown failed: {e}")
+
+    async def close_object_storage():
+        get_object_storage().close()
+
+    for name, stop in (
+        ("scheduler", stop_scheduler),
+        ("email outbox", email_outbox.stop),
+        ("exchange rates", exchange_rates.stop),
+        ("object storage", close_object_storage),
+    ):
+        try:
+            await stop()
+        except Exception as e:
+            logger.error(f"Shutdown of {name} failed: {e}")
 
 async def auto_migrate_payment_proofs():
-    """Auto-migrate filesystem payment proofs to database storage"""
+    """Auto-migrate filesystem and base64 payment proofs to blob storage (see migrate_proofs_to_blobs.py)"""
     try:
-        # Find proofs that need migration
-        old_proofs = await db.payment_proofs.find({
-            "$or": [
-                {"storage_type": {"$exists": False}},
-                {"storage_type": "local"}
-            ]
-        }).to_list(None)
-        
-        if len(old_proofs) == 0:
-            logger.info("✅ No proofs need migration - all already in database")
-            return
-        
-        logger.info(f"📦 Found {len(old_proofs)} proofs to migrate to database")
-        
-        migrated = 0
-        failed = 0
-        
-        for proof in old_proofs:
-            proof_id = proof.get("id")
-            file_path = proof.get("file_path")
-            
-            if not file_path:
-                failed += 1
-                continue
-            
-            file_path_obj = Path(file_path)
-            if not file_path_obj.is_absolute():
-                file_path_obj = Path("/app") / file_path
-            
-            if not file_path_obj.exists():
-                logger.warning(f"⚠️  Migration skipped - file not found: {file_path}")
-                failed += 1
-                continue
-            
-            try:
-                with open(file_path_obj, 'rb') as f:
-                    file_content = f.read()
-                
-                file_base64 = base64.b64encode(file_content).decode('utf-8')
-                
-                await db.payment_proofs.update_one(
-                    {"id": proof_id},
-                    {
-                        "$set": {
-                            "file_data": file_base64,
-                            "storage_type": "database",
-                            "migrated_from_filesystem": True,
-                            "original_file_path": file_path
-                        }
-                    }
-                )
-                
-                migrated += 1
-                logger.info(f"✅ Migrated proof {proof_id}")
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to migrate {proof_id}: {e}")
-                failed += 1
-        
-        logger.info(f"🎉 Auto-migration complete: {migrated} migrated, {failed} failed")
-        
+        await migrate_payment_proofs_to_blobs(db)
     except Exception as e:
         logger.error(f"❌ Auto-migration error: {e}")
 
 
 def prepare_for_mongo(data):
-    """Convert datetime objects to ISO strings for MongoDB with Z suffix for UTC"""
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                # Convert to ISO format and replace timezone offset with Z
-                iso_str = value.isoformat()
-                # Remove timezone offset like +00:00 and replace with Z
-                if '+00:00' in iso_str:
-                    iso_str = iso_str.replace('+00:00', 'Z')
-                elif not iso_str.endswith('Z'):
-                    iso_str = iso_str + 'Z'
-                data[key] = iso_str
-    return data
+    """Normalize datetimes to timezone-aware UTC so they are stored as BSON dates (see mongo_dates.py)"""
+    return to_mongo(data)
 
 def parse_from_mongo(item):
-    """Convert ISO strings back to datetime objects and handle ObjectId"""
+    """Drop MongoDB's _id (ObjectId is not JSON serializable); dates already come back as UTC datetimes"""
     if isinstance(item, dict):
-        # Remove MongoDB's _id field to avoid ObjectId serialization issues
-        if '_id' in item:
-            del item['_id']
-        
-        for key, value in item.items():
-            if isinstance(value, str) and 'T' in value and 'Z' in value:
-                try:
-                    item[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                except ValueError:
-                    pass
+        item.pop('_id', None)
     return item
 
 def generate_invoice_pdf(invoice_data: "InvoiceData") -> bytes:
@@ -1038,37 +1060,6 @@ def generate_wallet_transfer_invoice_pdf(invoice_data: "InvoiceData", target_acc
     
     return pdf_bytes
 
-# Exchange Rate Functions
-async def get_exchange_rate(from_currency: str, to_currency: str) -> float:
-    """Fetch real-time exchange rate from API"""
-    try:
-        if from_currency == to_currency:
-            return 1.0
-        
-        # Using ExchangeRate-API.com (free tier)
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"https://api.exchangerate-api.com/v4/latest/{from_currency}")
-            if response.status_code == 200:
-                data = response.json()
-                if to_currency in data.get("rates", {}):
-                    return float(data["rates"][to_currency])
-            
-            # Fallback: if API fails, use approximate rate (should be replaced with cached rates in production)
-            if from_currency == "IDR" and to_currency == "USD":
-                return 0.000067  # Approximate IDR to USD
-            elif from_currency == "USD" and to_currency == "IDR":
-                return 15000.0   # Approximate USD to IDR
-            
-    except Exception as e:
-        logger.error(f"Error fetching exchange rate: {e}")
-        # Fallback rates
-        if from_currency == "IDR" and to_currency == "USD":
-            return 0.000067
-        elif from_currency == "USD" and to_currency == "IDR":
-            return 15000.0
-    
-    return 1.0
-
 # Models
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -1194,6 +1185,9 @@ class CurrencyExchange(BaseModel):
     from_amount: float
     to_amount: float
     exchange_rate: float
+    # Rate table snapshot the rate came from (exchange_rate_snapshots)
+    rate_snapshot_id: Optional[str] = None
+    rate_as_of: Optional[datetime] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ExchangeRequest(BaseModel):
@@ -1201,6 +1195,11 @@ class ExchangeRequest(BaseModel):
     to_currency: str
     amount: float
 
+class ExportJobRequest(BaseModel):
+    kind: str  # wallet_statement, transactions / financial_report, admin_actions_history (admin)
+    format: str = "xlsx"
+    params: Dict[str, Any] = Field(default_factory=dict)
+
 class Group(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -1555,7 +1554,8 @@ class PaymentProof(BaseModel):
     file_path: Optional[str] = None  # Optional - for legacy filesystem storage
     gcs_path: Optional[str] = None  # GCS storage path
     gcs_bucket: Optional[str] = None  # GCS bucket name
-    storage_type: Optional[str] = "gcs"  # "gcs", "database", or "local"
+    storage_type: Optional[str] = "blob"  # "blob", "gcs", "database", or "local"
+    sha256: Optional[str] = None  # Blob storage digest (storage_type "blob")
     file_size: int
     mime_type: str
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -1781,6 +1781,38 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+async def load_principal(kind: str, payload: dict) -> Optional[dict]:
+    """
+    Account document of a decoded JWT, through the principal cache
+    
+    Returns:
+        dict: Parsed users / admin_users document without wallet balances, or None
+    
+    Raises:
+        HTTPException: 401 when the token predates a password reset
+    """
+    username = payload.get("sub")
+    token_version = payload.get("ver", 0)
+    collection = db.admin_users if kind == KIND_ADMIN else db.users
+    
+    async def load():
+        account = await collection.find_one({"username": username}, PRINCIPAL_PROJECTION)
+        return parse_from_mongo(account) if account else None
+    
+    account = await principal_cache.get((kind, username, token_version), load)
+    if account is not None and account.get("token_version", 0) != token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session expired, please log in again",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return account
+
+async def load_wallet_balances(user_id: str) -> dict:
+    """Current wallet balances of a user (not part of the cached principal)"""
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, **{field: 1 for field in WALLET_FIELDS}})
+    return {field: (user or {}).get(field, 0.0) for field in WALLET_FIELDS}
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
@@ -1791,10 +1823,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        user = await db.users.find_one({"username": username})
+        user = await load_principal(KIND_USER, payload)
         if user is None:
             raise HTTPException(status_code=404, detail="User not found")
-        return User(**parse_from_mongo(user))
+        return User(**user)
     except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1804,30 +1836,30 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 
 async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
-        logger.info(f"[get_current_admin] Starting authentication check")
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         user_type: str = payload.get("user_type")
         
-        logger.info(f"[get_current_admin] JWT decoded - username={username}, user_type={user_type}")
+        logger.debug(f"[get_current_admin] JWT decoded - username={username}, user_type={user_type}")
         
         if username is None or user_type != "admin":
-            logger.error(f"[get_current_admin] Auth failed - username={username}, user_type={user_type}")
+            logger.debug(f"[get_current_admin] Auth failed - username={username}, user_type={user_type}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate admin credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        admin = await db.admin_users.find_one({"username": username})
+        admin = await load_principal(KIND_ADMIN, payload)
         if admin is None:
-            logger.error(f"[get_current_admin] Admin not found in database - username={username}")
+            logger.debug(f"[get_current_admin] Admin not found in database - username={username}")
             raise HTTPException(status_code=404, detail="Admin not found")
         
-        logger.info(f"[get_current_admin] Auth successful for admin: {username}")
-        return AdminUser(**parse_from_mongo(admin))
+        return AdminUser(**admin)
+    except HTTPException:
+        raise
     except jwt.PyJWTError as e:
-        logger.error(f"[get_current_admin] JWT decode error: {str(e)}")
+        logger.debug(f"[get_current_admin] JWT decode error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate admin credentials",
@@ -1840,13 +1872,28 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
             detail=f"Authentication error: {str(e)}"
         )
 
+async def authenticate_stream(token: str, user_type: str) -> dict:
+    """Validate a JWT passed to a streaming endpoint; returns the admin or user document"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    
+    username = payload.get("sub")
+    if username is None or (user_type == "admin") != (payload.get("user_type") == "admin"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    
+    account = await load_principal(KIND_ADMIN if user_type == "admin" else KIND_USER, payload)
+    if account is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return account
+
 async def get_current_super_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify that current admin is a super admin"""
     admin = await get_current_admin(credentials)
     
-    # Check if admin is super admin
-    admin_data = await db.admin_users.find_one({"id": admin.id})
-    if not admin_data or not admin_data.get("is_super_admin", False):
+    # The cached principal carries is_super_admin; no second lookup
+    if not admin.is_super_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Super admin access required"
@@ -1862,6 +1909,10 @@ def require_super_admin(current_admin: AdminUser = Depends(get_current_admin)):
         )
     return current_admin
 
+def get_request_loaders() -> RequestLoaders:
+    """Request-scoped batch loaders for enriching admin list endpoints"""
+    return RequestLoaders(db)
+
 # Test endpoint
 @api_router.get("/")
 async def root():
@@ -1952,7 +2003,8 @@ async def login(user: UserLogin):
     # Client tokens expire in 7 days for better user experience
     access_token_expires = timedelta(minutes=CLIENT_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username, "user_type": "client"}, expires_delta=access_token_expires
+        data={"sub": user.username, "user_type": "client", "ver": db_user.get("token_version", 0)},
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -1976,12 +2028,8 @@ async def get_me(current_user: User = Depends(get_current_user)):
         "city": getattr(current_user, 'city', None),
         "province": getattr(current_user, 'province', None),
         "profile_picture": profile_picture,
-        "wallet_balance_idr": current_user.wallet_balance_idr,  # Legacy
-        "wallet_balance_usd": current_user.wallet_balance_usd,  # Legacy
-        "main_wallet_idr": getattr(current_user, 'main_wallet_idr', 0.0),
-        "main_wallet_usd": getattr(current_user, 'main_wallet_usd', 0.0),
-        "withdrawal_wallet_idr": getattr(current_user, 'withdrawal_wallet_idr', 0.0),
-        "withdrawal_wallet_usd": getattr(current_user, 'withdrawal_wallet_usd', 0.0)
+        # wallet_balance_idr / _usd (legacy), main_wallet_* and withdrawal_wallet_*
+        **await load_wallet_balances(current_user.id)
     }
 
 # Admin Auth endpoints
@@ -2000,10 +2048,12 @@ async def admin_login(admin: AdminUserLogin):
         {"id": db_admin["id"]},
         {"$set": {"last_login": datetime.now(timezone.utc)}}
     )
+    principal_cache.invalidate(KIND_ADMIN, db_admin["id"])
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": admin.username, "user_type": "admin"}, expires_delta=access_token_expires
+        data={"sub": admin.username, "user_type": "admin", "ver": db_admin.get("token_version", 0)},
+        expires_delta=access_token_expires
     )
     return {
         "access_token": access_token, 
@@ -2075,7 +2125,7 @@ async def update_profile(profile_data: UserProfileUpdate, current_user: User = D
     
     # Prepare update data
     update_data = {
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "updated_at": datetime.now(timezone.utc)
     }
     
     # Only update fields that are provided
@@ -2097,6 +2147,7 @@ async def update_profile(profile_data: UserProfileUpdate, current_user: User = D
         {"id": current_user.id},
         {"$set": update_data}
     )
+    principal_cache.invalidate(KIND_USER, current_user.id)
     
     if result.modified_count == 0:
         raise HTTPException(
@@ -2137,9 +2188,10 @@ async def change_password(password_data: PasswordChange, current_user: User = De
         {"id": current_user.id},
         {"$set": {
             "password_hash": new_password_hash,
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         }}
     )
+    principal_cache.invalidate(KIND_USER, current_user.id)
     
     if result.modified_count == 0:
         raise HTTPException(
@@ -2198,6 +2250,7 @@ async def update_admin_profile(profile_data: AdminUserUpdate, current_admin: Adm
     if update_data:
         update_data["updated_at"] = datetime.now(timezone.utc)
         await db.admin_users.update_one({"id": current_admin.id}, {"$set": update_data})
+        principal_cache.invalidate(KIND_ADMIN, current_admin.id)
     
     return {"message": "Profile updated successfully"}
 
@@ -2229,6 +2282,7 @@ async def change_admin_password(password_data: PasswordChange, current_admin: Ad
         {"id": current_admin.id},
         {"$set": {"password_hash": new_password_hash, "updated_at": datetime.now(timezone.utc)}}
     )
+    principal_cache.invalidate(KIND_ADMIN, current_admin.id)
     
     return {"message": "Password changed successfully"}
 
@@ -2299,6 +2353,7 @@ async def update_admin(admin_id: str, admin_data: AdminUserEditRequest, current_
     }
     
     await db.admin_users.update_one({"id": admin_id}, {"$set": update_data})
+    principal_cache.invalidate(KIND_ADMIN, admin_id)
     
     return {"message": "Admin updated successfully"}
 
@@ -2318,6 +2373,7 @@ async def toggle_admin_status(admin_id: str, status_data: dict, current_admin: A
         {"id": admin_id}, 
         {"$set": {"is_active": status_data.get("is_active", True), "updated_at": datetime.now(timezone.utc)}}
     )
+    principal_cache.invalidate(KIND_ADMIN, admin_id)
     
     return {"message": "Admin status updated successfully"}
 
@@ -2334,6 +2390,7 @@ async def delete_admin(admin_id: str, current_admin: AdminUser = Depends(require
     
     # Delete admin
     await db.admin_users.delete_one({"id": admin_id})
+    principal_cache.invalidate(KIND_ADMIN, admin_id)
     
     return {"message": "Admin deleted successfully"}
 
@@ -2352,6 +2409,7 @@ async def change_admin_password_alt(password_data: PasswordChange, current_admin
         {"id": current_admin.id},
         {"$set": {"password_hash": new_password_hash, "updated_at": datetime.now(timezone.utc)}}
     )
+    principal_cache.invalidate(KIND_ADMIN, current_admin.id)
     
     return {"message": "Password changed successfully"}
 
@@ -2503,19 +2561,15 @@ async def get_client_detail(
             start_date_fixed = start_date.replace(' ', '+').replace('Z', '+00:00')
             end_date_fixed = end_date.replace(' ', '+').replace('Z', '+00:00')
             
-            start = datetime.fromisoformat(start_date_fixed)
-            end = datetime.fromisoformat(end_date_fixed)
-            
-            # Convert to ISO strings for comparison (dates stored as strings in DB)
-            start_iso = start.isoformat()
-            end_iso = end.isoformat()
+            start = as_datetime(datetime.fromisoformat(start_date_fixed))
+            end = as_datetime(datetime.fromisoformat(end_date_fixed))
             
-            print(f"🔍 Date filter applied: {start_iso} to {end_iso}")
+            print(f"🔍 Date filter applied: {start.isoformat()} to {end.isoformat()}")
             
             date_filter = {
                 "created_at": {
-                    "$gte": start_iso,
-                    "$lte": end_iso
+                    "$gte": start,
+                    "$lte": end
                 }
             }
         except Exception as e:
@@ -2649,6 +2703,7 @@ async def update_client_status(client_id: str, status_data: ClientStatusUpdate,
         {"id": client_id},
         {"$set": {"is_active": status_data.is_active, "updated_at": datetime.now(timezone.utc)}}
     )
+    principal_cache.invalidate(KIND_USER, client_id)
     
     return {"message": "Client status updated successfully"}
 
@@ -2676,6 +2731,7 @@ async def update_client(client_id: str, client_data: dict, current_admin: AdminU
         update_data["updated_at"] = datetime.now(timezone.utc)
         update_data["updated_by"] = current_admin.id
         await db.users.update_one({"id": client_id}, {"$set": update_data})
+        principal_cache.invalidate(KIND_USER, client_id)
     
     return {"message": "Client updated successfully"}
 
@@ -2693,14 +2749,19 @@ async def reset_client_password(client_id: str, current_admin: AdminUser = Depen
     hashed_password = get_password_hash(new_password)
     
     # Update user password
+    # Bumping token_version signs the client out of existing sessions
     await db.users.update_one(
         {"id": client_id},
-        {"$set": {
-            "password_hash": hashed_password,
-            "updated_at": datetime.now(timezone.utc),
-            "password_reset_required": True  # Force user to change password on next login
-        }}
+        {
+            "$set": {
+                "password_hash": hashed_password,
+                "updated_at": datetime.now(timezone.utc),
+                "password_reset_required": True  # Force user to change password on next login
+            },
+            "$inc": {"token_version": 1}
+        }
     )
+    principal_cache.invalidate(KIND_USER, client_id)
     
     # Create admin notification
     await create_localized_notification(
@@ -2723,7 +2784,8 @@ async def reset_client_password(client_id: str, current_admin: AdminUser = Depen
 async def get_all_requests(
     status: Optional[str] = None,
     platform: Optional[str] = None,
-    current_admin: AdminUser = Depends(get_current_admin)
+    current_admin: AdminUser = Depends(get_current_admin),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
     filter_query = {}
     if status:
@@ -2734,17 +2796,21 @@ async def get_all_requests(
     requests_cursor = db.ad_account_requests.find(filter_query).sort("created_at", -1)
     requests = await requests_cursor.to_list(length=None)
     
+    # Resolve users and admins for the whole page with one query per collection
+    await loaders.users.load_many(request["user_id"] for request in requests)
+    await loaders.admin_users.load_many(request.get("verified_by") for request in requests)
+    
     result = []
     for request in requests:
         request_data = parse_from_mongo(request)
         # Get user info
-        user = await db.users.find_one({"id": request_data["user_id"]})
+        user = loaders.users.get(request_data["user_id"])
         if user:
             request_data["user"] = {"username": user["username"], "email": user["email"]}
         
         # Get admin info if processed
         if request_data.get("verified_by"):
-            admin = await db.admin_users.find_one({"id": request_data["verified_by"]})
+            admin = loaders.admin_users.get(request_data["verified_by"])
             if admin:
                 admin = parse_from_mongo(admin)
                 request_data["verified_by_admin"] = {
@@ -2795,7 +2861,7 @@ async def update_request_status(
     update_data = {
         "status": status_data.status,
         "verified_by": current_admin.id,
-        "processed_at": datetime.now(timezone.utc).isoformat()
+        "processed_at": datetime.now(timezone.utc)
     }
     
     if status_data.admin_notes:
@@ -2921,7 +2987,7 @@ async def update_request_status(
         }
         
         client_notification_dict = prepare_for_mongo(client_notification)
-        await db.client_notifications.insert_one(client_notification_dict)
+        await insert_client_notification(client_notification_dict)
         
         # Send email notification to client about account request approval
         try:
@@ -2960,7 +3026,7 @@ async def update_request_status(
         }
         
         client_notification_dict = prepare_for_mongo(client_notification)
-        await db.client_notifications.insert_one(client_notification_dict)
+        await insert_client_notification(client_notification_dict)
 
     # Create notification for client when request is completed (sharing -> active)
     if status_data.status == "completed":
@@ -2985,7 +3051,7 @@ async def update_request_status(
         }
         
         client_notification_dict = prepare_for_mongo(client_notification)
-        await db.client_notifications.insert_one(client_notification_dict)
+        await insert_client_notification(client_notification_dict)
         
         # Send email notification to client about account request completion
         try:
@@ -3024,7 +3090,7 @@ async def update_request_status(
         }
         
         client_notification_dict = prepare_for_mongo(client_notification)
-        await db.client_notifications.insert_one(client_notification_dict)
+        await insert_client_notification(client_notification_dict)
         
         # Send email notification to client about account request rejection
         try:
@@ -3231,7 +3297,7 @@ async def bulk_update_request_status(
                 }
                 
                 client_notification_dict = prepare_for_mongo(client_notification)
-                await db.client_notifications.insert_one(client_notification_dict)
+                await insert_client_notification(client_notification_dict)
                 
                 # Send email notification to client about account request approval
                 try:
@@ -3272,7 +3338,7 @@ async def bulk_update_request_status(
                 }
                 
                 client_notification_dict = prepare_for_mongo(client_notification)
-                await db.client_notifications.insert_one(client_notification_dict)
+                await insert_client_notification(client_notification_dict)
                 
                 # Send email notification to client about account request completion
                 try:
@@ -3310,7 +3376,7 @@ async def bulk_update_request_status(
                 }
                 
                 client_notification_dict = prepare_for_mongo(client_notification)
-                await db.client_notifications.insert_one(client_notification_dict)
+                await insert_client_notification(client_notification_dict)
             
             # Update transaction status when request status changes - CONSISTENT mapping per user requirements
             if bulk_data.status == "completed":
@@ -3427,17 +3493,15 @@ async def upload_account_proof(
         
         # Upload to GCS
         gcs_path = f"account_topup_proofs/{unique_filename}"
-        gcs = get_gcs_storage()
         
         try:
             # Read file content
             file_content = await file.read()
-            file_obj = io.BytesIO(file_content)
             
             # Upload to GCS
-            gcs.upload_file(
-                file_obj=file_obj,
-                destination_path=gcs_path,
+            await get_object_storage().upload(
+                file_content,
+                gcs_path,
                 content_type=file.content_type,
                 metadata={
                     "payment_id": payment_id,
@@ -3498,13 +3562,50 @@ async def upload_account_proof(
     except Exception as e:
         logger.error(f"Error uploading account proof: {e}")
         raise HTTPException(status_code=500, detail="Failed to upload account proof")
+async def get_latest_topups_by_account(account_ids: List[str]) -> tuple:
+    """
+    Latest verified bank/crypto top-up and latest completed wallet transfer per account
+    Returns tuple of (bank_topups, wallet_topups), each a dict keyed by internal account id
+    """
+    if not account_ids:
+        return {}, {}
+    
+    # Same ordering as the per-account find_one lookups, applied once per collection
+    bank_pipeline = [
+        {"$match": {"accounts.account_id": {"$in": account_ids}, "status": "verified"}},
+        {"$project": {"accounts.account_id": 1, "verified_at": 1, "created_at": 1}},
+        {"$unwind": "$accounts"},
+        {"$match": {"accounts.account_id": {"$in": account_ids}}},
+        {"$sort": {"verified_at": -1, "created_at": -1}},
+        {"$group": {
+            "_id": "$accounts.account_id",
+            "verified_at": {"$first": "$verified_at"},
+            "created_at": {"$first": "$created_at"}
+        }}
+    ]
+    wallet_pipeline = [
+        {"$match": {"target_account_id": {"$in": account_ids}, "status": {"$in": ["completed", "approved"]}}},
+        {"$sort": {"processed_at": -1, "verified_at": -1, "created_at": -1}},
+        {"$group": {
+            "_id": "$target_account_id",
+            "processed_at": {"$first": "$processed_at"},
+            "verified_at": {"$first": "$verified_at"},
+            "created_at": {"$first": "$created_at"}
+        }}
+    ]
+    
+    bank_topups = {doc["_id"]: doc async for doc in db.topup_requests.aggregate(bank_pipeline)}
+    wallet_topups = {doc["_id"]: doc async for doc in db.wallet_transfers.aggregate(wallet_pipeline)}
+    return bank_topups, wallet_topups
+
 # Ad Account Management endpoints
 @api_router.get("/admin/accounts", response_model=List[dict])
 async def get_all_ad_accounts(
     platform: Optional[str] = None,
     status: Optional[str] = None,
     no_topup_days: Optional[int] = None,  # Filter accounts with no topup for X days
-    current_admin: AdminUser = Depends(get_current_admin)
+    current_admin: AdminUser = Depends(get_current_admin),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
     """Get all ad accounts with optional filters"""
     try:
@@ -3516,20 +3617,25 @@ async def get_all_ad_accounts(
             
         accounts = await db.ad_accounts.find(query).sort("created_at", -1).to_list(1000)
         
+        # Batch all foreign lookups for the page up front
+        await loaders.users.load_many(account["user_id"] for account in accounts)
+        await loaders.admin_users.load_many(account.get("fee_updated_by") for account in accounts)
+        bank_topups, wallet_topups = await get_latest_topups_by_account([account["id"] for account in accounts])
+        
         result = []
         current_time = datetime.now(timezone.utc)
         
         for account in accounts:
             account = parse_from_mongo(account)
             # Get user info
-            user = await db.users.find_one({"id": account["user_id"]})
+            user = loaders.users.get(account["user_id"])
             if user:
                 account["user_name"] = user.get("name", "Unknown")
                 account["user_username"] = user.get("username", "Unknown")
             
             # Get admin info if fee was updated by admin
             if account.get("fee_updated_by"):
-                admin = await db.admin_users.find_one({"id": account["fee_updated_by"]})
+                admin = loaders.admin_users.get(account["fee_updated_by"])
                 if admin:
                     admin = parse_from_mongo(admin)
                     account["fee_updated_by_admin"] = {
@@ -3541,48 +3647,28 @@ async def get_all_ad_accounts(
             # Calculate last topup date and days since last topup
             # Check BOTH topup_requests (bank/crypto) AND wallet_transfers (wallet top-ups)
             
-            # 1. Check topup_requests for verified requests that include this account
-            last_topup_from_bank = await db.topup_requests.find_one(
-                {
-                    "accounts.account_id": account["id"],
-                    "status": "verified"
-                },
-                sort=[("verified_at", -1), ("created_at", -1)]  # Fallback to created_at if verified_at not exists
-            )
+            # 1. Latest verified topup_request that includes this account
+            last_topup_from_bank = bank_topups.get(account["id"])
             
-            # 2. Check wallet_transfers for completed/approved transfers to this account
-            last_topup_from_wallet = await db.wallet_transfers.find_one(
-                {
-                    "target_account_id": account["id"],
-                    "status": {"$in": ["completed", "approved"]}
-                },
-                sort=[("processed_at", -1), ("verified_at", -1), ("created_at", -1)]  # Prioritize processed_at > verified_at > created_at
-            )
+            # 2. Latest completed/approved wallet_transfer to this account
+            last_topup_from_wallet = wallet_topups.get(account["id"])
             
             # Determine the most recent top-up from both sources
             last_topup_at = None
             
             if last_topup_from_bank:
                 last_topup_from_bank = parse_from_mongo(last_topup_from_bank)
-                bank_topup_at = last_topup_from_bank.get("verified_at") or last_topup_from_bank.get("created_at")
-                if isinstance(bank_topup_at, str):
-                    bank_topup_at = datetime.fromisoformat(bank_topup_at.replace('Z', '+00:00'))
-                if bank_topup_at.tzinfo is None:
-                    bank_topup_at = bank_topup_at.replace(tzinfo=timezone.utc)
+                bank_topup_at = as_datetime(last_topup_from_bank.get("verified_at") or last_topup_from_bank.get("created_at"))
                 last_topup_at = bank_topup_at
             
             if last_topup_from_wallet:
                 last_topup_from_wallet = parse_from_mongo(last_topup_from_wallet)
                 # For wallet transfers, prioritize processed_at > verified_at > created_at
-                wallet_topup_at = (
+                wallet_topup_at = as_datetime(
                     last_topup_from_wallet.get("processed_at") or 
                     last_topup_from_wallet.get("verified_at") or 
                     last_topup_from_wallet.get("created_at")
                 )
-                if isinstance(wallet_topup_at, str):
-                    wallet_topup_at = datetime.fromisoformat(wallet_topup_at.replace('Z', '+00:00'))
-                if wallet_topup_at.tzinfo is None:
-                    wallet_topup_at = wallet_topup_at.replace(tzinfo=timezone.utc)
                 
                 # Compare with bank top-up and take the most recent
                 if last_topup_at is None or wallet_topup_at > last_topup_at:
@@ -3595,11 +3681,7 @@ async def get_all_ad_accounts(
                 account["never_topped_up"] = False  # Explicitly set to False
             else:
                 # No topup ever (neither bank/crypto nor wallet)
-                created_at = account.get("created_at")
-                if isinstance(created_at, str):
-                    created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                if created_at.tzinfo is None:
-                    created_at = created_at.replace(tzinfo=timezone.utc)
+                created_at = as_datetime(account.get("created_at"))
                 
                 days_since_creation = (current_time - created_at).days
                 account["last_topup_at"] = None
@@ -3665,7 +3747,7 @@ async def update_account_status(
         }
         
         client_notification_dict = prepare_for_mongo(client_notification)
-        await db.client_notifications.insert_one(client_notification_dict)
+        await insert_client_notification(client_notification_dict)
     
     return {"message": f"Account status updated to {status_data.status}"}
 
@@ -3836,7 +3918,7 @@ async def delete_account(
         }
         
         client_notification_dict = prepare_for_mongo(client_notification)
-        await db.client_notifications.insert_one(client_notification_dict)
+        await insert_client_notification(client_notification_dict)
         
         # Send email notification to client about account deletion
         try:
@@ -3908,20 +3990,16 @@ async def delete_account_with_balance_transfer(
     
     # Transfer balance to withdrawal wallet
     currency = account.get("currency", "IDR")
-    if currency == "IDR":
-        current_balance = user.get("withdrawal_wallet_idr", 0)
-        new_balance = current_balance + balance_amount
-        await db.users.update_one(
-            {"id": user_id},
-            {"$set": {"withdrawal_wallet_idr": new_balance}}
-        )
-    else:  # USD
-        current_balance = user.get("withdrawal_wallet_usd", 0)
-        new_balance = current_balance + balance_amount
-        await db.users.update_one(
-            {"id": user_id},
-            {"$set": {"withdrawal_wallet_usd": new_balance}}
-        )
+    entries = await ledger.post(
+        db,
+        [ledger.wallet(user_id, ledger.wallet_field("withdrawal", currency), balance_amount, currency)],
+        "account_deletion_balance_transfer",
+        user_id=user_id,
+        reference_id=account_id,
+        description=f"Transfer saldo dari akun {account.get('account_name')} ke withdrawal wallet (akun dihapus)"
+    )
+    current_balance = entries[0]["balance_before"]
+    new_balance = entries[0]["balance_after"]
     
     # Create transaction record
     transaction = {
@@ -3961,7 +4039,7 @@ async def delete_account_with_balance_transfer(
     }
     
     client_notification_dict = prepare_for_mongo(client_notification)
-    await db.client_notifications.insert_one(client_notification_dict)
+    await insert_client_notification(client_notification_dict)
     
     # Send email notification to client about account deletion with balance transfer
     try:
@@ -4012,68 +4090,97 @@ async def get_notifications(
 
 @api_router.get("/admin/notifications/unread-count", response_model=dict)
 async def get_unread_notification_count(current_admin: AdminUser = Depends(get_current_admin)):
-    """Get count of unread notifications"""
-    count = await db.notifications.count_documents({"is_read": False})
+    """Get count of unread notifications (incrementally maintained counter)"""
+    count = await notification_hub.unread_count(ADMIN_AUDIENCE)
     return {"count": count}
 
+@api_router.get("/admin/notifications/stream")
+async def stream_admin_notifications(
+    request: Request,
+    token: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+):
+    """Server-Sent Events stream of new admin notifications and unread counts
+    
+    EventSource cannot send headers, so the JWT may also be passed as ?token=
+    """
+    await authenticate_stream(token or (authorization or "").replace("Bearer ", ""), "admin")
+    return StreamingResponse(
+        notification_hub.stream(request, ADMIN_AUDIENCE),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @api_router.put("/admin/notifications/{notification_id}/read", response_model=dict)
 async def mark_notification_read(
     notification_id: str,
     current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Mark notification as read"""
-    result = await db.notifications.update_one(
+    previous = await db.notifications.find_one_and_update(
         {"id": notification_id},
-        {"$set": {"is_read": True}}
+        {"$set": {"is_read": True}},
+        projection={"is_read": 1}
     )
     
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Notification not found")
     
+    if previous.get("is_read") is False:
+        await notification_hub.adjust_unread(ADMIN_AUDIENCE, -1)
+    
     return {"message": "Notification marked as read"}
 
 @api_router.put("/admin/notifications/mark-all-read", response_model=dict)
 async def mark_all_notifications_read(current_admin: AdminUser = Depends(get_current_admin)):
     """Mark all notifications as read"""
-    await db.notifications.update_many(
+    result = await db.notifications.update_many(
         {"is_read": False},
         {"$set": {"is_read": True}}
     )
     
+    if result.modified_count:
+        await notification_hub.adjust_unread(ADMIN_AUDIENCE, -result.modified_count)
+    
     return {"message": "All notifications marked as read"}
 
 # Payment Verification Admin Endpoints
 @api_router.get("/admin/payments", response_model=List[dict])
 async def get_payment_requests(
+    response: Response,
     status: Optional[str] = None,
-    current_admin: AdminUser = Depends(get_current_admin)
+    page: QueuePageParams = Depends(queue_page_params),
+    current_admin: AdminUser = Depends(get_current_admin),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
-    """Get all payment requests for admin review"""
+    """Get payment requests for admin review, newest first (keyset paginated)"""
     query = {}
     if status:
         query["status"] = status
     
-    requests = await db.topup_requests.find(query).sort("created_at", -1).to_list(1000)
+    requests = await fetch_queue_page(db.topup_requests, apply_queue_filters(query, page), page, response)
+    
+    await load_topup_request_relations(requests, loaders)
     
     result = []
     for req in requests:
         req = parse_from_mongo(req)
         
         # Get user info
-        user = await db.users.find_one({"id": req["user_id"]})
+        user = loaders.users.get(req["user_id"])
         user = parse_from_mongo(user) if user else {}
         
         # Get payment proof if exists
         payment_proof = None
         if req.get("payment_proof_id"):
-            proof = await db.payment_proofs.find_one({"id": req["payment_proof_id"]})
+            proof = loaders.payment_proofs.get(req["payment_proof_id"])
             if proof:
                 payment_proof = parse_from_mongo(proof)
         
         # Get admin info if verified
         verified_by_admin = None
         if req.get("verified_by"):
-            admin = await db.admin_users.find_one({"id": req["verified_by"]})
+            admin = loaders.admin_users.get(req["verified_by"])
             if admin:
                 admin = parse_from_mongo(admin)
                 verified_by_admin = {
@@ -4088,14 +4195,14 @@ async def get_payment_requests(
         account_id = None
         
         # IMPORTANT: Enrich accounts with proof edit status BEFORE formatting
-        enriched_accounts = await enrich_accounts_with_proof_status(req.get("accounts", []), req["id"])
+        enriched_accounts = await enrich_accounts_with_proof_status(req.get("accounts", []), req["id"], loaders)
         
         # Format proof URLs in accounts array and populate platform account ID
         formatted_accounts = []
         for acc in enriched_accounts:
             # Lookup ad_account to get platform ID and other details
             internal_account_id = acc.get("account_id")  # This is internal UUID
-            ad_account = await db.ad_accounts.find_one({"id": internal_account_id})
+            ad_account = loaders.ad_accounts.get(internal_account_id)
             
             if ad_account:
                 ad_account = parse_from_mongo(ad_account)
@@ -4333,13 +4440,16 @@ async def verify_payment_request(
         "status": status,
         "verified_by": current_admin.id,
         "admin_notes": admin_notes,
-        "verified_at": datetime.now(timezone.utc).isoformat()
+        "verified_at": datetime.now(timezone.utc)
     }
     
-    await db.topup_requests.update_one(
-        {"id": request_id},
+    # Conditional on the status read above, so two concurrent reviews count once in the rollups
+    status_result = await db.topup_requests.update_one(
+        {"id": request_id, "status": topup_request.get("status")},
         {"$set": update_data}
     )
+    if status_result.modified_count == 1:
+        await record_status_change(db, ACCOUNT_TOPUP, topup_request, topup_request.get("status"), status)
     
     # If verified, update account balances
     if status == "verified":
@@ -4348,15 +4458,19 @@ async def verify_payment_request(
         # Support both old (accounts array) and new (single account) structures
         if "accounts" in topup_request and isinstance(topup_request["accounts"], list):
             # OLD STRUCTURE: accounts array
-            for acc in topup_request["accounts"]:
-                # Add balance to ad account and update last topup date
-                await db.ad_accounts.update_one(
-                    {"id": acc["account_id"]},
-                    {
-                        "$inc": {"balance": acc["amount"]},
-                        "$set": {"last_topup_date": datetime.now(timezone.utc)}
-                    }
-                )
+            # Add balance to every ad account and update last topup date, as one ledger operation
+            await ledger.post(
+                db,
+                [
+                    ledger.ad_account(acc["account_id"], acc["amount"], topup_request.get("currency", "IDR"),
+                                      extra_set={"last_topup_date": datetime.now(timezone.utc)}, missing_ok=True)
+                    for acc in topup_request["accounts"]
+                ],
+                "account_topup",
+                user_id=topup_request["user_id"],
+                reference_id=request_id,
+                description=f"Top-up verified - {topup_request.get('reference_code', 'N/A')}"
+            )
             
             # Create transaction record
             accounts_desc = ", ".join([f"{acc.get('account_name', 'Unknown')}" for acc in topup_request["accounts"]])
@@ -4371,12 +4485,14 @@ async def verify_payment_request(
         else:
             # NEW STRUCTURE: single account per request
             # Add balance to ad account and update last topup date
-            await db.ad_accounts.update_one(
-                {"id": topup_request["account_id"]},
-                {
-                    "$inc": {"balance": topup_request["amount"]},
-                    "$set": {"last_topup_date": datetime.now(timezone.utc)}
-                }
+            await ledger.post(
+                db,
+                [ledger.ad_account(topup_request["account_id"], topup_request["amount"], topup_request.get("currency", "IDR"),
+                                   extra_set={"last_topup_date": datetime.now(timezone.utc)}, missing_ok=True)],
+                "account_topup",
+                user_id=topup_request["user_id"],
+                reference_id=request_id,
+                description=f"Top-up verified - {topup_request.get('reference_code', 'N/A')}"
             )
             
             # Create transaction record
@@ -4452,7 +4568,7 @@ async def verify_payment_request(
     }
     
     client_notification_dict = prepare_for_mongo(client_notification)
-    await db.client_notifications.insert_one(client_notification_dict)
+    await insert_client_notification(client_notification_dict)
     
     # Send email notification to client
     try:
@@ -4497,11 +4613,10 @@ async def get_account_proof(
     request_id: str,
     account_id: str,
     proof_type: str,  # "spend_limit" or "budget_aspire"
+    request: Request,
     current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Get account top-up proof file from GCS with filesystem fallback"""
-    from fastapi.responses import Response
-    
     logger.info(f"📥 Account proof request: request_id={request_id}, account_id={account_id}, proof_type={proof_type}")
     
     try:
@@ -4537,56 +4652,21 @@ async def get_account_proof(
         else:
             gcs_path = proof_url
         
-        try:
-            # Try GCS first
-            content, mime_type = await download_from_gcs(gcs_path)
-            logger.info(f"✅ Served account proof from GCS: {gcs_path}")
-            return Response(
-                content=content,
-                media_type=mime_type,
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET",
-                    "Access-Control-Allow-Headers": "Authorization",
-                    "Cache-Control": "public, max-age=3600"
-                }
-            )
-        except HTTPException:
-            # Filesystem fallback
-            logger.warning(f"⚠️ File not in GCS, trying filesystem: {gcs_path}")
-            
-            file_path = Path(f"/app/{proof_url}") if not proof_url.startswith("/") else Path(proof_url)
-            
-            if not file_path.exists():
-                file_path = Path(f"/app/uploads/{gcs_path}")
-            
-            if not file_path.exists():
-                logger.error(f"❌ Account proof not found: {proof_url}")
-                raise HTTPException(status_code=404, detail="Proof file not found")
-            
-            # Determine content type
-            extension = file_path.suffix.lower()
-            mime_type_map = {
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.png': 'image/png',
-                '.pdf': 'application/pdf',
-                '.webp': 'image/webp'
-            }
-            mime_type = mime_type_map.get(extension, 'image/jpeg')
-            
-            logger.info(f"✅ Served account proof from filesystem: {file_path}")
-            return FileResponse(
-                path=str(file_path),
-                media_type=mime_type,
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET",
-                    "Access-Control-Allow-Headers": "Authorization",
-                    "Cache-Control": "public, max-age=3600"
-                }
-            )
-            
+        return await serve_gcs_path(
+            request,
+            gcs_path,
+            ACL_ADMIN,
+            headers={
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Methods": "GET",
+                "Access-Control-Allow-Headers": "Authorization"
+            },
+            fallback_paths=[
+                Path(f"/app/{proof_url}") if not proof_url.startswith("/") else Path(proof_url),
+                Path(f"/app/uploads/{gcs_path}")
+            ]
+        )
+
     except HTTPException:
         raise
     except Exception as e:
@@ -4596,11 +4676,10 @@ async def get_account_proof(
 @api_router.get("/admin/payments/{request_id}/payment-proof")
 async def get_account_topup_payment_proof(
     request_id: str,
+    request: Request,
     current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Get account top-up payment proof file from GCS with filesystem fallback"""
-    from fastapi.responses import Response
-    
     logger.info(f"📥 Account top-up proof request: request_id={request_id}, admin={current_admin.username}")
     
     try:
@@ -4627,6 +4706,16 @@ async def get_account_topup_payment_proof(
         content_type = proof.get("mime_type", "image/jpeg")
         file_name = proof.get("file_name", "proof.jpg")
         
+        headers = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "GET",
+            "Access-Control-Allow-Headers": "Authorization"
+        }
+        
+        # Serve from blob storage
+        if storage_type == "blob":
+            return await serve_proof_blob(request, proof, headers)
+        
         # Serve from GCS
         if storage_type == "gcs":
             gcs_path = proof.get("gcs_path")
@@ -4634,25 +4723,13 @@ async def get_account_topup_payment_proof(
                 raise HTTPException(status_code=404, detail="GCS path not found")
             
             try:
-                # Use download_from_gcs helper
-                file_content, mime_type = await download_from_gcs(gcs_path)
-                
-                logger.info(f"✅ Served account top-up proof from GCS: proof_id={payment_proof_id}, path={gcs_path}, size={len(file_content)} bytes")
-                
-                return Response(
-                    content=file_content,
-                    media_type=mime_type,
-                    headers={
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Methods": "GET",
-                        "Access-Control-Allow-Headers": "Authorization",
-                        "Content-Disposition": f'inline; filename="{file_name}"',
-                        "Cache-Control": "no-cache, must-revalidate"  # Force reload, no caching
-                    }
-                )
-            except HTTPException:
-                logger.warning(f"⚠️ File not in GCS, trying filesystem fallback")
-                # Continue to filesystem fallback
+                stored = await open_gcs_file(gcs_path, content_type=content_type)
+                if stored:
+                    logger.info(f"✅ Serving account top-up proof from GCS: proof_id={payment_proof_id}, path={gcs_path}, size={stored.size} bytes")
+                    return await serve_file(request, stored, ACL_ADMIN, file_name=file_name, headers=headers)
+            except Exception as e:
+                logger.warning(f"⚠️ GCS lookup failed for {gcs_path}: {e}")
+            logger.warning(f"⚠️ File not in GCS, trying filesystem fallback")
         
         # Filesystem fallback
         file_path_str = proof.get("file_path", proof.get("original_file_path"))
@@ -4663,23 +4740,13 @@ async def get_account_topup_payment_proof(
         if not file_path.is_absolute():
             file_path = Path("/app") / file_path_str
         
-        if not file_path.exists():
+        stored = open_local_file([file_path], content_type)
+        if not stored:
             logger.error(f"❌ File not found in filesystem: {file_path}")
             raise HTTPException(status_code=404, detail="Proof file not found")
         
-        logger.info(f"✅ Served account top-up proof from filesystem: {file_path}")
-        
-        return FileResponse(
-            path=str(file_path),
-            media_type=content_type,
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET",
-                "Access-Control-Allow-Headers": "Authorization",
-                "Content-Disposition": f'inline; filename="{file_name}"',
-                "Cache-Control": "public, max-age=3600"
-            }
-        )
+        logger.info(f"✅ Serving account top-up proof from filesystem: {file_path}")
+        return await serve_file(request, stored, ACL_ADMIN, file_name=file_name, headers=headers)
         
     except HTTPException:
         raise
@@ -4690,6 +4757,7 @@ async def get_account_topup_payment_proof(
 @api_router.get("/admin/payments/{request_id}/proof-file")
 async def get_payment_proof_file(
     request_id: str,
+    request: Request,
     current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Serve payment proof file for admin review"""
@@ -4704,6 +4772,14 @@ async def get_payment_proof_file(
     if not payment_proof:
         raise HTTPException(status_code=404, detail="Payment proof not found")
     
+    if payment_proof.get("storage_type") == "blob":
+        return await serve_proof_blob(request, payment_proof, {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "GET",
+            "Access-Control-Allow-Headers": "Authorization",
+            "Content-Disposition": f'attachment; filename="{payment_proof["file_name"]}"'
+        })
+    
     file_path = payment_proof["file_path"]
     if not Path(file_path).exists():
         raise HTTPException(status_code=404, detail="File not found on disk")
@@ -5252,6 +5328,7 @@ async def create_withdrawal_request(request: WithdrawRequestNew, current_user: U
         
         withdraw_dict = prepare_for_mongo(withdraw_record.dict())
         await db.withdraw_requests.insert_one(withdraw_dict)
+        await record_created(db, WITHDRAW, withdraw_dict)
         
         # Create notification for admins
         admin_notification = {
@@ -5263,12 +5340,12 @@ async def create_withdrawal_request(request: WithdrawRequestNew, current_user: U
                                            amount="(Admin akan verifikasi)",
                                            platform=ad_account["platform"]),
             "type": "new_withdraw_request",
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "read": False,
+            "created_at": datetime.now(timezone.utc),
+            "is_read": False,
             "user_id": current_user.id
         }
         
-        await db.notifications.insert_one(admin_notification)
+        await insert_admin_notification(admin_notification)
         
         # Send email notification to admins about new withdraw request
         try:
@@ -5321,11 +5398,14 @@ async def create_withdrawal_request(request: WithdrawRequestNew, current_user: U
 # Admin Withdraw Management endpoints  
 @api_router.get("/admin/withdraws", response_model=List[dict])
 async def get_withdraw_requests(
+    response: Response,
     status: Optional[str] = None,
     platform: Optional[str] = None,
-    current_admin: AdminUser = Depends(get_current_admin)
+    page: QueuePageParams = Depends(queue_page_params),
+    current_admin: AdminUser = Depends(get_current_admin),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
-    """Get all withdraw requests with filters"""
+    """Get withdraw requests with filters, newest first (keyset paginated)"""
     try:
         query = {}
         if status:
@@ -5333,7 +5413,11 @@ async def get_withdraw_requests(
         if platform:
             query["platform"] = platform
             
-        withdraws = await db.withdraw_requests.find(query).sort("created_at", -1).to_list(1000)
+        withdraws = await fetch_queue_page(db.withdraw_requests, apply_queue_filters(query, page), page, response)
+        
+        await loaders.users.load_many(withdraw["user_id"] for withdraw in withdraws)
+        await loaders.ad_accounts.load_many(withdraw["account_id"] for withdraw in withdraws)
+        await loaders.admin_users.load_many(withdraw.get("verified_by") for withdraw in withdraws)
         
         # Enrich with user info
         result = []
@@ -5362,7 +5446,7 @@ async def get_withdraw_requests(
                         withdraw["after_withdrawal_proof_url"] = f"/files/{proof_path}"
             
             # Get user info
-            user = await db.users.find_one({"id": withdraw["user_id"]})
+            user = loaders.users.get(withdraw["user_id"])
             if user:
                 withdraw["user"] = {
                     "name": user.get("name", "Unknown"),
@@ -5371,14 +5455,14 @@ async def get_withdraw_requests(
                 }
             
             # Get account info
-            account = await db.ad_accounts.find_one({"id": withdraw["account_id"]})
+            account = loaders.ad_accounts.get(withdraw["account_id"])
             if account:
                 withdraw["account_balance"] = account.get("balance", 0)
                 withdraw["account_external_id"] = account.get("account_id", "")  # Facebook/Google/TikTok ID
             
             # Get admin info if verified
             if withdraw.get("verified_by"):
-                admin = await db.admin_users.find_one({"id": withdraw["verified_by"]})
+                admin = loaders.admin_users.get(withdraw["verified_by"])
                 if admin:
                     admin = parse_from_mongo(admin)
                     withdraw["verified_by_admin"] = {
@@ -5406,6 +5490,7 @@ async def get_withdraw_requests(
 @api_router.get("/admin/withdraws/{withdraw_id}/actual-balance-proof")
 async def get_withdraw_actual_balance_proof(
     withdraw_id: str,
+    request: Request,
     current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Get actual balance proof file for withdraw request"""
@@ -5424,17 +5509,13 @@ async def get_withdraw_actual_balance_proof(
         else:
             gcs_path = proof_url
         
-        try:
-            # Try GCS first
-            content, mime_type = await download_from_gcs(gcs_path)
-            logger.info(f"✅ Served actual balance proof from GCS: {gcs_path}")
-            return Response(content=content, media_type=mime_type)
-        except:
-            # Fallback to filesystem
-            file_path = Path(f"/app/uploads/{gcs_path}")
-            if file_path.exists():
-                return FileResponse(path=str(file_path))
-            raise HTTPException(status_code=404, detail="Proof file not found")
+        # GCS first, legacy uploads directory as fallback
+        return await serve_gcs_path(
+            request,
+            gcs_path,
+            ACL_ADMIN,
+            fallback_paths=[Path(f"/app/uploads/{gcs_path}")]
+        )
             
     except HTTPException:
         raise
@@ -5445,6 +5526,7 @@ async def get_withdraw_actual_balance_proof(
 @api_router.get("/admin/withdraws/{withdraw_id}/after-withdrawal-proof")
 async def get_withdraw_after_withdrawal_proof(
     withdraw_id: str,
+    request: Request,
     current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Get after withdrawal proof file for withdraw request"""
@@ -5463,17 +5545,13 @@ async def get_withdraw_after_withdrawal_proof(
         else:
             gcs_path = proof_url
         
-        try:
-            # Try GCS first
-            content, mime_type = await download_from_gcs(gcs_path)
-            logger.info(f"✅ Served after withdrawal proof from GCS: {gcs_path}")
-            return Response(content=content, media_type=mime_type)
-        except:
-            # Fallback to filesystem
-            file_path = Path(f"/app/uploads/{gcs_path}")
-            if file_path.exists():
-                return FileResponse(path=str(file_path))
-            raise HTTPException(status_code=404, detail="Proof file not found")
+        # GCS first, legacy uploads directory as fallback
+        return await serve_gcs_path(
+            request,
+            gcs_path,
+            ACL_ADMIN,
+            fallback_paths=[Path(f"/app/uploads/{gcs_path}")]
+        )
             
     except HTTPException:
         raise
@@ -5510,8 +5588,8 @@ async def update_withdraw_status(
     update_fields = {
         "status": update_data.status,
         "verified_by": current_admin.id,
-        "verified_at": now.isoformat(),
-        "processed_at": now.isoformat()
+        "verified_at": now,
+        "processed_at": now
     }
     
     if update_data.admin_notes:
@@ -5535,40 +5613,20 @@ async def update_withdraw_status(
         if not account:
             raise HTTPException(status_code=404, detail="Account not found")
         
-        # Add to user WITHDRAWAL wallet using precise decimal calculations AND set account balance to 0 (complete withdrawal)
-        user = await db.users.find_one({"id": withdraw_request["user_id"]})
-        if user:
-            # Determine withdrawal wallet field based on currency
-            currency = withdraw_request.get("currency", "IDR")
-            wallet_field = f"withdrawal_wallet_{currency.lower()}"  # withdrawal_wallet_idr or withdrawal_wallet_usd
-            current_wallet_balance = user.get(wallet_field, 0)
-            
-            # Use precise decimal calculations for withdrawal wallet balance update
-            current_wallet_decimal = to_decimal(current_wallet_balance)
-            verified_amount_decimal = to_decimal(update_data.verified_amount)
-            new_wallet_decimal = decimal_add(current_wallet_decimal, verified_amount_decimal)
-            new_wallet_balance = to_float(decimal_round(new_wallet_decimal))
-            
-            await db.users.update_one(
-                {"id": withdraw_request["user_id"]},
-                {"$set": {wallet_field: new_wallet_balance}}
-            )
-        
-        # CRITICAL FIX: Set account balance to 0 after withdrawal approval
-        try:
-            result = await db.ad_accounts.update_one(
-                {"id": withdraw_request["account_id"]},
-                {"$set": {"balance": 0}}
-            )
-            logger.info(f"Balance update result for account {withdraw_request['account_id']}: matched={result.matched_count}, modified={result.modified_count}")
-            
-            if result.matched_count == 0:
-                logger.error(f"Account not found for balance update: {withdraw_request['account_id']}")
-            elif result.modified_count == 0:
-                logger.warning(f"Account balance was already 0 for account: {withdraw_request['account_id']}")
-        except Exception as e:
-            logger.error(f"Error updating account balance to 0: {e}")
-            # Don't raise exception to not block the withdrawal approval
+        # Add to user WITHDRAWAL wallet AND set account balance to 0 (complete withdrawal), as one ledger operation
+        currency = withdraw_request.get("currency", "IDR")
+        await ledger.post(
+            db,
+            [
+                ledger.wallet(withdraw_request["user_id"], ledger.wallet_field("withdrawal", currency),
+                              update_data.verified_amount, currency, missing_ok=True),
+                ledger.ad_account(withdraw_request["account_id"], currency=currency, set_to=0),
+            ],
+            "withdraw",
+            user_id=withdraw_request["user_id"],
+            reference_id=withdraw_id,
+            description=f"Penarikan dari akun {withdraw_request.get('account_name', 'Unknown')}"
+        )
         
         # Update transaction status to completed
         await db.transactions.update_one(
@@ -5601,7 +5659,7 @@ async def update_withdraw_status(
         }
         
         client_notification_dict = prepare_for_mongo(client_notification)
-        await db.client_notifications.insert_one(client_notification_dict)
+        await insert_client_notification(client_notification_dict)
         
         # Send email notification to client
         try:
@@ -5624,32 +5682,21 @@ async def update_withdraw_status(
         
     elif update_data.status == "completed":
         # Admin marks as completed - ensure balance is 0 (safety net in case admin skipped 'approved')
-        try:
-            result = await db.ad_accounts.update_one(
-                {"id": withdraw_request["account_id"]},
-                {"$set": {"balance": 0}}
-            )
-            logger.info(f"Completed status - Balance update result for account {withdraw_request['account_id']}: matched={result.matched_count}, modified={result.modified_count}")
-        except Exception as e:
-            logger.error(f"Error updating account balance to 0 on completed: {e}")
-        
-        # If verified_amount exists, ensure wallet is updated using precise calculations
+        # If verified_amount exists, ensure wallet is updated as well
+        currency = withdraw_request.get("currency", "IDR")
+        postings = [ledger.ad_account(withdraw_request["account_id"], currency=currency, set_to=0, missing_ok=True)]
         if update_data.verified_amount:
-            user = await db.users.find_one({"id": withdraw_request["user_id"]})
-            if user:
-                wallet_field = "wallet_balance_idr" if withdraw_request.get("currency", "IDR") == "IDR" else "wallet_balance_usd"
-                current_wallet_balance = user.get(wallet_field, 0)
-                
-                # Use precise decimal calculations for wallet balance update
-                current_wallet_decimal = to_decimal(current_wallet_balance)
-                verified_amount_decimal = to_decimal(update_data.verified_amount)
-                new_wallet_decimal = decimal_add(current_wallet_decimal, verified_amount_decimal)
-                new_wallet_balance = to_float(decimal_round(new_wallet_decimal))
-                
-                await db.users.update_one(
-                    {"id": withdraw_request["user_id"]},
-                    {"$set": {wallet_field: new_wallet_balance}}
-                )
+            wallet_field = "wallet_balance_idr" if currency == "IDR" else "wallet_balance_usd"
+            postings.append(ledger.wallet(withdraw_request["user_id"], wallet_field, update_data.verified_amount,
+                                          currency, missing_ok=True))
+        await ledger.post(
+            db,
+            postings,
+            "withdraw",
+            user_id=withdraw_request["user_id"],
+            reference_id=withdraw_id,
+            description=f"Penarikan dari akun {withdraw_request.get('account_name', 'Unknown')} selesai"
+        )
         
         # Create completion notification for client
         currency_symbol = "Rp " if withdraw_request.get('currency', 'IDR') == "IDR" else "$"
@@ -5669,7 +5716,7 @@ async def update_withdraw_status(
         }
         
         client_notification_dict = prepare_for_mongo(client_notification)
-        await db.client_notifications.insert_one(client_notification_dict)
+        await insert_client_notification(client_notification_dict)
         
     elif update_data.status == "rejected":
         # Update transaction status to failed
@@ -5696,12 +5743,15 @@ async def update_withdraw_status(
         }
         
         client_notification_dict = prepare_for_mongo(client_notification)
-        await db.client_notifications.insert_one(client_notification_dict)
+        await insert_client_notification(client_notification_dict)
     
-    await db.withdraw_requests.update_one(
-        {"id": withdraw_id},
+    # Conditional on the status read above, so two concurrent reviews count once in the rollups
+    status_result = await db.withdraw_requests.update_one(
+        {"id": withdraw_id, "status": current_status},
         {"$set": update_fields}
     )
+    if status_result.modified_count == 1:
+        await record_status_change(db, WITHDRAW, withdraw_request, current_status, update_fields["status"])
     
     return {"message": f"Withdraw request {update_data.status} successfully"}
 
@@ -5820,6 +5870,7 @@ async def get_balance_proof_file(
 @api_router.get("/client/balance-proof/{withdraw_id}")
 async def get_client_balance_proof(
     withdraw_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Get actual balance proof for client's own withdrawal request"""
@@ -5848,17 +5899,13 @@ async def get_client_balance_proof(
         else:
             gcs_path = proof_url
         
-        try:
-            # Try GCS first
-            content, mime_type = await download_from_gcs(gcs_path)
-            logger.info(f"✅ Served client actual balance proof from GCS: {gcs_path}")
-            return Response(content=content, media_type=mime_type)
-        except:
-            # Fallback to filesystem
-            file_path = Path(f"/app/uploads/{gcs_path}")
-            if file_path.exists():
-                return FileResponse(path=str(file_path))
-            raise HTTPException(status_code=404, detail="Actual balance proof file not found")
+        # GCS first, legacy uploads directory as fallback
+        return await serve_gcs_path(
+            request,
+            gcs_path,
+            ACL_USER,
+            fallback_paths=[Path(f"/app/uploads/{gcs_path}")]
+        )
             
     except HTTPException:
         raise
@@ -5869,28 +5916,36 @@ async def get_client_balance_proof(
 # Admin Wallet Management endpoints
 @api_router.get("/admin/wallet-topup-requests", response_model=List[dict])
 async def get_wallet_topup_requests(
+    response: Response,
     status: Optional[str] = None,
-    current_admin: AdminUser = Depends(get_current_admin)
+    page: QueuePageParams = Depends(queue_page_params),
+    current_admin: AdminUser = Depends(get_current_admin),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
-    """Get all wallet top-up requests for admin review"""
+    """Get wallet top-up requests for admin review, newest first (keyset paginated)"""
     query = {}
     if status:
         query["status"] = status
     
-    requests = await db.wallet_topup_requests.find(query).sort("created_at", -1).to_list(1000)
+    requests = await fetch_queue_page(db.wallet_topup_requests, apply_queue_filters(query, page), page, response)
+    
+    # Resolve users, proofs and admins for the whole page with one query per collection
+    await loaders.users.load_many(req["user_id"] for req in requests)
+    await loaders.payment_proofs.load_many(req.get("payment_proof_id") for req in requests)
+    await loaders.admin_users.load_many(req.get("verified_by") or req.get("admin_id") for req in requests)
     
     result = []
     for req in requests:
         req = parse_from_mongo(req)
         
         # Get user info
-        user = await db.users.find_one({"id": req["user_id"]})
+        user = loaders.users.get(req["user_id"])
         user = parse_from_mongo(user) if user else {}
         
         # Get payment proof if exists
         payment_proof = None
         if req.get("payment_proof_id"):
-            proof = await db.payment_proofs.find_one({"id": req["payment_proof_id"]})
+            proof = loaders.payment_proofs.get(req["payment_proof_id"])
             if proof:
                 payment_proof = parse_from_mongo(proof)
         
@@ -5898,7 +5953,7 @@ async def get_wallet_topup_requests(
         verified_by_admin = None
         admin_id = req.get("verified_by") or req.get("admin_id")
         if admin_id:
-            admin = await db.admin_users.find_one({"id": admin_id})
+            admin = loaders.admin_users.get(admin_id)
             if admin:
                 admin = parse_from_mongo(admin)
                 verified_by_admin = {
@@ -5949,15 +6004,51 @@ async def get_wallet_topup_requests(
     return result
 
 
-async def enrich_accounts_with_proof_status(accounts, request_id):
+def get_account_proof_tracking_ids(accounts, request_id) -> List[str]:
+    """Tracking ids of the spend limit / budget aspire proofs attached to request accounts"""
+    tracking_ids = []
+    for acc in accounts:
+        account_id = acc.get("account_id")
+        if acc.get("spend_limit_proof_url"):
+            tracking_ids.append(f"proof_tracking_{request_id}_{account_id}_spend_limit")
+        if acc.get("budget_aspire_proof_url"):
+            tracking_ids.append(f"proof_tracking_{request_id}_{account_id}_budget_aspire")
+    return tracking_ids
+
+async def load_topup_request_relations(requests, loaders: RequestLoaders):
+    """Prime loaders with every user, admin, proof and ad account referenced by top-up requests"""
+    await loaders.users.load_many(req["user_id"] for req in requests)
+    await loaders.payment_proofs.load_many(req.get("payment_proof_id") for req in requests)
+    await loaders.admin_users.load_many(
+        admin_id
+        for req in requests
+        for admin_id in (req.get("verified_by"), req.get("admin_id"), req.get("claimed_by"))
+    )
+    await loaders.ad_accounts.load_many(
+        acc.get("account_id") for req in requests for acc in req.get("accounts", [])
+    )
+    await loaders.proofs_by_tracking_id.load_many(
+        tracking_id
+        for req in requests
+        for tracking_id in get_account_proof_tracking_ids(req.get("accounts", []), req["id"])
+    )
+
+async def enrich_accounts_with_proof_status(accounts, request_id, loaders: Optional[RequestLoaders] = None):
     """Enrich accounts array with proof edit pending status and fee_percentage"""
+    if loaders is None:
+        loaders = RequestLoaders(db)
+    
+    # No-ops when the caller already primed the loaders for the whole page
+    await loaders.ad_accounts.load_many(acc.get("account_id") for acc in accounts)
+    await loaders.proofs_by_tracking_id.load_many(get_account_proof_tracking_ids(accounts, request_id))
+    
     enriched = []
     for acc in accounts:
         acc_copy = acc.copy()
         account_id = acc.get("account_id")
         
         # Get account details including fee_percentage
-        account_details = await db.ad_accounts.find_one({"id": account_id})
+        account_details = loaders.ad_accounts.get(account_id)
         if account_details:
             acc_copy["fee_percentage"] = account_details.get("fee_percentage", 0)
             acc_copy["platform"] = account_details.get("platform", "Unknown")
@@ -5965,14 +6056,14 @@ async def enrich_accounts_with_proof_status(accounts, request_id):
         # Check if spend_limit_proof has pending edit using tracking_id
         if acc.get("spend_limit_proof_url"):
             tracking_id = f"proof_tracking_{request_id}_{account_id}_spend_limit"
-            proof = await db.payment_proofs.find_one({"tracking_id": tracking_id})
+            proof = loaders.proofs_by_tracking_id.get(tracking_id)
             if proof:
                 acc_copy["spend_limit_proof_pending_edit"] = proof.get("pending_edit", False)
         
         # Check if budget_aspire_proof has pending edit using tracking_id
         if acc.get("budget_aspire_proof_url"):
             tracking_id = f"proof_tracking_{request_id}_{account_id}_budget_aspire"
-            proof = await db.payment_proofs.find_one({"tracking_id": tracking_id})
+            proof = loaders.proofs_by_tracking_id.get(tracking_id)
             if proof:
                 acc_copy["budget_aspire_proof_pending_edit"] = proof.get("pending_edit", False)
         
@@ -5982,28 +6073,33 @@ async def enrich_accounts_with_proof_status(accounts, request_id):
 
 @api_router.get("/admin/topup-requests", response_model=List[dict])
 async def get_account_topup_requests(
+    response: Response,
     status: Optional[str] = None,
-    current_admin: AdminUser = Depends(get_current_admin)
+    page: QueuePageParams = Depends(queue_page_params),
+    current_admin: AdminUser = Depends(get_current_admin),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
-    """Get all account top-up requests for admin review"""
+    """Get account top-up requests for admin review, newest first (keyset paginated)"""
     query = {}
     if status:
         query["status"] = status
     
-    requests = await db.topup_requests.find(query).sort("created_at", -1).to_list(1000)
+    requests = await fetch_queue_page(db.topup_requests, apply_queue_filters(query, page), page, response)
+    
+    await load_topup_request_relations(requests, loaders)
     
     result = []
     for req in requests:
         req = parse_from_mongo(req)
         
         # Get user info
-        user = await db.users.find_one({"id": req["user_id"]})
+        user = loaders.users.get(req["user_id"])
         user = parse_from_mongo(user) if user else {}
         
         # Get payment proof if exists
         payment_proof = None
         if req.get("payment_proof_id"):
-            proof = await db.payment_proofs.find_one({"id": req["payment_proof_id"]})
+            proof = loaders.payment_proofs.get(req["payment_proof_id"])
             if proof:
                 payment_proof = parse_from_mongo(proof)
         
@@ -6011,7 +6107,7 @@ async def get_account_topup_requests(
         verified_by_admin = None
         admin_id = req.get("verified_by") or req.get("admin_id")
         if admin_id:
-            admin = await db.admin_users.find_one({"id": admin_id})
+            admin = loaders.admin_users.get(admin_id)
             if admin:
                 admin = parse_from_mongo(admin)
                 verified_by_admin = {
@@ -6024,7 +6120,7 @@ async def get_account_topup_requests(
         claimed_by_admin = None
         claimed_by_id = req.get("claimed_by")
         if claimed_by_id:
-            admin = await db.admin_users.find_one({"id": claimed_by_id})
+            admin = loaders.admin_users.get(claimed_by_id)
             if admin:
                 admin = parse_from_mongo(admin)
                 claimed_by_admin = {
@@ -6045,7 +6141,7 @@ async def get_account_topup_requests(
             "currency": req["currency"],
             "total_amount": req["total_amount"],
             "total_fee": req.get("total_fee", 0),
-            "accounts": await enrich_accounts_with_proof_status(req.get("accounts", []), req["id"]),  # Pass request_id
+            "accounts": await enrich_accounts_with_proof_status(req.get("accounts", []), req["id"], loaders),  # Pass request_id
             "unique_code": req.get("unique_code", 0),
             "total_with_unique_code": req.get("total_with_unique_code", req["total_amount"]),
             "bank_name": req.get("bank_name"),
@@ -6076,11 +6172,10 @@ async def get_account_topup_requests(
 @api_router.get("/admin/transactions/{transaction_id}/payment-proof")
 async def get_transaction_payment_proof(
     transaction_id: str,
+    request: Request,
     current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Get transaction payment proof file"""
-    from fastapi.responses import Response
-    
     logger.info(f"📥 Transaction proof request: transaction_id={transaction_id}")
     
     try:
@@ -6119,36 +6214,32 @@ async def get_transaction_payment_proof(
         if not proof:
             raise HTTPException(status_code=404, detail="Payment proof not found")
         
-        # Serve from GCS
         storage_type = proof.get("storage_type", "gcs")
+        file_name = proof.get("file_name", "proof.jpg")
+        
+        # Serve from blob storage
+        if storage_type == "blob":
+            return await serve_proof_blob(request, proof, {})
         
+        # Serve from GCS
         if storage_type == "gcs":
             gcs_path = proof.get("gcs_path")
             if not gcs_path:
                 raise HTTPException(status_code=404, detail="GCS path not found")
             
-            # Download from GCS
-            content, mime_type = await download_from_gcs(gcs_path)
-            logger.info(f"✅ Served transaction proof from GCS: {gcs_path}")
-            
-            return Response(
-                content=content,
-                media_type=mime_type,
-                headers={
-                    "Cache-Control": "public, max-age=3600",
-                    "Content-Disposition": f'inline; filename="{proof.get("file_name", "proof.jpg")}"'
-                }
-            )
+            return await serve_gcs_path(request, gcs_path, ACL_ADMIN, file_name=file_name, content_type=proof.get("mime_type"))
         else:
             # Local file fallback
-            file_path = proof.get("file_path")
-            if not file_path or not Path(file_path).exists():
+            stored = open_local_file([proof.get("file_path")], proof.get("mime_type", "image/jpeg"))
+            if not stored:
                 raise HTTPException(status_code=404, detail="File not found")
             
-            return FileResponse(
-                path=file_path,
-                media_type=proof.get("mime_type", "image/jpeg"),
-                filename=proof.get("file_name", "proof.jpg")
+            return await serve_file(
+                request,
+                stored,
+                ACL_ADMIN,
+                file_name=file_name,
+                headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
             )
     
     except HTTPException:
@@ -6160,6 +6251,7 @@ async def get_transaction_payment_proof(
 @api_router.get("/admin/wallet-topup-requests/{topup_id}/payment-proof")
 async def get_wallet_topup_payment_proof(
     topup_id: str,
+    request: Request,
     current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Get wallet top-up payment proof file from database"""
@@ -6193,42 +6285,32 @@ async def get_wallet_topup_payment_proof(
         content_type = proof.get("mime_type", "image/jpeg")
         file_name = proof.get("file_name", "proof.jpg")
         
+        headers = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "GET",
+            "Access-Control-Allow-Headers": "Authorization"
+        }
+        
         # Check storage type and serve accordingly
-        if storage_type == "gcs":
+        if storage_type == "blob":
+            return await serve_proof_blob(request, proof, headers)
+        
+        elif storage_type == "gcs":
             # Serve from Google Cloud Storage
             gcs_path = proof.get("gcs_path")
             if not gcs_path:
                 raise HTTPException(status_code=404, detail="GCS path not found")
             
             try:
-                from google.cloud import storage
-                import os
-                
-                os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/app/backend/gcs-service-account.json"
-                storage_client = storage.Client()
-                bucket_name = proof.get("gcs_bucket", os.getenv("GCS_BUCKET_NAME"))
-                bucket = storage_client.bucket(bucket_name)
-                blob = bucket.blob(gcs_path)
-                
-                # Download file content
-                file_content = blob.download_as_bytes()
-                
-                logger.info(f"✅ Served from GCS: proof_id={payment_proof_id}, path={gcs_path}, size={len(file_content)} bytes")
-                
-                return Response(
-                    content=file_content,
-                    media_type=content_type,
-                    headers={
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Methods": "GET",
-                        "Access-Control-Allow-Headers": "Authorization",
-                        "Content-Disposition": f'inline; filename="{file_name}"',
-                        "Cache-Control": "no-cache, must-revalidate"  # Force reload, no caching
-                    }
-                )
+                stored = await open_gcs_file(gcs_path, proof.get("gcs_bucket"), content_type)
             except Exception as e:
-                logger.error(f"Error downloading from GCS: {e}")
+                logger.error(f"Error reading from GCS: {e}")
                 raise HTTPException(status_code=500, detail="Error retrieving file from GCS")
+            if not stored:
+                raise HTTPException(status_code=404, detail="File not found in storage")
+            
+            logger.info(f"✅ Serving from GCS: proof_id={payment_proof_id}, path={gcs_path}, size={stored.size} bytes")
+            return await serve_file(request, stored, ACL_ADMIN, file_name=file_name, headers=headers)
         
         elif storage_type == "database":
             # Serve from database (base64 stored)
@@ -6282,7 +6364,6 @@ async def get_wallet_topup_payment_proof(
             
             # Handle both relative and absolute paths
             from pathlib import Path
-            from fastapi.responses import FileResponse
             
             file_path_obj = Path(file_path)
             if not file_path_obj.is_absolute():
@@ -6294,16 +6375,8 @@ async def get_wallet_topup_payment_proof(
                 # File exists on filesystem - serve it directly
                 logger.info(f"✅ Served wallet topup proof from filesystem: proof_id={payment_proof_id}, path={file_path_obj}, size={file_path_obj.stat().st_size} bytes")
                 
-                return FileResponse(
-                    path=file_path_obj,
-                    media_type=content_type,
-                    headers={
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Methods": "GET",
-                        "Access-Control-Allow-Headers": "Authorization",
-                        "Content-Disposition": f'inline; filename="{file_name}"'
-                    }
-                )
+                stored = open_local_file([file_path_obj], content_type)
+                return await serve_file(request, stored, ACL_ADMIN, file_name=file_name, headers=headers)
             else:
                 # File NOT found on filesystem - Try to migrate from any available source
                 logger.warning(f"⚠️ File not found on filesystem: {file_path_obj}")
@@ -6350,32 +6423,44 @@ async def get_wallet_topup_payment_proof(
 
 @api_router.get("/admin/wallet-transfer-requests", response_model=List[dict])
 async def get_wallet_transfer_requests(
+    response: Response,
     status: Optional[str] = None,
-    current_admin: AdminUser = Depends(get_current_admin)
+    page: QueuePageParams = Depends(queue_page_params),
+    current_admin: AdminUser = Depends(get_current_admin),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
-    """Get all wallet-to-account transfer requests for admin review"""
+    """Get wallet-to-account transfer requests for admin review, newest first (keyset paginated)"""
     query = {}
     if status:
         query["status"] = status
     
-    requests = await db.wallet_transfers.find(query).sort("created_at", -1).to_list(1000)
+    requests = await fetch_queue_page(db.wallet_transfers, apply_queue_filters(query, page), page, response)
+    
+    await loaders.users.load_many(req["user_id"] for req in requests)
+    await loaders.ad_accounts.load_many(req["target_account_id"] for req in requests)
+    await loaders.admin_users.load_many(req.get("verified_by") for req in requests)
+    await loaders.pending_proofs_by_tracking_id.load_many(
+        f"proof_tracking_{req['id']}_{req['target_account_id']}_{proof_type}"
+        for req in requests
+        for proof_type in ("spend_limit", "budget_aspire")
+    )
     
     result = []
     for req in requests:
         req = parse_from_mongo(req)
         
         # Get user info
-        user = await db.users.find_one({"id": req["user_id"]})
+        user = loaders.users.get(req["user_id"])
         user = parse_from_mongo(user) if user else {}
         
         # Get target account info
-        account = await db.ad_accounts.find_one({"id": req["target_account_id"]})
+        account = loaders.ad_accounts.get(req["target_account_id"])
         account = parse_from_mongo(account) if account else {}
         
         # Get admin info if verified
         verified_by_admin = None
         if req.get("verified_by"):
-            admin = await db.admin_users.find_one({"id": req["verified_by"]})
+            admin = loaders.admin_users.get(req["verified_by"])
             if admin:
                 admin = parse_from_mongo(admin)
                 verified_by_admin = {
@@ -6390,17 +6475,11 @@ async def get_wallet_transfer_requests(
         
         # Check spend_limit proof pending edit
         spend_limit_tracking_id = f"proof_tracking_{transfer_id}_{target_account_id}_spend_limit"
-        spend_limit_pending = await db.payment_proofs.find_one({
-            "tracking_id": spend_limit_tracking_id,
-            "pending_edit": True
-        })
+        spend_limit_pending = loaders.pending_proofs_by_tracking_id.get(spend_limit_tracking_id)
         
         # Check budget_aspire proof pending edit
         budget_aspire_tracking_id = f"proof_tracking_{transfer_id}_{target_account_id}_budget_aspire"
-        budget_aspire_pending = await db.payment_proofs.find_one({
-            "tracking_id": budget_aspire_tracking_id,
-            "pending_edit": True
-        })
+        budget_aspire_pending = loaders.pending_proofs_by_tracking_id.get(budget_aspire_tracking_id)
         
         result.append({
             "id": req["id"],
@@ -6466,7 +6545,7 @@ async def update_wallet_topup_status(
         "status": update_data.status,
         "verified_by": current_admin.id,
         "admin_notes": update_data.admin_notes or "",
-        "verified_at": datetime.now(timezone.utc).isoformat()  # Set timestamp for both verified and rejected
+        "verified_at": datetime.now(timezone.utc)  # Set timestamp for both verified and rejected
     }
     
     # If verified, update user wallet balance
@@ -6480,9 +6559,13 @@ async def update_wallet_topup_status(
         # Update user wallet balance
         wallet_field = f"{wallet_type}_wallet_{currency_lower}"  # main_wallet_idr or withdrawal_wallet_usd
         
-        await db.users.update_one(
-            {"id": user_id},
-            {"$inc": {wallet_field: amount}}
+        await ledger.post(
+            db,
+            [ledger.wallet(user_id, wallet_field, amount, currency_original, missing_ok=True)],
+            "wallet_topup",
+            user_id=user_id,
+            reference_id=request_id,
+            description=f"Top-Up {wallet_type.title()} Wallet"
         )
         
         # Get user for notification
@@ -6520,7 +6603,7 @@ async def update_wallet_topup_status(
         }
         
         notification_dict = prepare_for_mongo(notification)
-        await db.client_notifications.insert_one(notification_dict)
+        await insert_client_notification(notification_dict)
         
         # Send email notification to client about wallet top-up approval
         try:
@@ -6554,7 +6637,7 @@ async def update_wallet_topup_status(
         }
         
         notification_dict = prepare_for_mongo(notification)
-        await db.client_notifications.insert_one(notification_dict)
+        await insert_client_notification(notification_dict)
         
         # Send email notification to client about wallet top-up rejection
         try:
@@ -6595,10 +6678,13 @@ async def update_wallet_topup_status(
         transaction_dict = prepare_for_mongo(transaction)
         await db.transactions.insert_one(transaction_dict)
     
-    await db.wallet_topup_requests.update_one(
-        {"id": request_id},
+    # Conditional on the status read above, so two concurrent reviews count once in the rollups
+    status_result = await db.wallet_topup_requests.update_one(
+        {"id": request_id, "status": wallet_request.get("status")},
         {"$set": update_fields}
     )
+    if status_result.modified_count == 1:
+        await record_status_change(db, WALLET_TOPUP, wallet_request, wallet_request.get("status"), update_data.status)
     
     # Send email notification to client
     try:
@@ -6681,6 +6767,7 @@ class WalletTransferStatusUpdate(BaseModel):
 async def get_wallet_transfer_proof(
     transfer_id: str,
     proof_type: str,  # "spend_limit" or "budget_aspire"
+    request: Request
 ):
     """Get wallet transfer verification proof files from GCS - PUBLIC for admin use (no auth to avoid CORS)"""
     try:
@@ -6707,55 +6794,21 @@ async def get_wallet_transfer_proof(
         else:
             gcs_path = proof_url
         
-        try:
-            # Try to download from GCS first
-            content, mime_type = await download_from_gcs(gcs_path)
-            logger.info(f"✅ Served wallet transfer proof from GCS: {gcs_path}")
-            return Response(
-                content=content,
-                media_type=mime_type,
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, OPTIONS",
-                    "Access-Control-Allow-Headers": "*",
-                    "Cache-Control": "public, max-age=3600"
-                }
-            )
-        except HTTPException:
-            # If not in GCS, try filesystem fallback
-            logger.warning(f"⚠️ File not in GCS, trying filesystem: {gcs_path}")
-            
-            file_path = Path(f"/app/{proof_url}") if not proof_url.startswith("/") else Path(proof_url)
-            
-            if not file_path.exists():
-                # Try without /files/ prefix
-                file_path = Path(f"/app/uploads/{gcs_path}")
-            
-            if not file_path.exists():
-                logger.error(f"❌ Wallet transfer proof not found in GCS or filesystem: {proof_url}")
-                raise HTTPException(status_code=404, detail="Proof file not found")
-            
-            # Determine content type
-            file_name = file_path.name
-            content_type = "image/jpeg"
-            if file_name.lower().endswith('.png'):
-                content_type = "image/png"
-            elif file_name.lower().endswith('.pdf'):
-                content_type = "application/pdf"
-            elif file_name.lower().endswith('.webp'):
-                content_type = "image/webp"
-            
-            logger.info(f"✅ Served wallet transfer proof from filesystem: {file_path}")
-            return FileResponse(
-                path=file_path,
-                media_type=content_type,
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, OPTIONS",
-                    "Access-Control-Allow-Headers": "*",
-                    "Cache-Control": "public, max-age=3600"
-                }
-            )
+        # GCS first, then the legacy filesystem copies
+        return await serve_gcs_path(
+            request,
+            gcs_path,
+            ACL_ADMIN,
+            headers={
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Methods": "GET, OPTIONS",
+                "Access-Control-Allow-Headers": "*"
+            },
+            fallback_paths=[
+                Path(f"/app/{proof_url}") if not proof_url.startswith("/") else Path(proof_url),
+                Path(f"/app/uploads/{gcs_path}")
+            ]
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -6810,9 +6863,9 @@ async def update_wallet_transfer_status(
         update_fields = {
             "status": update_data.status,
             "verified_by": current_admin.id,
-            "verified_at": now.isoformat(),
+            "verified_at": now,
             "admin_notes": update_data.admin_notes or "",
-            "processed_at": now.isoformat()
+            "processed_at": now
         }
         
         # Add file paths if provided
@@ -6829,7 +6882,6 @@ async def update_wallet_transfer_status(
             
             # Deduct from wallet NOW (when approved)
             wallet_field = f"{transfer_request['source_wallet_type']}_wallet_{transfer_request['currency'].lower()}"
-            current_wallet_balance = user.get(wallet_field, 0)
             
             # Calculate total deduction: amount + fee
             transfer_amount = transfer_request["amount"]
@@ -6843,34 +6895,35 @@ async def update_wallet_transfer_status(
             
             logger.info(f"Approving transfer {request_id}: amount={transfer_amount}, fee={transfer_fee}, total_deduct={deduct_amount}")
             
-            if current_wallet_balance < deduct_amount:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Saldo wallet tidak mencukupi saat approve. Dibutuhkan: {deduct_amount:,.2f}, Tersedia: {current_wallet_balance:,.2f}"
-                )
-            
-            new_wallet_balance = current_wallet_balance - deduct_amount
-            await db.users.update_one(
-                {"id": transfer_request["user_id"]},
-                {"$set": {wallet_field: new_wallet_balance}}
-            )
-            
-            logger.info(f"Wallet deducted: {current_wallet_balance} -> {new_wallet_balance} (deducted {deduct_amount})")
-            
-            # Update target account balance
             target_account = await db.ad_accounts.find_one({
                 "id": transfer_request["target_account_id"],
                 "user_id": transfer_request["user_id"]
             })
             
+            # Deduct wallet and credit the target account in one ledger operation
+            postings = [ledger.wallet(transfer_request["user_id"], wallet_field, -deduct_amount, transfer_request["currency"])]
             if target_account:
-                current_account_balance = target_account.get("balance", 0)
-                new_account_balance = current_account_balance + transfer_request["amount"]
-                
-                await db.ad_accounts.update_one(
-                    {"id": transfer_request["target_account_id"]},
-                    {"$set": {"balance": new_account_balance}}
+                postings.append(ledger.ad_account(transfer_request["target_account_id"], transfer_request["amount"],
+                                                  transfer_request["currency"]))
+            try:
+                entries = await ledger.post(
+                    db,
+                    postings,
+                    "wallet_transfer",
+                    user_id=transfer_request["user_id"],
+                    reference_id=request_id,
+                    description=f"Transfer ke {transfer_request.get('target_account_name', '')}",
+                    metadata={"amount": transfer_amount, "fee": transfer_fee}
+                )
+            except ledger.InsufficientBalance as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Saldo wallet tidak mencukupi saat approve. Dibutuhkan: {deduct_amount:,.2f}, Tersedia: {e.available:,.2f}"
                 )
+            
+            logger.info(f"Wallet deducted: {entries[0]['balance_before']} -> {entries[0]['balance_after']} (deducted {deduct_amount})")
+            
+            if target_account:
                 
                 # Try to find existing pending transaction first
                 existing_transaction = await db.transactions.find_one({"reference_id": request_id})
@@ -6958,7 +7011,7 @@ async def update_wallet_transfer_status(
             }
             
             notification_dict = prepare_for_mongo(notification)
-            await db.client_notifications.insert_one(notification_dict)
+            await insert_client_notification(notification_dict)
             
             # Send email notification to client about wallet transfer approval
             try:
@@ -7050,7 +7103,7 @@ async def update_wallet_transfer_status(
             }
             
             notification_dict = prepare_for_mongo(notification)
-            await db.client_notifications.insert_one(notification_dict)
+            await insert_client_notification(notification_dict)
             
             # Send email notification to client about wallet transfer rejection
             try:
@@ -7071,10 +7124,13 @@ async def update_wallet_transfer_status(
             except Exception as e:
                 logger.error(f"Failed to send wallet transfer rejection email: {e}")
         
-        await db.wallet_transfers.update_one(
-            {"id": request_id},
+        # Conditional on the status read above, so two concurrent reviews count once in the rollups
+        status_result = await db.wallet_transfers.update_one(
+            {"id": request_id, "status": transfer_request.get("status")},
             {"$set": update_fields}
         )
+        if status_result.modified_count == 1:
+            await record_status_change(db, WALLET_TRANSFER, transfer_request, transfer_request.get("status"), update_data.status)
         
         logger.info(f"[update_wallet_transfer_status] Successfully completed for request_id={request_id}")
         return {"message": f"Wallet transfer request {update_data.status} successfully"}
@@ -7166,15 +7222,12 @@ async def edit_wallet_transfer_proof(
             raise HTTPException(status_code=404, detail="Wallet transfer not found")
         
         # Upload new file to GCS
-        gcs = get_gcs_storage()
         file_content = await file.read()
         file_extension = Path(file.filename).suffix or '.jpg'
         unique_filename = f"{transfer_id}_{proof_type}_{uuid.uuid4().hex[:8]}{file_extension}"
         gcs_path = f"payment_proofs/pending_edits/{unique_filename}"
         
-        # Convert bytes to file-like object for GCS upload
-        file_obj = BytesIO(file_content)
-        gcs.upload_file(file_obj, gcs_path, content_type=file.content_type)
+        await get_object_storage().upload(file_content, gcs_path, content_type=file.content_type)
         logger.info(f"📤 Uploaded new proof to GCS: {gcs_path}")
         
         # Create/update payment_proofs document with pending edit
@@ -7203,7 +7256,7 @@ async def edit_wallet_transfer_proof(
                     "new_file_url": f"/files/{gcs_path}",
                     "edit_requested_by": current_admin.id,
                     "edit_requested_by_username": current_admin.username,
-                    "edit_requested_at": datetime.now(timezone.utc).isoformat(),
+                    "edit_requested_at": datetime.now(timezone.utc),
                     "edit_notes": notes,
                     "transfer_id": transfer_id,
                     "target_account_id": target_account_id,
@@ -7228,9 +7281,9 @@ async def edit_wallet_transfer_proof(
                 "new_file_url": f"/files/{gcs_path}",
                 "edit_requested_by": current_admin.id,
                 "edit_requested_by_username": current_admin.username,
-                "edit_requested_at": datetime.now(timezone.utc).isoformat(),
+                "edit_requested_at": datetime.now(timezone.utc),
                 "edit_notes": notes,
-                "created_at": datetime.now(timezone.utc).isoformat()
+                "created_at": datetime.now(timezone.utc)
             }
             await db.payment_proofs.insert_one(proof_doc)
             logger.info(f"✅ Created new payment_proofs with pending edit: {proof_id}")
@@ -7248,7 +7301,7 @@ async def edit_wallet_transfer_proof(
                 "created_at": datetime.now(timezone.utc)
             }
             notification_dict = prepare_for_mongo(notification)
-            await db.notifications.insert_one(notification_dict)
+            await insert_admin_notification(notification_dict)
         
         logger.info(f"✅ Admin {current_admin.username} submitted proof edit for transfer {transfer_id}")
         
@@ -7440,7 +7493,7 @@ async def create_transfer_request_via_balance_transfer(
     }
     
     client_notification_dict = prepare_for_mongo(client_notification)
-    await db.client_notifications.insert_one(client_notification_dict)
+    await insert_client_notification(client_notification_dict)
     
     # Create only ONE admin notification (not per admin to avoid confusion)
     admin_notification = {
@@ -7454,7 +7507,7 @@ async def create_transfer_request_via_balance_transfer(
     }
     
     admin_notification_dict = prepare_for_mongo(admin_notification)
-    await db.notifications.insert_one(admin_notification_dict)
+    await insert_admin_notification(admin_notification_dict)
     
     return {
         "message": "Transfer request created successfully. Waiting for admin approval.",
@@ -7467,6 +7520,51 @@ async def create_transfer_request_via_balance_transfer(
     }
 
 # Financial Reports endpoints
+def financial_report_days(start_date: Optional[str], end_date: Optional[str], period: Optional[str]):
+    """Inclusive Asia/Jakarta day range of a report filter (None = open end)"""
+    # Report days are Asia/Jakarta (GMT+7) calendar days
+    today = report_today()
+    
+    start_day = end_day = None
+    if start_date and end_date:
+        try:
+            start_day = datetime.fromisoformat(start_date).date()
+            end_day = datetime.fromisoformat(end_date).date()
+        except ValueError:
+            pass
+    elif period != "all":
+        if period == "today":
+            start_day = today
+        elif period == "yesterday":
+            start_day = end_day = today - timedelta(days=1)
+        elif period == "week":
+            start_day = today - timedelta(days=7)
+        elif period == "month":
+            start_day = today.replace(day=1)
+        elif period == "year":
+            start_day = today.replace(month=1, day=1)
+    return start_day, end_day
+
+async def load_financial_summary(start_date: Optional[str], end_date: Optional[str], period: Optional[str]) -> dict:
+    """Financial summary shared by the dashboard and the export (cached until a request changes status)"""
+    start_day, end_day = financial_report_days(start_date, end_date, period)
+    
+    async def compute():
+        # Revenue = ad account top-up fees (IDR bank / USD crypto payments) + wallet transfer fees
+        # Top-up volume = wallet top-ups + ad account top-ups without fee
+        # Withdrawals by currency and status
+        totals = await financial_summary(db, start_day, end_day)
+        return {
+            **totals,
+            "period": period,
+            "date_range": {
+                "start": start_date,
+                "end": end_date
+            }
+        }
+    
+    return await report_cache.get_or_compute(("summary", period, start_date, end_date, start_day, end_day), compute)
+
 @api_router.get("/admin/financial-reports/summary")
 async def get_financial_summary(
     start_date: Optional[str] = None,
@@ -7474,249 +7572,9 @@ async def get_financial_summary(
     period: Optional[str] = "all",  # all, today, week, month, year
     current_admin: AdminUser = Depends(get_current_admin)
 ):
-    """Get financial summary for admin dashboard"""
+    """Get financial summary for admin dashboard (from the daily rollups)"""
     try:
-        # Use GMT+7 (Asia/Jakarta) timezone
-        jakarta_tz = ZoneInfo("Asia/Jakarta")
-        
-        # Parse date filters
-        date_filter = {}
-        if start_date and end_date:
-            try:
-                start_dt = datetime.fromisoformat(start_date).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=jakarta_tz)
-                end_dt = datetime.fromisoformat(end_date).replace(hour=23, minute=59, second=59, microsecond=999999, tzinfo=jakarta_tz)
-                # Convert to UTC for database comparison
-                start_dt_utc = start_dt.astimezone(timezone.utc)
-                end_dt_utc = end_dt.astimezone(timezone.utc)
-                date_filter = {"created_at": {"$gte": start_dt_utc.isoformat(), "$lte": end_dt_utc.isoformat()}}
-            except ValueError:
-                pass
-        elif period != "all":
-            now = datetime.now(jakarta_tz)  # Use Jakarta time
-            if period == "today":
-                start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                start_of_day_utc = start_of_day.astimezone(timezone.utc)
-                date_filter = {"created_at": {"$gte": start_of_day_utc.isoformat()}}
-            elif period == "yesterday":
-                yesterday = now - timedelta(days=1)
-                start_of_yesterday = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
-                end_of_yesterday = yesterday.replace(hour=23, minute=59, second=59, microsecond=999999)
-                start_of_yesterday_utc = start_of_yesterday.astimezone(timezone.utc)
-                end_of_yesterday_utc = end_of_yesterday.astimezone(timezone.utc)
-                date_filter = {"created_at": {"$gte": start_of_yesterday_utc.isoformat(), "$lte": end_of_yesterday_utc.isoformat()}}
-            elif period == "week":
-                start_of_week = now - timedelta(days=7)
-                start_of_week_utc = start_of_week.astimezone(timezone.utc)
-                date_filter = {"created_at": {"$gte": start_of_week_utc.isoformat()}}
-            elif period == "month":
-                start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                start_of_month_utc = start_of_month.astimezone(timezone.utc)
-                date_filter = {"created_at": {"$gte": start_of_month_utc.isoformat()}}
-            elif period == "year":
-                start_of_year = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-                # Convert datetime object to ISO string for MongoDB comparison
-                date_filter = {"created_at": {"$gte": start_of_year.isoformat()}}
-
-        # ============================================
-        # REVENUE CALCULATION (Fee-based transactions)
-        # ============================================
-        
-        # 1. Revenue from Ad Account Top-Up (topup_requests with bank/crypto payment)
-        # - IDR: bank transfer (bank_bca, bank_mandiri, etc.)
-        # - USD: crypto (usdt_trc20, etc.)
-        # Note: topup_requests use "verified" (admin approval), "approved", or "completed" status
-        topup_valid_filter = {**date_filter, "status": {"$in": ["verified", "approved", "completed"]}}
-        
-        # Get IDR revenue from bank transfers
-        # Note: Include empty/null payment_method as bank transfer for IDR (backward compatibility)
-        topup_idr_revenue_pipeline = [
-            {"$match": {
-                **topup_valid_filter,
-                "currency": "IDR",
-                "$or": [
-                    {"payment_method": {"$regex": "^bank_", "$options": "i"}},
-                    {"payment_method": {"$in": [None, ""]}},  # Handle empty/null payment_method
-                    {"payment_method": {"$exists": False}}
-                ]
-            }},
-            {"$project": {
-                "total_fee": 1,
-                "total_amount": 1,
-                "pure_amount": {"$subtract": ["$total_amount", "$total_fee"]}  # Amount without fee
-            }},
-            {"$group": {
-                "_id": None,
-                "total_fee": {"$sum": "$total_fee"},
-                "pure_amount": {"$sum": "$pure_amount"},  # Sum of amounts without fees
-                "count": {"$sum": 1}
-            }}
-        ]
-        topup_idr_revenue = await db.topup_requests.aggregate(topup_idr_revenue_pipeline).to_list(1)
-        topup_idr_fee = topup_idr_revenue[0]["total_fee"] if topup_idr_revenue else 0
-        topup_idr_amount = topup_idr_revenue[0]["pure_amount"] if topup_idr_revenue else 0  # Pure amount without fee
-        
-        # Get USD revenue from crypto
-        # Note: Include empty/null payment_method as crypto for USD (backward compatibility)
-        topup_usd_revenue_pipeline = [
-            {"$match": {
-                **topup_valid_filter,
-                "currency": "USD",
-                "$or": [
-                    {"payment_method": {"$regex": "usdt|crypto", "$options": "i"}},
-                    {"payment_method": {"$in": [None, ""]}},  # Handle empty/null payment_method
-                    {"payment_method": {"$exists": False}}
-                ]
-            }},
-            {"$project": {
-                "total_fee": 1,
-                "total_amount": 1,
-                "pure_amount": {"$subtract": ["$total_amount", "$total_fee"]}  # Amount without fee
-            }},
-            {"$group": {
-                "_id": None,
-                "total_fee": {"$sum": "$total_fee"},
-                "pure_amount": {"$sum": "$pure_amount"},  # Sum of amounts without fees
-                "count": {"$sum": 1}
-            }}
-        ]
-        topup_usd_revenue = await db.topup_requests.aggregate(topup_usd_revenue_pipeline).to_list(1)
-        topup_usd_fee = topup_usd_revenue[0]["total_fee"] if topup_usd_revenue else 0
-        topup_usd_amount = topup_usd_revenue[0]["pure_amount"] if topup_usd_revenue else 0  # Pure amount without fee
-        
-        # 2. Revenue from Wallet to Account Transfer (wallet_transfers)
-        # Note: wallet_transfers use "completed" (direct transfers) or "approved" (admin-managed transfers)
-        wallet_transfer_valid_filter = {**date_filter, "status": {"$in": ["completed", "approved"]}}
-        
-        # Get IDR revenue from wallet transfers
-        wallet_transfer_idr_pipeline = [
-            {"$match": {**wallet_transfer_valid_filter, "currency": "IDR"}},
-            {"$group": {
-                "_id": None,
-                "total_fee": {"$sum": "$fee"},
-                "count": {"$sum": 1}
-            }}
-        ]
-        wallet_transfer_idr = await db.wallet_transfers.aggregate(wallet_transfer_idr_pipeline).to_list(1)
-        wallet_transfer_idr_fee = wallet_transfer_idr[0]["total_fee"] if wallet_transfer_idr else 0
-        
-        # Get USD revenue from wallet transfers
-        wallet_transfer_usd_pipeline = [
-            {"$match": {**wallet_transfer_valid_filter, "currency": "USD"}},
-            {"$group": {
-                "_id": None,
-                "total_fee": {"$sum": "$fee"},
-                "count": {"$sum": 1}
-            }}
-        ]
-        wallet_transfer_usd = await db.wallet_transfers.aggregate(wallet_transfer_usd_pipeline).to_list(1)
-        wallet_transfer_usd_fee = wallet_transfer_usd[0]["total_fee"] if wallet_transfer_usd else 0
-        
-        # Calculate Total Revenue (from fees)
-        total_revenue_idr = topup_idr_fee + wallet_transfer_idr_fee
-        total_revenue_usd = topup_usd_fee + wallet_transfer_usd_fee
-        
-        # ============================================
-        # TOP-UP VOLUME CALCULATION (Amount-based, not fee)
-        # ============================================
-        
-        # 1. Wallet Top-Up (wallet_topup_requests)
-        # Note: wallet_topup_requests use "verified" (admin approval), "approved", or "completed" status
-        wallet_topup_valid_filter = {**date_filter, "status": {"$in": ["verified", "approved", "completed"]}}
-        
-        # Get IDR wallet top-ups
-        wallet_topup_idr_pipeline = [
-            {"$match": {**wallet_topup_valid_filter, "currency": "IDR"}},
-            {"$group": {
-                "_id": None,
-                "total_amount": {"$sum": "$amount"},
-                "count": {"$sum": 1}
-            }}
-        ]
-        wallet_topup_idr = await db.wallet_topup_requests.aggregate(wallet_topup_idr_pipeline).to_list(1)
-        wallet_topup_idr_amount = wallet_topup_idr[0]["total_amount"] if wallet_topup_idr else 0
-        
-        # Get USD wallet top-ups
-        wallet_topup_usd_pipeline = [
-            {"$match": {**wallet_topup_valid_filter, "currency": "USD"}},
-            {"$group": {
-                "_id": None,
-                "total_amount": {"$sum": "$amount"},
-                "count": {"$sum": 1}
-            }}
-        ]
-        wallet_topup_usd = await db.wallet_topup_requests.aggregate(wallet_topup_usd_pipeline).to_list(1)
-        wallet_topup_usd_amount = wallet_topup_usd[0]["total_amount"] if wallet_topup_usd else 0
-        
-        # 2. Ad Account Top-Up already calculated above (topup_idr_amount, topup_usd_amount)
-        
-        # Calculate Total Top-Up Volume
-        total_topup_idr = wallet_topup_idr_amount + topup_idr_amount
-        total_topup_usd = wallet_topup_usd_amount + topup_usd_amount
-        
-        # ============================================
-        # WITHDRAWAL DATA (for completeness)
-        # ============================================
-        withdraw_pipeline = [
-            {"$match": date_filter},
-            {"$group": {
-                "_id": {"currency": "$currency", "status": "$status"},
-                "total_amount": {"$sum": "$requested_amount"},
-                "count": {"$sum": 1}
-            }}
-        ]
-        withdraw_data = await db.withdraw_requests.aggregate(withdraw_pipeline).to_list(length=None)
-        
-        withdraw_summary = {"IDR": {}, "USD": {}}
-        for item in withdraw_data:
-            currency = item["_id"]["currency"]
-            status = item["_id"]["status"]
-            
-            if currency not in withdraw_summary:
-                withdraw_summary[currency] = {}
-            if status not in withdraw_summary[currency]:
-                withdraw_summary[currency][status] = {
-                    "amount": 0, "count": 0
-                }
-            
-            withdraw_summary[currency][status]["amount"] += item["total_amount"]
-            withdraw_summary[currency][status]["count"] += item["count"]
-
-        # Build final summary
-        summary = {
-            "revenue": {
-                "total_revenue_idr": total_revenue_idr,
-                "total_revenue_usd": total_revenue_usd,
-                "breakdown_idr": {
-                    "ad_account_topup_fee": topup_idr_fee,
-                    "wallet_transfer_fee": wallet_transfer_idr_fee
-                },
-                "breakdown_usd": {
-                    "ad_account_topup_fee": topup_usd_fee,
-                    "wallet_transfer_fee": wallet_transfer_usd_fee
-                }
-            },
-            "topup_volume": {
-                "total_topup_idr": total_topup_idr,
-                "total_topup_usd": total_topup_usd,
-                "breakdown_idr": {
-                    "wallet_topup": wallet_topup_idr_amount,
-                    "ad_account_topup": topup_idr_amount
-                },
-                "breakdown_usd": {
-                    "wallet_topup": wallet_topup_usd_amount,
-                    "ad_account_topup": topup_usd_amount
-                }
-            },
-            "withdraw_summary": withdraw_summary,
-            "period": period,
-            "date_range": {
-                "start": start_date,
-                "end": end_date
-            }
-        }
-
-        return summary
-
+        return await load_financial_summary(start_date, end_date, period)
     except Exception as e:
         logger.error(f"Error generating financial summary: {e}")
         raise HTTPException(status_code=500, detail="Error generating financial report")
@@ -7734,206 +7592,22 @@ async def get_financial_growth(
         # Calculate start date based on period
         if period == "day":
             start_date = now - timedelta(days=30)  # Last 30 days
-            group_format = "%Y-%m-%d"
         elif period == "week":
             start_date = now - timedelta(weeks=months_back)  # Last N weeks
-            group_format = "%Y-W%U"
         else:  # month
             start_date = now - timedelta(days=months_back * 30)  # Last N months
-            group_format = "%Y-%m"
-
-        # ============================================
-        # 1. ACCOUNT TOP-UP (topup_requests)
-        # Same filter as summary: "verified", "approved", "completed"
-        # Revenue = total_fee
-        # Top-up amount = total_amount - total_fee (pure amount)
-        # ============================================
-        account_topup_pipeline = [
-            {"$match": {
-                "created_at": {"$gte": start_date.isoformat()},
-                "status": {"$in": ["verified", "approved", "completed"]}
-            }},
-            {"$project": {
-                "period": {"$dateToString": {"format": group_format, "date": {"$dateFromString": {"dateString": "$created_at"}}}},
-                "currency": 1,
-                "total_amount": 1,
-                "total_fee": {"$ifNull": ["$total_fee", 0]},
-                "pure_amount": {"$subtract": ["$total_amount", {"$ifNull": ["$total_fee", 0]}]}
-            }},
-            {"$group": {
-                "_id": {
-                    "period": "$period",
-                    "currency": "$currency"
-                },
-                "topup_amount": {"$sum": "$pure_amount"},  # Pure amount without fee
-                "revenue": {"$sum": "$total_fee"},  # Fee only
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"_id.period": 1}}
-        ]
-        
-        # ============================================
-        # 2. WALLET TOP-UP (wallet_topup_requests)
-        # Same filter as summary: "verified", "approved", "completed"
-        # Revenue = total_fee (if exists) or calculated from total_amount
-        # Top-up amount = amount field (NOT total_amount!)
-        # ============================================
-        wallet_topup_pipeline = [
-            {"$match": {
-                "created_at": {"$gte": start_date.isoformat()},
-                "status": {"$in": ["verified", "approved", "completed"]}
-            }},
-            {"$project": {
-                "period": {"$dateToString": {"format": group_format, "date": {"$dateFromString": {"dateString": "$created_at"}}}},
-                "currency": 1,
-                "amount": 1,  # Use 'amount' field, not 'total_amount'
-                "total_amount": {"$ifNull": ["$total_amount", "$amount"]},  # Fallback to amount
-                "total_fee": {"$ifNull": ["$total_fee", 0]}
-            }},
-            {"$project": {
-                "period": 1,
-                "currency": 1,
-                "topup_amount": "$amount",  # Direct amount (already pure)
-                "revenue": "$total_fee"  # Fee if available
-            }},
-            {"$group": {
-                "_id": {
-                    "period": "$period",
-                    "currency": "$currency"
-                },
-                "topup_amount": {"$sum": "$topup_amount"},
-                "revenue": {"$sum": "$revenue"},
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"_id.period": 1}}
-        ]
-        
-        # ============================================
-        # 3. WALLET TRANSFER FEE (wallet_transfers)
-        # For revenue calculation only
-        # ============================================
-        wallet_transfer_pipeline = [
-            {"$match": {
-                "created_at": {"$gte": start_date.isoformat()},
-                "status": {"$in": ["completed", "approved"]}
-            }},
-            {"$project": {
-                "period": {"$dateToString": {"format": group_format, "date": {"$dateFromString": {"dateString": "$created_at"}}}},
-                "currency": 1,
-                "fee": {"$ifNull": ["$fee", 0]}
-            }},
-            {"$group": {
-                "_id": {
-                    "period": "$period",
-                    "currency": "$currency"
-                },
-                "revenue": {"$sum": "$fee"}
-            }},
-            {"$sort": {"_id.period": 1}}
-        ]
-        
-        # ============================================
-        # 4. WITHDRAWAL (withdraw_requests)
-        # ============================================
-        withdraw_pipeline = [
-            {"$match": {
-                "created_at": {"$gte": start_date.isoformat()},
-                "status": {"$in": ["approved", "completed"]}
-            }},
-            {"$group": {
-                "_id": {
-                    "period": {"$dateToString": {"format": group_format, "date": {"$dateFromString": {"dateString": "$created_at"}}}},
-                    "currency": "$currency"
-                },
-                "amount": {"$sum": "$requested_amount"},
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"_id.period": 1}}
-        ]
-
-        # Execute all pipelines
-        account_topup_results = await db.topup_requests.aggregate(account_topup_pipeline).to_list(length=None)
-        wallet_topup_results = await db.wallet_topup_requests.aggregate(wallet_topup_pipeline).to_list(length=None)
-        wallet_transfer_results = await db.wallet_transfers.aggregate(wallet_transfer_pipeline).to_list(length=None)
-        withdraw_results = await db.withdraw_requests.aggregate(withdraw_pipeline).to_list(length=None)
-
-        # Initialize growth data structure
-        growth_data = {
-            "topup": {"IDR": [], "USD": []},
-            "withdraw": {"IDR": [], "USD": []},
-            "revenue": {"IDR": [], "USD": []}
-        }
 
-        # Helper to aggregate by period + currency
-        def aggregate_data(results_list):
-            aggregated = {}
-            for item in results_list:
-                currency = item["_id"]["currency"]
-                period = item["_id"]["period"]
-                key = f"{period}_{currency}"
-                
-                if key not in aggregated:
-                    aggregated[key] = {
-                        "period": period,
-                        "currency": currency,
-                        "topup_amount": 0,
-                        "revenue": 0,
-                        "withdraw_amount": 0,
-                        "count": 0
-                    }
-                
-                aggregated[key]["topup_amount"] += item.get("topup_amount", 0)
-                aggregated[key]["revenue"] += item.get("revenue", 0)
-                aggregated[key]["withdraw_amount"] += item.get("amount", 0)
-                aggregated[key]["count"] += item.get("count", 0)
-            
-            return aggregated
-
-        # Aggregate account + wallet top-ups
-        combined = aggregate_data(account_topup_results + wallet_topup_results)
+        # Same statuses as the summary; grouped by Asia/Jakarta day, week (%Y-W%U) or month
+        # Top-up = ad account pure amount + wallet top-up amount
+        # Revenue = ad account top-up, wallet top-up and wallet transfer fees
+        # Withdraw = approved / completed requested amounts
+        start_day = start_date.astimezone(ZoneInfo("Asia/Jakarta")).date()
         
-        # Add wallet transfer fees to revenue
-        for item in wallet_transfer_results:
-            currency = item["_id"]["currency"]
-            period = item["_id"]["period"]
-            key = f"{period}_{currency}"
-            
-            if key in combined:
-                combined[key]["revenue"] += item["revenue"]
-            else:
-                combined[key] = {
-                    "period": period,
-                    "currency": currency,
-                    "topup_amount": 0,
-                    "revenue": item["revenue"],
-                    "withdraw_amount": 0,
-                    "count": 0
-                }
-
-        # Build top-up and revenue growth data
-        for key, data in combined.items():
-            currency = data["currency"]
-            
-            growth_data["topup"][currency].append({
-                "period": data["period"],
-                "amount": data["topup_amount"],
-                "count": data["count"]
-            })
-            
-            growth_data["revenue"][currency].append({
-                "period": data["period"],
-                "amount": data["revenue"]
-            })
-
-        # Build withdrawal growth data
-        for item in withdraw_results:
-            currency = item["_id"]["currency"]
-            
-            growth_data["withdraw"][currency].append({
-                "period": item["_id"]["period"],
-                "amount": item["amount"],
-                "count": item["count"]
-            })
+        async def compute():
+            rows = await load_rollups(db, start_day=start_day)
+            return growth_from_rollups(rows, period)
+        
+        growth_data = await report_cache.get_or_compute(("growth", period, start_day), compute)
 
         return {
             "growth_data": growth_data,
@@ -7956,20 +7630,50 @@ async def export_financial_report(
 ):
     """Export financial report to PDF or Excel"""
     try:
-        # Get financial data first
-        financial_data = await get_financial_summary(start_date, end_date, period, current_admin)
+        # Same (cached) summary the dashboard shows
+        financial_data = await load_financial_summary(start_date, end_date, period)
         
+        # Rendering runs in a worker thread so the event loop stays free
         if format == "pdf":
-            return export_financial_pdf(financial_data)
+            return await asyncio.to_thread(export_financial_pdf, financial_data)
         elif format == "xlsx":
-            return export_financial_excel(financial_data)
+            return await asyncio.to_thread(export_financial_excel, financial_data)
         else:
             raise HTTPException(status_code=400, detail="Unsupported format. Use 'pdf' or 'xlsx'")
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting financial report: {e}")
         raise HTTPException(status_code=500, detail="Error exporting report")
 
+FINANCIAL_SUMMARY_HEADERS = ["Mata Uang", "Total Revenue (Fee)", "Total Top-up", "Total Withdrawal"]
+REVENUE_BREAKDOWN_HEADERS = ["Mata Uang", "Fee Top-up Akun Iklan", "Fee Transfer Wallet"]
+TOPUP_BREAKDOWN_HEADERS = ["Mata Uang", "Top-up Wallet", "Top-up Akun Iklan"]
+
+def financial_report_rows(financial_data: dict) -> dict:
+    """
+    Rows of the financial report tables, from the load_financial_summary sections
+    
+    Total withdrawal counts approved and completed requests, as the growth chart does.
+    """
+    revenue = financial_data.get('revenue', {})
+    volume = financial_data.get('topup_volume', {})
+    withdraws = financial_data.get('withdraw_summary', {})
+    rows = {"summary": [], "revenue": [], "topup": []}
+    for currency in ("IDR", "USD"):
+        key = currency.lower()
+        fees = revenue.get(f'breakdown_{key}', {})
+        topups = volume.get(f'breakdown_{key}', {})
+        withdrawn = sum(
+            data.get('amount', 0) for status, data in withdraws.get(currency, {}).items()
+            if status in WITHDRAW_GROWTH_STATUSES
+        )
+        rows["summary"].append([currency, revenue.get(f'total_revenue_{key}', 0), volume.get(f'total_topup_{key}', 0), withdrawn])
+        rows["revenue"].append([currency, fees.get('ad_account_topup_fee', 0), fees.get('wallet_transfer_fee', 0)])
+        rows["topup"].append([currency, topups.get('wallet_topup', 0), topups.get('ad_account_topup', 0)])
+    return rows
+
 def export_financial_pdf(financial_data: dict) -> Response:
     """Export financial report as PDF"""
     buffer = BytesIO()
@@ -8043,72 +7747,57 @@ def export_financial_pdf(financial_data: dict) -> Response:
     story.append(Paragraph(f"Tanggal Generate: {datetime.now(timezone.utc).astimezone(timezone(timedelta(hours=7))).strftime('%d %B %Y, %H:%M WIB')}", normal_style))
     story.append(Spacer(1, 20))
     
+    rows = financial_report_rows(financial_data)
+    
+    def money(currency, amount):
+        symbol = "Rp" if currency == "IDR" else "$"
+        return f"{symbol} {amount:,.2f}"
+    
+    def table_style(font_size, padding):
+        return TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), font_size),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), padding),
+            ('TOPPADDING', (0, 0), (-1, -1), padding),
+        ])
+    
     # Revenue Summary
     story.append(Paragraph("RINGKASAN REVENUE", heading_style))
     
-    revenue_data = [
-        ["Mata Uang", "Total Fee", "Total Top-up", "Total Withdrawal"],
-        ["IDR", f"Rp {financial_data['revenue']['total_fees_idr']:,.2f}", 
-         f"Rp {financial_data['revenue']['total_topup_idr']:,.2f}",
-         f"Rp {financial_data['revenue']['total_withdraw_idr']:,.2f}"],
-        ["USD", f"$ {financial_data['revenue']['total_fees_usd']:,.2f}", 
-         f"$ {financial_data['revenue']['total_topup_usd']:,.2f}",
-         f"$ {financial_data['revenue']['total_withdraw_usd']:,.2f}"]
+    revenue_data = [FINANCIAL_SUMMARY_HEADERS] + [
+        [currency] + [money(currency, amount) for amount in amounts]
+        for currency, *amounts in rows["summary"]
     ]
     
-    revenue_table = Table(revenue_data, colWidths=[1*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-    revenue_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-    ]))
+    revenue_table = Table(revenue_data, colWidths=[1*inch, 1.6*inch, 1.6*inch, 1.6*inch])
+    revenue_table.setStyle(table_style(10, 8))
     
     story.append(revenue_table)
     story.append(Spacer(1, 20))
     
-    # Top-up Breakdown
-    story.append(Paragraph("BREAKDOWN TOP-UP", heading_style))
-    
-    for currency, statuses in financial_data.get('topup_summary', {}).items():
-        if not statuses:
-            continue
-            
-        story.append(Paragraph(f"Top-up {currency}:", normal_style))
+    # Revenue and Top-up Breakdown
+    for title, headers, section in (
+        ("BREAKDOWN REVENUE", REVENUE_BREAKDOWN_HEADERS, rows["revenue"]),
+        ("BREAKDOWN TOP-UP", TOPUP_BREAKDOWN_HEADERS, rows["topup"]),
+    ):
+        story.append(Paragraph(title, heading_style))
         
-        topup_breakdown_data = [["Status", "Jumlah", "Fee", "Count"]]
-        
-        for status, data in statuses.items():
-            symbol = "Rp" if currency == "IDR" else "$"
-            topup_breakdown_data.append([
-                status.title(),
-                f"{symbol} {data['amount']:,.2f}",
-                f"{symbol} {data['fee']:,.2f}",
-                str(data['count'])
-            ])
+        breakdown_data = [headers] + [
+            [currency] + [money(currency, amount) for amount in amounts]
+            for currency, *amounts in section
+        ]
         
-        topup_table = Table(topup_breakdown_data, colWidths=[1.2*inch, 1.5*inch, 1.2*inch, 0.8*inch])
-        topup_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        breakdown_table = Table(breakdown_data, colWidths=[1*inch, 2*inch, 2*inch])
+        breakdown_table.setStyle(table_style(9, 6))
         
-        story.append(topup_table)
-        story.append(Spacer(1, 10))
+        story.append(breakdown_table)
+        story.append(Spacer(1, 20))
     
     # Withdrawal Breakdown
     story.append(Spacer(1, 10))
@@ -8131,18 +7820,7 @@ def export_financial_pdf(financial_data: dict) -> Response:
             ])
         
         withdraw_table = Table(withdraw_breakdown_data, colWidths=[1.5*inch, 2*inch, 1*inch])
-        withdraw_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        withdraw_table.setStyle(table_style(9, 6))
         
         story.append(withdraw_table)
         story.append(Spacer(1, 10))
@@ -8177,129 +7855,81 @@ def export_financial_pdf(financial_data: dict) -> Response:
     )
 
 def export_financial_excel(financial_data: dict) -> Response:
-    """Export financial report as Excel"""
+    """Export financial report as Excel (write-only workbook, rows appended in order)"""
     try:
         import openpyxl
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font, PatternFill, Alignment
-        from openpyxl.utils.dataframe import dataframe_to_rows
-        import pandas as pd
         
         # Create workbook
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Laporan Keuangan"
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Laporan Keuangan")
+        header_fill = PatternFill(start_color="F3F4F6", end_color="F3F4F6", fill_type="solid")
+        
+        def styled(value, **style):
+            cell = WriteOnlyCell(ws, value=value)
+            for name, item in style.items():
+                setattr(cell, name, item)
+            return cell
+        
+        def header_row(headers):
+            ws.append([styled(header, font=Font(bold=True), fill=header_fill) for header in headers])
         
         # Title
-        ws['A1'] = "RIMURU - LAPORAN KEUANGAN"
-        ws['A1'].font = Font(bold=True, size=16)
-        ws['A1'].alignment = Alignment(horizontal='center')
-        ws.merge_cells('A1:E1')
+        ws.merged_cells.add('A1:E1')
+        ws.append([styled("RIMURU - LAPORAN KEUANGAN", font=Font(bold=True, size=16), alignment=Alignment(horizontal='center'))])
+        ws.append([])
         
         # Period info
         period_info = f"Periode: {financial_data.get('period', 'N/A')}"
         if financial_data.get('date_range', {}).get('start'):
-            period_info = f"Periode: {financial_data['date_range']['start']} - {financial_data['date_range']['end']}"
-        
-        ws['A3'] = period_info
-        ws['A4'] = f"Tanggal Generate: {datetime.now(timezone.utc).astimezone(timezone(timedelta(hours=7))).strftime('%d %B %Y, %H:%M WIB')}"
-        
-        # Revenue Summary
-        row_num = 6
-        ws[f'A{row_num}'] = "RINGKASAN REVENUE"
-        ws[f'A{row_num}'].font = Font(bold=True, size=14)
-        row_num += 1
-        
-        # Revenue headers
-        revenue_headers = ["Mata Uang", "Total Fee", "Total Top-up", "Total Withdrawal"]
-        for col, header in enumerate(revenue_headers, 1):
-            cell = ws.cell(row=row_num, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="F3F4F6", end_color="F3F4F6", fill_type="solid")
-        
-        row_num += 1
-        
-        # IDR Row
-        ws.cell(row=row_num, column=1, value="IDR")
-        ws.cell(row=row_num, column=2, value=financial_data['revenue']['total_fees_idr'])
-        ws.cell(row=row_num, column=3, value=financial_data['revenue']['total_topup_idr'])
-        ws.cell(row=row_num, column=4, value=financial_data['revenue']['total_withdraw_idr'])
-        
-        row_num += 1
-        
-        # USD Row
-        ws.cell(row=row_num, column=1, value="USD")
-        ws.cell(row=row_num, column=2, value=financial_data['revenue']['total_fees_usd'])
-        ws.cell(row=row_num, column=3, value=financial_data['revenue']['total_topup_usd'])
-        ws.cell(row=row_num, column=4, value=financial_data['revenue']['total_withdraw_usd'])
-        
-        # Add more detailed breakdowns for top-up and withdrawals
-        row_num += 3
-        
-        # Top-up Breakdown
-        ws[f'A{row_num}'] = "BREAKDOWN TOP-UP"
-        ws[f'A{row_num}'].font = Font(bold=True, size=14)
-        row_num += 2
-        
-        for currency, statuses in financial_data.get('topup_summary', {}).items():
-            if not statuses:
-                continue
-                
-            ws[f'A{row_num}'] = f"Top-up {currency}"
-            ws[f'A{row_num}'].font = Font(bold=True)
-            row_num += 1
-            
-            # Headers
-            headers = ["Status", "Jumlah", "Fee", "Count"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=row_num, column=col, value=header)
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F3F4F6", end_color="F3F4F6", fill_type="solid")
-            row_num += 1
-            
-            # Data
-            for status, data in statuses.items():
-                ws.cell(row=row_num, column=1, value=status.title())
-                ws.cell(row=row_num, column=2, value=data['amount'])
-                ws.cell(row=row_num, column=3, value=data['fee'])
-                ws.cell(row=row_num, column=4, value=data['count'])
-                row_num += 1
-            
-            row_num += 1
+            period_info = f"Periode: {financial_data['date_range']['start']} - {financial_data['date_range']['end']}"
+        
+        ws.append([period_info])
+        ws.append([f"Tanggal Generate: {datetime.now(timezone.utc).astimezone(timezone(timedelta(hours=7))).strftime('%d %B %Y, %H:%M WIB')}"])
+        ws.append([])
+        
+        rows = financial_report_rows(financial_data)
+        
+        # Revenue Summary
+        ws.append([styled("RINGKASAN REVENUE", font=Font(bold=True, size=14))])
+        header_row(FINANCIAL_SUMMARY_HEADERS)
+        for row in rows["summary"]:
+            ws.append(row)
+        ws.append([])
+        
+        # Revenue Breakdown
+        ws.append([styled("BREAKDOWN REVENUE", font=Font(bold=True, size=14))])
+        header_row(REVENUE_BREAKDOWN_HEADERS)
+        for row in rows["revenue"]:
+            ws.append(row)
+        ws.append([])
+        
+        # Top-up Breakdown
+        ws.append([styled("BREAKDOWN TOP-UP", font=Font(bold=True, size=14))])
+        header_row(TOPUP_BREAKDOWN_HEADERS)
+        for row in rows["topup"]:
+            ws.append(row)
+        ws.append([])
+        ws.append([])
         
         # Withdrawal Breakdown
-        ws[f'A{row_num}'] = "BREAKDOWN WITHDRAWAL"
-        ws[f'A{row_num}'].font = Font(bold=True, size=14)
-        row_num += 2
+        ws.append([styled("BREAKDOWN WITHDRAWAL", font=Font(bold=True, size=14))])
+        ws.append([])
         
         for currency, statuses in financial_data.get('withdraw_summary', {}).items():
             if not statuses:
                 continue
-                
-            ws[f'A{row_num}'] = f"Withdrawal {currency}"
-            ws[f'A{row_num}'].font = Font(bold=True)
-            row_num += 1
             
-            # Headers
-            headers = ["Status", "Jumlah", "Count"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=row_num, column=col, value=header)
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="F3F4F6", end_color="F3F4F6", fill_type="solid")
-            row_num += 1
-            
-            # Data
+            ws.append([styled(f"Withdrawal {currency}", font=Font(bold=True))])
+            header_row(["Status", "Jumlah", "Count"])
             for status, data in statuses.items():
-                ws.cell(row=row_num, column=1, value=status.title())
-                ws.cell(row=row_num, column=2, value=data['amount'])
-                ws.cell(row=row_num, column=3, value=data['count'])
-                row_num += 1
-            
-            row_num += 1
+                ws.append([status.title(), data['amount'], data['count']])
+            ws.append([])
         
         # Save to bytes
         buffer = BytesIO()
         wb.save(buffer)
-        buffer.seek(0)
         
         return Response(
             content=buffer.getvalue(),
@@ -8316,18 +7946,20 @@ def export_financial_excel(financial_data: dict) -> Response:
         
         output = StringIO()
         writer = csv.writer(output)
+        rows = financial_report_rows(financial_data)
         
         # Write headers and data
         writer.writerow(["RIMURU - LAPORAN KEUANGAN"])
         writer.writerow([])
-        writer.writerow(["RINGKASAN REVENUE"])
-        writer.writerow(["Mata Uang", "Total Fee", "Total Top-up", "Total Withdrawal"])
-        writer.writerow(["IDR", financial_data['revenue']['total_fees_idr'], 
-                        financial_data['revenue']['total_topup_idr'],
-                        financial_data['revenue']['total_withdraw_idr']])
-        writer.writerow(["USD", financial_data['revenue']['total_fees_usd'], 
-                        financial_data['revenue']['total_topup_usd'],
-                        financial_data['revenue']['total_withdraw_usd']])
+        for title, headers, section in (
+            ("RINGKASAN REVENUE", FINANCIAL_SUMMARY_HEADERS, rows["summary"]),
+            ("BREAKDOWN REVENUE", REVENUE_BREAKDOWN_HEADERS, rows["revenue"]),
+            ("BREAKDOWN TOP-UP", TOPUP_BREAKDOWN_HEADERS, rows["topup"]),
+        ):
+            writer.writerow([title])
+            writer.writerow(headers)
+            writer.writerows(section)
+            writer.writerow([])
         
         # Return as CSV
         return Response(
@@ -8367,8 +7999,7 @@ async def create_group(group_data: GroupCreate, current_user: User = Depends(get
     )
     
     # Save to database
-    group_dict = new_group.dict()
-    group_dict["created_at"] = group_dict["created_at"].isoformat()
+    group_dict = prepare_for_mongo(new_group.dict())
     await db.groups.insert_one(group_dict)
     
     return new_group
@@ -8478,19 +8109,20 @@ async def get_user_transfer_requests(
 # Admin Transfer Request Management endpoints
 @api_router.get("/admin/transfer-requests", response_model=List[dict])
 async def get_all_transfer_requests(
+    response: Response,
     status: Optional[str] = None,
+    page: QueuePageParams = Depends(queue_page_params),
     current_admin: AdminUser = Depends(get_current_admin)
 ):
-    """Get all transfer requests for admin management"""
+    """Get transfer requests for admin management, newest first (keyset paginated)"""
     try:
         # Build match criteria
         match_criteria = {}
         if status:
             match_criteria["status"] = status
             
-        # Get transfer requests with user and account details
-        pipeline = [
-            {"$match": match_criteria},
+        # Lookups run on the selected page only
+        lookups = [
             {"$lookup": {
                 "from": "users",
                 "localField": "user_id",
@@ -8508,11 +8140,12 @@ async def get_all_transfer_requests(
                 "localField": "admin_id",
                 "foreignField": "id",
                 "as": "admin_details"
-            }},
-            {"$sort": {"created_at": -1}}
+            }}
         ]
         
-        transfer_requests = await db.transfer_requests.aggregate(pipeline).to_list(length=None)
+        transfer_requests = await fetch_queue_page(
+            db.transfer_requests, apply_queue_filters(match_criteria, page), page, response, pipeline_tail=lookups
+        )
         
         # Process results
         result = []
@@ -8574,18 +8207,14 @@ async def upload_proof_file(
         unique_filename = f"{type}_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}{file_extension}"
         gcs_path = f"wallet_transfer_proofs/{unique_filename}"
         
-        # Get GCS storage instance
-        gcs = get_gcs_storage()
-        
         try:
             # Read file content
             file_content = await file.read()
-            file_obj = io.BytesIO(file_content)
             
             # Upload to GCS
-            gcs.upload_file(
-                file_obj=file_obj,
-                destination_path=gcs_path,
+            await get_object_storage().upload(
+                file_content,
+                gcs_path,
                 content_type=file.content_type,
                 metadata={
                     "type": type,
@@ -8694,7 +8323,7 @@ async def request_account_proof_edit(
                 "gcs_path": current_proof_url,
                 "file_url": current_proof_url,
                 "storage_type": "gcs",
-                "created_at": datetime.now(timezone.utc).isoformat()
+                "created_at": datetime.now(timezone.utc)
             }
             await db.payment_proofs.insert_one(proof_doc)
             proof_id = proof_doc["id"]
@@ -8713,13 +8342,11 @@ async def request_account_proof_edit(
         unique_filename = f"edit_{proof_type}_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}{file_extension}"
         gcs_path = f"payment_proofs/pending_edits/{unique_filename}"
         
-        gcs = get_gcs_storage()
         file_content = await file.read()
-        file_obj = io.BytesIO(file_content)
         
-        gcs.upload_file(
-            file_obj=file_obj,
-            destination_path=gcs_path,
+        await get_object_storage().upload(
+            file_content,
+            gcs_path,
             content_type=file.content_type,
             metadata={
                 "type": f"proof_edit_{proof_type}",
@@ -8739,7 +8366,7 @@ async def request_account_proof_edit(
             "new_file_url": f"/files/{gcs_path}",
             "edit_requested_by": current_admin.id,
             "edit_requested_by_username": current_admin.username,
-            "edit_requested_at": datetime.now(timezone.utc).isoformat(),
+            "edit_requested_at": datetime.now(timezone.utc),
             "edit_notes": notes,
             "proof_type": proof_type,
             "account_id": account_id,
@@ -8766,7 +8393,7 @@ async def request_account_proof_edit(
                 "created_at": datetime.now(timezone.utc)
             }
             notification_dict = prepare_for_mongo(notification)
-            await db.notifications.insert_one(notification_dict)
+            await insert_admin_notification(notification_dict)
         
         logger.info(f"📧 Notified {len(super_admins)} super admins about {proof_type} proof edit request")
         
@@ -8956,7 +8583,7 @@ async def approve_proof_edit(
             "edited_at": proof.get("edit_requested_at"),
             "approved_by": current_super_admin.id,
             "approved_by_username": current_super_admin.username,
-            "approved_at": datetime.now(timezone.utc).isoformat(),
+            "approved_at": datetime.now(timezone.utc),
             "status": "approved",
             "notes": notes
         })
@@ -8969,7 +8596,7 @@ async def approve_proof_edit(
                 "file_url": proof["new_file_url"],
                 "pending_edit": False,
                 "proof_history": proof_history,
-                "last_edited_at": datetime.now(timezone.utc).isoformat(),
+                "last_edited_at": datetime.now(timezone.utc),
                 "last_edited_by": current_super_admin.id
             },
             "$unset": {
@@ -9028,7 +8655,7 @@ async def approve_proof_edit(
                 "created_at": datetime.now(timezone.utc)
             }
             notification_dict = prepare_for_mongo(notification)
-            await db.notifications.insert_one(notification_dict)
+            await insert_admin_notification(notification_dict)
         
         # IMPORTANT: Save to admin_actions for history tracking
         action_record = {
@@ -9097,17 +8724,16 @@ async def reject_proof_edit(
             "edited_at": proof.get("edit_requested_at"),
             "rejected_by": current_super_admin.id,
             "rejected_by_username": current_super_admin.username,
-            "rejected_at": datetime.now(timezone.utc).isoformat(),
+            "rejected_at": datetime.now(timezone.utc),
             "status": "rejected",
             "notes": notes
         })
         
         # Delete new file from GCS
         try:
-            gcs = get_gcs_storage()
             gcs_path = proof.get("new_gcs_path", "").replace("/files/", "")
             if gcs_path:
-                gcs.delete_file(gcs_path)
+                await get_object_storage().delete(gcs_path)
                 logger.info(f"🗑️ Deleted rejected proof file from GCS: {gcs_path}")
         except Exception as e:
             logger.warning(f"⚠️ Could not delete rejected file: {e}")
@@ -9152,7 +8778,7 @@ async def reject_proof_edit(
                 "created_at": datetime.now(timezone.utc)
             }
             notification_dict = prepare_for_mongo(notification)
-            await db.notifications.insert_one(notification_dict)
+            await insert_admin_notification(notification_dict)
         
         # IMPORTANT: Save to admin_actions for history tracking
         request_id = proof.get("request_id")
@@ -9240,10 +8866,7 @@ async def claim_request(
         if claimed_by and claimed_by != current_admin.id:
             # Check if claim is expired (30 minutes)
             if claimed_at:
-                if isinstance(claimed_at, str):
-                    claimed_at = datetime.fromisoformat(claimed_at.replace('Z', '+00:00'))
-                
-                time_diff = datetime.now(timezone.utc) - claimed_at
+                time_diff = datetime.now(timezone.utc) - as_datetime(claimed_at)
                 if time_diff.total_seconds() < 1800:  # 30 minutes
                     # Still claimed by another admin
                     admin = await db.admin_users.find_one({"id": claimed_by})
@@ -9257,7 +8880,7 @@ async def claim_request(
         update_data = {
             "claimed_by": current_admin.id,
             "claimed_by_username": current_admin.username,
-            "claimed_at": datetime.now(timezone.utc).isoformat().replace('+00:00', '') + 'Z'
+            "claimed_at": datetime.now(timezone.utc)
         }
         
         # Update status to processing if currently pending or uploaded
@@ -9406,7 +9029,7 @@ async def force_release_request(
                 "created_at": datetime.now(timezone.utc)
             }
             notification_dict = prepare_for_mongo(notification)
-            await db.notifications.insert_one(notification_dict)
+            await insert_admin_notification(notification_dict)
         
         logger.info(f"✅ Super admin {current_super_admin.username} force released {request_type} {request_id}")
         
@@ -9469,14 +9092,19 @@ async def get_verification_file(
 @api_router.get("/files/{file_path:path}")
 async def get_gcs_file(
     file_path: str,
+    request: Request,
+    redirect: bool = False,
     authorization: Optional[str] = Header(None)
 ):
-    """Get file from Google Cloud Storage - Generic endpoint for all GCS files
+    """Get file from object storage (GCS bucket or local root) - Generic endpoint for stored files
     
     Access Control:
     - Profile pictures: Accessible by authenticated users (admin or client)
     - Payment proofs: Admin only
     - Other files: Requires authentication
+    
+    Streams the object with Range / ETag support; with ?redirect=true (or
+    FILE_SIGNED_URL_REDIRECT) it answers with a short-lived signed URL instead.
     """
     try:
         # Verify authentication if Authorization header is provided
@@ -9498,56 +9126,41 @@ async def get_gcs_file(
             except:
                 pass  # Continue without auth for public files
         
+        acl = acl_for_path(file_path)
+        
         # For profile pictures in profile_pictures/ folder, allow authenticated users
         if file_path.startswith('profile_pictures/'):
             if not authenticated_user:
                 raise HTTPException(status_code=401, detail="Authentication required for profile pictures")
         
-        # For payment proofs and sensitive files, require admin access
-        elif any(file_path.startswith(prefix) for prefix in ['payment_proofs/', 'wallet_payment_proofs/', 'verification_files/']):
+        # For payment proofs and sensitive files (file_serving.ADMIN_PREFIXES), require admin access
+        elif acl == ACL_ADMIN:
             if not is_admin:
                 raise HTTPException(status_code=403, detail="Admin access required for this file")
         
-        # Initialize GCS client
-        from google.cloud import storage
-        storage_client = storage.Client()
-        bucket_name = os.getenv("GCS_BUCKET_NAME", "rimuru-file-uploads")
-        bucket = storage_client.bucket(bucket_name)
-        
-        # Get the blob
-        blob = bucket.blob(file_path)
-        
-        if not blob.exists():
-            logger.error(f"GCS file not found: {file_path}")
+        storage = get_object_storage()
+        if storage.backend == "local":
+            try:
+                stored = open_local_file([storage.path(file_path)], guess_content_type(file_path))
+            except ValueError:
+                stored = None
+        else:
+            # One metadata request on the shared client; content is streamed in chunks
+            stored = await open_gcs_file(file_path)
+        if not stored:
+            logger.error(f"Storage file not found: {file_path}")
             raise HTTPException(status_code=404, detail="File not found in storage")
         
-        # Download blob content
-        file_content = blob.download_as_bytes()
-        
-        # Determine content type from blob or filename
-        content_type = blob.content_type or "application/octet-stream"
-        file_name = file_path.split('/')[-1]
-        
-        if not blob.content_type:
-            # Infer from extension
-            if file_name.lower().endswith(('.jpg', '.jpeg')):
-                content_type = "image/jpeg"
-            elif file_name.lower().endswith('.png'):
-                content_type = "image/png"
-            elif file_name.lower().endswith('.pdf'):
-                content_type = "application/pdf"
-            elif file_name.lower().endswith('.webp'):
-                content_type = "image/webp"
-        
-        return Response(
-            content=file_content,
-            media_type=content_type,
+        return await serve_file(
+            request,
+            stored,
+            acl,
             headers={
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "GET",
-                "Access-Control-Allow-Headers": "Authorization",
-                "Content-Disposition": f'inline; filename="{file_name}"'
-            }
+                "Access-Control-Allow-Headers": "Authorization"
+            },
+            redirect=redirect or None
         )
     except HTTPException:
         raise
@@ -9611,30 +9224,27 @@ async def update_transfer_request_status(
                 currency = transfer_request["currency"]
                 wallet_field = "wallet_balance_idr" if currency == "IDR" else "wallet_balance_usd"
                 
-                # Check wallet balance again
-                current_wallet_balance = user.get(wallet_field, 0)
-                if current_wallet_balance >= transfer_request["amount"]:
-                    # Update wallet balance using precise decimal calculations
-                    current_wallet_decimal = to_decimal(current_wallet_balance)
-                    transfer_amount_decimal = to_decimal(transfer_request["amount"])
-                    new_wallet_decimal = decimal_subtract(current_wallet_decimal, transfer_amount_decimal)
-                    new_wallet_balance = to_float(decimal_round(new_wallet_decimal))
-                    
-                    await db.users.update_one(
-                        {"id": transfer_request["user_id"]},
-                        {"$set": {wallet_field: new_wallet_balance}}
-                    )
-                    
-                    # Update account balance using precise decimal calculations
-                    current_account_balance = account.get("balance", 0)
-                    current_account_decimal = to_decimal(current_account_balance)
-                    new_account_decimal = decimal_add(current_account_decimal, transfer_amount_decimal)
-                    new_account_balance = to_float(decimal_round(new_account_decimal))
-                    
-                    await db.ad_accounts.update_one(
-                        {"id": transfer_request["account_id"]},
-                        {"$set": {"balance": new_account_balance}}
+                # Move the amount from wallet to account; the wallet debit only applies if it is covered
+                try:
+                    entries = await ledger.post(
+                        db,
+                        [
+                            ledger.wallet(transfer_request["user_id"], wallet_field, -transfer_request["amount"], currency),
+                            ledger.ad_account(transfer_request["account_id"], transfer_request["amount"], currency),
+                        ],
+                        "transfer_request",
+                        user_id=transfer_request["user_id"],
+                        reference_id=request_id,
+                        description=f"Approved transfer to {account['account_name']} ({account['platform']})"
                     )
+                except ledger.InsufficientBalance:
+                    entries = None
+                
+                if entries:
+                    current_wallet_balance = entries[0]["balance_before"]
+                    new_wallet_balance = entries[0]["balance_after"]
+                    current_account_balance = entries[1]["balance_before"]
+                    new_account_balance = entries[1]["balance_after"]
                     
                     # Create transaction record
                     transaction = Transaction(
@@ -9680,7 +9290,7 @@ async def update_transfer_request_status(
                     }
                     
                     client_notification_dict = prepare_for_mongo(client_notification)
-                    await db.client_notifications.insert_one(client_notification_dict)
+                    await insert_client_notification(client_notification_dict)
                     
                     return {
                         "message": "Transfer request approved and processed successfully",
@@ -9712,7 +9322,7 @@ async def update_transfer_request_status(
                     }
                     
                     client_notification_dict = prepare_for_mongo(client_notification)
-                    await db.client_notifications.insert_one(client_notification_dict)
+                    await insert_client_notification(client_notification_dict)
                     
                     return {
                         "message": "Transfer request approved but failed due to insufficient wallet balance",
@@ -9741,7 +9351,7 @@ async def update_transfer_request_status(
                 }
                 
                 client_notification_dict = prepare_for_mongo(client_notification)
-                await db.client_notifications.insert_one(client_notification_dict)
+                await insert_client_notification(client_notification_dict)
         
         return {
             "message": f"Transfer request {request_data.status} successfully",
@@ -9807,9 +9417,10 @@ async def upload_profile_picture(file: UploadFile = File(...), current_user: Use
         {"$set": {
             "profile_picture": profile_picture_path,
             "profile_picture_gcs": profile_picture_gcs,  # Store raw GCS path for reference
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         }}
     )
+    principal_cache.invalidate(KIND_USER, current_user.id)
     
     if result.modified_count == 0:
         raise HTTPException(
@@ -10011,6 +9622,7 @@ async def create_topup_request(request: TopUpRequest, current_user: User = Depen
     
     topup_request_dict = prepare_for_mongo(topup_request.dict())
     await db.topup_requests.insert_one(topup_request_dict)
+    await record_created(db, ACCOUNT_TOPUP, topup_request_dict)
     
     # Create admin notification
     currency_symbol = "Rp " if request.currency == "IDR" else "$"
@@ -10157,7 +9769,7 @@ async def auto_cancel_expired_topup_requests():
                 }
                 
                 user_notification_dict = prepare_for_mongo(user_notification)
-                await db.client_notifications.insert_one(user_notification_dict)
+                await insert_client_notification(user_notification_dict)
                 
                 # Send email notification to client about auto-cancellation
                 try:
@@ -10235,7 +9847,7 @@ async def auto_cancel_expired_wallet_topup_requests():
                 }
                 
                 user_notification_dict = prepare_for_mongo(user_notification)
-                await db.client_notifications.insert_one(user_notification_dict)
+                await insert_client_notification(user_notification_dict)
                 
                 # Send email notification to client about auto-cancellation
                 try:
@@ -10364,22 +9976,23 @@ async def upload_payment_proof(
             detail="Only JPG, PNG, and PDF files are allowed"
         )
     
-    # Upload to GCS
-    gcs_data = await upload_to_gcs(file, folder="payment_proofs")
+    content = await file.read()
     
-    if gcs_data["file_size"] > max_size:
+    if len(content) > max_size:
         raise HTTPException(status_code=400, detail="File size must be less than 10MB")
     
-    # Create payment proof record with GCS data
+    # Store in blob storage (identical files are kept once)
+    digest = await store_payment_proof_blob(content, file.content_type)
+    
+    # Create payment proof record referencing the blob
     payment_proof = PaymentProof(
         topup_request_id=request_id,
         user_id=current_user.id,
-        file_name=gcs_data["file_name"],
-        gcs_path=gcs_data["gcs_path"],
-        gcs_bucket=gcs_data["gcs_bucket"],
-        storage_type="gcs",
-        file_size=gcs_data["file_size"],
-        mime_type=gcs_data["mime_type"]
+        file_name=file.filename,
+        sha256=digest,
+        storage_type="blob",
+        file_size=len(content),
+        mime_type=file.content_type
     )
     
     payment_proof_dict = prepare_for_mongo(payment_proof.dict())
@@ -10567,43 +10180,20 @@ async def upload_wallet_topup_proof(
         if file_size > max_size:
             raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
         
-        # Upload to Google Cloud Storage
-        from google.cloud import storage
-        import os
+        # Store in blob storage (identical files are kept once)
+        digest = await store_payment_proof_blob(content, file.content_type)
         
-        try:
-            # Initialize GCS client
-            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/app/backend/gcs-service-account.json"
-            storage_client = storage.Client()
-            bucket_name = os.getenv("GCS_BUCKET_NAME", "rimuru-file-uploads")
-            bucket = storage_client.bucket(bucket_name)
-            
-            # Create unique filename
-            file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
-            gcs_filename = f"wallet_payment_proofs/{request_id}_{uuid.uuid4().hex}.{file_extension}"
-            
-            # Upload to GCS
-            blob = bucket.blob(gcs_filename)
-            blob.upload_from_string(content, content_type=file.content_type)
-            
-            logger.info(f"✅ Uploaded to GCS: {gcs_filename}, size={file_size}")
-            
-            # Create payment proof record with GCS info
-            proof_record = {
-                "id": str(uuid.uuid4()),
-                "user_id": current_user.id,
-                "file_name": file.filename,
-                "gcs_path": gcs_filename,
-                "gcs_bucket": bucket_name,
-                "storage_type": "gcs",
-                "file_size": file_size,
-                "mime_type": file.content_type,
-                "uploaded_at": datetime.now(timezone.utc)
-            }
-            
-        except Exception as gcs_error:
-            logger.error(f"❌ GCS upload failed: {gcs_error}")
-            raise HTTPException(status_code=500, detail=f"Failed to upload to cloud storage: {str(gcs_error)}")
+        # Create payment proof record referencing the blob
+        proof_record = {
+            "id": str(uuid.uuid4()),
+            "user_id": current_user.id,
+            "file_name": file.filename,
+            "sha256": digest,
+            "storage_type": "blob",
+            "file_size": file_size,
+            "mime_type": file.content_type,
+            "uploaded_at": datetime.now(timezone.utc)
+        }
         
         proof_record_dict = prepare_for_mongo(proof_record)
         await db.payment_proofs.insert_one(proof_record_dict)
@@ -10632,7 +10222,7 @@ async def upload_wallet_topup_proof(
         }
         
         notification_dict = prepare_for_mongo(notification)
-        await db.notifications.insert_one(notification_dict)
+        await insert_admin_notification(notification_dict)
         
         # Send email notification to admins about wallet top-up proof uploaded
         try:
@@ -10649,19 +10239,19 @@ async def upload_wallet_topup_proof(
         except Exception as e:
             logger.error(f"Failed to send wallet top-up proof uploaded email: {e}")
         
-        logger.info(f"Wallet topup proof uploaded to GCS: proof_id={proof_record['id']}, gcs_path={gcs_filename}, size={file_size}")
+        logger.info(f"Wallet topup proof uploaded: proof_id={proof_record['id']}, sha256={digest}, size={file_size}")
         
         return {
             "message": "Payment proof uploaded successfully",
             "proof_id": proof_record["id"],
             "status": "proof_uploaded",
-            "storage": "gcs"
+            "storage": "blob"
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error uploading wallet top-up proof to GCS: {e}")
+        logger.error(f"Error uploading wallet top-up proof: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to upload payment proof: {str(e)}")
 
 @api_router.put("/wallet-topup-request/{request_id}/cancel")
@@ -10719,11 +10309,12 @@ async def cancel_wallet_topup_request(
 async def get_wallet_balances(current_user: User = Depends(get_current_user)):
     """Get user wallet balances with pending amounts"""
     
-    # Get current balances from user model
-    main_idr = getattr(current_user, 'main_wallet_idr', 0.0)
-    main_usd = getattr(current_user, 'main_wallet_usd', 0.0)
-    withdrawal_idr = getattr(current_user, 'withdrawal_wallet_idr', 0.0)
-    withdrawal_usd = getattr(current_user, 'withdrawal_wallet_usd', 0.0)
+    # Get current balances (not part of the cached principal)
+    wallets = await load_wallet_balances(current_user.id)
+    main_idr = wallets["main_wallet_idr"]
+    main_usd = wallets["main_wallet_usd"]
+    withdrawal_idr = wallets["withdrawal_wallet_idr"]
+    withdrawal_usd = wallets["withdrawal_wallet_usd"]
     
     # Calculate pending amounts for each wallet
     pending_transfers = await db.wallet_transfers.find({
@@ -10818,47 +10409,21 @@ async def create_wallet_topup_request(
             "network": "USDT TRC20"
         }
     
-    # Upload payment proof to Google Cloud Storage (if provided)
+    # Store payment proof in blob storage (if provided)
     payment_proof_record = None
     if payment_proof and payment_proof.filename:
-        try:
-            from google.cloud import storage
-            import os
-            
-            # Read file content
-            content = await payment_proof.read()
-            
-            # Initialize GCS client
-            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/app/backend/gcs-service-account.json"
-            storage_client = storage.Client()
-            bucket_name = os.getenv("GCS_BUCKET_NAME", "rimuru-file-uploads")
-            bucket = storage_client.bucket(bucket_name)
-            
-            # Generate unique filename for GCS
-            file_extension = Path(payment_proof.filename).suffix
-            gcs_filename = f"wallet_payment_proofs/{str(uuid.uuid4())[:12]}{file_extension}"
-            
-            # Upload to GCS
-            blob = bucket.blob(gcs_filename)
-            blob.upload_from_string(content, content_type=payment_proof.content_type)
-            
-            logger.info(f"✅ Wallet topup proof uploaded to GCS: {gcs_filename}, size={len(content)}")
-            
-            # Create payment proof record with GCS storage
-            payment_proof_record = PaymentProof(
-                topup_request_id="",  # Will be updated after wallet request is created
-                user_id=current_user.id,
-                file_name=payment_proof.filename,
-                gcs_path=gcs_filename,
-                gcs_bucket=bucket_name,
-                storage_type="gcs",
-                file_size=len(content),
-                mime_type=payment_proof.content_type
-            )
-            
-        except Exception as gcs_error:
-            logger.error(f"❌ GCS upload failed: {gcs_error}")
-            raise HTTPException(status_code=500, detail=f"Failed to upload proof to cloud storage: {str(gcs_error)}")
+        content = await payment_proof.read()
+        digest = await store_payment_proof_blob(content, payment_proof.content_type)
+        
+        payment_proof_record = PaymentProof(
+            topup_request_id="",  # Will be updated after wallet request is created
+            user_id=current_user.id,
+            file_name=payment_proof.filename,
+            sha256=digest,
+            storage_type="blob",
+            file_size=len(content),
+            mime_type=payment_proof.content_type
+        )
     
     # Create wallet top-up request
     wallet_request = WalletTopUpRecord(
@@ -10883,6 +10448,7 @@ async def create_wallet_topup_request(
     # Save to database
     wallet_request_dict = prepare_for_mongo(wallet_request.dict())
     await db.wallet_topup_requests.insert_one(wallet_request_dict)
+    await record_created(db, WALLET_TOPUP, wallet_request_dict)
     
     # Save payment proof if it exists
     if payment_proof_record:
@@ -10962,38 +10528,21 @@ async def upload_wallet_topup_proof(
     if request.get('status') not in ['pending', 'proof_uploaded', 'rejected']:
         raise HTTPException(status_code=400, detail="Cannot upload proof for this request status")
     
-    # Upload payment proof to Google Cloud Storage
+    # Store payment proof in blob storage
     try:
-        from google.cloud import storage
-        import os
-        
         # Read file content
         content = await payment_proof.read()
         
-        # Initialize GCS client
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/app/backend/gcs-service-account.json"
-        storage_client = storage.Client()
-        bucket_name = os.getenv("GCS_BUCKET_NAME", "rimuru-file-uploads")
-        bucket = storage_client.bucket(bucket_name)
-        
-        # Generate unique filename for GCS
-        file_extension = Path(payment_proof.filename).suffix
-        gcs_filename = f"wallet_payment_proofs/{str(uuid.uuid4())[:12]}{file_extension}"
-        
-        # Upload to GCS
-        blob = bucket.blob(gcs_filename)
-        blob.upload_from_string(content, content_type=payment_proof.content_type)
-        
-        logger.info(f"✅ Wallet topup proof uploaded to GCS: {gcs_filename}, size={len(content)}")
+        # Identical files are kept once
+        digest = await store_payment_proof_blob(content, payment_proof.content_type)
         
-        # Create payment proof record with GCS storage
+        # Create payment proof record referencing the blob
         payment_proof_record = PaymentProof(
             topup_request_id=request_id,
             user_id=current_user.id,
             file_name=payment_proof.filename,
-            gcs_path=gcs_filename,
-            gcs_bucket=bucket_name,
-            storage_type="gcs",
+            sha256=digest,
+            storage_type="blob",
             file_size=len(content),
             mime_type=payment_proof.content_type
         )
@@ -11025,7 +10574,7 @@ async def upload_wallet_topup_proof(
         }
         
         notification_dict = prepare_for_mongo(notification)
-        await db.notifications.insert_one(notification_dict)
+        await insert_admin_notification(notification_dict)
         logger.info(f"✅ Admin notification created for wallet topup proof upload")
         
         # Send email notification to admins about wallet top-up proof uploaded
@@ -11051,9 +10600,11 @@ async def upload_wallet_topup_proof(
             "status": "proof_uploaded"
         }
         
-    except Exception as gcs_error:
-        logger.error(f"❌ GCS upload failed: {gcs_error}")
-        raise HTTPException(status_code=500, detail=f"Failed to upload proof to cloud storage: {str(gcs_error)}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Proof upload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to upload proof to cloud storage: {str(e)}")
 
 # Wallet transfer models
 class WalletToAccountTransfer(BaseModel):
@@ -11107,16 +10658,6 @@ async def transfer_wallet_to_account(
     if ad_account.get("currency", "IDR") != transfer.currency:
         raise HTTPException(status_code=400, detail="Currency mismatch with target account")
     
-    # For now, we'll simulate the wallet balance check and transfer
-    # In a real implementation, this would check actual wallet balances from a wallet_balances collection
-    
-    # Simulate wallet balance (for demo purposes)
-    # In production, you would fetch from actual wallet_balances collection
-    simulated_balance = 1000000 if transfer.currency == "IDR" else 1000  # Assume sufficient balance for demo
-    
-    if transfer.amount > simulated_balance:
-        raise HTTPException(status_code=400, detail="Insufficient wallet balance")
-    
     # Create transfer record WITH PROPER FEE CALCULATION
     # Calculate fee based on target account's fee_percentage AND source wallet type
     fee = 0
@@ -11139,18 +10680,29 @@ async def transfer_wallet_to_account(
         notes=transfer.notes
     )
     
+    # Debit the wallet (amount + fee) and credit the account in one ledger operation
+    try:
+        entries = await ledger.post(
+            db,
+            [
+                ledger.wallet(current_user.id, ledger.wallet_field(transfer.source_wallet_type, transfer.currency),
+                              -total, transfer.currency),
+                ledger.ad_account(transfer.target_account_id, transfer.amount, transfer.currency),
+            ],
+            "wallet_transfer",
+            user_id=current_user.id,
+            reference_id=transfer_record.id,
+            description=f"Transfer ke {transfer_record.target_account_name}",
+            metadata={"amount": transfer.amount, "fee": fee}
+        )
+    except ledger.InsufficientBalance:
+        raise HTTPException(status_code=400, detail="Insufficient wallet balance")
+    new_balance = entries[-1]["balance_after"]
+    
     # Save transfer record
     transfer_dict = prepare_for_mongo(transfer_record.dict())
     await db.wallet_transfers.insert_one(transfer_dict)
-    
-    # Update account balance
-    current_balance = ad_account.get("balance", 0)
-    new_balance = current_balance + transfer.amount
-    
-    await db.ad_accounts.update_one(
-        {"id": transfer.target_account_id},
-        {"$set": {"balance": new_balance}}
-    )
+    await record_created(db, WALLET_TRANSFER, transfer_dict)
     
     # Create notification for user
     await create_localized_notification(
@@ -11194,7 +10746,7 @@ async def transfer_wallet_to_account(
     }
     
     admin_notification_dict = prepare_for_mongo(admin_notification)
-    await db.notifications.insert_one(admin_notification_dict)
+    await insert_admin_notification(admin_notification_dict)
     
     # Send email notification to admins about new wallet-to-account transfer request
     try:
@@ -11334,6 +10886,7 @@ async def transfer_wallet_to_multiple_accounts(
             # Save transfer record
             transfer_dict = prepare_for_mongo(transfer_record.dict())
             await db.wallet_transfers.insert_one(transfer_dict)
+            await record_created(db, WALLET_TRANSFER, transfer_dict)
             
             # Create transaction record immediately with pending status for client monitoring
             transaction = Transaction(
@@ -11414,14 +10967,21 @@ async def transfer_wallet_to_multiple_accounts(
 
 @api_router.get("/wallet/statement", response_model=List[dict])
 async def get_wallet_statement(
+    response: Response,
     wallet_type: str = "main",  # main or withdrawal
     currency: str = "IDR",  # IDR or USD
     start_date: Optional[str] = None,  # YYYY-MM-DD
     end_date: Optional[str] = None,  # YYYY-MM-DD
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """Get wallet statement/history for client with optional date range filter"""
+    """
+    Get wallet statement/history for client with optional date range filter
+    
+    Rows come from the ledger with their running balances, newest first. The
+    next page is requested with the X-Next-Cursor header value as cursor.
+    """
     
     # Validate inputs
     if wallet_type not in ["main", "withdrawal"]:
@@ -11430,303 +10990,9 @@ async def get_wallet_statement(
     if currency not in ["IDR", "USD"]:
         raise HTTPException(status_code=400, detail="Invalid currency")
     
-    # Build date filter
-    # Use GMT+7 (Asia/Jakarta) timezone for Indonesian users
-    jakarta_tz = ZoneInfo("Asia/Jakarta")
-    
-    date_filter = {}
-    date_filter_str = {}  # For string-based date fields
-    
-    if start_date:
-        try:
-            # Parse date as Jakarta time, then convert to UTC for database query
-            start_dt = datetime.fromisoformat(start_date).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=jakarta_tz)
-            # Convert to UTC for database comparison
-            start_dt_utc = start_dt.astimezone(timezone.utc)
-            date_filter["$gte"] = start_dt_utc
-            # Also create string version for string-based fields
-            date_filter_str["$gte"] = start_dt_utc.isoformat()
-            logger.info(f"Start date filter: {start_date} Jakarta -> {start_dt_utc} UTC")
-        except:
-            raise HTTPException(status_code=400, detail="Invalid start_date format. Use YYYY-MM-DD")
-    
-    if end_date:
-        try:
-            # Parse date as Jakarta time, then convert to UTC for database query
-            end_dt = datetime.fromisoformat(end_date).replace(hour=23, minute=59, second=59, microsecond=999999, tzinfo=jakarta_tz)
-            # Convert to UTC for database comparison
-            end_dt_utc = end_dt.astimezone(timezone.utc)
-            date_filter["$lte"] = end_dt_utc
-            # Also create string version for string-based fields
-            date_filter_str["$lte"] = end_dt_utc.isoformat()
-            logger.info(f"End date filter: {end_date} Jakarta -> {end_dt_utc} UTC")
-        except:
-            raise HTTPException(status_code=400, detail="Invalid end_date format. Use YYYY-MM-DD")
-    
-    # Get all transactions related to this wallet
-    transactions = []
-    
-    # 1. Wallet top-ups (credit)
-    topup_query = {
-        "user_id": current_user.id,
-        "wallet_type": wallet_type,
-        "currency": currency,
-        "status": "verified"
-    }
-    # Use string-based filter for wallet topups (created_at stored as string)
-    if date_filter_str:
-        topup_query["created_at"] = date_filter_str
-    
-    wallet_topups = await db.wallet_topup_requests.find(topup_query).sort("created_at", -1).to_list(limit)
-    
-    for topup in wallet_topups:
-        topup = parse_from_mongo(topup)
-        # Convert string date to datetime if needed
-        created_at = topup["created_at"]
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-        # Ensure timezone aware
-        if created_at.tzinfo is None:
-            created_at = created_at.replace(tzinfo=timezone.utc)
-        
-        transactions.append({
-            "id": topup["id"],
-            "date": created_at,
-            "type": "credit",
-            "description": f"Top-Up {wallet_type.title()} Wallet",
-            "amount": topup["amount"],
-            "currency": currency,
-            "reference": topup.get("reference_code", topup["id"][:8]),
-            "status": "completed"
-        })
-    
-    # 2. Account deletion balance transfers (credit to withdrawal wallet)
-    if wallet_type == "withdrawal":
-        deletion_query = {
-            "user_id": current_user.id,
-            "type": "account_deletion_balance_transfer",
-            "currency": currency,
-            "status": "completed"
-        }
-        if date_filter:
-            deletion_query["created_at"] = date_filter
-        
-        deletion_transfers = await db.transactions.find(deletion_query).sort("created_at", -1).to_list(limit)
-        
-        for deletion in deletion_transfers:
-            deletion = parse_from_mongo(deletion)
-            created_at = deletion["created_at"]
-            if isinstance(created_at, str):
-                created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-            if created_at.tzinfo is None:
-                created_at = created_at.replace(tzinfo=timezone.utc)
-            
-            transactions.append({
-                "id": deletion["id"],
-                "date": created_at,
-                "type": "credit",
-                "description": f"Transfer saldo dari akun {deletion.get('account_name', 'Unknown')} (dihapus)",
-                "amount": deletion["amount"],
-                "currency": currency,
-                "reference": deletion["id"][:8],
-                "status": "completed"
-            })
-        
-        # 2b. Withdraw requests approved (credit to withdrawal wallet)
-        withdraw_query = {
-            "user_id": current_user.id,
-            "currency": currency,
-            "status": {"$in": ["approved", "completed"]}
-        }
-        if date_filter:
-            withdraw_query["processed_at"] = date_filter
-        
-        withdraw_requests = await db.withdraw_requests.find(withdraw_query).sort("processed_at", -1).to_list(limit)
-        
-        for withdraw in withdraw_requests:
-            withdraw = parse_from_mongo(withdraw)
-            # Use processed_at when approved
-            processed_at = withdraw.get("processed_at", withdraw.get("created_at"))
-            if isinstance(processed_at, str):
-                processed_at = datetime.fromisoformat(processed_at.replace('Z', '+00:00'))
-            if processed_at.tzinfo is None:
-                processed_at = processed_at.replace(tzinfo=timezone.utc)
-            
-            # Get account name
-            account = await db.ad_accounts.find_one({"id": withdraw["account_id"]})
-            account_name = account.get("account_name", "Unknown") if account else "Unknown"
-            
-            # Use verified amount if available, else requested amount
-            credit_amount = withdraw.get("admin_verified_amount", withdraw.get("amount", 0))
-            
-            transactions.append({
-                "id": withdraw["id"],
-                "date": processed_at,
-                "type": "credit",
-                "description": f"Penarikan dari akun {account_name}",
-                "amount": credit_amount,
-                "currency": currency,
-                "reference": withdraw["id"][:8],
-                "status": "completed"
-            })
-    
-    # 3. Wallet transfers (debit) - only approved ones
-    transfer_query = {
-        "user_id": current_user.id,
-        "source_wallet_type": wallet_type,
-        "currency": currency,
-        "status": "approved"
-    }
-    if date_filter:
-        # Use processed_at for transfers (stored as proper ISODate, not string)
-        transfer_query["processed_at"] = date_filter
-    
-    wallet_transfers = await db.wallet_transfers.find(transfer_query).sort("processed_at", -1).to_list(limit)
-    
-    for transfer in wallet_transfers:
-        transfer = parse_from_mongo(transfer)
-        transfer_amount = transfer["amount"]
-        transfer_total = transfer.get("total", transfer_amount)
-        
-        # Calculate fee: if fee field exists use it, otherwise calculate from total - amount
-        transfer_fee = transfer.get("fee", 0)
-        if transfer_fee == 0 and transfer_total > transfer_amount:
-            transfer_fee = transfer_total - transfer_amount
-        
-        # Total debit = amount + fee (what was actually deducted from wallet)
-        total_debit = transfer_amount + transfer_fee
-        
-        # DEBUG: Log transfer data
-        logger.info(f"Wallet transfer: id={transfer['id'][:8]}, amount={transfer_amount}, fee={transfer_fee}, total_debit={total_debit}")
-        
-        # Use processed_at for transfers (proper ISODate object)
-        # This is when transfer was actually approved and balance was deducted
-        date_field = transfer.get("processed_at", transfer.get("created_at"))
-        if isinstance(date_field, str):
-            date_field = datetime.fromisoformat(date_field.replace('Z', '+00:00'))
-        # Ensure timezone aware
-        if date_field.tzinfo is None:
-            date_field = date_field.replace(tzinfo=timezone.utc)
-        
-        # Add transfer transaction with TOTAL amount (amount + fee)
-        transactions.append({
-            "id": transfer["id"],
-            "date": date_field,
-            "type": "debit",
-            "description": f"Transfer ke {transfer['target_account_name']}",
-            "amount": total_debit,  # Show total debit (amount + fee)
-            "currency": currency,
-            "reference": transfer["id"][:8],
-            "status": "completed",
-            "fee": transfer_fee  # Show fee in separate column
-        })
-    
-    # 4. Currency exchanges (both debit from source currency and credit to target currency)
-    # Only show for main wallet since exchanges only work with main wallet
-    if wallet_type == "main":
-        # Query exchanges where this currency is involved (either from or to)
-        exchange_query = {
-            "user_id": current_user.id,
-            "$or": [
-                {"from_currency": currency},
-                {"to_currency": currency}
-            ]
-        }
-        if date_filter:
-            exchange_query["created_at"] = date_filter
-        
-        currency_exchanges = await db.currency_exchanges.find(exchange_query).sort("created_at", -1).to_list(limit)
-        
-        for exchange in currency_exchanges:
-            exchange = parse_from_mongo(exchange)
-            created_at = exchange.get("created_at")
-            if isinstance(created_at, str):
-                created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-            if created_at.tzinfo is None:
-                created_at = created_at.replace(tzinfo=timezone.utc)
-            
-            # If this currency is the source (from), it's a debit
-            if exchange["from_currency"] == currency:
-                transactions.append({
-                    "id": exchange["id"],
-                    "date": created_at,
-                    "type": "debit",
-                    "description": f"Tukar {currency} → {exchange['to_currency']} (Rate: {exchange['exchange_rate']:.6f})",
-                    "amount": exchange["from_amount"],
-                    "currency": currency,
-                    "reference": exchange["id"][:8],
-                    "status": "completed",
-                    "fee": 0
-                })
-            # If this currency is the target (to), it's a credit
-            elif exchange["to_currency"] == currency:
-                transactions.append({
-                    "id": exchange["id"],
-                    "date": created_at,
-                    "type": "credit",
-                    "description": f"Tukar {exchange['from_currency']} → {currency} (Rate: {exchange['exchange_rate']:.6f})",
-                    "amount": exchange["to_amount"],
-                    "currency": currency,
-                    "reference": exchange["id"][:8],
-                    "status": "completed",
-                    "fee": 0
-                })
-    
-    # 5. Wallet statements (admin deductions, etc)
-    wallet_stmt_query = {
-        "user_id": current_user.id,
-        "wallet_type": f"{wallet_type}_{currency.lower()}"
-    }
-    
-    if date_filter_str:
-        wallet_stmt_query["created_at"] = date_filter_str
-    
-    wallet_statements = await db.wallet_statements.find(wallet_stmt_query).to_list(length=None)
-    
-    for stmt in wallet_statements:
-        # Parse date
-        date_field = stmt.get("created_at")
-        if isinstance(date_field, str):
-            date_field = datetime.fromisoformat(date_field.replace('Z', '+00:00'))
-        if date_field.tzinfo is None:
-            date_field = date_field.replace(tzinfo=timezone.utc)
-        
-        # Determine type based on amount
-        stmt_amount = abs(stmt.get("amount", 0))
-        tx_type = "debit" if stmt.get("amount", 0) < 0 else "credit"
-        
-        transactions.append({
-            "id": stmt["id"],
-            "date": date_field,
-            "type": tx_type,
-            "description": stmt.get("description", "Wallet adjustment"),
-            "amount": stmt_amount,
-            "currency": stmt.get("currency", currency),
-            "reference": stmt.get("reference_id", stmt["id"])[:8],
-            "status": "completed",
-            "fee": 0
-        })
-    
-    # Sort by date descending
-    transactions.sort(key=lambda x: x["date"], reverse=True)
-    
-    # Calculate running balance (from oldest to newest, then reverse)
-    # Get current wallet balance
-    user = await db.users.find_one({"id": current_user.id})
-    wallet_field = f"{wallet_type}_wallet_{currency.lower()}"
-    current_balance = user.get(wallet_field, 0)
-    
-    # Add running balance
-    balance = current_balance
-    for tx in transactions[:limit]:
-        tx["balance_after"] = balance
-        if tx["type"] == "credit":
-            balance -= tx["amount"]
-        else:  # debit
-            balance += tx["amount"]
-        tx["balance_before"] = balance
-    
-    return transactions[:limit]
+    # Dates are Asia/Jakarta days (pagination.apply_queue_filters)
+    page = QueuePageParams(limit=limit, cursor=cursor, start_date=start_date, end_date=end_date)
+    return await wallet_statement.statement_page(db, current_user.id, wallet_type, currency, page, response)
 
 @api_router.get("/wallet/statement/export/pdf")
 async def export_wallet_statement_pdf(
@@ -11736,93 +11002,9 @@ async def export_wallet_statement_pdf(
     end_date: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """Export wallet statement as PDF"""
-    from io import BytesIO
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    
-    # Get statement data (reuse existing logic)
-    params = {
-        "wallet_type": wallet_type,
-        "currency": currency,
-        "limit": 1000  # Export all
-    }
-    if start_date:
-        params["start_date"] = start_date
-    if end_date:
-        params["end_date"] = end_date
-    
-    # Get transactions using existing endpoint logic
-    transactions = await get_wallet_statement(**params, current_user=current_user)
-    
-    # Create PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    story = []
-    styles = getSampleStyleSheet()
-    
-    # Title
-    title_text = f"Wallet Statement - {wallet_type.title()} Wallet ({currency})"
-    story.append(Paragraph(title_text, styles['Title']))
-    story.append(Spacer(1, 0.2*inch))
-    
-    # Period info
-    period_text = "Periode: "
-    if start_date and end_date:
-        period_text += f"{start_date} s/d {end_date}"
-    else:
-        period_text += "Semua transaksi"
-    story.append(Paragraph(period_text, styles['Normal']))
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Table data
-    table_data = [['Tanggal', 'Tipe', 'Deskripsi', 'Jumlah', 'Saldo']]
-    
-    for tx in transactions:
-        date_str = tx['date'].strftime('%Y-%m-%d %H:%M') if isinstance(tx['date'], datetime) else str(tx['date'])
-        type_str = 'Kredit' if tx['type'] == 'credit' else 'Debit'
-        desc_str = tx['description'][:40]  # Truncate long descriptions
-        
-        # Format amount
-        if currency == 'USD':
-            amount_str = f"${tx['amount']:,.2f}"
-            balance_str = f"${tx.get('balance_after', 0):,.2f}"
-        else:
-            amount_str = f"Rp {tx['amount']:,.0f}"
-            balance_str = f"Rp {tx.get('balance_after', 0):,.0f}"
-        
-        table_data.append([date_str, type_str, desc_str, amount_str, balance_str])
-    
-    # Create table
-    table = Table(table_data, colWidths=[1.5*inch, 0.8*inch, 2.5*inch, 1.2*inch, 1.2*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-    ]))
-    
-    story.append(table)
-    
-    # Build PDF
-    doc.build(story)
-    buffer.seek(0)
-    
-    return Response(
-        content=buffer.getvalue(),
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename=Wallet_Statement_{wallet_type}_{currency}.pdf"
-        }
-    )
+    """Export wallet statement as PDF (every row of the period, streamed from the ledger)"""
+    spec, rows = wallet_statement.statement_export(db, current_user.id, wallet_type, currency, "pdf", start_date, end_date)
+    return await export_response(spec, rows, "pdf")
 
 @api_router.get("/wallet/statement/export/excel")
 async def export_wallet_statement_excel(
@@ -11832,90 +11014,9 @@ async def export_wallet_statement_excel(
     end_date: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """Export wallet statement as Excel"""
-    from io import BytesIO
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment
-    
-    # Get statement data
-    params = {
-        "wallet_type": wallet_type,
-        "currency": currency,
-        "limit": 1000  # Export all
-    }
-    if start_date:
-        params["start_date"] = start_date
-    if end_date:
-        params["end_date"] = end_date
-    
-    transactions = await get_wallet_statement(**params, current_user=current_user)
-    
-    # Create Excel workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Wallet Statement"
-    
-    # Header styling
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    
-    # Add title
-    ws['A1'] = f"Wallet Statement - {wallet_type.title()} Wallet ({currency})"
-    ws['A1'].font = Font(bold=True, size=14)
-    
-    # Add period
-    period_text = "Periode: "
-    if start_date and end_date:
-        period_text += f"{start_date} s/d {end_date}"
-    else:
-        period_text += "Semua transaksi"
-    ws['A2'] = period_text
-    
-    # Headers
-    headers = ['Tanggal', 'Tipe', 'Deskripsi', 'Jumlah', 'Saldo Setelah', 'Referensi', 'Status']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=4, column=col)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Data rows
-    row_num = 5
-    for tx in transactions:
-        date_str = tx['date'].strftime('%Y-%m-%d %H:%M') if isinstance(tx['date'], datetime) else str(tx['date'])
-        
-        ws.cell(row=row_num, column=1, value=date_str)
-        ws.cell(row=row_num, column=2, value='Kredit' if tx['type'] == 'credit' else 'Debit')
-        ws.cell(row=row_num, column=3, value=tx['description'])
-        ws.cell(row=row_num, column=4, value=tx['amount'])
-        ws.cell(row=row_num, column=5, value=tx.get('balance_after', 0))
-        ws.cell(row=row_num, column=6, value=tx.get('reference', ''))
-        ws.cell(row=row_num, column=7, value=tx.get('status', ''))
-        
-        row_num += 1
-    
-    # Adjust column widths
-    ws.column_dimensions['A'].width = 18
-    ws.column_dimensions['B'].width = 10
-    ws.column_dimensions['C'].width = 40
-    ws.column_dimensions['D'].width = 15
-    ws.column_dimensions['E'].width = 15
-    ws.column_dimensions['F'].width = 15
-    ws.column_dimensions['G'].width = 12
-    
-    # Save to buffer
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    
-    return Response(
-        content=buffer.getvalue(),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename=Wallet_Statement_{wallet_type}_{currency}.xlsx"
-        }
-    )
+    """Export wallet statement as Excel (every row of the period, streamed from the ledger)"""
+    spec, rows = wallet_statement.statement_export(db, current_user.id, wallet_type, currency, "xlsx", start_date, end_date)
+    return await export_response(spec, rows, "xlsx")
 
 @api_router.post("/withdraw", response_model=dict)
 async def withdraw_balance(request: WithdrawRequest, current_user: User = Depends(get_current_user)):
@@ -11965,6 +11066,7 @@ async def withdraw_balance(request: WithdrawRequest, current_user: User = Depend
     
     withdraw_dict = prepare_for_mongo(withdraw_record.dict())
     await db.withdraw_requests.insert_one(withdraw_dict)
+    await record_created(db, WITHDRAW, withdraw_dict)
     
     # Create transaction record in pending state
     transaction = Transaction(
@@ -11999,7 +11101,7 @@ async def withdraw_balance(request: WithdrawRequest, current_user: User = Depend
     }
     
     admin_notification_dict = prepare_for_mongo(admin_notification)
-    await db.notifications.insert_one(admin_notification_dict)
+    await insert_admin_notification(admin_notification_dict)
     
     # Send email notification to all active admins
     try:
@@ -12082,16 +11184,10 @@ async def get_monthly_topup_amount(current_user: User = Depends(get_current_user
     current_month = now.month
     current_year = now.year
     
-    # Helper function to check if a date string is in current month
-    def is_current_month(date_str):
-        if not date_str:
-            return False
-        try:
-            # Parse ISO format date string
-            date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            return date.month == current_month and date.year == current_year
-        except:
-            return False
+    # Helper function to check if a timestamp is in current month
+    def is_current_month(value):
+        date = as_datetime(value)
+        return date is not None and date.month == current_month and date.year == current_year
     
     # Fetch wallet top-up requests for current user
     wallet_requests = await db.wallet_topup_requests.find({
@@ -12141,90 +11237,82 @@ async def get_monthly_topup_amount(current_user: User = Depends(get_current_user
     }
 
 
-@api_router.post("/transactions/export/excel")
-async def export_transactions_excel(
-    request: dict,
-    current_user: User = Depends(get_current_user)
-):
-    """Export transactions to Excel"""
-    try:
-        import pandas as pd
-        from io import BytesIO
-        
-        # Get transactions data
-        transactions = request.get('transactions', [])
-        
-        # Function to format transaction type to user-friendly text
-        def format_transaction_type(trans_type):
-            type_mapping = {
-                'topup': 'Top Up',
-                'withdraw': 'Penarikan',
-                'withdraw_request': 'Penarikan',
-                'approved_transfer': 'Transfer Disetujui',
-                'transfer': 'Transfer',
-                'account_request': 'Permintaan Akun',
-                'balance_transfer': 'Transfer Saldo',
-                'fee': 'Fee/Biaya'
-            }
-            clean_type = str(trans_type).lower().strip()
-            return type_mapping.get(clean_type, clean_type.replace('_', ' ').title())
-        
-        def format_status(status):
-            status_mapping = {
-                'completed': 'Selesai',
-                'pending': 'Menunggu',
-                'approved': 'Disetujui',
-                'rejected': 'Ditolak',
-                'failed': 'Gagal',
-                'cancelled': 'Dibatalkan'
-            }
-            clean_status = str(status).lower().strip()
-            return status_mapping.get(clean_status, str(status).title())
-        
-        if not transactions:
-            # Create empty dataframe
-            df = pd.DataFrame(columns=['Tanggal', 'Jenis Transaksi', 'Akun', 'Jumlah', 'Currency', 'Status'])
-        else:
-            # Prepare data for Excel
-            data = []
-            for trans in transactions:
-                data.append({
-                    'Tanggal': trans.get('created_at', '')[:10] if trans.get('created_at') else '',
-                    'Jenis Transaksi': format_transaction_type(trans.get('type', '')),
-                    'Akun': trans.get('account_name', 'N/A'),
-                    'Jumlah': trans.get('amount', 0),
-                    'Currency': trans.get('currency', 'IDR'),
-                    'Status': format_status(trans.get('status', ''))
-                })
-            
-            df = pd.DataFrame(data)
-        
-        # Create Excel buffer
-        buffer = BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Transactions', index=False)
-            
-            # Auto-adjust column widths
-            worksheet = writer.sheets['Transactions']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except (TypeError, AttributeError):
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        buffer.seek(0)
-        
-        return Response(
-            content=buffer.getvalue(),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": "attachment; filename=transactions.xlsx"}
-        )
+TRANSACTION_TYPE_LABELS = {
+    'topup': 'Top Up',
+    'withdraw': 'Penarikan',
+    'withdraw_request': 'Penarikan',
+    'approved_transfer': 'Transfer Disetujui',
+    'transfer': 'Transfer',
+    'account_request': 'Permintaan Akun',
+    'balance_transfer': 'Transfer Saldo',
+    'fee': 'Fee/Biaya'
+}
+
+TRANSACTION_STATUS_LABELS = {
+    'completed': 'Selesai',
+    'pending': 'Menunggu',
+    'approved': 'Disetujui',
+    'rejected': 'Ditolak',
+    'failed': 'Gagal',
+    'cancelled': 'Dibatalkan'
+}
+
+def transactions_export(user_id: str, transactions: Optional[List[dict]] = None):
+    """
+    Export layout and row source of a client's transactions
+    
+    Args:
+        user_id: Client
+        transactions: Rows already filtered by the client; when None every
+            transaction of the client is streamed from the database
+    
+    Returns:
+        tuple: (ExportSpec, async iterator of rows) for export_engine
+    """
+    def format_transaction_type(trans_type):
+        clean_type = str(trans_type).lower().strip()
+        return TRANSACTION_TYPE_LABELS.get(clean_type, clean_type.replace('_', ' ').title())
+    
+    def format_status(status):
+        clean_status = str(status).lower().strip()
+        return TRANSACTION_STATUS_LABELS.get(clean_status, str(status).title())
+    
+    if transactions is None:
+        source = db.transactions.find({"user_id": user_id}, {"_id": 0}).sort([("created_at", -1), ("id", -1)]).batch_size(500)
+    else:
+        source = iterate(transactions)
+    
+    async def rows():
+        async for trans in source:
+            created_at = as_datetime(trans.get('created_at'))
+            yield [
+                created_at.strftime('%Y-%m-%d') if created_at else '',
+                format_transaction_type(trans.get('type', '')),
+                trans.get('account_name', 'N/A'),
+                trans.get('amount', 0),
+                trans.get('currency', 'IDR'),
+                format_status(trans.get('status', ''))
+            ]
+    
+    spec = ExportSpec("Transactions", "transactions",
+                      ['Tanggal', 'Jenis Transaksi', 'Akun', 'Jumlah', 'Currency', 'Status'],
+                      [12, 22, 30, 16, 10, 12], sheet_name="Transactions")
+    return spec, rows()
+
+@api_router.post("/transactions/export/excel")
+async def export_transactions_excel(
+    request: dict,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export transactions to Excel
+    
+    The rows sent in `transactions` (the client's filtered view) are exported
+    as given; without them every transaction of the client is streamed.
+    """
+    try:
+        spec, rows = transactions_export(current_user.id, request.get('transactions'))
+        return await export_response(spec, rows, "xlsx")
         
     except Exception as e:
         logger.error(f"Error exporting transactions to Excel: {e}")
@@ -12246,12 +11334,8 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
     })
     
     return {
-        "wallet_balance_idr": current_user.wallet_balance_idr,  # Legacy
-        "wallet_balance_usd": current_user.wallet_balance_usd,  # Legacy
-        "main_wallet_idr": getattr(current_user, 'main_wallet_idr', 0.0),
-        "main_wallet_usd": getattr(current_user, 'main_wallet_usd', 0.0),
-        "withdrawal_wallet_idr": getattr(current_user, 'withdrawal_wallet_idr', 0.0),
-        "withdrawal_wallet_usd": getattr(current_user, 'withdrawal_wallet_usd', 0.0),
+        # wallet_balance_idr / _usd (legacy), main_wallet_* and withdrawal_wallet_*
+        **await load_wallet_balances(current_user.id),
         "total_ads_balance": total_ads_balance,
         "accounts_count": accounts_count,
         "recent_transactions": recent_transactions
@@ -12260,13 +11344,18 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
 # Currency Exchange Endpoints
 @api_router.get("/exchange-rate/{from_currency}/{to_currency}")
 async def get_current_exchange_rate(from_currency: str, to_currency: str):
-    """Get real-time exchange rate"""
-    rate = await get_exchange_rate(from_currency.upper(), to_currency.upper())
+    """Get the current exchange rate (from the in-memory table, refreshed in the background)"""
+    try:
+        quote = exchange_rates.quote(from_currency, to_currency)
+    except RateUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     return {
-        "from_currency": from_currency.upper(),
-        "to_currency": to_currency.upper(),
-        "rate": rate,
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "from_currency": quote.from_currency,
+        "to_currency": quote.to_currency,
+        "rate": quote.rate,
+        "timestamp": quote.as_of.isoformat(),
+        "snapshot_id": quote.snapshot_id,
+        "stale": quote.stale
     }
 
 @api_router.post("/exchange", response_model=dict)
@@ -12283,60 +11372,48 @@ async def exchange_currency(request: ExchangeRequest, current_user: User = Depen
         if request.amount <= 0:
             raise HTTPException(status_code=400, detail="Amount must be greater than 0")
         
-        # Get current exchange rate
-        rate = await get_exchange_rate(request.from_currency.upper(), request.to_currency.upper())
+        # Current rate from the in-memory table; never exchange on an outdated one
+        try:
+            quote = exchange_rates.quote(request.from_currency, request.to_currency)
+        except RateUnavailable as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        if quote.stale:
+            raise HTTPException(status_code=503, detail="Exchange rates are outdated, please try again later")
+        rate = quote.rate
         to_amount = request.amount * rate
         
-        # Check sufficient balance
-        current_balance = 0
-        if request.from_currency.upper() == "IDR":
-            current_balance = current_user.main_wallet_idr
-        else:
-            current_balance = current_user.main_wallet_usd
-        
-        if current_balance < request.amount:
-            raise HTTPException(status_code=400, detail="Insufficient balance")
-        
-        # Perform exchange using precise decimal calculations
-        update_data = {"updated_at": datetime.now(timezone.utc)}
-        
-        if request.from_currency.upper() == "IDR":
-            # Subtract from IDR wallet
-            current_idr_decimal = to_decimal(current_user.main_wallet_idr)
-            request_amount_decimal = to_decimal(request.amount)
-            new_idr_decimal = decimal_subtract(current_idr_decimal, request_amount_decimal)
-            update_data["main_wallet_idr"] = to_float(decimal_round(new_idr_decimal))
-            
-            # Add to USD wallet
-            current_usd_decimal = to_decimal(current_user.main_wallet_usd)
-            to_amount_decimal = to_decimal(to_amount)
-            new_usd_decimal = decimal_add(current_usd_decimal, to_amount_decimal)
-            update_data["main_wallet_usd"] = to_float(decimal_round(new_usd_decimal))
-        else:
-            # Subtract from USD wallet
-            current_usd_decimal = to_decimal(current_user.main_wallet_usd)
-            request_amount_decimal = to_decimal(request.amount)
-            new_usd_decimal = decimal_subtract(current_usd_decimal, request_amount_decimal)
-            update_data["main_wallet_usd"] = to_float(decimal_round(new_usd_decimal))
-            
-            # Add to IDR wallet
-            current_idr_decimal = to_decimal(current_user.main_wallet_idr)
-            to_amount_decimal = to_decimal(to_amount)
-            new_idr_decimal = decimal_add(current_idr_decimal, to_amount_decimal)
-            update_data["main_wallet_idr"] = to_float(decimal_round(new_idr_decimal))
-        
-        await db.users.update_one({"id": current_user.id}, {"$set": update_data})
-        
-        # Create exchange record
+        from_currency = request.from_currency.upper()
+        to_currency = request.to_currency.upper()
         exchange_record = CurrencyExchange(
             user_id=current_user.id,
-            from_currency=request.from_currency.upper(),
-            to_currency=request.to_currency.upper(),
+            from_currency=from_currency,
+            to_currency=to_currency,
             from_amount=request.amount,
             to_amount=to_amount,
-            exchange_rate=rate
+            exchange_rate=rate,
+            rate_snapshot_id=quote.snapshot_id,
+            rate_as_of=quote.as_of
         )
         
+        # Debit the source wallet (only if covered) and credit the target wallet atomically
+        try:
+            entries = await ledger.post(
+                db,
+                [
+                    ledger.wallet(current_user.id, ledger.wallet_field("main", from_currency), -request.amount,
+                                  extra_set={"updated_at": datetime.now(timezone.utc)}),
+                    ledger.wallet(current_user.id, ledger.wallet_field("main", to_currency), to_amount),
+                ],
+                "exchange",
+                user_id=current_user.id,
+                reference_id=exchange_record.id,
+                description=f"Tukar {from_currency} → {to_currency} (Rate: {rate:.6f})",
+                metadata={"exchange_rate": rate, "rate_snapshot_id": quote.snapshot_id, "rate_as_of": quote.as_of}
+            )
+        except ledger.InsufficientBalance:
+            raise HTTPException(status_code=400, detail="Insufficient balance")
+        new_balances = {entry["currency"]: entry["balance_after"] for entry in entries}
+        
         exchange_dict = prepare_for_mongo(exchange_record.dict())
         await db.currency_exchanges.insert_one(exchange_dict)
         
@@ -12345,8 +11422,9 @@ async def exchange_currency(request: ExchangeRequest, current_user: User = Depen
             "from_amount": request.amount,
             "to_amount": to_amount,
             "exchange_rate": rate,
-            "new_balance_idr": update_data.get("main_wallet_idr", current_user.main_wallet_idr),
-            "new_balance_usd": update_data.get("main_wallet_usd", current_user.main_wallet_usd)
+            "rate_timestamp": quote.as_of.isoformat(),
+            "new_balance_idr": new_balances.get("IDR"),
+            "new_balance_usd": new_balances.get("USD")
         }
         
     except HTTPException:
@@ -13057,7 +12135,7 @@ async def get_account_details(
             })
         
         # Sort combined list by verified_at
-        topup_history.sort(key=lambda x: x.get("verified_at") or x.get("created_at"), reverse=True)
+        topup_history.sort(key=lambda x: as_datetime(x.get("verified_at") or x.get("created_at")) or MIN_DATETIME, reverse=True)
         topup_history = topup_history[:5]  # Keep only 5 most recent
         
         # Get recent withdraw requests
@@ -13103,25 +12181,32 @@ async def get_account_details(
 # Admin Share Request Management
 @api_router.get("/admin/share-requests", response_model=List[dict])
 async def get_admin_share_requests(
+    response: Response,
     status: Optional[str] = None,
     platform: Optional[str] = None,
-    current_admin: AdminUser = Depends(get_current_admin)
+    page: QueuePageParams = Depends(queue_page_params),
+    current_admin: AdminUser = Depends(get_current_admin),
+    loaders: RequestLoaders = Depends(get_request_loaders)
 ):
-    """Get all share requests for admin management"""
+    """Get share requests for admin management, newest first (keyset paginated)"""
     filter_query = {}
     if status:
         filter_query["status"] = status
     if platform:
         filter_query["platform"] = platform
     
-    requests = await db.share_requests.find(filter_query).sort("created_at", -1).to_list(length=None)
+    requests = await fetch_queue_page(db.share_requests, apply_queue_filters(filter_query, page), page, response)
+    
+    await loaders.users.load_many(request["user_id"] for request in requests)
+    await loaders.ad_accounts.load_many(request.get("account_id") for request in requests)
+    await loaders.admin_users.load_many(request.get("processed_by") for request in requests)
     
     result = []
     for request in requests:
         request = parse_from_mongo(request)
         
         # Get user info
-        user = await db.users.find_one({"id": request["user_id"]})
+        user = loaders.users.get(request["user_id"])
         user_info = None
         if user:
             user_info = {
@@ -13132,7 +12217,7 @@ async def get_admin_share_requests(
         # Get ad account info to get the real account ID
         ad_account_info = None
         if request.get("account_id"):
-            ad_account = await db.ad_accounts.find_one({"id": request["account_id"]})
+            ad_account = loaders.ad_accounts.get(request["account_id"])
             if ad_account:
                 ad_account_info = {
                     "real_account_id": ad_account.get("account_id"),  # The real ad account ID (FB/Google/TikTok ID)
@@ -13143,7 +12228,7 @@ async def get_admin_share_requests(
         # Get processed by info if available
         processed_by = None
         if request.get("processed_by"):
-            admin = await db.admin_users.find_one({"id": request["processed_by"]})
+            admin = loaders.admin_users.get(request["processed_by"])
             if admin:
                 admin = parse_from_mongo(admin)
                 processed_by = {
@@ -13175,7 +12260,7 @@ async def update_share_request_status(
     update_data = {
         "status": status_data.status,
         "processed_by": current_admin.id,
-        "processed_at": datetime.now(timezone.utc).isoformat()
+        "processed_at": datetime.now(timezone.utc)
     }
     
     if status_data.admin_notes:
@@ -13221,7 +12306,7 @@ async def update_share_request_status(
         }
         
         client_notification_dict = prepare_for_mongo(client_notification)
-        await db.client_notifications.insert_one(client_notification_dict)
+        await insert_client_notification(client_notification_dict)
         
         # Send email notification to client about share request status
         try:
@@ -13314,7 +12399,7 @@ async def bulk_update_share_request_status(
                 }
                 
                 client_notification_dict = prepare_for_mongo(client_notification)
-                await db.client_notifications.insert_one(client_notification_dict)
+                await insert_client_notification(client_notification_dict)
                 
                 # Send email notification to client about share request status (bulk update)
                 try:
@@ -13387,9 +12472,9 @@ async def get_client_notifications(
         if 'is_read' not in parsed_notif:
             parsed_notif['is_read'] = False
         
-        # Fix datetime format issue - remove trailing 'Z' if present
-        if 'created_at' in parsed_notif and isinstance(parsed_notif['created_at'], str):
-            parsed_notif['created_at'] = parsed_notif['created_at'].rstrip('Z')
+        # Legacy documents may still carry created_at as an ISO string
+        if isinstance(parsed_notif.get('created_at'), str):
+            parsed_notif['created_at'] = as_datetime(parsed_notif['created_at'])
         
         try:
             parsed_notifications.append(ClientNotificationResponse(**parsed_notif))
@@ -13401,33 +12486,61 @@ async def get_client_notifications(
 
 @api_router.get("/client/notifications/unread-count", response_model=dict)
 async def get_client_unread_notification_count(current_user: User = Depends(get_current_user)):
-    """Get count of unread notifications for client"""
-    count = await db.client_notifications.count_documents({"user_id": current_user.id, "is_read": False})
+    """Get count of unread notifications for client (incrementally maintained counter)"""
+    count = await notification_hub.unread_count(client_audience(current_user.id))
     return {"count": count}
 
+@api_router.get("/client/notifications/stream")
+async def stream_client_notifications(
+    request: Request,
+    token: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+):
+    """Server-Sent Events stream of the client's new notifications and unread count
+    
+    EventSource cannot send headers, so the JWT may also be passed as ?token=
+    """
+    user = await authenticate_stream(token or (authorization or "").replace("Bearer ", ""), "client")
+    return StreamingResponse(
+        notification_hub.stream(request, client_audience(user["id"])),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @api_router.put("/client/notifications/{notification_id}/read", response_model=dict)
 async def mark_client_notification_read(
     notification_id: str,
     current_user: User = Depends(get_current_user)
 ):
     """Mark client notification as read"""
-    result = await db.client_notifications.update_one(
+    previous = await db.client_notifications.find_one_and_update(
         {"id": notification_id, "user_id": current_user.id},
-        {"$set": {"is_read": True}}
+        {"$set": {"is_read": True}},
+        projection={"is_read": 1}
     )
     
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Notification not found")
     
+    if previous.get("is_read") is False:
+        await notification_hub.adjust_unread(client_audience(current_user.id), -1)
+    
     return {"message": "Notification marked as read"}
 
 @api_router.put("/client/notifications/mark-all-read", response_model=dict)
 async def mark_all_client_notifications_read(current_user: User = Depends(get_current_user)):
     """Mark all client notifications as read"""
+    # Only unread -> read transitions move the counter; legacy documents without is_read were never counted
+    result = await db.client_notifications.update_many(
+        {"user_id": current_user.id, "is_read": False},
+        {"$set": {"is_read": True}}
+    )
     await db.client_notifications.update_many(
-        {"user_id": current_user.id},
+        {"user_id": current_user.id, "is_read": {"$exists": False}},
         {"$set": {"is_read": True}}
     )
+    if result.modified_count:
+        await notification_hub.adjust_unread(client_audience(current_user.id), -result.modified_count)
     return {"message": "All notifications marked as read"}
 
 # ============================================================================
@@ -13481,10 +12594,10 @@ async def create_admin_topup_wallet_action(
                 "message": f"Admin {current_admin.username} requested wallet top-up for client {client.get('username')} (Amount: {amount})",
                 "type": "admin_action_pending",
                 "data": {"action_id": action_record.id, "action_type": "topup_wallet"},
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "is_read": False
             }
-            await db.notifications.insert_one(notification)
+            await insert_admin_notification(notification)
         
         logger.info(f"✅ Admin action created: topup_wallet by {current_admin.username} for client {client_id}")
         
@@ -13547,10 +12660,10 @@ async def create_admin_deduct_wallet_action(
                 "message": f"Admin {current_admin.username} requests to deduct {formatted_amount} from {client.get('name', client.get('username'))}'s {wallet_type.upper()} wallet",
                 "type": "wallet_deduction_pending",
                 "data": {"deduction_id": deduction_record.id, "client_id": client_id},
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "is_read": False
             }
-            await db.notifications.insert_one(notification)
+            await insert_admin_notification(notification)
         
         logger.info(f"✅ Wallet deduction request created by {current_admin.username} for client {client_id}: {formatted_amount} from {wallet_type}")
         
@@ -13615,10 +12728,10 @@ async def create_admin_withdraw_account_action(
                 "message": f"Admin {current_admin.username} requested account withdrawal for client {client.get('username')} (Amount: {currency} {amount})",
                 "type": "admin_action_pending",
                 "data": {"action_id": action_record.id, "action_type": "withdraw_account"},
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "is_read": False
             }
-            await db.notifications.insert_one(notification)
+            await insert_admin_notification(notification)
         
         logger.info(f"✅ Admin action created: withdraw_account by {current_admin.username} for client {client_id}")
         
@@ -13688,10 +12801,10 @@ async def create_admin_transfer_wallet_to_account_action(
                 "message": f"Admin {current_admin.username} requested wallet transfer for client {client.get('username')} (Amount: {currency} {amount})",
                 "type": "admin_action_pending",
                 "data": {"action_id": action_record.id, "action_type": "transfer_wallet_to_account"},
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "is_read": False
             }
-            await db.notifications.insert_one(notification)
+            await insert_admin_notification(notification)
         
         logger.info(f"✅ Admin action created: transfer_wallet_to_account by {current_admin.username} for client {client_id}")
         
@@ -13770,7 +12883,7 @@ async def get_admin_actions_history(
         
         # Combine and sort
         all_actions = actions_from_admin_actions + actions_from_history
-        all_actions.sort(key=lambda x: x.get("processed_at", ""), reverse=True)
+        all_actions.sort(key=lambda x: as_datetime(x.get("processed_at")) or MIN_DATETIME, reverse=True)
         
         # Apply pagination
         actions = all_actions[skip:skip+limit]
@@ -13822,6 +12935,201 @@ async def get_admin_actions_history(
         logger.error(f"❌ Failed to get actions history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Export jobs (background exports, see export_jobs.py)
+
+ADMIN_ACTION_TYPE_LABELS = {
+    "topup_wallet": "Top Up Wallet",
+    "withdraw_account": "Withdraw Akun",
+    "transfer_wallet_to_account": "Transfer Wallet ke Akun",
+    "wallet_deduction": "Potong Wallet",
+    "proof_edit": "Edit Bukti",
+}
+
+# Job kinds only super admins may request and download
+SUPER_ADMIN_EXPORTS = {"admin_actions_history"}
+
+async def produce_financial_report(params: dict, owner_id: str, fmt: str, file, progress) -> str:
+    """Financial report job: the same document as /admin/financial-reports/export"""
+    financial_data = await load_financial_summary(params.get("start_date"), params.get("end_date"), params.get("period") or "all")
+    render = export_financial_pdf if fmt == "pdf" else export_financial_excel
+    response = await asyncio.to_thread(render, financial_data)
+    await asyncio.to_thread(file.write, response.body)
+    # export_financial_excel falls back to CSV without openpyxl; keep its file name
+    disposition = response.headers.get("content-disposition", "")
+    return disposition.split("filename=", 1)[1] if "filename=" in disposition else f"financial_report.{fmt}"
+
+def admin_actions_export(params: dict, owner_id: str, fmt: str):
+    """
+    Export layout and row source of the processed admin actions
+    
+    Both collections (admin_actions and admin_actions_history) are streamed
+    newest first and merged on processed_at.
+    """
+    status_filter = params.get("status")
+    query = {"status": status_filter} if status_filter in ("approved", "rejected") else {"status": {"$in": ["approved", "rejected"]}}
+    sources = [
+        collection.find(query, {"_id": 0}).sort([("processed_at", -1), ("id", -1)]).batch_size(500)
+        for collection in (db.admin_actions, db.admin_actions_history)
+    ]
+    
+    async def rows():
+        merged = merge_sorted(sources, key=lambda action: as_datetime(action.get("processed_at")) or MIN_DATETIME, reverse=True)
+        async for action in merged:
+            processed_at = as_datetime(action.get("processed_at"))
+            action_type = action.get("action_type", "")
+            yield [
+                processed_at.strftime('%Y-%m-%d %H:%M') if processed_at else '',
+                ADMIN_ACTION_TYPE_LABELS.get(action_type, action_type.replace('_', ' ').title()),
+                action.get("client_name") or action.get("client_username") or action.get("client_id", ''),
+                action.get("amount", 0),
+                action.get("currency", 'IDR'),
+                TRANSACTION_STATUS_LABELS.get(action.get("status", ''), action.get("status", '')),
+                action.get("admin_username", ''),
+                action.get("super_admin_username", ''),
+                action.get("approval_notes") or action.get("notes") or '',
+            ]
+    
+    spec = ExportSpec(
+        "Riwayat Aksi Admin", f"admin_actions_history_{datetime.now().strftime('%Y%m%d')}",
+        ['Diproses', 'Aksi', 'Client', 'Jumlah', 'Currency', 'Status', 'Admin', 'Super Admin', 'Catatan'],
+        [17, 22, 24, 16, 10, 12, 16, 16, 30],
+        info=[f"Status: {status_filter or 'approved, rejected'}"],
+        sheet_name="Actions History",
+    )
+    return spec, rows()
+
+export_jobs.register(
+    "financial_report", produce_financial_report,
+    params=("start_date", "end_date", "period"), owner_kind=EXPORT_OWNER_ADMIN,
+)
+export_jobs.register(
+    "admin_actions_history", table_producer(admin_actions_export),
+    formats=("xlsx", "csv", "pdf"), params=("status",), owner_kind=EXPORT_OWNER_ADMIN,
+)
+export_jobs.register(
+    "wallet_statement",
+    table_producer(lambda params, user_id, fmt: wallet_statement.statement_export(
+        db, user_id, params.get("wallet_type", "main"), params.get("currency", "IDR"), fmt,
+        params.get("start_date"), params.get("end_date"))),
+    params=("wallet_type", "currency", "start_date", "end_date"),
+)
+export_jobs.register(
+    "transactions",
+    table_producer(lambda params, user_id, fmt: transactions_export(user_id)),
+    formats=("xlsx", "csv"),
+)
+
+async def submit_export_job(request: ExportJobRequest, owner_id: str, admin: bool) -> dict:
+    kind = export_jobs.kinds.get(request.kind)
+    if kind is None or (kind.owner_kind == EXPORT_OWNER_ADMIN) != admin:
+        raise HTTPException(status_code=404, detail="Unknown export")
+    if request.kind == "wallet_statement":
+        if request.params.get("wallet_type", "main") not in ["main", "withdrawal"]:
+            raise HTTPException(status_code=400, detail="Invalid wallet type")
+        if request.params.get("currency", "IDR") not in ["IDR", "USD"]:
+            raise HTTPException(status_code=400, detail="Invalid currency")
+    try:
+        job, deduplicated = await export_jobs.submit(request.kind, request.format, request.params, owner_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**job_view(job), "deduplicated": deduplicated}
+
+async def find_export_job(job_id: str, owner_id: str) -> dict:
+    job = await export_jobs.get(job_id)
+    if not job or job["owner_id"] != owner_id:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+def check_export_access(job: dict, admin: AdminUser):
+    if job["kind"] in SUPER_ADMIN_EXPORTS and not admin.is_super_admin:
+        raise HTTPException(status_code=403, detail="Super admin access required")
+
+async def serve_export_artifact(request: Request, job: dict, acl: str) -> Response:
+    """Stream a finished job's file from object storage as an attachment"""
+    if job["status"] == EXPORT_EXPIRED or (job["status"] == EXPORT_COMPLETED and job["expires_at"] <= datetime.now(timezone.utc)):
+        raise HTTPException(status_code=410, detail="Export expired, submit it again")
+    if job["status"] != EXPORT_COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Export is {job['status']}")
+    
+    storage = get_object_storage()
+    content_type = guess_content_type(job["file_name"])
+    if storage.backend == "local":
+        stored = open_local_file([storage.path(job["artifact_path"])], content_type)
+    else:
+        stored = await open_gcs_file(job["artifact_path"], content_type=content_type)
+    if not stored:
+        raise HTTPException(status_code=404, detail="Export file not found")
+    return await serve_file(
+        request,
+        stored,
+        acl,
+        file_name=job["file_name"],
+        headers={"Content-Disposition": f'attachment; filename="{job["file_name"]}"'}
+    )
+
+@api_router.post("/exports", response_model=dict)
+async def create_export_job(request: ExportJobRequest, current_user: User = Depends(get_current_user)):
+    """
+    Start a background export (wallet_statement, transactions)
+    
+    Returns the job; an identical export that is still running or whose file
+    has not expired is returned instead of starting a new one. Progress comes
+    as "export_job" events on the notification stream or by polling the job.
+    """
+    return await submit_export_job(request, current_user.id, admin=False)
+
+@api_router.get("/exports", response_model=dict)
+async def list_export_jobs(current_user: User = Depends(get_current_user)):
+    """Recent export jobs of the client"""
+    jobs = await db.export_jobs.find({"owner_id": current_user.id}, EXPORT_JOB_PROJECTION).sort("created_at", -1).to_list(50)
+    return {"jobs": jobs}
+
+@api_router.get("/exports/{job_id}", response_model=dict)
+async def get_export_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Status and progress (rows written) of an export job"""
+    return job_view(await find_export_job(job_id, current_user.id))
+
+@api_router.get("/exports/{job_id}/download")
+async def download_export_job(job_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    """Download the file of a finished export job"""
+    job = await find_export_job(job_id, current_user.id)
+    return await serve_export_artifact(request, job, ACL_USER)
+
+@api_router.post("/admin/exports", response_model=dict)
+async def create_admin_export_job(request: ExportJobRequest, current_admin: AdminUser = Depends(get_current_admin)):
+    """
+    Start a background admin export (financial_report, admin_actions_history)
+    
+    Admin exports are shared: an identical export requested by another admin
+    returns the same job and file.
+    """
+    if request.kind in SUPER_ADMIN_EXPORTS and not current_admin.is_super_admin:
+        raise HTTPException(status_code=403, detail="Super admin access required")
+    return await submit_export_job(request, current_admin.id, admin=True)
+
+@api_router.get("/admin/exports", response_model=dict)
+async def list_admin_export_jobs(current_admin: AdminUser = Depends(get_current_admin)):
+    """Recent admin export jobs"""
+    query = {"owner_id": ADMIN_AUDIENCE}
+    if not current_admin.is_super_admin:
+        query["kind"] = {"$nin": list(SUPER_ADMIN_EXPORTS)}
+    jobs = await db.export_jobs.find(query, EXPORT_JOB_PROJECTION).sort("created_at", -1).to_list(50)
+    return {"jobs": jobs}
+
+@api_router.get("/admin/exports/{job_id}", response_model=dict)
+async def get_admin_export_job(job_id: str, current_admin: AdminUser = Depends(get_current_admin)):
+    """Status and progress of an admin export job"""
+    job = await find_export_job(job_id, ADMIN_AUDIENCE)
+    check_export_access(job, current_admin)
+    return job_view(job)
+
+@api_router.get("/admin/exports/{job_id}/download")
+async def download_admin_export_job(job_id: str, request: Request, current_admin: AdminUser = Depends(get_current_admin)):
+    """Download the file of a finished admin export job"""
+    job = await find_export_job(job_id, ADMIN_AUDIENCE)
+    check_export_access(job, current_admin)
+    return await serve_export_artifact(request, job, ACL_ADMIN)
+
 @api_router.put("/super-admin/actions/{action_id}/approve", response_model=dict)
 async def approve_admin_action(
     action_id: str,
@@ -13863,9 +13171,13 @@ async def approve_admin_action(
                     raise HTTPException(status_code=400, detail="Invalid wallet type")
                 
                 # Update wallet balance
-                await db.users.update_one(
-                    {"id": client_id},
-                    {"$inc": {actual_field: amount}}
+                await ledger.post(
+                    db,
+                    [ledger.wallet(client_id, actual_field, amount, currency)],
+                    "admin_topup",
+                    user_id=client_id,
+                    reference_id=action_id,
+                    description=f"Admin top-up by {action['admin_username']}"
                 )
                 
                 # Create transaction record
@@ -13880,7 +13192,7 @@ async def approve_admin_action(
                     "status": "completed",
                     "admin_id": action["admin_id"],
                     "super_admin_id": current_super_admin.id,
-                    "created_at": datetime.now(timezone.utc).isoformat()
+                    "created_at": datetime.now(timezone.utc)
                 }
                 await db.transactions.insert_one(transaction)
                 
@@ -13891,10 +13203,10 @@ async def approve_admin_action(
                     "title": "✅ Wallet Top-Up Completed",
                     "message": f"Admin has topped up your {wallet_field.replace('_', ' ').title()} wallet with {currency} {amount:,.2f}",
                     "type": "admin_topup_completed",
-                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "created_at": datetime.now(timezone.utc),
                     "is_read": False
                 }
-                await db.client_notifications.insert_one(client_notification)
+                await insert_client_notification(client_notification)
                 
                 # Send email notification for wallet top-up completion
                 try:
@@ -13916,17 +13228,18 @@ async def approve_admin_action(
                 # Withdraw from account to withdrawal wallet
                 account_id = action["account_id"]
                 
-                # Deduct from account balance
-                await db.ad_accounts.update_one(
-                    {"id": account_id},
-                    {"$inc": {"balance": -amount}}
-                )
-                
-                # Add to withdrawal wallet
+                # Move the amount from the account balance to the withdrawal wallet
                 wallet_field = "withdrawal_wallet_idr" if currency == "IDR" else "withdrawal_wallet_usd"
-                await db.users.update_one(
-                    {"id": client_id},
-                    {"$inc": {wallet_field: amount}}
+                await ledger.post(
+                    db,
+                    [
+                        ledger.ad_account(account_id, -amount, currency),
+                        ledger.wallet(client_id, wallet_field, amount, currency),
+                    ],
+                    "admin_withdraw",
+                    user_id=client_id,
+                    reference_id=action_id,
+                    description=f"Admin withdrawal by {action['admin_username']}"
                 )
                 
                 # Create transaction record
@@ -13941,7 +13254,7 @@ async def approve_admin_action(
                     "status": "completed",
                     "admin_id": action["admin_id"],
                     "super_admin_id": current_super_admin.id,
-                    "created_at": datetime.now(timezone.utc).isoformat()
+                    "created_at": datetime.now(timezone.utc)
                 }
                 await db.transactions.insert_one(transaction)
                 
@@ -13953,10 +13266,10 @@ async def approve_admin_action(
                     "title": "✅ Account Withdrawal Completed",
                     "message": f"Admin has withdrawn {currency} {amount:,.2f} from account {account.get('account_name', account_id)} to your withdrawal wallet",
                     "type": "admin_withdraw_completed",
-                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "created_at": datetime.now(timezone.utc),
                     "is_read": False
                 }
-                await db.client_notifications.insert_one(client_notification)
+                await insert_client_notification(client_notification)
                 
                 # Send email notification for withdrawal completion
                 try:
@@ -13991,15 +13304,17 @@ async def approve_admin_action(
                 if not wallet_field:
                     raise HTTPException(status_code=400, detail="Invalid wallet type")
                 
-                await db.users.update_one(
-                    {"id": client_id},
-                    {"$inc": {wallet_field: -amount}}
-                )
-                
-                # Add to account balance
-                await db.ad_accounts.update_one(
-                    {"id": to_account_id},
-                    {"$inc": {"balance": amount}}
+                # Super admin transfers are not limited by the wallet balance
+                await ledger.post(
+                    db,
+                    [
+                        ledger.wallet(client_id, wallet_field, -amount, currency, guard=False),
+                        ledger.ad_account(to_account_id, amount, currency),
+                    ],
+                    "admin_transfer",
+                    user_id=client_id,
+                    reference_id=action_id,
+                    description=f"Admin transfer by {action['admin_username']}"
                 )
                 
                 # Create transaction record
@@ -14015,7 +13330,7 @@ async def approve_admin_action(
                     "status": "completed",
                     "admin_id": action["admin_id"],
                     "super_admin_id": current_super_admin.id,
-                    "created_at": datetime.now(timezone.utc).isoformat()
+                    "created_at": datetime.now(timezone.utc)
                 }
                 await db.transactions.insert_one(transaction)
                 
@@ -14027,10 +13342,10 @@ async def approve_admin_action(
                     "title": "✅ Wallet Transfer Completed",
                     "message": f"Admin has transferred {currency} {amount:,.2f} from your {from_wallet.replace('_', ' ').title()} to account {account.get('account_name', to_account_id)}",
                     "type": "admin_transfer_completed",
-                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "created_at": datetime.now(timezone.utc),
                     "is_read": False
                 }
-                await db.client_notifications.insert_one(client_notification)
+                await insert_client_notification(client_notification)
                 
                 # Send email notification for wallet transfer completion
                 try:
@@ -14056,7 +13371,7 @@ async def approve_admin_action(
                     "super_admin_id": current_super_admin.id,
                     "super_admin_username": current_super_admin.username,
                     "approval_notes": approval_data.notes,
-                    "processed_at": datetime.now(timezone.utc).isoformat()
+                    "processed_at": datetime.now(timezone.utc)
                 }}
             )
             
@@ -14068,10 +13383,10 @@ async def approve_admin_action(
                 "message": f"Your {action_type.replace('_', ' ')} request has been approved by {current_super_admin.username}",
                 "type": "admin_action_approved",
                 "data": {"action_id": action_id},
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "is_read": False
             }
-            await db.notifications.insert_one(admin_notification)
+            await insert_admin_notification(admin_notification)
             
             logger.info(f"✅ Admin action approved: {action_id} by super admin {current_super_admin.username}")
             
@@ -14086,7 +13401,7 @@ async def approve_admin_action(
                     "super_admin_id": current_super_admin.id,
                     "super_admin_username": current_super_admin.username,
                     "approval_notes": approval_data.notes,
-                    "processed_at": datetime.now(timezone.utc).isoformat()
+                    "processed_at": datetime.now(timezone.utc)
                 }}
             )
             
@@ -14098,10 +13413,10 @@ async def approve_admin_action(
                 "message": f"Your {action_type.replace('_', ' ')} request has been rejected by {current_super_admin.username}. Reason: {approval_data.notes or 'No reason provided'}",
                 "type": "admin_action_rejected",
                 "data": {"action_id": action_id},
-                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_at": datetime.now(timezone.utc),
                 "is_read": False
             }
-            await db.notifications.insert_one(admin_notification)
+            await insert_admin_notification(admin_notification)
             
             logger.info(f"✅ Admin action rejected: {action_id} by super admin {current_super_admin.username}")
             
@@ -14163,9 +13478,13 @@ async def approve_wallet_deduction(
         currency = "IDR" if "idr" in wallet_type.lower() else "USD"
         
         # Deduct from wallet (no validation - can go negative as per requirements)
-        await db.users.update_one(
-            {"id": client_id},
-            {"$inc": {actual_field: -amount}}
+        await ledger.post(
+            db,
+            [ledger.wallet(client_id, actual_field, -amount, currency, guard=False)],
+            "admin_deduction",
+            user_id=client_id,
+            reference_id=deduction_id,
+            description=f"Pengurangan saldo oleh admin. Alasan: {deduction['reason']}"
         )
         
         # Create transaction record
@@ -14181,7 +13500,7 @@ async def approve_wallet_deduction(
             "admin_id": deduction["admin_id"],
             "super_admin_id": current_super_admin.id,
             "reference_id": deduction_id,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.transactions.insert_one(transaction)
         
@@ -14198,7 +13517,7 @@ async def approve_wallet_deduction(
             "reference_id": deduction_id,
             "admin_id": deduction["admin_id"],
             "super_admin_id": current_super_admin.id,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.wallet_statements.insert_one(wallet_statement)
         
@@ -14210,7 +13529,7 @@ async def approve_wallet_deduction(
                 "super_admin_id": current_super_admin.id,
                 "super_admin_username": current_super_admin.username,
                 "approval_notes": notes,
-                "processed_at": datetime.now(timezone.utc).isoformat()
+                "processed_at": datetime.now(timezone.utc)
             }}
         )
         
@@ -14236,7 +13555,7 @@ async def approve_wallet_deduction(
             },
             "approval_notes": notes,
             "created_at": deduction["created_at"],
-            "processed_at": datetime.now(timezone.utc).isoformat()
+            "processed_at": datetime.now(timezone.utc)
         }
         await db.admin_actions_history.insert_one(action_history)
         
@@ -14250,10 +13569,10 @@ async def approve_wallet_deduction(
             "title": "⚠️ Pengurangan Saldo Wallet",
             "message": f"Saldo {wallet_type.replace('_', ' ').upper()} Anda telah dikurangi {formatted_amount}. Alasan: {deduction['reason']}",
             "type": "wallet_deduction",
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": datetime.now(timezone.utc),
             "is_read": False
         }
-        await db.client_notifications.insert_one(client_notification)
+        await insert_client_notification(client_notification)
         
         # Notify requesting admin
         admin_notification = {
@@ -14262,10 +13581,10 @@ async def approve_wallet_deduction(
             "title": "✅ Wallet Deduction Approved",
             "message": f"Your wallet deduction request for {deduction['client_name']} has been approved ({formatted_amount})",
             "type": "wallet_deduction_approved",
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": datetime.now(timezone.utc),
             "is_read": False
         }
-        await db.notifications.insert_one(admin_notification)
+        await insert_admin_notification(admin_notification)
         
         logger.info(f"✅ Wallet deduction approved: {deduction_id} by super admin {current_super_admin.username}")
         
@@ -14299,7 +13618,7 @@ async def reject_wallet_deduction(
                 "super_admin_id": current_super_admin.id,
                 "super_admin_username": current_super_admin.username,
                 "approval_notes": notes,
-                "processed_at": datetime.now(timezone.utc).isoformat()
+                "processed_at": datetime.now(timezone.utc)
             }}
         )
         
@@ -14326,7 +13645,7 @@ async def reject_wallet_deduction(
             },
             "approval_notes": notes,
             "created_at": deduction["created_at"],
-            "processed_at": datetime.now(timezone.utc).isoformat()
+            "processed_at": datetime.now(timezone.utc)
         }
         await db.admin_actions_history.insert_one(action_history)
         
@@ -14340,10 +13659,10 @@ async def reject_wallet_deduction(
             "title": "❌ Wallet Deduction Rejected",
             "message": f"Your wallet deduction request for {deduction['client_name']} has been rejected ({formatted_amount}). Reason: {notes or 'No reason provided'}",
             "type": "wallet_deduction_rejected",
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": datetime.now(timezone.utc),
             "is_read": False
         }
-        await db.notifications.insert_one(admin_notification)
+        await insert_admin_notification(admin_notification)
         
         logger.info(f"✅ Wallet deduction rejected: {deduction_id} by super admin {current_super_admin.username}")
         
@@ -14796,6 +14115,8 @@ class RestoreRequest(BaseModel):
     backup_id: str
     pin: str
     selected_collections: Optional[List[str]] = None
+    point_in_time: Optional[datetime] = None  # Replay delta backups up to this moment
+    mode: str = RESTORE_MODE_REPLACE  # "upsert" merges by id instead of clearing collections
 
 @app.post("/api/admin/database/restore")
 async def restore_database(
@@ -14805,6 +14126,9 @@ async def restore_database(
     """
     Restore database from backup
     Requires PIN verification
+    
+    Restoring a delta backup replays its base full backup plus every delta up to
+    it; point_in_time replays the chain up to that moment.
     """
     try:
         # Verify PIN
@@ -14812,30 +14136,54 @@ async def restore_database(
         if request_data.pin != correct_pin:
             raise HTTPException(status_code=401, detail="Invalid PIN")
         
-        # Get backup metadata
-        backup = await db.backup_history.find_one({"backup_id": request_data.backup_id})
+        if request_data.mode not in RESTORE_MODES:
+            raise HTTPException(status_code=400, detail=f"Invalid restore mode: {request_data.mode}")
         
-        if not backup:
+        # Get backup metadata (base backup first, then its deltas)
+        try:
+            chain = await resolve_backup_chain(db, request_data.backup_id, until=request_data.point_in_time)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if not chain:
             raise HTTPException(status_code=404, detail="Backup not found")
         
-        local_path = backup.get("local_path")
+        local_paths = [backup.get("local_path") for backup in chain]
         
-        if not local_path or not os.path.exists(local_path):
+        if not all(path and os.path.exists(path) for path in local_paths):
             raise HTTPException(status_code=404, detail="Backup file not found")
         
         # Restore
         result = await restore_backup(
             db,
-            local_path,
-            selected_collections=request_data.selected_collections
+            local_paths[0],
+            selected_collections=request_data.selected_collections,
+            delta_file_paths=local_paths[1:],
+            until=request_data.point_in_time,
+            mode=request_data.mode
         )
         
         if not result.get("success"):
             raise HTTPException(status_code=500, detail=result.get("error", "Failed to restore"))
         
+        # The request collections were rewritten: older backups may carry string
+        # timestamps, and the financial rollups are recomputed from the restored data
+        try:
+            await migrate_timestamps(db)
+            await rebuild_rollups(db)
+        except Exception as e:
+            logger.error(f"❌ Post-restore timestamp migration / rollup rebuild failed (run mongo_dates.py and financial_rollup.py): {e}")
+        
+        # The notification collections were rewritten under the incremental unread counters
+        try:
+            await notification_hub.rebuild_counters()
+        except Exception as e:
+            logger.error(f"❌ Post-restore notification counter rebuild failed: {e}")
+        
         return {
             "success": True,
             "message": "Database berhasil di-restore",
+            "restore_id": result.get("restore_id"),
             "results": result.get("results")
         }
         
@@ -14869,8 +14217,10 @@ async def delete_backup(
         
         # Delete local file
         local_path = backup.get("local_path")
-        if local_path and os.path.exists(local_path):
-            os.remove(local_path)
+        if local_path:
+            for path in (local_path, manifest_path_for(local_path)):
+                if os.path.exists(path):
+                    os.remove(path)
         
         # Delete from database
         await db.backup_history.delete_one({"backup_id": backup_id})
@@ -14975,17 +14325,6 @@ class DeleteClientsRequest(BaseModel):
 async def generate_landing_page_content(product_name: str, product_description: str):
     """Generate AI content for landing page using Emergent LLM"""
     try:
-        import litellm
-        import os
-        import json
-        
-        emergent_key = os.environ.get("EMERGENT_LLM_KEY")
-        if not emergent_key:
-            return {"copy_blocks": {}, "layout_map": {}}
-        
-        # Configure for emergent key
-        api_base = os.getenv("INTEGRATION_PROXY_URL", "https://integrations.emergentagent.com")
-        
         prompt = f"""Create marketing copy for a landing page IN INDONESIAN LANGUAGE.
 Product: {product_name}
 Description: {product_description}
@@ -15006,20 +14345,10 @@ Return JSON with:
 
 REMEMBER: Use ONLY Indonesian language for all text content!"""
         
-        response = litellm.completion(
-            model="openai/gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            api_key=emergent_key,
-            api_base=api_base + "/llm",
-            custom_llm_provider="openai",
-            temperature=0.7
-        )
-        
-        content = response.choices[0].message.content
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0].strip()
-        
-        return {"copy_blocks": json.loads(content), "layout_map": {}}
+        copy_blocks = await llm_gateway.complete_json(prompt, temperature=0.7)
+        return {"copy_blocks": copy_blocks, "layout_map": {}}
+    except LLMNotConfigured:
+        return {"copy_blocks": {}, "layout_map": {}}
     except Exception as e:
         logger.error(f"AI generation failed: {e}")
         return {"copy_blocks": {}, "layout_map": {}}
@@ -15282,9 +14611,6 @@ async def upload_landing_page_image(
     current_user: User = Depends(get_current_user)
 ):
     try:
-        from google.cloud import storage
-        import os
-        
         # Validate file type
         if not file.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="File must be an image")
@@ -15292,27 +14618,25 @@ async def upload_landing_page_image(
         # Read file content
         content = await file.read()
         
-        # Initialize GCS client (credentials loaded from .env GOOGLE_APPLICATION_CREDENTIALS)
-        storage_client = storage.Client()
-        bucket_name = os.getenv("GCS_BUCKET_NAME", "rimuru-file-uploads")
-        bucket = storage_client.bucket(bucket_name)
-        
         # Generate filename
         file_extension = os.path.splitext(file.filename)[1]
         gcs_filename = f"landing_page_images/{str(uuid.uuid4())[:12]}{file_extension}"
         
         # Upload to GCS
-        blob = bucket.blob(gcs_filename)
-        blob.upload_from_string(content, content_type=file.content_type)
+        storage = get_object_storage()
+        await storage.upload(content, gcs_filename, content_type=file.content_type)
         
         # Generate public URL
-        public_url = f"https://storage.googleapis.com/{bucket_name}/{gcs_filename}"
+        public_url = storage.public_url(gcs_filename)
         
         return {"success": True, "url": public_url}
     except Exception as e:
         logger.error(f"Upload image error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# AI helper types whose results are cached per product (see llm_gateway)
+CACHED_AI_HELPERS = {"benefits", "seo"}
+
 # AI HELPER for generating content
 @app.post("/api/landing-pages/ai-helper")
 async def landing_page_ai_helper(
@@ -15329,17 +14653,6 @@ async def landing_page_ai_helper(
         if not helper_type or not product_name:
             raise HTTPException(status_code=400, detail="Type and product_name required")
         
-        import litellm
-        import os
-        import json
-        
-        emergent_key = os.environ.get("EMERGENT_LLM_KEY")
-        if not emergent_key:
-            raise HTTPException(status_code=500, detail="AI service not configured")
-        
-        # Configure for emergent key
-        api_base = os.getenv("INTEGRATION_PROXY_URL", "https://integrations.emergentagent.com")
-        
         # Different prompts based on type
         if helper_type == "benefits":
             prompt = f"""Generate 5-7 key benefits for this product. Return ONLY valid JSON array:
@@ -15397,28 +14710,15 @@ Requirements:
         else:
             raise HTTPException(status_code=400, detail="Invalid type. Must be: benefits, testimonials, seo, or pricing_packages")
         
-        # Call AI
-        response = litellm.completion(
-            model="openai/gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            api_key=emergent_key,
-            api_base=api_base + "/llm",
-            custom_llm_provider="openai",
-            temperature=0.7
-        )
-        
-        # Parse response
-        content = response.choices[0].message.content
-        
-        # Extract JSON from response if wrapped
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0].strip()
-        elif '```' in content:
-            content = content.split('```')[1].split('```')[0].strip()
-        
-        data = json.loads(content)
+        # Call AI; answers for the same product are reused from the gateway cache where listed
+        data = await llm_gateway.complete_json(prompt, temperature=0.7, cache=helper_type in CACHED_AI_HELPERS)
         
         return {"success": True, "data": data}
+    except HTTPException:
+        raise
+    except LLMError as e:
+        logger.error(f"AI helper error: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         logger.error(f"AI helper error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -15448,6 +14748,8 @@ async def delete_clients(
         
         # Delete users
         user_result = await db.users.delete_many({'id': {'$in': client_ids}})
+        for client_id in client_ids:
+            principal_cache.invalidate(KIND_USER, client_id)
         deleted_summary['clients_deleted'] = user_result.deleted_count
         
         # Delete all related data for these clients
@@ -15460,10 +14762,12 @@ async def delete_clients(
         deleted_summary['data_deleted']['ad_account_requests'] = requests_result.deleted_count
         
         # Top-up requests
+        await record_deleted(db, ACCOUNT_TOPUP, {'user_id': {'$in': client_ids}})
         topup_result = await db.topup_requests.delete_many({'user_id': {'$in': client_ids}})
         deleted_summary['data_deleted']['topup_requests'] = topup_result.deleted_count
         
         # Wallet top-up requests
+        await record_deleted(db, WALLET_TOPUP, {'user_id': {'$in': client_ids}})
         wallet_topup_result = await db.wallet_topup_requests.delete_many({'user_id': {'$in': client_ids}})
         deleted_summary['data_deleted']['wallet_topup_requests'] = wallet_topup_result.deleted_count
         
@@ -15472,10 +14776,12 @@ async def delete_clients(
         deleted_summary['data_deleted']['transfer_requests'] = transfer_result.deleted_count
         
         # Wallet transfers
+        await record_deleted(db, WALLET_TRANSFER, {'user_id': {'$in': client_ids}})
         wallet_transfer_result = await db.wallet_transfers.delete_many({'user_id': {'$in': client_ids}})
         deleted_summary['data_deleted']['wallet_transfers'] = wallet_transfer_result.deleted_count
         
         # Withdraw requests
+        await record_deleted(db, WITHDRAW, {'user_id': {'$in': client_ids}})
         withdraw_result = await db.withdraw_requests.delete_many({'user_id': {'$in': client_ids}})
         deleted_summary['data_deleted']['withdraw_requests'] = withdraw_result.deleted_count
         
@@ -15495,6 +14801,7 @@ async def delete_clients(
         # Client notifications
         notif_result = await db.client_notifications.delete_many({'user_id': {'$in': client_ids}})
         deleted_summary['data_deleted']['client_notifications'] = notif_result.deleted_count
+        await notification_hub.delete_counters(client_audience(client_id) for client_id in client_ids)
         
         # Currency exchanges
         exchange_result = await db.currency_exchanges.delete_many({'user_id': {'$in': client_ids}})
@@ -15523,28 +14830,8 @@ class AdCopyResponse(BaseModel):
     data: Optional[dict] = None
     message: Optional[str] = None
 
-@app.post("/api/generate-ad-copy", response_model=AdCopyResponse)
-async def generate_ad_copy(
-    request: AdCopyGenerateRequest,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    """
-    Generate AI-powered ad copy for Meta (Facebook & Instagram) in Indonesian
-    """
-    try:
-        # Verify client authentication
-        current_user = await get_current_user(credentials)
-        
-        # Import emergentintegrations
-        from emergentintegrations.llm.chat import LlmChat, UserMessage
-        
-        # Get API key from environment
-        api_key = os.getenv('EMERGENT_LLM_KEY')
-        if not api_key:
-            raise HTTPException(status_code=500, detail="LLM API key not configured")
-        
-        # Create system message for Meta Performance Copywriter
-        system_message = """You are an expert AI Meta Performance Copywriter specializing in creating high-converting ad copy for Facebook and Instagram in Indonesian language.
+# Meta Performance Copywriter instructions
+AD_COPY_SYSTEM_MESSAGE = """You are an expert AI Meta Performance Copywriter specializing in creating high-converting ad copy for Facebook and Instagram in Indonesian language.
 
 Core Principles:
 1. Readability: Write clear, engaging copy that resonates with Indonesian audiences
@@ -15585,8 +14872,8 @@ Your output MUST be valid JSON only, following this exact structure:
 
 IMPORTANT: Return ONLY valid JSON, no markdown, no explanations, no code blocks."""
 
-        # Create developer message with production rules
-        developer_message = f"""Production Rules:
+# Production rules, sent ahead of the campaign data
+AD_COPY_DEVELOPER_MESSAGE = """Production Rules:
 - Generate ad copy in Bahasa Indonesia (natural, conversational)
 - Generate 3 variants for each text type (primary_text_short, primary_text_standard, headlines, hooks, ctas)
 - At least 5 headlines, 3 descriptions
@@ -15606,8 +14893,15 @@ IMPORTANT: Return ONLY valid JSON, no markdown, no explanations, no code blocks.
   * No misleading urgency or scarcity
 - Return ONLY valid JSON format, no markdown formatting"""
 
-        # Create user message with campaign data
-        user_message_text = f"""Campaign Information:
+AD_COPY_REQUIRED_FIELDS = ['primary_text_short', 'primary_text_standard', 'headlines',
+                           'descriptions', 'hooks', 'ctas', 'ugc_scripts']
+
+# GPT-5 (better quality for ad copy)
+AD_COPY_MODEL = "openai/gpt-5"
+
+def ad_copy_prompt(request: AdCopyGenerateRequest) -> str:
+    """User message for an ad copy generation: production rules plus the campaign data"""
+    user_message_text = f"""Campaign Information:
 Product Name: {request.product_name}
 Description: {request.description}
 Campaign Goal: {request.goal}
@@ -15617,94 +14911,47 @@ Automatically determine the best angles (problem-solution, social-proof, value-s
 Generate copy that will perform well for the stated goal ({request.goal}).
 
 Return valid JSON ONLY."""
+    return f"{AD_COPY_DEVELOPER_MESSAGE}\n\n{user_message_text}"
 
-        # Initialize LLM Chat with GPT-5 (better quality for ad copy)
-        session_id = f"adcopy_{current_user.id}_{datetime.now(timezone.utc).isoformat()}"
-        chat = LlmChat(
-            api_key=api_key,
-            session_id=session_id,
-            system_message=system_message
-        ).with_model("openai", "gpt-5")
-        
-        # Add developer context as a system-level message (we'll send it with user message)
-        full_user_message = f"{developer_message}\n\n{user_message_text}"
-        
-        # Create user message
-        user_msg = UserMessage(text=full_user_message)
-        
-        # Send message with retry mechanism for 502 errors
-        max_retries = 2  # Reduced from 3 to make it faster
-        retry_delay = 1  # Start with shorter delay
-        last_error = None
+@app.post("/api/generate-ad-copy", response_model=AdCopyResponse)
+async def generate_ad_copy(
+    request: AdCopyGenerateRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Generate AI-powered ad copy for Meta (Facebook & Instagram) in Indonesian
+    """
+    try:
+        # Verify client authentication
+        await get_current_user(credentials)
         
-        for attempt in range(max_retries):
-            try:
-                # Try with timeout of 30 seconds per attempt
-                response = await asyncio.wait_for(
-                    chat.send_message(user_msg),
-                    timeout=30.0
-                )
-                break  # Success, exit retry loop
-            except asyncio.TimeoutError:
-                last_error = "Request timeout"
-                if attempt < max_retries - 1:
-                    logging.warning(f"GPT-5 timeout, retrying... (attempt {attempt + 1}/{max_retries})")
-                    await asyncio.sleep(retry_delay)
-                    retry_delay *= 2
-                    continue
-                else:
-                    logging.error(f"GPT-5 failed after {max_retries} attempts due to timeout")
-                    raise HTTPException(status_code=504, detail="AI sedang lambat, coba lagi dalam beberapa saat")
-            except Exception as e:
-                error_msg = str(e)
-                last_error = error_msg
-                if ('502' in error_msg or '503' in error_msg or '504' in error_msg) and attempt < max_retries - 1:
-                    logging.warning(f"GPT-5 returned error {error_msg}, retrying... (attempt {attempt + 1}/{max_retries})")
-                    await asyncio.sleep(retry_delay)
-                    retry_delay *= 2
-                    continue
-                else:
-                    # If all retries failed or not a retryable error
-                    logging.error(f"Failed after {attempt + 1} attempts: {error_msg}")
-                    if 'budget' in error_msg.lower() or 'insufficient' in error_msg.lower():
-                        raise HTTPException(status_code=402, detail="Saldo Emergent LLM Key habis. Silakan top up di Profile → Universal Key")
-                    raise HTTPException(status_code=500, detail=f"AI generation error: {error_msg}")
-        
-        # Parse JSON response
-        import json
+        # Through the shared gateway; retries 502/503/504 and timeouts
         try:
-            # Clean response if it has markdown code blocks
-            response_text = response.strip()
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-            
-            ad_copy_data = json.loads(response_text)
-            
-            # Validate required fields
-            required_fields = ['primary_text_short', 'primary_text_standard', 'headlines', 
-                             'descriptions', 'hooks', 'ctas', 'ugc_scripts']
-            for field in required_fields:
-                if field not in ad_copy_data:
-                    raise ValueError(f"Missing required field: {field}")
-            
-            return {
-                "success": True,
-                "data": ad_copy_data,
-                "message": "Ad copy generated successfully"
-            }
-            
-        except json.JSONDecodeError as e:
-            logging.error(f"Failed to parse LLM response as JSON: {str(e)}")
-            logging.error(f"Response was: {response}")
-            raise HTTPException(
-                status_code=500, 
-                detail="Failed to parse AI response. Please try again."
+            ad_copy_data = await llm_gateway.complete_json(
+                ad_copy_prompt(request),
+                system=AD_COPY_SYSTEM_MESSAGE,
+                model=AD_COPY_MODEL,
+                temperature=None,
+                timeout=30.0
             )
+        except LLMResponseError as e:
+            logging.error(f"Failed to parse LLM response as JSON: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to parse AI response. Please try again.")
+        except LLMBudgetExceeded:
+            raise HTTPException(status_code=402, detail="Saldo Emergent LLM Key habis. Silakan top up di Profile → Universal Key")
+        except LLMError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        
+        # Validate required fields
+        missing = [field for field in AD_COPY_REQUIRED_FIELDS if field not in ad_copy_data]
+        if missing:
+            raise HTTPException(status_code=500, detail=f"Failed to generate ad copy: Missing required field: {missing[0]}")
+        
+        return {
+            "success": True,
+            "data": ad_copy_data,
+            "message": "Ad copy generated successfully"
+        }
     
     except HTTPException:
         raise
@@ -15713,6 +14960,66 @@ Return valid JSON ONLY."""
         logging.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Failed to generate ad copy: {str(e)}")
 
+@app.post("/api/generate-ad-copy/stream")
+async def generate_ad_copy_stream(
+    request: AdCopyGenerateRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Generate ad copy as Server-Sent Events
+    
+    Emits a "section" event ({key, value}) for every field of the ad copy as
+    soon as it is complete in the model output, then "done" ({data,
+    ad_copy_id, saved}) once the whole document is stored in saved_ad_copies,
+    or "error" ({status, detail}). Closing the connection stops the
+    generation upstream.
+    """
+    current_user = await get_current_user(credentials)
+    
+    async def events():
+        parser = JSONSectionParser()
+        try:
+            async for piece in llm_gateway.stream(
+                ad_copy_prompt(request),
+                system=AD_COPY_SYSTEM_MESSAGE,
+                model=AD_COPY_MODEL,
+                temperature=None
+            ):
+                for key, value in parser.feed(piece):
+                    yield format_sse("section", {"key": key, "value": value})
+            
+            ad_copy_data = parser.document()
+            missing = [field for field in AD_COPY_REQUIRED_FIELDS if field not in ad_copy_data]
+            if missing:
+                yield format_sse("error", {"status": 500, "detail": f"Failed to generate ad copy: Missing required field: {missing[0]}"})
+                return
+            
+            # Same document the client would save from the non-streaming endpoint
+            ad_copy_id = await insert_saved_ad_copy(
+                current_user, f"{request.product_name} - {request.goal}", request.product_name,
+                request.description, request.goal, ad_copy_data
+            )
+            yield format_sse("done", {"data": ad_copy_data, "ad_copy_id": ad_copy_id, "saved": ad_copy_id is not None})
+        except asyncio.CancelledError:
+            logging.info(f"Ad copy stream for {current_user.id} closed by the client, generation cancelled")
+            raise
+        except LLMResponseError as e:
+            logging.error(f"Failed to parse streamed ad copy: {str(e)}")
+            yield format_sse("error", {"status": 500, "detail": "Failed to parse AI response. Please try again."})
+        except LLMBudgetExceeded:
+            yield format_sse("error", {"status": 402, "detail": "Saldo Emergent LLM Key habis. Silakan top up di Profile → Universal Key"})
+        except LLMError as e:
+            yield format_sse("error", {"status": e.status_code, "detail": str(e)})
+        except Exception as e:
+            logging.error(f"Error streaming ad copy: {str(e)}")
+            yield format_sse("error", {"status": 500, "detail": f"Failed to generate ad copy: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ==========================
 # Saved Ad Copies CRUD Endpoints
 # ==========================
@@ -15728,6 +15035,38 @@ class UpdateAdCopyRequest(BaseModel):
     label: Optional[str] = None
     generated_content: Optional[dict] = None
 
+SAVED_AD_COPIES_LIMIT = 100
+
+async def insert_saved_ad_copy(current_user: User, label: str, product_name: str, description: str,
+                               goal: str, generated_content: dict) -> Optional[str]:
+    """
+    Store an ad copy in saved_ad_copies
+    
+    Returns:
+        str: ad_copy_id, or None when the client already has SAVED_AD_COPIES_LIMIT
+    """
+    # Check if user has reached the limit of 100 saved ad copies
+    existing_count = await db.saved_ad_copies.count_documents({'user_id': current_user.id})
+    if existing_count >= SAVED_AD_COPIES_LIMIT:
+        return None
+    
+    # Create ad copy document
+    ad_copy_doc = {
+        'ad_copy_id': str(uuid.uuid4()),
+        'user_id': current_user.id,
+        'username': current_user.username,
+        'label': label,
+        'product_name': product_name,
+        'description': description,
+        'goal': goal,
+        'generated_content': generated_content,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'updated_at': datetime.now(timezone.utc).isoformat()
+    }
+    
+    await db.saved_ad_copies.insert_one(ad_copy_doc)
+    return ad_copy_doc['ad_copy_id']
+
 @app.post("/api/ad-copies")
 async def save_ad_copy(
     request: SaveAdCopyRequest,
@@ -15739,36 +15078,20 @@ async def save_ad_copy(
     """
     try:
         current_user = await get_current_user(credentials)
-        user_id = current_user.id  # Fixed: Use .id instead of .get('user_id')
         
-        # Check if user has reached the limit of 100 saved ad copies
-        existing_count = await db.saved_ad_copies.count_documents({'user_id': user_id})
-        if existing_count >= 100:
+        ad_copy_id = await insert_saved_ad_copy(
+            current_user, request.label, request.product_name, request.description, request.goal, request.generated_content
+        )
+        if ad_copy_id is None:
             raise HTTPException(
                 status_code=400, 
                 detail="Anda sudah mencapai limit maksimal 100 saved ad copies. Hapus beberapa untuk menambah yang baru."
             )
         
-        # Create ad copy document
-        ad_copy_doc = {
-            'ad_copy_id': str(uuid.uuid4()),
-            'user_id': user_id,
-            'username': current_user.username,  # Fixed: Use .username instead of .get('username')
-            'label': request.label,
-            'product_name': request.product_name,
-            'description': request.description,
-            'goal': request.goal,
-            'generated_content': request.generated_content,
-            'created_at': datetime.now(timezone.utc).isoformat(),
-            'updated_at': datetime.now(timezone.utc).isoformat()
-        }
-        
-        await db.saved_ad_copies.insert_one(ad_copy_doc)
-        
         return {
             'success': True,
             'message': 'Ad copy berhasil disimpan',
-            'ad_copy_id': ad_copy_doc['ad_copy_id']
+            'ad_copy_id': ad_copy_id
         }
     
     except HTTPException:
@@ -15946,7 +15269,7 @@ async def delete_ad_copy(
 # BitShip Shipping Integration Endpoints
 # ==========================
 
-from biteship_client import get_biteship_client
+from biteship_client import BiteshipUnavailable, close_biteship_client, get_biteship_client
 
 # Calculate shipping rates (PUBLIC - no auth required)
 @app.post("/api/shipping/calculate-rates")
@@ -15982,6 +15305,8 @@ async def calculate_shipping_rates(
         )
         
         return {"success": True, "data": result}
+    except BiteshipUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error calculating shipping rates: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -15995,6 +15320,8 @@ async def get_available_couriers():
         biteship = get_biteship_client()
         result = await biteship.get_couriers()
         return {"success": True, "data": result}
+    except BiteshipUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error retrieving couriers: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -16008,11 +15335,38 @@ async def track_shipment(waybill_id: str, courier_code: str):
         biteship = get_biteship_client()
         result = await biteship.track_order(waybill_id, courier_code)
         return {"success": True, "data": result}
+    except BiteshipUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error tracking shipment: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Shipment status webhook (called by BitShip)
+@app.post("/api/shipping/webhook")
+async def biteship_webhook(request: Request):
+    """Apply a BitShip order status event to the matching order"""
+    if not webhook_authorized(request.headers.get(BITESHIP_WEBHOOK_HEADER)):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+    
+    try:
+        payload = await request.json()
+    except ValueError:
+        # BitShip checks the URL with an empty request when the webhook is installed
+        payload = {}
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid payload")
+    
+    try:
+        order_number = await shipment_sync.handle_webhook(payload)
+    except Exception as e:
+        # Non-2xx makes BitShip deliver the event again
+        logger.error(f"Error applying BitShip webhook: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to apply webhook")
+    
+    return {"success": True, "order_number": order_number}
+
+
 # ==========================
 # Order Management Endpoints
 # ==========================
@@ -16055,11 +15409,6 @@ async def create_order(order_data: CreateOrderRequest):
         if not landing_page.get("product_details", {}).get("is_enabled", True):
             raise HTTPException(status_code=400, detail="Product is not available")
         
-        # Check stock
-        current_stock = landing_page.get("product_details", {}).get("stock_quantity", 0)
-        if current_stock < order_data.quantity:
-            raise HTTPException(status_code=400, detail=f"Insufficient stock. Available: {current_stock}")
-        
         # Generate order number
         import random
         import string
@@ -16117,20 +15466,34 @@ async def create_order(order_data: CreateOrderRequest):
             "updated_at": datetime.now(timezone.utc).isoformat()
         }
         
-        # Insert order
-        await db.orders.insert_one(order)
+        # Reserve stock first; the decrement only applies while enough is left,
+        # so concurrent checkouts cannot oversell
+        try:
+            await ledger.post(
+                db,
+                [ledger.stock(order_data.landing_page_id, -order_data.quantity,
+                              extra_set={"updated_at": datetime.now(timezone.utc).isoformat()})],
+                "order_stock",
+                user_id=order["merchant_id"],
+                reference_id=order["id"],
+                description=f"Order {order_number}"
+            )
+        except ledger.InsufficientBalance as e:
+            raise HTTPException(status_code=400, detail=f"Insufficient stock. Available: {e.available}")
         
-        # Update stock (reduce)
-        new_stock = current_stock - order_data.quantity
-        await db.landing_pages.update_one(
-            {"id": order_data.landing_page_id},
-            {
-                "$set": {
-                    "product_details.stock_quantity": new_stock,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }
-            }
-        )
+        # Insert order
+        try:
+            await db.orders.insert_one(order)
+        except Exception:
+            await ledger.post(
+                db,
+                [ledger.stock(order_data.landing_page_id, order_data.quantity)],
+                "order_stock_release",
+                user_id=order["merchant_id"],
+                reference_id=order["id"],
+                description=f"Order {order_number} not created"
+            )
+            raise
         
         logger.info(f"✅ Order created: {order_number} for merchant {order['merchant_id']}")
         
@@ -16148,36 +15511,23 @@ async def create_order(order_data: CreateOrderRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Internal fields left out of the public order page
+PUBLIC_ORDER_PROJECTION = {"_id": 0, "merchant_id": 0, "shipping_active": 0, "shipping_checked_at": 0}
+
 # Track order by order number (PUBLIC)
 @app.get("/api/orders/track/{order_number}")
 async def track_order_public(order_number: str):
     """Track order status by order number (public endpoint)"""
     try:
-        order = await db.orders.find_one({"order_number": order_number})
+        # Shipment status is kept on the order by the webhook and reconciler (shipment_sync.py)
+        order = await db.orders.find_one({"order_number": order_number}, PUBLIC_ORDER_PROJECTION)
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
         
-        # Get tracking info from BitShip if available
-        tracking_data = None
-        if order.get("waybill_id") and order.get("courier_company"):
-            try:
-                biteship = get_biteship_client()
-                tracking_result = await biteship.track_order(
-                    order["waybill_id"],
-                    order["courier_company"]
-                )
-                tracking_data = tracking_result
-            except Exception as e:
-                logger.error(f"Error fetching tracking: {str(e)}")
-        
-        # Remove sensitive internal fields
-        order.pop("_id", None)
-        order.pop("merchant_id", None)
-        
         return {
             "success": True,
             "order": order,
-            "tracking": tracking_data
+            "tracking": tracking_view(order)
         }
         
     except HTTPException:
@@ -16359,6 +15709,13 @@ async def process_order_shipping(
                     "waybill_id": biteship_result.get("waybill_id"),
                     "tracking_url": biteship_result.get("courier", {}).get("link"),
                     "order_status": "shipped",
+                    "shipping_status": biteship_result.get("status"),
+                    # No status time yet, so BitShip's first event always applies
+                    "shipping_status_at": None,
+                    "shipping_history": [],
+                    # Kept current by the BitShip webhook, with the reconciler as fallback
+                    "shipping_active": True,
+                    "shipping_checked_at": datetime.now(timezone.utc).isoformat(),
                     "updated_at": datetime.now(timezone.utc).isoformat()
                 }
             }
@@ -16433,15 +15790,14 @@ async def update_product_stock(
         if not landing_page:
             raise HTTPException(status_code=404, detail="Landing page not found")
         
-        # Update stock
-        await db.landing_pages.update_one(
-            {"id": page_id},
-            {
-                "$set": {
-                    "product_details.stock_quantity": stock_quantity,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }
-            }
+        # Update stock (recorded as an adjustment by the difference)
+        await ledger.post(
+            db,
+            [ledger.stock(page_id, set_to=stock_quantity,
+                          extra_set={"updated_at": datetime.now(timezone.utc).isoformat()})],
+            "stock_adjustment",
+            user_id=current_user.id,
+            reference_id=page_id
         )
         
         logger.info(f"✅ Updated stock for {page_id}: {stock_quantity}")
@@ -16457,4 +15813,8 @@ async def update_product_stock(
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    try:
+        await close_biteship_client()
+    except Exception as e:
+        logger.error(f"Shutdown of BitShip client failed: {e}")
     client.close()
\ No newline at end of file
@@ -0,0 +1,280 @@
+"""
+Shipment Status Sync
+Keeps the shipping fields of orders current from BitShip, so reading an
+order's shipment never calls BitShip. Status webhooks are applied as they
+arrive; a scheduler job reconciles shipments that have not been heard from
+for SHIPMENT_RECONCILE_AFTER_MINUTES by reading them from the API in small
+batches (lost webhooks, orders shipped before the webhook was set up).
+
+Both paths go through apply(), which is idempotent: history entries are keyed
+by (status, time), so a redelivered event is not appended twice while a status
+BitShip reports again later (e.g. a re-attempted delivery) is, and the current
+status only moves to an event at least as new as the stored one.
+
+Order fields: shipping_status (BitShip status), shipping_status_at,
+shipping_history, shipping_active (until a final status) and
+shipping_checked_at (last webhook or reconcile); order_status follows the
+shipment (delivered / cancelled).
+"""
+import os
+import hmac
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# BitShip sends this header with the value configured for the webhook in its dashboard
+BITESHIP_WEBHOOK_HEADER = os.getenv("BITESHIP_WEBHOOK_HEADER", "X-Biteship-Webhook-Secret")
+BITESHIP_WEBHOOK_SECRET = os.getenv("BITESHIP_WEBHOOK_SECRET", "")
+
+# Shipments not updated for this long are read from the API
+SHIPMENT_RECONCILE_AFTER_MINUTES = int(os.getenv("SHIPMENT_RECONCILE_AFTER_MINUTES", 60))
+SHIPMENT_RECONCILE_INTERVAL_MINUTES = int(os.getenv("SHIPMENT_RECONCILE_INTERVAL_MINUTES", 15))
+SHIPMENT_RECONCILE_BATCH = int(os.getenv("SHIPMENT_RECONCILE_BATCH", 50))
+SHIPMENT_RECONCILE_CONCURRENCY = int(os.getenv("SHIPMENT_RECONCILE_CONCURRENCY", 4))
+
+# BitShip statuses after which the shipment no longer changes
+FINAL_STATUSES = {"delivered", "cancelled", "rejected", "returned", "disposed"}
+# order_status for a BitShip status; other non-final statuses mean "shipped"
+ORDER_STATUS_FOR = {"delivered": "delivered", "cancelled": "cancelled", "rejected": "cancelled"}
+
+SYNC_PROJECTION = {
+    "_id": 0, "id": 1, "biteship_order_id": 1, "shipping_status": 1,
+    "shipping_history.status": 1, "shipping_history.updated_at": 1,
+}
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def normalize_time(value) -> Optional[str]:
+    """BitShip timestamp (ISO with offset) as a UTC ISO string, None if missing or unparseable"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+@dataclass
+class ShipmentUpdate:
+    """A shipment state reported by BitShip, from a webhook or an order read"""
+    status: str
+    updated_at: str
+    waybill_id: Optional[str] = None
+    tracking_url: Optional[str] = None
+    history: List[dict] = field(default_factory=list)
+
+    @classmethod
+    def from_webhook(cls, payload: dict) -> "ShipmentUpdate":
+        event_time = normalize_time(payload.get("updated_at"))
+        status = payload["status"]
+        return cls(
+            status=status,
+            updated_at=event_time or now_iso(),
+            waybill_id=payload.get("courier_waybill_id"),
+            tracking_url=payload.get("courier_link"),
+            history=[{"status": status, "note": payload.get("note", ""), "updated_at": event_time}],
+        )
+
+    @classmethod
+    def from_order(cls, order: dict) -> "ShipmentUpdate":
+        courier = order.get("courier") or {}
+        history = [
+            {"status": entry["status"], "note": entry.get("note", ""), "updated_at": normalize_time(entry.get("updated_at"))}
+            for entry in courier.get("history") or [] if entry.get("status")
+        ]
+        # Time of the current status, else of the latest event, so an unchanged order compares equal
+        timed = [entry for entry in history if entry["updated_at"]]
+        latest = max((entry["updated_at"] for entry in timed if entry["status"] == order["status"]), default=None)
+        latest = latest or max((entry["updated_at"] for entry in timed), default=None)
+        return cls(
+            status=order["status"],
+            updated_at=latest or now_iso(),
+            waybill_id=courier.get("waybill_id") or order.get("waybill_id"),
+            tracking_url=courier.get("link"),
+            history=history,
+        )
+
+
+def webhook_authorized(secret: Optional[str]) -> bool:
+    return bool(BITESHIP_WEBHOOK_SECRET) and hmac.compare_digest((secret or "").encode(), BITESHIP_WEBHOOK_SECRET.encode())
+
+
+def tracking_view(order: dict) -> Optional[dict]:
+    """Tracking block of the public order page, shaped like BitShip's tracking object"""
+    if not order.get("waybill_id"):
+        return None
+    return {
+        "waybill_id": order["waybill_id"],
+        "status": order.get("shipping_status"),
+        "updated_at": order.get("shipping_status_at"),
+        "courier": {"company": order.get("courier_company"), "type": order.get("courier_type")},
+        "link": order.get("tracking_url"),
+        "history": order.get("shipping_history") or [],
+    }
+
+
+class ShipmentSync:
+    """Applies BitShip shipment updates to orders and reconciles quiet shipments"""
+
+    def __init__(self):
+        self.db = None
+        self._running = False
+
+    def configure(self, db):
+        self.db = db
+
+    @property
+    def orders(self):
+        return self.db.orders
+
+    async def backfill(self):
+        """Enroll shipments created before the sync existed in reconciliation"""
+        result = await self.orders.update_many(
+            {"biteship_order_id": {"$type": "string"}, "shipping_active": {"$exists": False}},
+            {"$set": {"shipping_active": True, "shipping_checked_at": ""}}
+        )
+        if result.modified_count:
+            logger.info(f"🚚 {result.modified_count} existing shipments enrolled for status sync")
+
+    async def apply(self, order: dict, update: ShipmentUpdate) -> bool:
+        """
+        Apply an update to an order (idempotent)
+
+        Args:
+            order: Order read with SYNC_PROJECTION
+            update: Reported shipment state
+
+        Returns:
+            bool: True when the current status changed
+        """
+        history = order.get("shipping_history") or []
+        known = {(entry.get("status"), entry.get("updated_at")) for entry in history}
+        known_statuses = {entry.get("status") for entry in history}
+        for entry in update.history:
+            if entry["updated_at"]:
+                if (entry["status"], entry["updated_at"]) in known:
+                    continue
+                duplicate = {"$elemMatch": {"status": entry["status"], "updated_at": entry["updated_at"]}}
+            else:
+                # Without a BitShip timestamp a repeat cannot be told from a redelivery; keep the first
+                if entry["status"] in known_statuses:
+                    continue
+                entry = {**entry, "updated_at": now_iso()}
+                duplicate = {"$elemMatch": {"status": entry["status"]}}
+            # The guard keeps concurrent deliveries of the same event from both appending
+            await self.orders.update_one(
+                {"id": order["id"], "shipping_history": {"$not": duplicate}},
+                {"$push": {"shipping_history": {"$each": [entry], "$sort": {"updated_at": 1}}}}
+            )
+            known.add((entry["status"], entry["updated_at"]))
+            known_statuses.add(entry["status"])
+
+        changed = order.get("shipping_status") != update.status
+        checked = {"shipping_checked_at": now_iso()}
+        fields = {
+            "shipping_status": update.status,
+            "shipping_status_at": update.updated_at,
+            "shipping_active": update.status not in FINAL_STATUSES,
+            **checked,
+        }
+        if changed:
+            fields["updated_at"] = checked["shipping_checked_at"]
+        if update.status in ORDER_STATUS_FOR:
+            fields["order_status"] = ORDER_STATUS_FOR[update.status]
+        elif update.status not in FINAL_STATUSES:
+            fields["order_status"] = "shipped"
+        if update.waybill_id:
+            fields["waybill_id"] = update.waybill_id
+        if update.tracking_url:
+            fields["tracking_url"] = update.tracking_url
+
+        result = await self.orders.update_one(
+            {"id": order["id"], "$or": [
+                {"shipping_status_at": None},
+                {"shipping_status_at": {"$lte": update.updated_at}},
+            ]},
+            {"$set": fields}
+        )
+        if result.matched_count:
+            return changed
+        # An older event than the stored status: only record that BitShip was heard from
+        await self.orders.update_one({"id": order["id"]}, {"$set": checked})
+        return False
+
+    async def handle_webhook(self, payload: dict) -> Optional[str]:
+        """
+        Apply a BitShip order webhook
+
+        Returns:
+            str: The order number it was applied to, None if the event is not for a known order
+        """
+        if not payload.get("order_id") or not payload.get("status"):
+            return None
+        order = await self.orders.find_one(
+            {"biteship_order_id": payload["order_id"]}, {**SYNC_PROJECTION, "order_number": 1}
+        )
+        if not order:
+            logger.warning(f"⚠️ BitShip webhook for unknown order {payload['order_id']}")
+            return None
+        changed = await self.apply(order, ShipmentUpdate.from_webhook(payload))
+        if changed:
+            logger.info(f"🚚 Order {order['order_number']} shipment is now {payload['status']}")
+        return order["order_number"]
+
+    async def reconcile(self):
+        """Scheduler job: read shipments without a recent update from the API, one batch per run"""
+        if self._running:
+            return
+        # Imported here so the module loads without BitShip credentials
+        from biteship_client import BiteshipUnavailable, get_biteship_client
+        try:
+            biteship = get_biteship_client()
+        except ValueError:
+            return
+
+        self._running = True
+        try:
+            cutoff = (datetime.now(timezone.utc) - timedelta(minutes=SHIPMENT_RECONCILE_AFTER_MINUTES)).isoformat()
+            due = await self.orders.find(
+                {"shipping_active": True, "shipping_checked_at": {"$lt": cutoff}}, SYNC_PROJECTION
+            ).sort("shipping_checked_at", 1).limit(SHIPMENT_RECONCILE_BATCH).to_list(SHIPMENT_RECONCILE_BATCH)
+            if not due:
+                return
+
+            slots = asyncio.Semaphore(SHIPMENT_RECONCILE_CONCURRENCY)
+            changed = 0
+
+            async def sync(order: dict):
+                nonlocal changed
+                async with slots:
+                    try:
+                        result = await biteship.get_order(order["biteship_order_id"])
+                        if await self.apply(order, ShipmentUpdate.from_order(result)):
+                            changed += 1
+                        return
+                    except BiteshipUnavailable:
+                        # Circuit open: leave the order due for the next run
+                        return
+                    except Exception as e:
+                        logger.error(f"❌ Shipment reconcile failed for order {order['id']}: {e}")
+                # Failed orders go to the back of the queue instead of blocking the batch
+                await self.orders.update_one({"id": order["id"]}, {"$set": {"shipping_checked_at": now_iso()}})
+
+            await asyncio.gather(*(sync(order) for order in due))
+            logger.info(f"🚚 Reconciled {len(due)} shipments, {changed} changed")
+        finally:
+            self._running = False
+
+
+# Global instance
+shipment_sync = ShipmentSync()
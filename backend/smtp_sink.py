@@ -0,0 +1,104 @@
+"""
+Local SMTP Sink
+Minimal SMTP server that accepts every message and stores it as .eml, for
+exercising the email outbox without a real mail server
+
+Usage:
+    python smtp_sink.py --port 1025 --out /tmp/rimuru_mail
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=false SMTP_USER= uvicorn server:app
+"""
+
+import argparse
+import asyncio
+import logging
+import uuid
+from pathlib import Path
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class SMTPSink:
+    """Accepts SMTP sessions and writes each received message to a directory"""
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.received = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        await reply("220 rimuru-smtp-sink ready")
+        mail_from, rcpt_to = None, []
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode(errors="replace").rstrip("\r\n")
+                command = line[:4].upper()
+
+                if command == "EHLO":
+                    writer.write(b"250-rimuru-smtp-sink\r\n250 8BITMIME\r\n")
+                    await writer.drain()
+                elif command == "HELO":
+                    await reply("250 rimuru-smtp-sink")
+                elif command == "MAIL":
+                    mail_from, rcpt_to = line.split(":", 1)[1].strip(), []
+                    await reply("250 OK")
+                elif command == "RCPT":
+                    rcpt_to.append(line.split(":", 1)[1].strip())
+                    await reply("250 OK")
+                elif command == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        data_line = await reader.readline()
+                        if data_line in (b".\r\n", b".\n", b""):
+                            break
+                        if data_line.startswith(b".."):
+                            data_line = data_line[1:]
+                        lines.append(data_line)
+                    self._store(mail_from, rcpt_to, b"".join(lines))
+                    await reply("250 OK: queued")
+                elif command == "RSET":
+                    mail_from, rcpt_to = None, []
+                    await reply("250 OK")
+                elif command == "NOOP":
+                    await reply("250 OK")
+                elif command == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        finally:
+            writer.close()
+
+    def _store(self, mail_from, rcpt_to, body: bytes):
+        self.received += 1
+        path = self.out_dir / f"{self.received:05d}_{uuid.uuid4().hex[:8]}.eml"
+        path.write_bytes(body)
+        logger.info(f"📨 #{self.received} from {mail_from} to {', '.join(rcpt_to)} -> {path}")
+
+
+async def main(host: str, port: int, out_dir: str):
+    sink = SMTPSink(Path(out_dir))
+    server = await asyncio.start_server(sink.handle, host, port)
+    logger.info(f"SMTP sink listening on {host}:{port}, writing to {out_dir}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--out", default="/tmp/rimuru_mail", help="Directory for received .eml files")
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.out))
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Wallet Statement
+The client wallet statement is read from ledger_entries (ledger.py): every
+wallet posting already carries the balance before and after it, so a page is
+one indexed query on (user_id, field, created_at, id) with keyset cursors
+(pagination.py) and exports stream the same cursor.
+
+History from before the ledger lives in the request collections (wallet
+top-ups, withdrawals, wallet transfers, exchanges, account deletion transfers
+and wallet_statements). backfill_wallet() turns it into ledger entries once per
+(user, wallet), with running balances counted back from the oldest ledger
+entry (or the current balance). It runs lazily on the first statement request
+for a wallet, or for everyone by hand.
+
+Usage:
+    python wallet_statement.py [--user-id USER_ID] [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set
+from fastapi import Response
+from pymongo.errors import DuplicateKeyError
+from export_engine import ExportSpec
+from ledger import LEDGER_COLLECTION, WALLET_TYPES, round_amount, wallet_field
+from mongo_dates import MIN_DATETIME, as_datetime
+from pagination import PAGE_SORT, QueuePageParams, apply_queue_filters, fetch_queue_page
+import logging
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_COLLECTION = "ledger_backfills"
+BACKFILL_RUNNING = "running"
+BACKFILL_DONE = "done"
+# A backfill claim older than this is presumed abandoned and taken over
+BACKFILL_STALE_SECONDS = int(os.getenv("STATEMENT_BACKFILL_STALE_SECONDS", 120))
+BACKFILL_POLL_SECONDS = 0.2
+
+CURRENCIES = ("IDR", "USD")
+
+EXPORT_BATCH_SIZE = 500
+
+# (user_id, field) pairs known to be backfilled, to skip the marker lookup
+_backfilled: Set[tuple] = set()
+
+
+def statement_query(user_id: str, wallet_type: str, currency: str) -> dict:
+    return {"user_id": user_id, "field": wallet_field(wallet_type, currency)}
+
+
+def statement_row(entry: dict) -> dict:
+    """Statement row (as returned by /wallet/statement) of a ledger entry"""
+    metadata = entry.get("metadata") or {}
+    amount = entry.get("amount", 0)
+    return {
+        "id": entry["id"],
+        "date": as_datetime(entry.get("created_at")),
+        "type": "credit" if amount > 0 else "debit",
+        "description": entry.get("description") or entry.get("type", ""),
+        "amount": abs(amount),
+        "currency": entry.get("currency"),
+        "reference": metadata.get("reference") or (entry.get("reference_id") or entry["id"])[:8],
+        "status": "completed",
+        "fee": metadata.get("fee", 0),
+        "balance_before": entry.get("balance_before"),
+        "balance_after": entry.get("balance_after"),
+    }
+
+
+async def statement_page(db, user_id: str, wallet_type: str, currency: str, params: QueuePageParams,
+                         response: Optional[Response] = None) -> List[dict]:
+    """
+    One keyset page of a wallet statement, newest first
+
+    Args:
+        db: Database
+        user_id: Client
+        wallet_type: main or withdrawal
+        currency: IDR or USD
+        params: Page size, cursor and date range (Asia/Jakarta days)
+        response: When given, receives the X-Next-Cursor header
+
+    Returns:
+        list: Statement rows with balance_before / balance_after
+    """
+    await ensure_backfilled(db, user_id, wallet_type, currency)
+    query = apply_queue_filters(statement_query(user_id, wallet_type, currency), params)
+    entries = await fetch_queue_page(db[LEDGER_COLLECTION], query, params, response)
+    return [statement_row(entry) for entry in entries]
+
+
+async def iter_statement(db, user_id: str, wallet_type: str, currency: str,
+                         start_date: Optional[str] = None, end_date: Optional[str] = None) -> AsyncIterator[dict]:
+    """Every statement row of a wallet in the date range, newest first, read from one cursor"""
+    await ensure_backfilled(db, user_id, wallet_type, currency)
+    query = apply_queue_filters(statement_query(user_id, wallet_type, currency),
+                                QueuePageParams(start_date=start_date, end_date=end_date))
+    async for entry in db[LEDGER_COLLECTION].find(query, {"_id": 0}).sort(PAGE_SORT).batch_size(EXPORT_BATCH_SIZE):
+        yield statement_row(entry)
+
+
+def statement_export(db, user_id: str, wallet_type: str, currency: str, fmt: str,
+                     start_date: Optional[str] = None, end_date: Optional[str] = None):
+    """
+    Export layout and row source of a wallet statement
+
+    Returns:
+        tuple: (ExportSpec, async iterator of rows) for export_engine
+    """
+    period = f"Periode: {start_date} s/d {end_date}" if start_date and end_date else "Periode: Semua transaksi"
+    title = f"Wallet Statement - {wallet_type.title()} Wallet ({currency})"
+    filename = f"Wallet_Statement_{wallet_type}_{currency}"
+
+    def money(value) -> str:
+        return f"${value or 0:,.2f}" if currency == "USD" else f"Rp {value or 0:,.0f}"
+
+    def date_text(row) -> str:
+        return row["date"].strftime('%Y-%m-%d %H:%M') if isinstance(row["date"], datetime) else str(row["date"] or "")
+
+    if fmt == "pdf":
+        spec = ExportSpec(title, filename, ['Tanggal', 'Tipe', 'Deskripsi', 'Jumlah', 'Saldo'],
+                          [1.5, 0.8, 2.5, 1.2, 1.2], info=[period])
+
+        async def rows():
+            async for row in iter_statement(db, user_id, wallet_type, currency, start_date, end_date):
+                yield [date_text(row), 'Kredit' if row['type'] == 'credit' else 'Debit', row['description'][:40],
+                       money(row['amount']), money(row.get('balance_after'))]
+    else:
+        spec = ExportSpec(title, filename, ['Tanggal', 'Tipe', 'Deskripsi', 'Jumlah', 'Saldo Setelah', 'Referensi', 'Status'],
+                          [18, 10, 40, 15, 15, 15, 12], info=[period], sheet_name="Wallet Statement")
+
+        async def rows():
+            async for row in iter_statement(db, user_id, wallet_type, currency, start_date, end_date):
+                yield [date_text(row), 'Kredit' if row['type'] == 'credit' else 'Debit', row['description'],
+                       row['amount'], row.get('balance_after', 0), row.get('reference', ''), row.get('status', '')]
+
+    return spec, rows()
+
+
+async def legacy_rows(db, user_id: str, wallet_type: str, currency: str) -> List[dict]:
+    """
+    Wallet movements recorded before the ledger, from the request collections
+
+    Returns:
+        list: Rows with date, signed amount, description, fee and the ids they settle
+    """
+    rows = []
+
+    def add(date, amount, description, ref_ids, reference, kind, fee=0):
+        rows.append({
+            "date": as_datetime(date) or MIN_DATETIME,
+            "amount": amount,
+            "description": description,
+            "ref_ids": [ref for ref in ref_ids if ref],
+            "reference": reference,
+            "type": kind,
+            "fee": fee,
+        })
+
+    # Wallet top-ups (credit)
+    async for topup in db.wallet_topup_requests.find(
+            {"user_id": user_id, "wallet_type": wallet_type, "currency": currency, "status": "verified"}):
+        add(topup.get("created_at"), topup["amount"], f"Top-Up {wallet_type.title()} Wallet",
+            [topup["id"]], topup.get("reference_code", topup["id"][:8]), "wallet_topup")
+
+    if wallet_type == "withdrawal":
+        # Account deletion balance transfers (credit)
+        async for deletion in db.transactions.find(
+                {"user_id": user_id, "type": "account_deletion_balance_transfer", "currency": currency, "status": "completed"}):
+            add(deletion.get("created_at"), deletion["amount"],
+                f"Transfer saldo dari akun {deletion.get('account_name', 'Unknown')} (dihapus)",
+                [deletion["id"], deletion.get("account_id")], deletion["id"][:8], "account_deletion_balance_transfer")
+
+        # Approved withdrawals (credit)
+        withdraws = await db.withdraw_requests.find(
+            {"user_id": user_id, "currency": currency, "status": {"$in": ["approved", "completed"]}}
+        ).to_list(length=None)
+        account_ids = list({w["account_id"] for w in withdraws if w.get("account_id")})
+        accounts = {
+            account["id"]: account.get("account_name", "Unknown")
+            async for account in db.ad_accounts.find({"id": {"$in": account_ids}}, {"_id": 0, "id": 1, "account_name": 1})
+        }
+        for withdraw in withdraws:
+            add(withdraw.get("processed_at", withdraw.get("created_at")),
+                withdraw.get("admin_verified_amount", withdraw.get("amount", 0)),
+                f"Penarikan dari akun {accounts.get(withdraw.get('account_id'), 'Unknown')}",
+                [withdraw["id"]], withdraw["id"][:8], "withdraw")
+
+    # Approved wallet transfers (debit of amount + fee)
+    async for transfer in db.wallet_transfers.find(
+            {"user_id": user_id, "source_wallet_type": wallet_type, "currency": currency, "status": "approved"}):
+        transfer_amount = transfer["amount"]
+        transfer_total = transfer.get("total", transfer_amount)
+        transfer_fee = transfer.get("fee", 0)
+        if transfer_fee == 0 and transfer_total > transfer_amount:
+            transfer_fee = transfer_total - transfer_amount
+        add(transfer.get("processed_at", transfer.get("created_at")), -(transfer_amount + transfer_fee),
+            f"Transfer ke {transfer.get('target_account_name', 'Unknown')}",
+            [transfer["id"]], transfer["id"][:8], "wallet_transfer", fee=transfer_fee)
+
+    # Currency exchanges (main wallet only)
+    if wallet_type == "main":
+        async for exchange in db.currency_exchanges.find(
+                {"user_id": user_id, "$or": [{"from_currency": currency}, {"to_currency": currency}]}):
+            if exchange["from_currency"] == currency:
+                amount = -exchange["from_amount"]
+            else:
+                amount = exchange["to_amount"]
+            add(exchange.get("created_at"), amount,
+                f"Tukar {exchange['from_currency']} → {exchange['to_currency']} (Rate: {exchange['exchange_rate']:.6f})",
+                [exchange["id"]], exchange["id"][:8], "exchange")
+
+    # Admin deductions and other adjustments
+    async for statement in db.wallet_statements.find({"user_id": user_id, "wallet_type": f"{wallet_type}_{currency.lower()}"}):
+        add(statement.get("created_at"), statement.get("amount", 0),
+            statement.get("description", "Wallet adjustment"),
+            [statement["id"], statement.get("reference_id")], (statement.get("reference_id") or statement["id"])[:8],
+            statement.get("reference_type", "adjustment"))
+
+    return rows
+
+
+async def backfill_wallet(db, user_id: str, wallet_type: str, currency: str, dry_run: bool = False) -> int:
+    """
+    Write the pre-ledger history of one wallet as ledger entries
+
+    Rows already settled by a ledger entry (same reference id) are skipped.
+    Running balances are counted backwards from the balance before the
+    oldest ledger entry, or from the current balance when there is none.
+
+    Returns:
+        int: Entries written (or that would be written)
+    """
+    field = wallet_field(wallet_type, currency)
+    ledger = db[LEDGER_COLLECTION]
+    query = {"user_id": user_id, "field": field}
+
+    settled = set(await ledger.distinct("reference_id", query))
+    oldest = await ledger.find_one(query, {"_id": 0, "balance_before": 1}, sort=[("created_at", 1), ("id", 1)])
+    if oldest is not None:
+        balance = oldest.get("balance_before", 0)
+    else:
+        user = await db.users.find_one({"id": user_id}, {"_id": 0, field: 1})
+        balance = (user or {}).get(field, 0)
+
+    rows = [row for row in await legacy_rows(db, user_id, wallet_type, currency)
+            if row["amount"] and not settled.intersection(row["ref_ids"])]
+    rows.sort(key=lambda row: row["date"], reverse=True)
+
+    entries = []
+    for row in rows:
+        after = round_amount(balance)
+        balance = round_amount(after - row["amount"])
+        entries.append({
+            "id": str(uuid.uuid4()),
+            "operation_id": str(uuid.uuid4()),
+            "type": row["type"],
+            "user_id": user_id,
+            "reference_id": row["ref_ids"][0] if row["ref_ids"] else None,
+            "collection": "users",
+            "account_id": user_id,
+            "field": field,
+            "currency": currency,
+            "description": row["description"],
+            "metadata": {"fee": row["fee"], "reference": row["reference"], "backfilled": True},
+            "created_at": row["date"],
+            "amount": row["amount"],
+            "balance_before": balance,
+            "balance_after": after,
+        })
+
+    if entries and not dry_run:
+        await ledger.insert_many(entries)
+    return len(entries)
+
+
+async def ensure_backfilled(db, user_id: str, wallet_type: str, currency: str):
+    """
+    Backfill a wallet's history the first time its statement is read
+
+    The first request claims the marker (status "running") and sets it to
+    "done" when the entries are written; concurrent requests for the wallet
+    wait for that instead of reading a page without the older history. A claim
+    not finished within BACKFILL_STALE_SECONDS (its worker died) is taken over.
+    """
+    key = (user_id, wallet_field(wallet_type, currency))
+    if key in _backfilled:
+        return
+    marker = {"user_id": key[0], "field": key[1]}
+    collection = db[BACKFILL_COLLECTION]
+
+    while True:
+        now = datetime.now(timezone.utc)
+        existing = await collection.find_one(marker, {"_id": 0, "status": 1, "claimed_at": 1})
+        if existing is None:
+            try:
+                await collection.insert_one({**marker, "status": BACKFILL_RUNNING, "created_at": now, "claimed_at": now})
+            except DuplicateKeyError:
+                continue
+        # Markers written before the status field existed are complete
+        elif existing.get("status", BACKFILL_DONE) == BACKFILL_DONE:
+            break
+        elif (as_datetime(existing.get("claimed_at")) or MIN_DATETIME) < now - timedelta(seconds=BACKFILL_STALE_SECONDS):
+            claimed = await collection.update_one(
+                {**marker, "status": BACKFILL_RUNNING, "claimed_at": existing.get("claimed_at")},
+                {"$set": {"claimed_at": now}}
+            )
+            if not claimed.modified_count:
+                continue
+        else:
+            await asyncio.sleep(BACKFILL_POLL_SECONDS)
+            continue
+
+        # This request holds the claim
+        try:
+            written = await backfill_wallet(db, user_id, wallet_type, currency)
+        except Exception:
+            await collection.delete_one({**marker, "status": BACKFILL_RUNNING})
+            raise
+        # updated_at lets timestamp-based delta backups pick up the completion
+        completed = datetime.now(timezone.utc)
+        await collection.update_one(marker, {"$set": {"status": BACKFILL_DONE, "completed_at": completed, "updated_at": completed}})
+        if written:
+            logger.info(f"📒 Backfilled {written} statement entries for {key[0][:8]} {key[1]}")
+        break
+    _backfilled.add(key)
+
+
+async def backfill_all(db, user_id: Optional[str] = None, dry_run: bool = False) -> Dict[str, int]:
+    """Backfill every wallet (of one user, or of every client) not backfilled yet"""
+    report = {}
+    query = {"id": user_id} if user_id else {}
+    async for user in db.users.find(query, {"_id": 0, "id": 1}):
+        for wallet_type in WALLET_TYPES:
+            for currency in CURRENCIES:
+                marker = {"user_id": user["id"], "field": wallet_field(wallet_type, currency)}
+                existing = await db[BACKFILL_COLLECTION].find_one(marker, {"_id": 0, "status": 1})
+                if existing and existing.get("status", BACKFILL_DONE) == BACKFILL_DONE:
+                    continue
+                if dry_run:
+                    written = await backfill_wallet(db, user["id"], wallet_type, currency, dry_run=True)
+                else:
+                    await ensure_backfilled(db, user["id"], wallet_type, currency)
+                    written = await db[LEDGER_COLLECTION].count_documents({**marker, "metadata.backfilled": True})
+                if written:
+                    report[f"{user['id']} {marker['field']}"] = written
+    return report
+
+
+async def main(user_id: Optional[str], dry_run: bool):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), tz_aware=True)
+    db = client[os.environ.get("DB_NAME", "test_database")]
+    try:
+        report = await backfill_all(db, user_id, dry_run=dry_run)
+        for wallet, written in report.items():
+            print(f"{wallet:<60} {written} entries {'to write' if dry_run else 'written'}")
+        print(f"{len(report)} wallets with pre-ledger history")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv(Path(__file__).parent / ".env")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", help="Only backfill this client's wallets")
+    parser.add_argument("--dry-run", action="store_true", help="Count entries without writing them")
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id, args.dry_run))
@@ -10,6 +10,7 @@ import { Textarea } from "../ui/textarea";
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, DialogTrigger } from "../ui/dialog";
 import { toast } from "sonner";
 import { useLanguage } from "../../contexts/LanguageContext";
+import { buildQueueParams, fetchAllQueuePages } from "../../utils/adminQueue";
 import { 
   Clock, 
   CheckCircle, 
@@ -122,11 +123,11 @@ const PaymentVerification = () => {
   const fetchPayments = async () => {
     try {
       const token = localStorage.getItem('admin_token');
-      const response = await axios.get(`${API}/admin/payments`, {
-        headers: { Authorization: `Bearer ${token}` },
-        params: statusFilter ? { status: statusFilter } : {}
+      const requests = await fetchAllQueuePages(`${API}/admin/payments`, {
+        token,
+        params: buildQueueParams({ status: statusFilter })
       });
-      setPayments(response.data);
+      setPayments(requests);
     } catch (error) {
       console.error('Error fetching payments:', error);
       toast.error('Failed to load payment requests');
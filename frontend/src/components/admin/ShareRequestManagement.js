@@ -26,6 +26,7 @@ import {
   Hash,
   Copy
 } from 'lucide-react';
+import { fetchAllQueuePages } from '../../utils/adminQueue';
 
 const API = process.env.REACT_APP_BACKEND_URL || import.meta.env.REACT_APP_BACKEND_URL;
 
@@ -144,16 +145,15 @@ const ShareRequestManagement = () => {
       }
       
       const token = localStorage.getItem('admin_token');
-      const params = new URLSearchParams();
+      const params = {};
       
-      if (statusFilter) params.append('status', statusFilter);
-      if (platformFilter) params.append('platform', platformFilter);
+      if (statusFilter) params.status = statusFilter;
+      if (platformFilter) params.platform = platformFilter;
       
-      const response = await axios.get(`${API}/api/admin/share-requests?${params}`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
+      // The endpoint is keyset paginated; search and stats below need every page
+      const requests = await fetchAllQueuePages(`${API}/api/admin/share-requests`, { token, params });
       
-      setShareRequests(response.data);
+      setShareRequests(requests);
     } catch (error) {
       console.error('Error fetching share requests:', error);
       toast.error(t('errorFetchingShareRequests'));
@@ -34,6 +34,7 @@ import {
 } from 'lucide-react';
 import { formatCurrency } from '../../utils/currencyFormatter';
 import { useRequestClaim } from '../../hooks/useRequestClaim';
+import { buildQueueParams, fetchAllQueuePages } from '../../utils/adminQueue';
 
 const API = process.env.REACT_APP_BACKEND_URL || import.meta.env.REACT_APP_BACKEND_URL;
 
@@ -140,16 +141,14 @@ const TransferRequestManagement = () => {
       }
       const token = localStorage.getItem('admin_token');
       
-      const params = new URLSearchParams();
-      if (statusFilter) params.append('status', statusFilter);
-      
-      const response = await axios.get(`${API}/api/admin/wallet-transfer-requests?${params}`, {
-        headers: { 'Authorization': `Bearer ${token}` }
+      const requests = await fetchAllQueuePages(`${API}/api/admin/wallet-transfer-requests`, {
+        token,
+        params: buildQueueParams({ status: statusFilter })
       });
       
       // Check if currently viewing request has been force released
       if (selectedRequest && showDetailModal) {
-        const updatedRequest = response.data.find(r => r.id === selectedRequest.id);
+        const updatedRequest = requests.find(r => r.id === selectedRequest.id);
         if (updatedRequest) {
           const wasClaimedByMe = isClaimedByMe(selectedRequest);
           const stillClaimedByMe = updatedRequest.claimed_by_username === localStorage.getItem('admin_username');
@@ -164,7 +163,7 @@ const TransferRequestManagement = () => {
         }
       }
       
-      setTransferRequests(response.data);
+      setTransferRequests(requests);
     } catch (error) {
       console.error('Error fetching transfer requests:', error);
       toast.error('Failed to fetch transfer requests');
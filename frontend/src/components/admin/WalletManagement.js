@@ -12,6 +12,7 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from "../ui/tabs";
 import { toast } from "sonner";
 import { useLanguage } from "../../contexts/LanguageContext";
 import AuthenticatedImage from "../ui/AuthenticatedImage";
+import { fetchAllQueuePages } from "../../utils/adminQueue";
 import { 
   Clock, 
   CheckCircle, 
@@ -100,10 +101,8 @@ const WalletManagement = () => {
   const fetchWalletTopUps = async () => {
     try {
       const token = localStorage.getItem('admin_token');
-      const response = await axios.get(`${API}/admin/wallet-topup-requests`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setWalletTopUps(response.data);
+      const topUps = await fetchAllQueuePages(`${API}/admin/wallet-topup-requests`, { token });
+      setWalletTopUps(topUps);
     } catch (error) {
       console.error('Error fetching wallet top-ups:', error);
       if (error.response?.status === 401) {
@@ -119,10 +118,8 @@ const WalletManagement = () => {
   const fetchWalletTransfers = async () => {
     try {
       const token = localStorage.getItem('admin_token');
-      const response = await axios.get(`${API}/admin/wallet-transfer-requests`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setWalletTransfers(response.data);
+      const transfers = await fetchAllQueuePages(`${API}/admin/wallet-transfer-requests`, { token });
+      setWalletTransfers(transfers);
     } catch (error) {
       console.error('Error fetching wallet transfers:', error);
       if (error.response?.status === 401) {
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useLanguage } from '../../contexts/LanguageContext';
 import axios from 'axios';
 import { toast } from 'sonner';
@@ -22,6 +22,7 @@ import {
 } from 'lucide-react';
 import { formatCurrency } from '../../utils/currencyFormatter';
 import { useRequestClaim } from '../../hooks/useRequestClaim';
+import { buildQueueParams, fetchQueuePage } from '../../utils/adminQueue';
 
 const API = process.env.REACT_APP_BACKEND_URL || import.meta.env.REACT_APP_BACKEND_URL;
 
@@ -73,10 +74,21 @@ const WalletTopUpManagement = () => {
     };
   }, []);
   
-  // Pagination state
+  // Pagination state (server-side keyset pages)
   const [currentPage, setCurrentPage] = useState(1);
   const [itemsPerPage, setItemsPerPage] = useState(25);
   const [paginatedRequests, setPaginatedRequests] = useState([]);
+  const [totalCount, setTotalCount] = useState(0);
+  const [knownPages, setKnownPages] = useState(1);
+  // pageCursorsRef.current[i] is the cursor that loads page i + 1 (page 1 has none)
+  const pageCursorsRef = useRef([null]);
+
+  // Reset to first page when server-side filters change
+  useEffect(() => {
+    pageCursorsRef.current = [null];
+    setKnownPages(1);
+    setCurrentPage(1);
+  }, [statusFilter, dateRange, itemsPerPage]);
 
   useEffect(() => {
     fetchRequests(); // Initial fetch
@@ -88,7 +100,7 @@ const WalletTopUpManagement = () => {
     
     // Cleanup interval on unmount
     return () => clearInterval(intervalId);
-  }, []);
+  }, [currentPage, statusFilter, dateRange, itemsPerPage]);
   
   // Check if current user is super admin
   useEffect(() => {
@@ -98,35 +110,48 @@ const WalletTopUpManagement = () => {
 
   useEffect(() => {
     filterRequests();
-  }, [requests, searchTerm, statusFilter, dateRange]);
+  }, [requests, searchTerm]);
 
-  // Pagination effect
+  // The server already returns exactly one page
   useEffect(() => {
-    const startIndex = (currentPage - 1) * itemsPerPage;
-    const endIndex = startIndex + itemsPerPage;
-    const paginated = filteredRequests.slice(startIndex, endIndex);
-    setPaginatedRequests(paginated);
-  }, [filteredRequests, currentPage, itemsPerPage]);
-
-  // Reset to first page when filters change
-  useEffect(() => {
-    setCurrentPage(1);
-  }, [searchTerm, statusFilter, itemsPerPage, dateRange]);
+    setPaginatedRequests(filteredRequests);
+  }, [filteredRequests]);
 
   const fetchRequests = async (silent = false) => {
     const token = localStorage.getItem('admin_token');
+    const cursor = pageCursorsRef.current[currentPage - 1];
+    if (cursor === undefined) {
+      // Page not reachable yet (filters were just reset)
+      return;
+    }
+    
     try {
       if (!silent) {
         setLoading(true);
       }
       
-      const response = await axios.get(`${API}/api/admin/wallet-topup-requests`, {
-        headers: { Authorization: `Bearer ${token}` }
+      const page = await fetchQueuePage(`${API}/api/admin/wallet-topup-requests`, {
+        token,
+        params: buildQueueParams({
+          status: statusFilter,
+          startDate: dateRange.startDate,
+          endDate: dateRange.endDate
+        }),
+        cursor,
+        limit: itemsPerPage,
+        includeTotal: true
       });
       
+      pageCursorsRef.current = pageCursorsRef.current.slice(0, currentPage);
+      if (page.nextCursor) {
+        pageCursorsRef.current.push(page.nextCursor);
+      }
+      setKnownPages(pageCursorsRef.current.length);
+      setTotalCount(page.total ?? page.items.length);
+      
       // Check if currently viewing request has been force released
       if (selectedRequest && showDetailModal) {
-        const updatedRequest = response.data.find(r => r.id === selectedRequest.id);
+        const updatedRequest = page.items.find(r => r.id === selectedRequest.id);
         if (updatedRequest) {
           const wasClaimedByMe = isClaimedByMe(selectedRequest);
           const stillClaimedByMe = updatedRequest.claimed_by_username === localStorage.getItem('admin_username');
@@ -141,7 +166,7 @@ const WalletTopUpManagement = () => {
         }
       }
       
-      setRequests(response.data);
+      setRequests(page.items);
     } catch (error) {
       console.error('Failed to fetch wallet top-up requests:', error);
       toast.error('Gagal memuat permintaan top-up wallet');
@@ -151,13 +176,9 @@ const WalletTopUpManagement = () => {
   };
 
   const filterRequests = () => {
+    // Status and date range are filtered server-side; search narrows the current page
     let filtered = requests;
 
-    // Status filter
-    if (statusFilter !== 'all') {
-      filtered = filtered.filter(req => req.status === statusFilter);
-    }
-
     // Search filter
     if (searchTerm) {
       filtered = filtered.filter(req => 
@@ -167,16 +188,6 @@ const WalletTopUpManagement = () => {
       );
     }
 
-    // Date range filter
-    if (dateRange.startDate && dateRange.endDate) {
-      filtered = filtered.filter(req => {
-        const requestDate = new Date(req.created_at);
-        const startDate = new Date(dateRange.startDate);
-        const endDate = new Date(dateRange.endDate);
-        return requestDate >= startDate && requestDate <= endDate;
-      });
-    }
-
     setFilteredRequests(filtered);
   };
 
@@ -559,12 +570,13 @@ const WalletTopUpManagement = () => {
   };
 
   // Pagination calculations
-  const totalPages = Math.ceil(filteredRequests.length / itemsPerPage);
-  const startIndex = (currentPage - 1) * itemsPerPage + 1;
-  const endIndex = Math.min(currentPage * itemsPerPage, filteredRequests.length);
+  const totalPages = Math.max(1, Math.ceil(totalCount / itemsPerPage));
+  const startIndex = totalCount === 0 ? 0 : (currentPage - 1) * itemsPerPage + 1;
+  const endIndex = Math.min((currentPage - 1) * itemsPerPage + requests.length, totalCount);
 
+  // Keyset pages can only be reached once the page before them has been loaded
   const goToPage = (page) => {
-    if (page >= 1 && page <= totalPages) {
+    if (page >= 1 && page <= Math.min(totalPages, knownPages)) {
       setCurrentPage(page);
     }
   };
@@ -584,7 +596,8 @@ const WalletTopUpManagement = () => {
         <button
           key={i}
           onClick={() => goToPage(i)}
-          className={`px-3 py-1 rounded ${
+          disabled={i > knownPages}
+          className={`px-3 py-1 rounded disabled:opacity-50 disabled:cursor-not-allowed ${
             currentPage === i
               ? 'bg-blue-600 text-white'
               : 'bg-white text-gray-700 hover:bg-gray-100'
@@ -600,7 +613,7 @@ const WalletTopUpManagement = () => {
       <div className="hidden md:flex items-center justify-between px-6 py-3 bg-white border-t border-gray-200">
         <div className="flex items-center text-sm text-gray-700">
           <span>
-            Menampilkan {startIndex} - {endIndex} dari {filteredRequests.length} data
+            Menampilkan {startIndex} - {endIndex} dari {totalCount} data
           </span>
           <select
             value={itemsPerPage}
@@ -641,7 +654,7 @@ const WalletTopUpManagement = () => {
           </button>
           <button
             onClick={() => goToPage(totalPages)}
-            disabled={currentPage === totalPages}
+            disabled={currentPage === totalPages || totalPages > knownPages}
             className="px-3 py-1 rounded bg-white text-gray-700 hover:bg-gray-100 disabled:opacity-50 disabled:cursor-not-allowed"
           >
             »»
@@ -665,7 +678,8 @@ const WalletTopUpManagement = () => {
         <button
           key={i}
           onClick={() => goToPage(i)}
-          className={`px-3 py-1 border text-xs font-medium rounded ${
+          disabled={i > knownPages}
+          className={`px-3 py-1 border text-xs font-medium rounded disabled:opacity-50 ${
             i === currentPage
               ? 'bg-blue-600 border-blue-600 text-white'
               : 'border-gray-300 text-gray-700 hover:bg-gray-50'
@@ -681,7 +695,7 @@ const WalletTopUpManagement = () => {
         <div className="flex flex-col space-y-3">
           <div className="flex flex-col sm:flex-row sm:items-center sm:justify-between space-y-2 sm:space-y-0">
             <p className="text-xs text-gray-600">
-              Menampilkan {startIndex} - {endIndex} dari {filteredRequests.length}
+              Menampilkan {startIndex} - {endIndex} dari {totalCount}
             </p>
             <div className="flex items-center space-x-2">
               <span className="text-xs text-gray-600">Per halaman:</span>
@@ -1108,7 +1122,7 @@ const WalletTopUpManagement = () => {
       </div>
 
       {/* Pagination - Outside desktop/mobile divs so both can render */}
-      {filteredRequests.length > 0 && renderPagination()}
+      {totalCount > 0 && renderPagination()}
 
       {/* Detail Modal */}
       {showDetailModal && selectedRequest && (
@@ -26,6 +26,7 @@ import {
 } from 'lucide-react';
 import { formatCurrency } from '../../utils/currencyFormatter';
 import { useRequestClaim } from '../../hooks/useRequestClaim';
+import { buildQueueParams, fetchAllQueuePages } from '../../utils/adminQueue';
 
 const API = process.env.REACT_APP_BACKEND_URL || import.meta.env.REACT_APP_BACKEND_URL;
 
@@ -195,18 +196,14 @@ const WithdrawManagement = () => {
         setLoading(true);
       }
       const token = localStorage.getItem('admin_token');
-      const params = new URLSearchParams();
+      const params = buildQueueParams({ status: statusFilter });
+      if (platformFilter) params.platform = platformFilter;
       
-      if (statusFilter) params.append('status', statusFilter);
-      if (platformFilter) params.append('platform', platformFilter);
-      
-      const response = await axios.get(`${API}/api/admin/withdraws?${params}`, {
-        headers: { Authorization: `Bearer ${token}` }
-      });
+      const requests = await fetchAllQueuePages(`${API}/api/admin/withdraws`, { token, params });
       
       // Check if currently viewing request has been force released
       if (selectedWithdraw && showDetailModal) {
-        const updatedRequest = response.data.find(r => r.id === selectedWithdraw.id);
+        const updatedRequest = requests.find(r => r.id === selectedWithdraw.id);
         if (updatedRequest) {
           const wasClaimedByMe = isClaimedByMe(selectedWithdraw);
           const stillClaimedByMe = updatedRequest.claimed_by_username === localStorage.getItem('admin_username');
@@ -221,7 +218,7 @@ const WithdrawManagement = () => {
         }
       }
       
-      setWithdraws(response.data);
+      setWithdraws(requests);
     } catch (error) {
       console.error('Error fetching withdraws:', error);
       toast.error(t('errorFetchingWithdraws'));
@@ -0,0 +1,66 @@
+/**
+ * Helpers for the keyset-paginated admin queue endpoints
+ * (/admin/payments, /admin/wallet-topup-requests, /admin/withdraws, ...)
+ *
+ * Pages are returned as plain arrays; the cursor for the next page and the
+ * optional total count travel in the X-Next-Cursor / X-Total-Count headers.
+ */
+import axios from 'axios';
+
+/**
+ * Build server-side filter params from the admin list filter state
+ * @param {Object} filters - { status, startDate, endDate, currency, userId }
+ * @returns {Object} - Query params understood by the queue endpoints
+ */
+export const buildQueueParams = ({ status, startDate, endDate, currency, userId } = {}) => {
+  const params = {};
+  if (status && status !== 'all') params.status = status;
+  if (startDate) params.start_date = startDate;
+  if (endDate) params.end_date = endDate;
+  if (currency && currency !== 'all') params.currency = currency;
+  if (userId) params.user_id = userId;
+  return params;
+};
+
+/**
+ * Fetch a single page of an admin queue
+ * @param {string} url - Queue endpoint URL
+ * @param {Object} options - { token, params, cursor, limit, includeTotal }
+ * @returns {Promise<{items: Array, nextCursor: string|null, total: number|null}>}
+ */
+export const fetchQueuePage = async (url, { token, params = {}, cursor = null, limit = 25, includeTotal = false } = {}) => {
+  const response = await axios.get(url, {
+    headers: { Authorization: `Bearer ${token}` },
+    params: {
+      ...params,
+      limit,
+      ...(cursor ? { cursor } : {}),
+      ...(includeTotal ? { include_total: true } : {})
+    }
+  });
+
+  const totalHeader = response.headers['x-total-count'];
+  return {
+    items: response.data,
+    nextCursor: response.headers['x-next-cursor'] || null,
+    total: totalHeader !== undefined ? parseInt(totalHeader, 10) : null
+  };
+};
+
+/**
+ * Fetch every page of an admin queue by following the cursor, for lists that
+ * still search and count on the client
+ * @param {string} url - Queue endpoint URL
+ * @param {Object} options - { token, params, limit }
+ * @returns {Promise<Array>} - All items, newest first
+ */
+export const fetchAllQueuePages = async (url, { token, params = {}, limit = 1000 } = {}) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const page = await fetchQueuePage(url, { token, params, cursor, limit });
+    items.push(...page.items);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
+};
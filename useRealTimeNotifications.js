@@ -5,6 +5,11 @@ import notificationService from '../services/NotificationService';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || import.meta.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Polling is only the fallback while the notification stream is down
+const FALLBACK_POLL_INTERVAL = 60000;
+// While the stream is up, an occasional resync covers events another API worker pushed
+const STREAM_RESYNC_INTERVAL = 300000;
+
 // Global singleton to prevent multiple polling instances
 let globalPollingInterval = null;
 let instanceCount = 0;
@@ -16,6 +21,7 @@ export const useRealTimeNotifications = (userType = 'client') => {
   const intervalRef = useRef(null);
   const isInitialized = useRef(false);
   const savedCallback = useRef(); // Fix for stale closures
+  const shownIds = useRef(new Set()); // Desktop notifications already shown (pushed or polled)
 
   const fetchNotifications = useCallback(async (retryCount = 0) => {
     try {
@@ -107,13 +113,14 @@ export const useRealTimeNotifications = (userType = 'client') => {
       const lastCheck = new Date(Date.now() - 15000); // Look back 15 seconds to avoid missing notifications
       const newNotifications = currentNotifications.filter(notification => {
         const notificationTime = new Date(notification.created_at);
-        return notificationTime > lastCheck && !notification.is_read;
+        return notificationTime > lastCheck && !notification.is_read && !shownIds.current.has(notification.id);
       });
 
       // Show desktop notifications for new items (with sound only for first notification)
       for (let i = 0; i < newNotifications.length; i++) {
         const notification = newNotifications[i];
         const isFirstNotification = i === 0;
+        shownIds.current.add(notification.id);
         
         if (userType === 'admin') {
           notificationService.showAdminNotification(
@@ -144,6 +151,37 @@ export const useRealTimeNotifications = (userType = 'client') => {
     }
   };
 
+  const showDesktopNotification = (notification, playSound) => {
+    if (userType === 'admin') {
+      notificationService.showAdminNotification(
+        notification.title,
+        notification.message,
+        notification.type,
+        playSound,
+        notification.reference_id
+      );
+    } else {
+      notificationService.showClientNotification(
+        notification.title,
+        notification.message,
+        notification.type,
+        playSound,
+        notification.reference_id
+      );
+    }
+  };
+
+  // Notification pushed over the stream: no refetch needed
+  const handlePushedNotification = (notification, count) => {
+    setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)].slice(0, 50));
+    setUnreadCount(count);
+    setLastCheckTime(new Date());
+    if (!shownIds.current.has(notification.id)) {
+      shownIds.current.add(notification.id);
+      showDesktopNotification(notification, true);
+    }
+  };
+
   const markAsRead = useCallback(async (notificationId) => {
     try {
       const token = localStorage.getItem(userType === 'admin' ? 'admin_token' : 'token');
@@ -199,7 +237,17 @@ export const useRealTimeNotifications = (userType = 'client') => {
     savedCallback.current = checkForNewNotifications;
   });
 
-  // Setup polling with fixed dependencies
+  const startPolling = (interval) => {
+    if (globalPollingInterval) clearInterval(globalPollingInterval);
+    globalPollingInterval = setInterval(() => {
+      // Use saved callback to avoid stale closures
+      if (instanceCount > 0 && savedCallback.current) {
+        savedCallback.current();
+      }
+    }, interval);
+  };
+
+  // Server-sent events stream, with polling as the fallback
   useEffect(() => {
     const token = localStorage.getItem(userType === 'admin' ? 'admin_token' : 'token');
     if (!token) return;
@@ -210,24 +258,49 @@ export const useRealTimeNotifications = (userType = 'client') => {
     // Initial load
     savedCallback.current();
 
-    // Only start polling if it's not already running
-    if (!globalPollingInterval) {
-      console.log('Starting global notification polling (60 seconds)');
-      globalPollingInterval = setInterval(() => {
-        // Use saved callback to avoid stale closures
-        if (instanceCount > 0 && savedCallback.current) {
+    let source = null;
+    if (typeof window !== 'undefined' && window.EventSource) {
+      source = new EventSource(`${API}/${userType}/notifications/stream?token=${encodeURIComponent(token)}`);
+
+      source.onopen = () => {
+        // Stream is up: drop to a slow resync, and catch up on anything missed while disconnected
+        console.log('Notification stream connected');
+        startPolling(STREAM_RESYNC_INTERVAL);
+        if (isInitialized.current && savedCallback.current) {
           savedCallback.current();
         }
-      }, 60000); // Increased from 10s to 60s to reduce server load
+      };
+
+      source.addEventListener('unread', (event) => {
+        const { count } = JSON.parse(event.data);
+        setUnreadCount(count);
+        localStorage.setItem(`cached_unread_count_${userType}`, count.toString());
+      });
+
+      source.addEventListener('notification', (event) => {
+        const { notification, unread_count: count } = JSON.parse(event.data);
+        handlePushedNotification(notification, count);
+      });
+
+      source.onerror = () => {
+        // EventSource reconnects by itself; poll until it does
+        console.log('Notification stream unavailable, polling every 60 seconds');
+        startPolling(FALLBACK_POLL_INTERVAL);
+      };
+    } else {
+      console.log('Starting notification polling (60 seconds)');
+      startPolling(FALLBACK_POLL_INTERVAL);
     }
 
     return () => {
+      if (source) source.close();
+
       // Decrement instance count on cleanup
       instanceCount--;
       
       // Clear global polling if no instances left
       if (instanceCount <= 0 && globalPollingInterval) {
-        console.log('Stopping global notification polling');
+        console.log('Stopping notification polling');
         clearInterval(globalPollingInterval);
         globalPollingInterval = null;
         instanceCount = 0; // Reset to 0